@@ -0,0 +1,154 @@
+"""dashboard summary tables and counter triggers
+
+Revision ID: 3c1f8a2d9b47
+Revises:
+Create Date: 2026-10-17 00:10:00.000000
+
+Creates ``dashboard_counters`` and ``attendance_daily_counts`` (see
+``app.services.dashboard_stats``) and the statement-level triggers that
+keep the counters current. Attendance has no trigger: the daily rollup is
+rebuilt by the application's periodic refresh, so concurrent roll calls
+do not contend on the row of the current day. Triggers are only created
+on tables that exist. The SQL is frozen here on purpose; later changes
+to the counters need a new revision.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f8a2d9b47'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table -> [(counter name, row predicate)], as of this revision
+COUNTERS = {
+    "students": [
+        ("students_active", "status = 'active'"),
+    ],
+    "staff_members": [
+        ("staff_active", "is_active = true"),
+    ],
+    "courses": [
+        ("courses_active", "is_active = true"),
+    ],
+    "course_enrollments": [
+        ("enrollments_total", "true"),
+        ("enrollments_active", "enrollment_status = 'active'"),
+        ("enrollments_completed", "enrollment_status = 'completed'"),
+    ],
+    "transcript_requests": [
+        ("transcript_requests_pending", "status = 'pending'"),
+    ],
+    "organization_units": [
+        ("organization_units_active", "is_active = true"),
+        ("faculties_active", "is_active = true AND type = 'faculty'"),
+        ("departments_active", "is_active = true AND type = 'department'"),
+    ],
+}
+
+# Transition tables need one trigger per event
+EVENTS = [
+    ("insert", "INSERT", "NEW TABLE AS new_rows"),
+    ("update", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("delete", "DELETE", "OLD TABLE AS old_rows"),
+]
+
+def _function(table: str) -> str:
+    return f"dashboard_counters_{table}"
+
+
+def delta_sql(table: str, rows: str, sign: str) -> str:
+    """Apply the counter deltas of one transition table in a single scan"""
+    counters = COUNTERS[table]
+    aggregates = ", ".join(
+        f"COUNT(*) FILTER (WHERE {predicate}) AS c{i}"
+        for i, (_, predicate) in enumerate(counters)
+    )
+    deltas = ", ".join(
+        f"('{name}', s.c{i})" for i, (name, _) in enumerate(counters)
+    )
+    return f"""
+        UPDATE dashboard_counters d
+        SET value = d.value {sign} v.delta, updated_at = now()
+        FROM (SELECT {aggregates} FROM {rows}) s
+        CROSS JOIN LATERAL (VALUES {deltas}) AS v(name, delta)
+        WHERE d.name = v.name AND v.delta <> 0;
+    """
+
+
+def counter_trigger_sql(table: str) -> str:
+    function = _function(table)
+    triggers = "\n".join(
+        f"""
+        CREATE TRIGGER {function}_{suffix}
+            AFTER {event} ON {table}
+            REFERENCING {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+        """
+        for suffix, event, referencing in EVENTS
+    )
+    return f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                {delta_sql(table, 'new_rows', '+')}
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                {delta_sql(table, 'old_rows', '-')}
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        {_drop_triggers_sql(table, function)}
+        {triggers}
+    """
+
+
+def _drop_triggers_sql(table: str, function: str) -> str:
+    return "\n".join(
+        f"DROP TRIGGER IF EXISTS {function}_{suffix} ON {table};"
+        for suffix, _, _ in EVENTS
+    )
+
+
+def _existing_tables(tables) -> list:
+    rows = op.get_bind().execute(
+        sa.text("SELECT t FROM unnest(CAST(:tables AS text[])) AS t "
+                "WHERE to_regclass(t) IS NOT NULL"),
+        {"tables": list(tables)}
+    )
+    return [row[0] for row in rows]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS dashboard_counters (
+            name TEXT PRIMARY KEY,
+            value BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        CREATE TABLE IF NOT EXISTS attendance_daily_counts (
+            attendance_date DATE PRIMARY KEY,
+            present BIGINT NOT NULL DEFAULT 0,
+            total BIGINT NOT NULL DEFAULT 0
+        );
+    """)
+    for table in _existing_tables(COUNTERS):
+        op.execute(counter_trigger_sql(table))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in _existing_tables(COUNTERS):
+        op.execute(_drop_triggers_sql(table, _function(table)))
+    for table in COUNTERS:
+        op.execute(f"DROP FUNCTION IF EXISTS {_function(table)}()")
+    op.execute("DROP TABLE IF EXISTS attendance_daily_counts")
+    op.execute("DROP TABLE IF EXISTS dashboard_counters")
@@ -0,0 +1,92 @@
+"""pg_trgm extension and trigram search indexes
+
+Revision ID: 7d2e4b9a1c63
+Revises: 3c1f8a2d9b47
+Create Date: 2026-10-17 00:20:00.000000
+
+Indexes ``lower(col) gin_trgm_ops`` on the columns searched through
+``app.services.search``, so ``lower(col) LIKE '%word%'`` is answered by
+the index. Indexes are built with ``CREATE INDEX CONCURRENTLY`` outside
+the migration transaction, so writes are not blocked. An INVALID index
+left by an interrupted concurrent build is dropped and rebuilt.
+Columns missing from the current schema are skipped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4b9a1c63'
+down_revision: Union[str, Sequence[str], None] = '3c1f8a2d9b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column) pairs searched by the API, as of this revision
+TRIGRAM_INDEXES = [
+    ("persons", "first_name"),
+    ("persons", "last_name"),
+    ("persons", "middle_name"),
+    ("students", "student_number"),
+    ("staff_members", "employee_number"),
+    # Legacy schema
+    ("persons", "firstname"),
+    ("persons", "lastname"),
+    ("persons", "patronymic"),
+    ("persons", "pincode"),
+    ("students", "card_number"),
+]
+
+
+def index_name(table: str, column: str) -> str:
+    return f"ix_{table}_{column}_trgm"
+
+
+def _existing_columns(connection) -> list:
+    rows = connection.execute(sa.text("""
+        SELECT table_name::text, column_name::text
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND (table_name::text, column_name::text) IN (
+              SELECT * FROM unnest(CAST(:tables AS text[]), CAST(:columns AS text[]))
+          )
+    """), {
+        "tables": [t for t, _ in TRIGRAM_INDEXES],
+        "columns": [c for _, c in TRIGRAM_INDEXES],
+    })
+    return [tuple(row) for row in rows]
+
+
+def _invalid_indexes(connection) -> set:
+    rows = connection.execute(sa.text("""
+        SELECT c.relname::text
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid AND c.relname = ANY(CAST(:names AS text[]))
+    """), {"names": [index_name(t, c) for t, c in TRIGRAM_INDEXES]})
+    return {row[0] for row in rows}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        for name in _invalid_indexes(connection):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        for table, column in _existing_columns(connection):
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name(table, column)} "
+                f"ON {table} USING gin (lower({column}) gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The extension is left installed; other objects may depend on it
+    with op.get_context().autocommit_block():
+        for table, column in TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(table, column)}")
@@ -0,0 +1,74 @@
+"""reference data change notification triggers
+
+Revision ID: b81f3e5c2a90
+Revises: 7d2e4b9a1c63
+Create Date: 2026-10-17 00:30:00.000000
+
+Statement-level triggers on the tables behind the cached reference sets
+(see ``app.services.reference_data``) that ``pg_notify('reference_data',
+<table>)``. The application only LISTENs on the channel. Tables missing
+from the current schema are skipped. A new source table needs a new
+revision.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f3e5c2a90'
+down_revision: Union[str, Sequence[str], None] = '7d2e4b9a1c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CHANNEL = "reference_data"
+
+# Source tables of the registered reference sets, as of this revision
+SOURCE_TABLES = [
+    "a_subject_catalog",
+    "academic_programs",
+    "course",
+    "courses",
+    "dictionaries",
+    "dictionary_types",
+    "grade_point_scale",
+    "organization_units",
+    "subject_dic",
+]
+
+
+def _existing_tables() -> list:
+    rows = op.get_bind().execute(
+        sa.text("SELECT t FROM unnest(CAST(:tables AS text[])) AS t "
+                "WHERE to_regclass(t) IS NOT NULL"),
+        {"tables": SOURCE_TABLES}
+    )
+    return [row[0] for row in rows]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION reference_data_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{CHANNEL}', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in _existing_tables():
+        op.execute(f"""
+            DROP TRIGGER IF EXISTS reference_data_notify ON {table};
+            CREATE TRIGGER reference_data_notify
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION reference_data_notify();
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in _existing_tables():
+        op.execute(f"DROP TRIGGER IF EXISTS reference_data_notify ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS reference_data_notify()")
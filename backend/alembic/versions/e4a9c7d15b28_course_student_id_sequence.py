@@ -0,0 +1,48 @@
+"""course_student id sequence
+
+Revision ID: e4a9c7d15b28
+Revises: b81f3e5c2a90
+Create Date: 2026-10-17 00:40:00.000000
+
+``course_student.id`` has no default. Enrollment writes take ids from
+``course_student_id_seq`` instead of ``MAX(id) + 1``. The sequence is
+positioned after the current ids, or after its own position if an
+earlier application version already created it. Skipped when the legacy
+``course_student`` table does not exist.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c7d15b28'
+down_revision: Union[str, Sequence[str], None] = 'b81f3e5c2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_course_student() -> bool:
+    return op.get_bind().execute(
+        sa.text("SELECT to_regclass('course_student') IS NOT NULL")
+    ).scalar()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_course_student():
+        return
+    op.execute("CREATE SEQUENCE IF NOT EXISTS course_student_id_seq")
+    op.execute("""
+        SELECT setval('course_student_id_seq', GREATEST(
+            (SELECT COALESCE(MAX(id), 0) FROM course_student),
+            (SELECT CASE WHEN is_called THEN last_value ELSE 0 END
+             FROM course_student_id_seq)
+        ) + 1, false)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP SEQUENCE IF EXISTS course_student_id_seq")
@@ -20,6 +20,8 @@ from .curriculum_simplified import router as curriculum_router
 from .class_schedule import router as class_schedule_router
 from .dashboard import router as dashboard_router
 from .user_preferences import router as user_preferences_router
+from .search import router as search_router
+from .lookups import router as lookups_router
 
 # Create main API router
 api_router = APIRouter()
@@ -64,6 +66,12 @@ api_router.include_router(
 api_router.include_router(
     user_preferences_router, tags=["user-preferences"]
 )
+api_router.include_router(
+    search_router, tags=["search"]
+)
+api_router.include_router(
+    lookups_router, tags=["lookups"]
+)
 
 
 @api_router.get("/health")
@@ -6,21 +6,15 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
 
-from app.core.config import settings
+from app.core.db_pool import get_db_connection as get_pooled_connection
+from app.services import schedule_index
 
 router = APIRouter()
 
 def get_db_connection():
     """Get database connection"""
     try:
-        conn = psycopg2.connect(
-            host=settings.DB_HOST,
-            database=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            cursor_factory=RealDictCursor
-        )
-        return conn
+        return get_pooled_connection(cursor_factory=RealDictCursor)
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
 
@@ -400,6 +394,7 @@ def create_event(event: EventCreate):
         
         result = cursor.fetchone()
         conn.commit()
+        schedule_index.invalidate()  # holidays affect calendar occurrences
         
         return {
             "id": result["id"], 
@@ -480,6 +475,7 @@ def update_event(event_id: str, event: EventUpdate):
             raise HTTPException(status_code=404, detail="Event not found")
             
         conn.commit()
+        schedule_index.invalidate()  # holidays affect calendar occurrences
         
         return {
             "id": result["id"],
@@ -508,6 +504,7 @@ def delete_event(event_id: str):
         # Delete the event from calendar_events
         cursor.execute("DELETE FROM calendar_events WHERE id = %s", (event_id,))
         conn.commit()
+        schedule_index.invalidate()  # holidays affect calendar occurrences
         
         return {"message": "Event deleted successfully"}
         
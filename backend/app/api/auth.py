@@ -16,14 +16,26 @@ from app.schemas.auth import LoginRequest, LoginResponse, UserProfile, UserProfi
 from app.auth import (
     create_access_token,
     get_current_user,
-    CurrentUser,
-    verify_password,
-    hash_password
+    CurrentUser
 )
+from app.auth.password_pool import PasswordHashingBusy, password_pool
+from app.auth.user_cache import get_identity, revoke_tokens
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
+def _run_hashing(func, *args):
+    """Run bcrypt work on the hashing pool, answering 429 when overloaded"""
+    try:
+        return func(*args)
+    except PasswordHashingBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
 @router.post("/login", response_model=LoginResponse)
 def login(
     login_data: LoginRequest,
@@ -59,8 +71,8 @@ def login(
     # Verify password using bcrypt hashing
     # Check if password is hashed (bcrypt hashes start with $2b$ or $2a$)
     if user.password_hash.startswith('$2'):
-        # Password is hashed, use verify_password
-        if not verify_password(login_data.password, user.password_hash):
+        # Password is hashed, verify it on the bounded hashing pool
+        if not _run_hashing(password_pool.verify, login_data.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password"
@@ -81,7 +93,7 @@ def login(
         password_to_hash = login_data.password
         if len(password_to_hash.encode('utf-8')) > 72:
             password_to_hash = password_to_hash.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-        user.password_hash = hash_password(password_to_hash)
+        user.password_hash = _run_hashing(password_pool.hash, password_to_hash)
         db.commit()
     
     # Check if user is active and not locked
@@ -91,62 +103,11 @@ def login(
             detail="User account is disabled or locked"
         )
     
-    # Get person information for full name
-    person = None
-    if user.id:
-        stmt = select(Person).where(Person.user_id == user.id)
-        result = db.execute(stmt)
-        person = result.scalar_one_or_none()
-    
-    # Determine user type by checking students and staff_members tables
-    user_type = "UNKNOWN"
-    full_name = None
-    
-    if person:
-        full_name = f"{person.first_name} {person.last_name}".strip()
-    
-    # First check if role is defined in user metadata (for SYSADMIN and special roles)
-    if user.user_metadata and isinstance(user.user_metadata, dict):
-        metadata_role = user.user_metadata.get('role')
-        if metadata_role in ['SYSADMIN', 'ADMIN', 'TEACHER', 'STUDENT']:
-            user_type = metadata_role
-    
-    # If not in metadata, check database tables
-    if user_type == "UNKNOWN":
-        # Check if user is a student
-        from app.models import Student
-        student_check = db.execute(
-            select(Student.id).where(Student.user_id == user.id).limit(1)
-        ).scalar_one_or_none()
-        
-        if student_check:
-            user_type = "STUDENT"
-        else:
-            # Check if user is staff/teacher
-            from app.models.staff_member import StaffMember
-            staff_check = db.execute(
-                select(
-                    StaffMember.id,
-                    StaffMember.academic_rank,
-                    StaffMember.administrative_role
-                )
-                .where(StaffMember.user_id == user.id)
-                .limit(1)
-            ).fetchone()
-            
-            if staff_check:
-                # Determine if TEACHER or ADMIN based on role
-                admin_role = staff_check.administrative_role
-                
-                # If has administrative role, classify as ADMIN
-                if admin_role and admin_role in [
-                    'rector', 'vice_rector', 'dean', 'vice_dean',
-                    'head_of_department'
-                ]:
-                    user_type = "ADMIN"
-                else:
-                    # All staff members are teachers by default
-                    user_type = "TEACHER"
+    # Resolve role and name through the identity cache so the first
+    # authenticated request after login is served without a lookup
+    identity = get_identity(db, user.id)
+    user_type = identity.user_type
+    full_name = identity.full_name if identity.person_id else None
     
     # Validate user type against frontend type (role-based access control)
     if login_data.frontend_type:
@@ -194,13 +155,8 @@ def login(
     access_token_expires = timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    token_data = {
-        "sub": str(user.id),
-        "user_type": user_type,
-        "username": user.username,
-    }
     access_token = create_access_token(
-        data=token_data,
+        data=identity.to_claims(),
         expires_delta=access_token_expires
     )
     
@@ -255,13 +211,8 @@ def refresh_token(
     access_token_expires = timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    token_data = {
-        "sub": str(current_user.id),
-        "user_type": current_user.user_type,
-        "username": current_user.username,
-    }
     access_token = create_access_token(
-        data=token_data,
+        data=current_user.identity.to_claims(),
         expires_delta=access_token_expires
     )
 
@@ -271,6 +222,25 @@ def refresh_token(
     }
 
 
+@router.post("/logout-all")
+def logout_all_sessions(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Revoke every access token issued to the current user
+
+    Args:
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        Confirmation message
+    """
+    revoke_tokens(db, current_user.user)
+    return {"message": "All sessions have been logged out"}
+
+
 @router.get("/user/", response_model=UserProfileDetailed)
 def get_user_profile(
     current_user: CurrentUser = Depends(get_current_user),
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 import os
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
-import psycopg2
 from psycopg2.extras import RealDictCursor
 
-from app.core.config import settings
+from app.core.db_pool import get_db_connection as get_pooled_connection
+from app.services import localization, reference_data
+from app.services.search import search_condition, search_rank
 
 router = APIRouter(tags=["class-schedule"])
 
@@ -139,14 +140,7 @@ class AvailableStudent(BaseModel):
 
 def get_db_connection():
     try:
-        conn = psycopg2.connect(
-            host=settings.DB_HOST,
-            database=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            port=str(settings.DB_PORT)
-        )
-        return conn
+        return get_pooled_connection(cursor_factory=None)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -154,8 +148,64 @@ def get_db_connection():
         )
 
 
+def _apply_course_enrollment(cursor, course_id: int,
+                             student_ids_to_add: List[int],
+                             student_ids_to_remove: List[int]) -> dict:
+    """
+    Apply enrollment changes of one course with set-based statements
+
+    Only rows whose state actually changes are touched: active members
+    are deactivated, inactive ones reactivated and missing ones inserted.
+    Edits of the same course are serialized for the transaction. New ids
+    come from ``course_student_id_seq`` (created by a migration) instead
+    of ``MAX(id) + 1``, which hands out duplicates under concurrency.
+    """
+    to_add = sorted(set(student_ids_to_add))
+    to_remove = sorted(set(student_ids_to_remove) - set(to_add))
+
+    cursor.execute(
+        "SELECT pg_advisory_xact_lock(hashtext('course_student:' || %s))",
+        (str(course_id),)
+    )
+
+    removed = 0
+    if to_remove:
+        cursor.execute("""
+            UPDATE course_student
+            SET active = 0, update_date = NOW()
+            WHERE course_id = %s AND student_id = ANY(%s) AND active <> 0
+        """, (course_id, to_remove))
+        removed = cursor.rowcount
+
+    reactivated = 0
+    added = 0
+    if to_add:
+        cursor.execute("""
+            UPDATE course_student
+            SET active = 1, update_date = NOW()
+            WHERE course_id = %s AND student_id = ANY(%s) AND active <> 1
+        """, (course_id, to_add))
+        reactivated = cursor.rowcount
+
+        cursor.execute("""
+            INSERT INTO course_student
+            (id, course_id, student_id, active, create_date, create_user_id,
+             update_date, update_user_id, course_work)
+            SELECT nextval('course_student_id_seq'), %s, v.student_id,
+                   1, NOW(), 1, NOW(), 1, 0
+            FROM unnest(%s::bigint[]) AS v(student_id)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM course_student cs
+                WHERE cs.course_id = %s AND cs.student_id = v.student_id
+            )
+        """, (course_id, to_add, course_id))
+        added = cursor.rowcount
+
+    return {"added": added, "reactivated": reactivated, "removed": removed}
+
+
 @router.get("/courses/full-schedule/")
-def get_full_schedule_data():
+def get_full_schedule_data(lang: str = Query("az", pattern=localization.LANGUAGE_PATTERN)):
     """Get full schedule data - combines courses and stats"""
     try:
         conn = get_db_connection()
@@ -167,10 +217,6 @@ def get_full_schedule_data():
                 c.id::text,
                 c.code as course_code,
                 c.code,
-                COALESCE(c.name->>'az', c.name->>'en', 
-                         'Unknown Subject') as subject_name,
-                COALESCE(c.name->>'az', c.name->>'en', 
-                         'Unknown Subject') as course_name,
                 c.credit_hours as credits,
                 c.lecture_hours as m_hours,
                 c.tutorial_hours as s_hours,
@@ -195,15 +241,20 @@ def get_full_schedule_data():
             LEFT JOIN course_enrollments ce ON ce.course_offering_id = co.id
             LEFT JOIN course_instructors ci ON ci.course_offering_id = co.id
             WHERE c.is_active = true
-            GROUP BY c.id, c.code, c.name, c.credit_hours, c.lecture_hours,
-                     c.tutorial_hours, c.lab_hours, c.is_active, 
-                     c.created_at, c.updated_at
+            GROUP BY c.id
             ORDER BY c.code
         """
 
         cursor.execute(courses_query)
         courses = cursor.fetchall()
 
+        # Names come from the per-language catalog instead of the JSONB column
+        course_names = localization.names("courses", lang)
+        for course in courses:
+            name = course_names.get(course["id"], "Unknown Subject")
+            course["subject_name"] = name
+            course["course_name"] = name
+
         # Get stats data
         cursor.execute(
             "SELECT COUNT(*) as count FROM courses WHERE is_active = true"
@@ -831,14 +882,8 @@ def enroll_student(course_id: int, enrollment: StudentEnrollment):
                 detail="Student already enrolled in this course"
             )
         
-        # Insert new enrollment
-        cursor.execute(
-            """INSERT INTO course_student 
-               (id, course_id, student_id, active, create_date, create_user_id, 
-                update_date, update_user_id, course_work)
-               VALUES ((SELECT COALESCE(MAX(id), 0) + 1 FROM course_student), %s, %s, 1, NOW(), 1, NOW(), 1, 0)""",
-            (course_id, enrollment.student_id)
-        )
+        # Insert new enrollment (or reactivate a removed one)
+        _apply_course_enrollment(cursor, course_id, [enrollment.student_id], [])
         
         conn.commit()
         cursor.close()
@@ -898,94 +943,84 @@ def remove_student(course_id: int, student_id: int):
         )
 
 
+@reference_data.register("subjects", tables=("subject_dic", "a_subject_catalog"))
+def _load_subjects(cur):
+    # Get subjects from subject_dic table (primary subjects)
+    query = """
+        SELECT 
+            sd.id,
+            sd.name_az as name,
+            sd.code
+        FROM subject_dic sd
+        WHERE sd.name_az IS NOT NULL 
+        AND sd.name_az != ''
+        UNION
+        SELECT 
+            asubc.id,
+            asubc.subject as name,
+            NULL as code
+        FROM a_subject_catalog asubc
+        WHERE asubc.subject IS NOT NULL 
+        AND asubc.subject != ''
+        AND asubc.subject NOT IN (
+            SELECT sd.name_az FROM subject_dic sd WHERE sd.name_az IS NOT NULL
+        )
+        ORDER BY name
+        LIMIT 100
+    """
+    cur.execute(query)
+    return cur.fetchall()
+
+
 @router.get("/subjects", response_model=List[SubjectInfo])
 def get_available_subjects():
     """Get all available subjects from the university system"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get subjects from subject_dic table (primary subjects)
-        query = """
-            SELECT 
-                sd.id,
-                sd.name_az as name,
-                sd.code
-            FROM subject_dic sd
-            WHERE sd.name_az IS NOT NULL 
-            AND sd.name_az != ''
-            UNION
-            SELECT 
-                asubc.id,
-                asubc.subject as name,
-                NULL as code
-            FROM a_subject_catalog asubc
-            WHERE asubc.subject IS NOT NULL 
-            AND asubc.subject != ''
-            AND asubc.subject NOT IN (
-                SELECT sd.name_az FROM subject_dic sd WHERE sd.name_az IS NOT NULL
-            )
-            ORDER BY name
-            LIMIT 100
-        """
-        
-        cursor.execute(query)
-        subjects = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        return subjects
-        
+        return reference_data.get("subjects")
     except Exception as e:
         raise HTTPException(
-            status_code=500, 
+            status_code=500,
             detail=f"Failed to fetch subjects: {str(e)}"
         )
 
 
+@reference_data.register("education_languages", tables=("subject_dic", "course"))
+def _load_education_languages(cur):
+    # Get languages from dictionary table
+    query = """
+        SELECT DISTINCT 
+            sd.id,
+            sd.name_az as name
+        FROM subject_dic sd
+        INNER JOIN course c ON sd.id = c.education_lang_id
+        WHERE sd.name_az IS NOT NULL 
+        AND sd.name_az != ''
+        UNION
+        SELECT 
+            110000065 as id,
+            'Azərbaycan dili' as name
+        UNION
+        SELECT 
+            110000066 as id,
+            'İngilis dili' as name
+        UNION
+        SELECT 
+            110000067 as id,
+            'Rus dili' as name
+        ORDER BY name
+    """
+    cur.execute(query)
+    return cur.fetchall()
+
+
 @router.get("/education-languages", response_model=List[EducationLanguage])
 def get_education_languages():
     """Get all available education languages"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get languages from dictionary table
-        query = """
-            SELECT DISTINCT 
-                sd.id,
-                sd.name_az as name
-            FROM subject_dic sd
-            INNER JOIN course c ON sd.id = c.education_lang_id
-            WHERE sd.name_az IS NOT NULL 
-            AND sd.name_az != ''
-            UNION
-            SELECT 
-                110000065 as id,
-                'Azərbaycan dili' as name
-            UNION
-            SELECT 
-                110000066 as id,
-                'İngilis dili' as name
-            UNION
-            SELECT 
-                110000067 as id,
-                'Rus dili' as name
-            ORDER BY name
-        """
-        
-        cursor.execute(query)
-        languages = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        return languages
-        
+        return reference_data.get("education_languages")
     except Exception as e:
         raise HTTPException(
-            status_code=500, 
+            status_code=500,
             detail=f"Failed to fetch education languages: {str(e)}"
         )
 
@@ -1107,42 +1142,37 @@ def get_education_groups(
         )
 
 
+@reference_data.register("semesters", tables=("course",))
+def _load_semesters(cur):
+    # Try to get actual semester data, or provide common ones
+    query = """
+        SELECT DISTINCT 
+            semester_id as id,
+            CASE 
+                WHEN semester_id = 1 THEN 'Payız semestri'
+                WHEN semester_id = 2 THEN 'Yaz semestri'
+                WHEN semester_id = 3 THEN 'Bahar semestri'
+                ELSE CONCAT('Semestr ', semester_id::text)
+            END as name
+        FROM course 
+        WHERE semester_id IS NOT NULL
+        UNION
+        SELECT 1 as id, 'Payız semestri' as name
+        UNION  
+        SELECT 2 as id, 'Yaz semestri' as name
+        UNION
+        SELECT 3 as id, 'Bahar semestri' as name
+        ORDER BY id
+    """
+    cur.execute(query)
+    return cur.fetchall()
+
+
 @router.get("/semesters", response_model=List[SemesterInfo])
 def get_semesters():
     """Get available semester periods"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Try to get actual semester data, or provide common ones
-        query = """
-            SELECT DISTINCT 
-                semester_id as id,
-                CASE 
-                    WHEN semester_id = 1 THEN 'Payız semestri'
-                    WHEN semester_id = 2 THEN 'Yaz semestri'
-                    WHEN semester_id = 3 THEN 'Bahar semestri'
-                    ELSE CONCAT('Semestr ', semester_id::text)
-                END as name
-            FROM course 
-            WHERE semester_id IS NOT NULL
-            UNION
-            SELECT 1 as id, 'Payız semestri' as name
-            UNION  
-            SELECT 2 as id, 'Yaz semestri' as name
-            UNION
-            SELECT 3 as id, 'Bahar semestri' as name
-            ORDER BY id
-        """
-        
-        cursor.execute(query)
-        semesters = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        return semesters
-        
+        return reference_data.get("semesters")
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1254,48 +1284,19 @@ def manage_course_students(
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Remove students
-        for student_id in management.student_ids_to_remove:
-            cursor.execute("""
-                UPDATE course_student 
-                SET active = 0, update_date = NOW()
-                WHERE course_id = %s AND student_id = %s
-            """, (course_id, student_id))
-        
-        # Add students
-        for student_id in management.student_ids_to_add:
-            # Check if student is already enrolled
-            cursor.execute("""
-                SELECT id FROM course_student 
-                WHERE course_id = %s AND student_id = %s
-            """, (course_id, student_id))
-            
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Reactivate if exists
-                cursor.execute("""
-                    UPDATE course_student 
-                    SET active = 1, update_date = NOW()
-                    WHERE course_id = %s AND student_id = %s
-                """, (course_id, student_id))
-            else:
-                # Create new enrollment
-                cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM course_student")
-                new_id = cursor.fetchone()[0]
-                
-                cursor.execute("""
-                    INSERT INTO course_student 
-                    (id, course_id, student_id, active, create_date, create_user_id, update_date, update_user_id, course_work)
-                    VALUES (%s, %s, %s, 1, NOW(), 1, NOW(), 1, 0)
-                """, (new_id, course_id, student_id))
+        changes = _apply_course_enrollment(
+            cursor, course_id,
+            management.student_ids_to_add,
+            management.student_ids_to_remove
+        )
         
         conn.commit()
         cursor.close()
         conn.close()
         
         return {
-            "message": f"Successfully managed students: {len(management.student_ids_to_add)} added, {len(management.student_ids_to_remove)} removed"
+            "message": f"Successfully managed students: {len(management.student_ids_to_add)} added, {len(management.student_ids_to_remove)} removed",
+            **changes
         }
     
     except Exception as e:
@@ -1307,6 +1308,55 @@ def manage_course_students(
         )
 
 
+@router.post("/courses/{course_id}/education-groups/{group_id}/enroll")
+def enroll_education_group(course_id: int, group_id: int):
+    """Enroll every active student of an education group in a course"""
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT DISTINCT egs.student_id
+            FROM education_group_student egs
+            JOIN students s ON s.id = egs.student_id AND s.active = 1
+            WHERE egs.education_group_id = %s AND egs.active = 1
+        """, (group_id,))
+        student_ids = [row[0] for row in cursor.fetchall()]
+        
+        if not student_ids:
+            raise HTTPException(
+                status_code=404,
+                detail="No active students in this education group"
+            )
+        
+        changes = _apply_course_enrollment(cursor, course_id, student_ids, [])
+        
+        conn.commit()
+        cursor.close()
+        conn.close()
+        
+        enrolled = changes["added"] + changes["reactivated"]
+        return {
+            "message": f"Enrolled {enrolled} students from education group {group_id}",
+            "group_students": len(student_ids),
+            **changes
+        }
+    
+    except HTTPException:
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        raise
+    except Exception as e:
+        if 'conn' in locals():
+            conn.rollback()
+            conn.close()
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Failed to enroll education group: {str(e)}"
+        )
+
+
 @router.get("/students/available", response_model=List[AvailableStudent])
 def get_available_students(
     search: Optional[str] = None,
@@ -1348,12 +1398,16 @@ def get_available_students(
             params.append(education_group_id)
         
         # Search filter
+        rank_sql, rank_params = "0", []
         if search and len(search) >= 2:
-            query += " AND (p.firstname ILIKE %s OR p.lastname ILIKE %s OR s.id::text ILIKE %s)"
-            search_param = f"%{search}%"
-            params.extend([search_param, search_param, search_param])
-        
-        query += " ORDER BY p.firstname, p.lastname LIMIT %s"
+            columns = ["p.firstname", "p.lastname"]
+            search_sql, search_params = search_condition(search, columns, id_column="s.id")
+            query += f" AND {search_sql}"
+            params.extend(search_params)
+            rank_sql, rank_params = search_rank(search, columns)
+        
+        query += f" ORDER BY {rank_sql} DESC, p.firstname, p.lastname LIMIT %s"
+        params.extend(rank_params)
         params.append(limit)
         
         cursor.execute(query, params)
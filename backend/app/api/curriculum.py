@@ -1,27 +1,18 @@
 from fastapi import APIRouter, HTTPException, Query
-import os
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
-import psycopg2
 from psycopg2.extras import RealDictCursor
 import logging
 
-from app.core.config import settings
+from app.core.db_pool import get_db_connection as get_pooled_connection
 
 router = APIRouter()
 
 
-def get_db_connection():
 def get_db_connection():
     try:
-        conn = psycopg2.connect(
-            host=settings.DB_HOST,
-            database=settings.DB_NAME, 
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            cursor_factory=RealDictCursor
-        )
+        conn = get_pooled_connection(cursor_factory=RealDictCursor)
         conn.autocommit = True
         return conn
     except Exception as e:
@@ -123,7 +114,7 @@ class CurriculumUpdate(BaseModel):
 # API Endpoints
 
 @router.get("/stats", response_model=CurriculumStats)
-async def get_curriculum_stats():
+def get_curriculum_stats():
     """Get comprehensive curriculum system statistics"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -173,7 +164,7 @@ async def get_curriculum_stats():
         raise HTTPException(status_code=500, detail=f"Failed to get curriculum statistics: {str(e)}")
 
 @router.get("/subjects/top", response_model=List[SubjectInfo])
-async def get_top_subjects(limit: int = Query(20, ge=1, le=100)):
+def get_top_subjects(limit: int = Query(20, ge=1, le=100)):
     """Get top subjects by usage in curricula"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -218,7 +209,7 @@ async def get_top_subjects(limit: int = Query(20, ge=1, le=100)):
         raise HTTPException(status_code=500, detail=f"Failed to get top subjects: {str(e)}")
 
 @router.get("/organizations", response_model=List[OrganizationInfo])
-async def get_organizations_with_curricula(limit: int = Query(50, ge=1, le=100)):
+def get_organizations_with_curricula(limit: int = Query(50, ge=1, le=100)):
     """Get organizations with their curricula counts"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -255,7 +246,7 @@ async def get_organizations_with_curricula(limit: int = Query(50, ge=1, le=100))
         raise HTTPException(status_code=500, detail=f"Failed to get organizations: {str(e)}")
 
 @router.get("/", response_model=List[CurriculumOverview])
-async def get_curricula_overview(
+def get_curricula_overview(
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     organization_id: Optional[int] = Query(None),
@@ -330,7 +321,7 @@ async def get_curricula_overview(
         raise HTTPException(status_code=500, detail=f"Failed to get curricula: {str(e)}")
 
 @router.get("/{curriculum_id}", response_model=CurriculumDetail)
-async def get_curriculum_detail(curriculum_id: str):
+def get_curriculum_detail(curriculum_id: str):
     """Get detailed information about a specific curriculum (academic program)"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -388,7 +379,7 @@ async def get_curriculum_detail(curriculum_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to get curriculum detail: {str(e)}")
 
 @router.get("/{curriculum_id}/subjects", response_model=List[CurriculumSubject])
-async def get_curriculum_subjects(curriculum_id: str):
+def get_curriculum_subjects(curriculum_id: str):
     """Get all courses/subjects for a specific academic program"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -437,7 +428,7 @@ async def get_curriculum_subjects(curriculum_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to get curriculum subjects: {str(e)}")
 
 @router.get("/{curriculum_id}/courses", response_model=List[CourseInfo])
-async def get_curriculum_courses(curriculum_id: int):
+def get_curriculum_courses(curriculum_id: int):
     """Get all courses for a specific curriculum"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -493,7 +484,7 @@ async def get_curriculum_courses(curriculum_id: int):
         raise HTTPException(status_code=500, detail=f"Failed to get curriculum courses: {str(e)}")
 
 @router.post("/", response_model=Dict[str, Any])
-async def create_curriculum(curriculum: CurriculumCreate):
+def create_curriculum(curriculum: CurriculumCreate):
     """Create a new curriculum"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -540,7 +531,7 @@ async def create_curriculum(curriculum: CurriculumCreate):
         raise HTTPException(status_code=500, detail=f"Failed to create curriculum: {str(e)}")
 
 @router.put("/{curriculum_id}", response_model=Dict[str, Any])
-async def update_curriculum(curriculum_id: int, curriculum: CurriculumUpdate):
+def update_curriculum(curriculum_id: int, curriculum: CurriculumUpdate):
     """Update an existing curriculum"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -613,7 +604,7 @@ async def update_curriculum(curriculum_id: int, curriculum: CurriculumUpdate):
         raise HTTPException(status_code=500, detail=f"Failed to update curriculum: {str(e)}")
 
 @router.delete("/{curriculum_id}", response_model=Dict[str, Any])
-async def delete_curriculum(curriculum_id: int):
+def delete_curriculum(curriculum_id: int):
     """Soft delete a curriculum (set active = 0)"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -9,7 +9,8 @@ from pydantic import BaseModel
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
-from app.core.config import settings
+from app.core.db_pool import get_db_connection as get_pooled_connection
+from app.services import localization
 
 router = APIRouter()
 
@@ -17,14 +18,7 @@ router = APIRouter()
 def get_db():
     """Get database connection"""
     try:
-        conn = psycopg2.connect(
-            host=settings.DB_HOST,
-            database=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            cursor_factory=RealDictCursor
-        )
-        return conn
+        return get_pooled_connection(cursor_factory=RealDictCursor)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -344,7 +338,10 @@ def get_curriculum_detail(curriculum_id: str):
 
 
 @router.get("/curricula/{curriculum_id}/subjects", response_model=List[CurriculumSubject])
-def get_curriculum_subjects(curriculum_id: str):
+def get_curriculum_subjects(
+    curriculum_id: str,
+    lang: str = Query('en', pattern=localization.LANGUAGE_PATTERN)
+):
     """Get all courses/subjects for a specific academic program"""
     conn = get_db()
     try:
@@ -352,13 +349,8 @@ def get_curriculum_subjects(curriculum_id: str):
 
         query = """
             SELECT
+                c.id::text,
                 c.code as subject_code,
-                COALESCE(
-                    c.name->>'en',
-                    c.name->>'az',
-                    c.name->>'ru',
-                    c.name::text
-                ) as subject_name,
                 c.credit_hours
             FROM courses c
             WHERE c.code LIKE (
@@ -374,7 +366,11 @@ def get_curriculum_subjects(curriculum_id: str):
         cursor.execute(query, (curriculum_id,))
         subjects = cursor.fetchall()
 
-        return [dict(row) for row in subjects]
+        course_names = localization.names("courses", lang)
+        return [
+            {**row, "subject_name": course_names.get(row["id"], row["subject_code"])}
+            for row in subjects
+        ]
 
     except psycopg2.Error as e:
         raise HTTPException(
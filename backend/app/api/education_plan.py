@@ -7,7 +7,11 @@ from typing import List, Optional
 from pydantic import BaseModel
 import psycopg2
 from psycopg2.extras import RealDictCursor
-import os
+from app.core.db_pool import get_db_connection as get_pooled_connection
+from app.core.pagination import (
+    COUNT_MODE_PATTERN, SortKey, after_sql, decode_cursor, estimate_rows,
+    order_by_sql, row_values, split_page, total_count
+)
 
 router = APIRouter()
 
@@ -15,14 +19,7 @@ router = APIRouter()
 def get_db_connection():
     """Get database connection - using LMS database"""
     try:
-        conn = psycopg2.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            database=os.getenv("DB_NAME", "lms"),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASSWORD", "1111"),
-            cursor_factory=RealDictCursor
-        )
-        return conn
+        return get_pooled_connection(cursor_factory=RealDictCursor)
     except psycopg2.Error as e:
         raise HTTPException(
             status_code=500,
@@ -48,6 +45,15 @@ class EducationPlanListResponse(BaseModel):
     """Paginated education plan (academic programs) list response"""
     count: int
     results: List[AcademicProgram]
+    next_cursor: Optional[str] = None
+
+
+# Newest first (undated programs first, as with ORDER BY created_at DESC)
+PROGRAM_SORT_KEYS = [
+    SortKey("COALESCE(created_at, 'infinity')", "sort_created_at", descending=True),
+    SortKey("code", "code"),
+    SortKey("id", "id"),
+]
 
 
 @router.get("/", response_model=EducationPlanListResponse)
@@ -65,7 +71,11 @@ def get_education_plans(
         description="Filter by active status"
     ),
     limit: int = Query(default=50, le=100),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    page_cursor: Optional[str] = Query(
+        None, alias="cursor", description="next_cursor of the previous page"
+    ),
+    count_mode: str = Query("exact", pattern=COUNT_MODE_PATTERN)
 ) -> EducationPlanListResponse:
     """
     Get list of academic programs (education plans) from lms database
@@ -76,6 +86,8 @@ def get_education_plans(
         is_active: Filter by active status
         limit: Maximum number of programs to return
         offset: Number of programs to skip
+        page_cursor: Continue after the previous page instead of offset
+        count_mode: exact, cached or estimated total count
         
     Returns:
         List of academic programs
@@ -110,18 +122,35 @@ def get_education_plans(
         )
         
         # Get total count
-        count_query = f"""
-            SELECT COUNT(*) as total
-            FROM academic_programs
-            WHERE {where_clause}
-        """
-        cursor.execute(count_query, params)
-        total_count = cursor.fetchone()['total'] or 0
+        def count_exact():
+            cursor.execute(f"""
+                SELECT COUNT(*) as total
+                FROM academic_programs
+                WHERE {where_clause}
+            """, params)
+            return cursor.fetchone()['total'] or 0
+
+        count = total_count(
+            count_mode, ("education_plans", search, degree_type, is_active), count_exact,
+            lambda: estimate_rows(
+                cursor, f"SELECT id FROM academic_programs WHERE {where_clause}", params
+            )
+        )
         
-        # Get paginated results
-        params.extend([limit, offset])
+        # Get paginated results; a cursor replaces the offset
+        order_sql, _ = order_by_sql(PROGRAM_SORT_KEYS)
+        offset_sql, offset_params = "OFFSET %s", [offset]
+        if page_cursor:
+            after, after_params = after_sql(
+                PROGRAM_SORT_KEYS, decode_cursor(page_cursor, PROGRAM_SORT_KEYS)
+            )
+            where_clause = f"{where_clause} AND {after}"
+            params.extend(after_params)
+            offset_sql, offset_params = "", []
+        params.extend([limit + 1] + offset_params)
         query = f"""
             SELECT
+                COALESCE(created_at, 'infinity')::text as sort_created_at,
                 id::text,
                 organization_unit_id::text,
                 code,
@@ -134,16 +163,19 @@ def get_education_plans(
                 created_at::text
             FROM academic_programs
             WHERE {where_clause}
-            ORDER BY created_at DESC, code
-            LIMIT %s OFFSET %s
+            ORDER BY {order_sql}
+            LIMIT %s {offset_sql}
         """
         
         cursor.execute(query, params)
-        programs = cursor.fetchall()
+        programs, next_cursor = split_page(
+            cursor.fetchall(), limit, row_values(PROGRAM_SORT_KEYS)
+        )
         
         return EducationPlanListResponse(
-            count=total_count,
-            results=[dict(row) for row in programs]
+            count=count,
+            results=[dict(row) for row in programs],
+            next_cursor=next_cursor
         )
         
     except psycopg2.Error as e:
@@ -1,41 +1,18 @@
 from fastapi import APIRouter, HTTPException
-import os
+import asyncio
 from typing import List, Dict, Any
-import psycopg2
-from psycopg2.extras import RealDictCursor
 import logging
 
-from app.core.config import settings
+from app.core.database import fetch_all, fetch_one
+from app.services import reference_data
 
 router = APIRouter()
 
 
-def get_db_connection():
-    """Create database connection"""
-    try:
-        connection = psycopg2.connect(
-            host=settings.DB_HOST,
-            database=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            cursor_factory=RealDictCursor
-        )
-        return connection
-    except Exception as e:
-        logging.error(f"Database connection error: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Database connection failed"
-        )
-
-
 @router.get("/evaluation-systems", response_model=List[Dict[str, Any]])
 async def get_evaluation_systems():
     """Get all evaluation systems (assessment types) with their details from LMS database"""
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-
         # Query assessment types and their usage from the LMS database
         query = """
         SELECT
@@ -53,8 +30,7 @@ async def get_evaluation_systems():
         ORDER BY assessment_type
         """
 
-        cursor.execute(query)
-        systems = cursor.fetchall()
+        systems = await fetch_all(query)
 
         result = []
         for system in systems:
@@ -66,9 +42,6 @@ async def get_evaluation_systems():
                 "formulas": system["formulas"] or "N/A"
             })
 
-        cursor.close()
-        connection.close()
-
         return result
 
     except Exception as e:
@@ -83,9 +56,6 @@ async def get_evaluation_systems():
 async def get_evaluation_system_details(system_name: str):
     """Get detailed information for a specific evaluation system (assessment type)"""
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-
         query = """
         SELECT
             a.id::text,
@@ -106,13 +76,12 @@ async def get_evaluation_system_details(system_name: str):
             NULL::integer as colloquium_status,
             a.submission_type as type
         FROM assessments a
-        WHERE a.assessment_type = %s
+        WHERE a.assessment_type = :system_name
         ORDER BY a.id
         LIMIT 50
         """
 
-        cursor.execute(query, (system_name,))
-        details = cursor.fetchall()
+        details = await fetch_all(query, {"system_name": system_name})
 
         if not details:
             raise HTTPException(
@@ -120,13 +89,11 @@ async def get_evaluation_system_details(system_name: str):
                 detail=f"Evaluation system '{system_name}' not found"
             )
 
+        # The grade scale does not depend on the assessment, load it once
+        parsed_points = await parse_points_from_assessment()
+
         result = []
         for detail in details:
-            # Parse points to get grade scale
-            parsed_points = await parse_points_from_assessment(
-                detail["id"],
-                connection
-            )
 
             result.append({
                 "id": detail["id"],
@@ -140,9 +107,6 @@ async def get_evaluation_system_details(system_name: str):
                 "type": detail["type"]
             })
 
-        cursor.close()
-        connection.close()
-
         return result
 
     except HTTPException:
@@ -155,11 +119,9 @@ async def get_evaluation_system_details(system_name: str):
         )
 
 
-async def parse_points_from_assessment(assessment_id: str, connection) -> List[Dict[str, Any]]:
-    """Get grade scale points used for an assessment"""
+async def parse_points_from_assessment() -> List[Dict[str, Any]]:
+    """Get grade scale points used for assessments"""
     try:
-        cursor = connection.cursor()
-
         # Get grade point scale (letter grades available)
         query = """
         SELECT
@@ -173,11 +135,10 @@ async def parse_points_from_assessment(assessment_id: str, connection) -> List[D
         ORDER BY display_order
         """
 
-        cursor.execute(query)
-        grade_points = cursor.fetchall()
+        grade_points = await fetch_all(query)
 
         if grade_points:
-            return [dict(point) for point in grade_points]
+            return grade_points
 
         # Fallback to numeric scale if no letter grades
         return [
@@ -190,38 +151,31 @@ async def parse_points_from_assessment(assessment_id: str, connection) -> List[D
         return []
 
 
+@reference_data.register("grade_scale", tables=("grade_point_scale",))
+def _load_grade_scale(cur):
+    cur.execute("""
+    SELECT
+        id::text,
+        letter_grade as code,
+        description->>'en' as name_en,
+        description->>'ru' as name_ru,
+        NULL::text as type_id,
+        CASE
+            WHEN letter_grade ~ '^[A-F][+-]?$' THEN 'letter'
+            ELSE 'numeric'
+        END as category
+    FROM grade_point_scale
+    WHERE is_active = true
+    ORDER BY display_order
+    """)
+    return cur.fetchall()
+
+
 @router.get("/grade-dictionary", response_model=List[Dict[str, Any]])
 async def get_grade_dictionary():
     """Get all grade point scale entries from LMS database"""
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-
-        query = """
-        SELECT
-            id::text,
-            letter_grade as code,
-            description->>'en' as name_en,
-            description->>'ru' as name_ru,
-            NULL::text as type_id,
-            CASE
-                WHEN letter_grade ~ '^[A-F][+-]?$' THEN 'letter'
-                ELSE 'numeric'
-            END as category
-        FROM grade_point_scale
-        WHERE is_active = true
-        ORDER BY display_order
-        """
-
-        cursor.execute(query)
-        grades = cursor.fetchall()
-
-        result = [dict(grade) for grade in grades]
-
-        cursor.close()
-        connection.close()
-
-        return result
+        return await reference_data.get_async("grade_scale")
 
     except Exception as e:
         logging.error(f"Error fetching grade dictionary: {e}")
@@ -235,19 +189,15 @@ async def get_grade_dictionary():
 async def get_evaluation_statistics():
     """Get statistics about evaluation system usage from LMS database"""
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-
         # Total grades recorded
-        cursor.execute("""
+        grade_stats_query = fetch_one("""
         SELECT COUNT(*) as total_records
         FROM grades
         WHERE is_final = true
         """)
-        grade_stats = cursor.fetchone()
 
         # Usage by assessment type
-        cursor.execute("""
+        usage_stats_query = fetch_all("""
         SELECT
             a.assessment_type as name,
             COUNT(g.id) as usage_count
@@ -257,10 +207,9 @@ async def get_evaluation_statistics():
         GROUP BY a.assessment_type
         ORDER BY usage_count DESC
         """)
-        usage_stats = cursor.fetchall()
 
         # Grade distribution by letter grade
-        cursor.execute("""
+        grade_distribution_query = fetch_all("""
         SELECT
             CASE
                 WHEN g.letter_grade IS NOT NULL THEN g.letter_grade
@@ -276,15 +225,16 @@ async def get_evaluation_statistics():
         GROUP BY grade_type
         ORDER BY count DESC
         """)
-        grade_distribution = cursor.fetchall()
 
-        cursor.close()
-        connection.close()
+        # The three aggregates are independent, run them concurrently
+        grade_stats, usage_stats, grade_distribution = await asyncio.gather(
+            grade_stats_query, usage_stats_query, grade_distribution_query
+        )
 
         return {
             "total_records": grade_stats["total_records"] if grade_stats else 0,
-            "usage_by_system": [dict(stat) for stat in usage_stats],
-            "grade_distribution": [dict(dist) for dist in grade_distribution]
+            "usage_by_system": usage_stats,
+            "grade_distribution": grade_distribution
         }
 
     except Exception as e:
@@ -0,0 +1,47 @@
+"""
+Reference data API endpoints
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.core.etag import is_not_modified, make_etag, not_modified, set_etag
+from app.services import reference_data
+
+router = APIRouter(prefix="/lookups", tags=["lookups"])
+
+
+@router.get("")
+def get_lookups(
+    request: Request,
+    response: Response,
+    names: Optional[str] = Query(
+        None, description="Comma-separated set names; all sets when omitted"
+    ),
+):
+    """
+    Dropdown data for the forms in one response
+
+    Served from the process-wide reference data cache. The response
+    carries an ETag derived from the bundle version, so clients that
+    already hold the current data get ``304 Not Modified``.
+    """
+    requested = [name.strip() for name in names.split(",") if name.strip()] if names else None
+    unknown = sorted(set(requested or ()) - set(reference_data.names()))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown lookups: {', '.join(unknown)}"
+        )
+
+    try:
+        bundle = reference_data.bundle(requested)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    etag = make_etag(request, bundle["version"])
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return bundle
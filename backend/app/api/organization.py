@@ -8,6 +8,9 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models.organization_unit import OrganizationUnit
+from app.services import org_tree
+from app.services.localization import localize
+from app.services.org_tree import OrgNode
 
 
 router = APIRouter(prefix="/organizations", tags=["organizations"])
@@ -25,11 +28,39 @@ class OrganizationWithChildren(BaseModel):
     has_children: bool = False
 
 
-def get_localized_value(jsonb_field: Optional[dict], lang: str = 'en') -> Optional[str]:
-    """Get localized value from JSONB field with fallback"""
-    if not jsonb_field:
-        return None
-    return jsonb_field.get(lang) or jsonb_field.get('en') or jsonb_field.get('az') or next(iter(jsonb_field.values()), None)
+def _node_dict(node: OrgNode, lang: str = 'en') -> dict:
+    """Response fields of a cached tree node (children left empty)"""
+    return {
+        "id": node.id,
+        "code": node.code,
+        "name": node.name,
+        "name_localized": localize(node.name, lang),
+        "type": node.type,
+        "parent_id": node.parent_id,
+        "is_active": node.is_active,
+        "children": [],
+        "has_children": False
+    }
+
+
+def _unit_response(tree: org_tree.OrgTree, node: OrgNode, lang: str = 'en',
+                   active_only: bool = False) -> OrganizationWithChildren:
+    """A single unit whose has_children tells the UI whether it expands"""
+    unit = _node_dict(node, lang)
+    unit["has_children"] = bool(tree.children_of(node.id, active_only))
+    return OrganizationWithChildren(**unit)
+
+
+def _parse_id(organization_id: str) -> str:
+    """Canonical id string; 400 for malformed ids"""
+    from uuid import UUID
+    try:
+        return str(UUID(organization_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid organization ID format"
+        )
 
 
 class OrganizationHierarchy(BaseModel):
@@ -71,31 +102,14 @@ def get_organization_hierarchy(
         lang: Language code for localized content (en, ru, az)
     """
     try:
-        # Build query
-        query = db.query(OrganizationUnit)
-        
-        if not include_inactive:
-            query = query.filter(OrganizationUnit.is_active == True)
-        
-        # Get all organizations
-        org_units = query.all()
-        
-        # Convert to response format
-        def build_org_dict(org):
-            name_dict = org.name or {"en": f"Organization {org.code}"}
-            return {
-                "id": str(org.id),
-                "code": org.code,
-                "name": name_dict,
-                "name_localized": get_localized_value(name_dict, lang),
-                "type": org.type,
-                "parent_id": str(org.parent_id) if org.parent_id else None,
-                "is_active": org.is_active if org.is_active is not None else True,
-                "children": [],
-                "has_children": False
-            }
+        # Units in tree order from the cached organization tree
+        tree = org_tree.get_tree(db)
+        org_units = [
+            tree.nodes[unit_id] for unit_id in tree.order
+            if include_inactive or tree.nodes[unit_id].is_active
+        ]
         
-        org_list = [build_org_dict(org) for org in org_units]
+        org_list = [_node_dict(org, lang) for org in org_units]
         
         # Build hierarchy if requested
         if include_children:
@@ -150,10 +164,8 @@ def get_organization_detail(
                 detail="Organization not found"
             )
         
-        # Count children
-        children_count = db.query(OrganizationUnit).filter(
-            OrganizationUnit.parent_id == org_uuid
-        ).count()
+        # Count children from the cached tree
+        children_count = len(org_tree.get_tree(db).children_of(str(org_uuid)))
         
         return OrganizationDetail(
             id=str(org.id),
@@ -176,6 +188,8 @@ def get_organization_detail(
             status_code=400,
             detail="Invalid organization ID format"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -197,41 +211,63 @@ def get_organization_children(
     """
     Get children of a specific organization unit
     """
+    org_id = _parse_id(organization_id)
     try:
-        from uuid import UUID
-        org_uuid = UUID(organization_id)
-        
-        # Build query
-        query = db.query(OrganizationUnit).filter(
-            OrganizationUnit.parent_id == org_uuid
-        )
-        
-        if active_only:
-            query = query.filter(OrganizationUnit.is_active.is_(True))
-        
-        children = query.all()
+        tree = org_tree.get_tree(db)
         
         return [
-            OrganizationWithChildren(
-                id=str(child.id),
-                code=child.code,
-                name=child.name or {"en": f"Organization {child.code}"},
-                type=child.type,
-                parent_id=str(child.parent_id) if child.parent_id else None,
-                is_active=child.is_active if child.is_active is not None else True,
-                children=[],
-                has_children=False
-            )
-            for child in children
+            _unit_response(tree, child, active_only=active_only)
+            for child in tree.children_of(org_id, active_only)
         ]
     
-    except ValueError:
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid organization ID format"
-        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to retrieve children: {str(e)}"
         )
+
+
+@router.get(
+    "/{organization_id}/subtree",
+    response_model=List[OrganizationWithChildren]
+)
+def get_organization_subtree(
+    organization_id: str,
+    include_self: bool = Query(True, description="Include the unit itself"),
+    active_only: bool = Query(True, description="Return only active units"),
+    lang: str = Query('en', pattern='^(en|ru|az)$'),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a unit and all units below it as a flat list in tree order
+    """
+    org_id = _parse_id(organization_id)
+    tree = org_tree.get_tree(db)
+    if org_id not in tree:
+        raise HTTPException(status_code=404, detail="Organization not found")
+
+    return [
+        _unit_response(tree, tree.nodes[unit_id], lang, active_only)
+        for unit_id in tree.subtree_ids(org_id, include_self, active_only)
+    ]
+
+
+@router.get(
+    "/{organization_id}/path",
+    response_model=List[OrganizationWithChildren]
+)
+def get_organization_path(
+    organization_id: str,
+    lang: str = Query('en', pattern='^(en|ru|az)$'),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the units from the top of the hierarchy down to this unit
+    (breadcrumbs)
+    """
+    org_id = _parse_id(organization_id)
+    tree = org_tree.get_tree(db)
+    if org_id not in tree:
+        raise HTTPException(status_code=404, detail="Organization not found")
+
+    return [_unit_response(tree, node, lang) for node in tree.path(org_id)]
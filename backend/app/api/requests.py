@@ -7,6 +7,9 @@ from datetime import datetime
 import logging
 
 from ..core.database import get_db
+from ..core.pagination import (
+    SortKey, after_sql, decode_cursor, named_params, order_by_sql, split_page
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -359,29 +362,84 @@ def get_requests_by_category(
         logger.error(f"Database error in get_requests_by_category: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
+
+def _sort_keys(alias: str, date_column: str) -> List[SortKey]:
+    """Newest first, undated rows first (as with ORDER BY date DESC)"""
+    return [
+        SortKey(f"COALESCE({alias}.{date_column}, 'infinity')", "sort_date", True),
+        SortKey(f"{alias}.id", "sort_id", True),
+    ]
+
+
+# Sort keys of the request type listings; orders repeat per person, so
+# the person_orders row is part of their key
+REQUEST_SORT_KEYS = {
+    "resource_request": _sort_keys("rr", "reservation_date"),
+    "teacher_request": _sort_keys("tr", "create_date"),
+    "orders": _sort_keys("o", "order_date") + [
+        SortKey("COALESCE(po.id, 0)", "sort_person_order_id", True)
+    ],
+    "student_transcript": _sort_keys("st", "create_date"),
+    "documents": _sort_keys("d", "create_date"),
+}
+
+
+def _type_page(request_type: str, cursor: Optional[str], limit: int, offset: int):
+    """
+    SQL fragments paginating one request type listing
+
+    Returns:
+        (key columns for SELECT, condition for WHERE, ORDER BY list,
+        LIMIT/OFFSET clause, bind parameters)
+    """
+    keys = REQUEST_SORT_KEYS[request_type]
+    columns = ", ".join(f"{key.expression}::text as {key.column}" for key in keys)
+    order_sql, _ = order_by_sql(keys)
+    params = {"limit": limit + 1}
+    if cursor:
+        condition, after_params = after_sql(keys, decode_cursor(cursor, keys))
+        condition, named = named_params(condition, after_params)
+        params.update(named)
+        return columns, condition, order_sql, "LIMIT :limit", params
+    params["offset"] = offset
+    return columns, "TRUE", order_sql, "LIMIT :limit OFFSET :offset", params
+
+
+def _split_type_page(request_type: str, result, limit: int):
+    """Page rows and next cursor (the key columns come last in each row)"""
+    width = len(REQUEST_SORT_KEYS[request_type])
+    return split_page(result.fetchall(), limit, lambda row: list(row[-width:]))
+
+
 @router.get("/type/{request_type}")
 def get_requests_by_type(
     request_type: str,
     db: Session = Depends(get_db),
     limit: int = Query(default=50, le=500),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
 ):
     """Get detailed information about a specific request type"""
     try:
         if request_type == "resource_request":
-            result = db.execute(text("""
+            key_columns, after, order_sql, limit_sql, params = _type_page(
+                request_type, cursor, limit, offset
+            )
+            result = db.execute(text(f"""
                 SELECT rr.id, rr.resource_edition_id, rr.reservation_date, rr.status,
                        rr.person_id, rr.take_date, rr.return_date, rr.request_code,
-                       p.firstname, p.lastname, p.pincode
+                       p.firstname, p.lastname, p.pincode,
+                       {key_columns}
                 FROM resource_request rr
                 LEFT JOIN persons p ON rr.person_id = p.id
-                WHERE rr.active = 1
-                ORDER BY rr.reservation_date DESC
-                LIMIT :limit OFFSET :offset
-            """), {"limit": limit, "offset": offset})
+                WHERE rr.active = 1 AND {after}
+                ORDER BY {order_sql}
+                {limit_sql}
+            """), params)
+            rows, next_cursor = _split_type_page(request_type, result, limit)
 
             requests = []
-            for row in result:
+            for row in rows:
                 requests.append({
                     "id": row[0],
                     "resource_edition_id": row[1],
@@ -399,21 +457,27 @@ def get_requests_by_type(
                 "request_type": request_type,
                 "name": "Library & Resource Requests",
                 "total_count": len(requests),
-                "requests": requests
+                "requests": requests,
+                "next_cursor": next_cursor
             }
 
         elif request_type == "teacher_request":
-            result = db.execute(text("""
+            key_columns, after, order_sql, limit_sql, params = _type_page(
+                request_type, cursor, limit, offset
+            )
+            result = db.execute(text(f"""
                 SELECT tr.id, tr.course_id, tr.meeting_id, tr.evaluation_id, tr.status,
-                       tr.reason, tr.access_date, tr.create_date
+                       tr.reason, tr.access_date, tr.create_date,
+                       {key_columns}
                 FROM teacher_request tr
-                WHERE tr.active = 1
-                ORDER BY tr.create_date DESC
-                LIMIT :limit OFFSET :offset
-            """), {"limit": limit, "offset": offset})
+                WHERE tr.active = 1 AND {after}
+                ORDER BY {order_sql}
+                {limit_sql}
+            """), params)
+            rows, next_cursor = _split_type_page(request_type, result, limit)
 
             requests = []
-            for row in result:
+            for row in rows:
                 requests.append({
                     "id": row[0],
                     "course_id": row[1],
@@ -429,25 +493,31 @@ def get_requests_by_type(
                 "request_type": request_type,
                 "name": "Teacher Evaluation Requests",
                 "total_count": len(requests),
-                "requests": requests
+                "requests": requests,
+                "next_cursor": next_cursor
             }
 
         elif request_type == "orders":
-            result = db.execute(text("""
+            key_columns, after, order_sql, limit_sql, params = _type_page(
+                request_type, cursor, limit, offset
+            )
+            result = db.execute(text(f"""
                 SELECT o.id, o.type_id, o.serial, o.order_date, o.status,
                        o.create_date, o.note,
                        po.person_id, po.student_id, po.reason_id,
-                       p.firstname, p.lastname, p.pincode
+                       p.firstname, p.lastname, p.pincode,
+                       {key_columns}
                 FROM orders o
                 LEFT JOIN person_orders po ON o.id = po.order_id AND po.active = 1
                 LEFT JOIN persons p ON po.person_id = p.id
-                WHERE o.active = 1
-                ORDER BY o.order_date DESC
-                LIMIT :limit OFFSET :offset
-            """), {"limit": limit, "offset": offset})
+                WHERE o.active = 1 AND {after}
+                ORDER BY {order_sql}
+                {limit_sql}
+            """), params)
+            rows, next_cursor = _split_type_page(request_type, result, limit)
 
             requests = []
-            for row in result:
+            for row in rows:
                 requests.append({
                     "id": row[0],
                     "type_id": row[1],
@@ -467,22 +537,28 @@ def get_requests_by_type(
                 "request_type": request_type,
                 "name": "Academic Orders",
                 "total_count": len(requests),
-                "requests": requests
+                "requests": requests,
+                "next_cursor": next_cursor
             }
 
         elif request_type == "student_transcript":
-            result = db.execute(text("""
+            key_columns, after, order_sql, limit_sql, params = _type_page(
+                request_type, cursor, limit, offset
+            )
+            result = db.execute(text(f"""
                 SELECT st.id, st.student_id, st.course_id, st.subject_name,
                        st.credit, st.end_point, st.semester, st.eps_education_year,
-                       st.create_date
+                       st.create_date,
+                       {key_columns}
                 FROM student_transcript st
-                WHERE st.active = 1
-                ORDER BY st.create_date DESC
-                LIMIT :limit OFFSET :offset
-            """), {"limit": limit, "offset": offset})
+                WHERE st.active = 1 AND {after}
+                ORDER BY {order_sql}
+                {limit_sql}
+            """), params)
+            rows, next_cursor = _split_type_page(request_type, result, limit)
 
             requests = []
-            for row in result:
+            for row in rows:
                 requests.append({
                     "id": row[0],
                     "student_id": row[1],
@@ -499,21 +575,27 @@ def get_requests_by_type(
                 "request_type": request_type,
                 "name": "Student Transcripts",
                 "total_count": len(requests),
-                "requests": requests
+                "requests": requests,
+                "next_cursor": next_cursor
             }
 
         elif request_type == "documents":
-            result = db.execute(text("""
+            key_columns, after, order_sql, limit_sql, params = _type_page(
+                request_type, cursor, limit, offset
+            )
+            result = db.execute(text(f"""
                 SELECT d.id, d.type_id, d.serial, d.num, d.start_date,
-                       d.end_date, d.issuing_organization, d.create_date
+                       d.end_date, d.issuing_organization, d.create_date,
+                       {key_columns}
                 FROM documents d
-                WHERE d.active = 1
-                ORDER BY d.create_date DESC
-                LIMIT :limit OFFSET :offset
-            """), {"limit": limit, "offset": offset})
+                WHERE d.active = 1 AND {after}
+                ORDER BY {order_sql}
+                {limit_sql}
+            """), params)
+            rows, next_cursor = _split_type_page(request_type, result, limit)
 
             requests = []
-            for row in result:
+            for row in rows:
                 requests.append({
                     "id": row[0],
                     "type_id": row[1],
@@ -529,12 +611,15 @@ def get_requests_by_type(
                 "request_type": request_type,
                 "name": "Official Documents",
                 "total_count": len(requests),
-                "requests": requests
+                "requests": requests,
+                "next_cursor": next_cursor
             }
 
         else:
             raise HTTPException(status_code=404, detail="Request type not found")
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Database error in get_requests_by_type: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
@@ -0,0 +1,32 @@
+"""
+Search API endpoints
+"""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.auth import get_current_user, CurrentUser
+from app.services import suggest
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/suggest")
+def get_suggestions(
+    q: str = Query(..., min_length=1, max_length=100, description="Typed text"),
+    kind: Optional[str] = Query(
+        None, pattern="^(student|teacher)$", description="Only students or teachers"
+    ),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> List[Dict[str, Any]]:
+    """
+    Type-ahead suggestions for student and teacher pickers
+
+    Answered from the in-memory prefix index; names match by word prefix
+    regardless of Azerbaijani, Russian or Latin spelling, and student /
+    employee numbers match by prefix as well.
+    """
+    kinds = [kind] if kind else suggest.KINDS
+    return [entry.to_dict() for entry in suggest.suggest(q, kinds, limit)]
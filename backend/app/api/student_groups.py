@@ -5,24 +5,22 @@ Student Groups API endpoints - Updated for LMS database
 from fastapi import APIRouter, Query, HTTPException
 from typing import List, Optional
 from pydantic import BaseModel
-import psycopg2
 from psycopg2.extras import RealDictCursor
 import math
 
-from app.core.config import settings
+from app.core.db_pool import get_db_connection as get_pooled_connection
+from app.core.pagination import (
+    COUNT_MODE_PATTERN, SortKey, after_sql, decode_cursor, estimate_rows,
+    order_by_sql, row_values, split_page, total_count
+)
+from app.services import reference_data
 
 router = APIRouter()
 
 
 def get_db_connection():
     """Get database connection"""
-    return psycopg2.connect(
-        host=settings.DB_HOST,
-        database=settings.DB_NAME,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD,
-        cursor_factory=RealDictCursor
-    )
+    return get_pooled_connection(cursor_factory=RealDictCursor)
 
 
 class StudentGroupResponse(BaseModel):
@@ -44,6 +42,14 @@ class StudentGroupListResponse(BaseModel):
     total_pages: int
     current_page: int
     results: List[StudentGroupResponse]
+    next_cursor: Optional[str] = None
+
+
+# Newest first, cohorts without a creation date last
+GROUP_SORT_KEYS = [
+    SortKey("COALESCE(sc.created_at, '-infinity')", "sort_created_at", descending=True),
+    SortKey("sc.id", "id", descending=True),
+]
 
 
 class StudentGroupStatsResponse(BaseModel):
@@ -57,7 +63,11 @@ class StudentGroupStatsResponse(BaseModel):
 def get_student_groups(
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    page_cursor: Optional[str] = Query(
+        None, alias="cursor", description="next_cursor of the previous page"
+    ),
+    count_mode: str = Query("exact", pattern=COUNT_MODE_PATTERN)
 ):
     """Get student cohorts from LMS database"""
     conn = get_db_connection()
@@ -77,9 +87,29 @@ def get_student_groups(
         where_clause = " AND ".join(where_conditions)
 
         # Get total count
-        count_query = f"SELECT COUNT(*) as count FROM student_cohorts sc WHERE {where_clause}"
-        cursor.execute(count_query, params)
-        total_count = cursor.fetchone()['count']
+        def count_exact():
+            cursor.execute(
+                f"SELECT COUNT(*) as count FROM student_cohorts sc WHERE {where_clause}",
+                params
+            )
+            return cursor.fetchone()['count']
+
+        count = total_count(
+            count_mode, ("student_groups", search), count_exact,
+            lambda: estimate_rows(
+                cursor, f"SELECT sc.id FROM student_cohorts sc WHERE {where_clause}", params
+            )
+        )
+
+        # A cursor replaces the offset with a condition on the sort keys
+        order_sql, _ = order_by_sql(GROUP_SORT_KEYS)
+        offset_sql, offset_params, after_params = "OFFSET %s", [offset], []
+        if page_cursor:
+            after, after_params = after_sql(
+                GROUP_SORT_KEYS, decode_cursor(page_cursor, GROUP_SORT_KEYS)
+            )
+            where_clause = f"{where_clause} AND {after}"
+            offset_sql, offset_params = "", []
 
         # Get cohorts with member count and related info
         query = f"""
@@ -92,27 +122,31 @@ def get_student_groups(
                 sc.education_type,
                 sc.language,
                 '' as tutor_full_name,
-                COUNT(DISTINCT scm.student_id) as student_count
+                COUNT(DISTINCT scm.student_id) as student_count,
+                COALESCE(sc.created_at, '-infinity')::text as sort_created_at
             FROM student_cohorts sc
             LEFT JOIN organization_units ou ON sc.organization_unit_id = ou.id
             LEFT JOIN student_cohort_members scm ON sc.id = scm.cohort_id AND scm.is_active = true
             WHERE {where_clause}
             GROUP BY sc.id, sc.name, sc.created_at, ou.name,
                      sc.education_level, sc.education_type, sc.language
-            ORDER BY sc.created_at DESC NULLS LAST
-            LIMIT %s OFFSET %s
+            ORDER BY {order_sql}
+            LIMIT %s {offset_sql}
         """
 
-        cursor.execute(query, params + [limit, offset])
-        groups = cursor.fetchall()
+        cursor.execute(query, params + after_params + [limit + 1] + offset_params)
+        groups, next_cursor = split_page(
+            cursor.fetchall(), limit, row_values(GROUP_SORT_KEYS)
+        )
 
-        total_pages = math.ceil(total_count / limit) if total_count > 0 else 0
+        total_pages = math.ceil(count / limit) if count > 0 else 0
 
         return StudentGroupListResponse(
-            count=total_count,
+            count=count,
             total_pages=total_pages,
             current_page=page,
-            results=[dict(g) for g in groups]
+            results=[dict(g) for g in groups],
+            next_cursor=next_cursor
         )
 
     except Exception as e:
@@ -492,141 +526,111 @@ def delete_student_group(group_id: str):
         conn.close()
 
 
+@reference_data.register("organizations", tables=("organization_units",))
+def _load_organizations(cur):
+    cur.execute("""
+        SELECT
+            id::text,
+            name
+        FROM organization_units
+        WHERE is_active = true
+        ORDER BY name
+        LIMIT 200
+    """)
+    # Return in multi-language format with same name for all languages
+    return [
+        {
+            "id": r["id"],
+            "name": {
+                "az": r["name"],
+                "en": r["name"],
+                "ru": r["name"]
+            }
+        } for r in cur.fetchall()
+    ]
+
+
+@reference_data.register("education_levels")
+def _load_education_levels(cur):
+    return [
+        {"id": "bachelor", "name": {"az": "Bakalavr", "en": "Bachelor", "ru": "Бакалавр"}},
+        {"id": "master", "name": {"az": "Magistr", "en": "Master", "ru": "Магистр"}},
+        {"id": "doctorate", "name": {"az": "Doktorantura", "en": "Doctorate", "ru": "Докторантура"}},
+    ]
+
+
+@reference_data.register("education_types")
+def _load_education_types(cur):
+    return [
+        {
+            "id": "fulltime",
+            "name": {
+                "az": "Tam vaxtlı",
+                "en": "Full-time",
+                "ru": "Очное"
+            }
+        },
+        {
+            "id": "parttime",
+            "name": {
+                "az": "Qiyabi",
+                "en": "Part-time",
+                "ru": "Заочное"
+            }
+        },
+        {
+            "id": "distance",
+            "name": {
+                "az": "Distant",
+                "en": "Distance",
+                "ru": "Дистанционное"
+            }
+        },
+    ]
+
+
+@reference_data.register("languages", tables=("dictionaries", "dictionary_types"))
+def _load_languages(cur):
+    cur.execute("""
+        SELECT
+            id::text,
+            COALESCE(name_az, name_ru, name_en) as name
+        FROM dictionaries
+        WHERE type_id = (SELECT id FROM dictionary_types WHERE code = 'EDU_LANG')
+        ORDER BY name_az
+    """)
+    return [{"id": r["id"], "name": r["name"]} for r in cur.fetchall()]
+
+
+def _lookup(name: str):
+    try:
+        return reference_data.get(name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
 @router.get("/lookup/organizations")
 def get_organizations_lookup():
     """Get organizations for dropdown"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        query = """
-            SELECT
-                id::text,
-                name
-            FROM organization_units
-            WHERE is_active = true
-            ORDER BY name
-            LIMIT 200
-        """
-        cursor.execute(query)
-        results = cursor.fetchall()
-        # Return in multi-language format with same name for all languages
-        return [
-            {
-                "id": r["id"],
-                "name": {
-                    "az": r["name"],
-                    "en": r["name"],
-                    "ru": r["name"]
-                }
-            } for r in results
-        ]
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Database error: {str(e)}"
-        )
-    finally:
-        cursor.close()
-        conn.close()
+    return _lookup("organizations")
 
 
 @router.get("/lookup/education-levels")
 def get_education_levels_lookup():
     """Get education levels for dropdown"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        # Return predefined education levels
-        education_levels = [
-            {"id": "bachelor", "name": {"az": "Bakalavr", "en": "Bachelor", "ru": "Бакалавр"}},
-            {"id": "master", "name": {"az": "Magistr", "en": "Master", "ru": "Магистр"}},
-            {"id": "doctorate", "name": {"az": "Doktorantura", "en": "Doctorate", "ru": "Докторантура"}},
-        ]
-        return education_levels
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, 
-            detail=f"Database error: {str(e)}"
-        )
-    finally:
-        cursor.close()
-        conn.close()
+    return _lookup("education_levels")
 
 
 @router.get("/lookup/education-types")
 def get_education_types_lookup():
     """Get education types for dropdown"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        # Return predefined education types
-        education_types = [
-            {
-                "id": "fulltime",
-                "name": {
-                    "az": "Tam vaxtlı",
-                    "en": "Full-time",
-                    "ru": "Очное"
-                }
-            },
-            {
-                "id": "parttime",
-                "name": {
-                    "az": "Qiyabi",
-                    "en": "Part-time",
-                    "ru": "Заочное"
-                }
-            },
-            {
-                "id": "distance",
-                "name": {
-                    "az": "Distant",
-                    "en": "Distance",
-                    "ru": "Дистанционное"
-                }
-            },
-        ]
-        return education_types
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Database error: {str(e)}"
-        )
-    finally:
-        cursor.close()
-        conn.close()
+    return _lookup("education_types")
 
 
 @router.get("/lookup/languages")
 def get_languages_lookup():
     """Get languages for dropdown"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
-        query = """
-            SELECT
-                id::text,
-                COALESCE(name_az, name_ru, name_en) as name
-            FROM dictionaries
-            WHERE type_id = (SELECT id FROM dictionary_types WHERE code = 'EDU_LANG')
-            ORDER BY name_az
-        """
-        cursor.execute(query)
-        results = cursor.fetchall()
-        return [{"id": r["id"], "name": r["name"]} for r in results]
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    finally:
-        cursor.close()
-        conn.close()
+    return _lookup("languages")
 
 
 @router.get("/lookup/tutors")
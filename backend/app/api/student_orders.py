@@ -6,24 +6,21 @@ Provides access to student orders data from the LMS database
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional, List, Any
 from pydantic import BaseModel
-import psycopg2
 from psycopg2.extras import RealDictCursor
 
-from app.core.config import settings
+from app.core.database import fetch_one
+from app.core.db_pool import get_db_connection as get_pooled_connection
+from app.core.pagination import (
+    COUNT_MODE_PATTERN, SortKey, after_sql, decode_cursor, estimate_rows,
+    order_by_sql, row_values, split_page, total_count
+)
 
 router = APIRouter()
 
 
 def get_db_connection():
     """Get database connection to LMS database"""
-    return psycopg2.connect(
-        dbname=settings.DB_NAME,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD,
-        host=settings.DB_HOST,
-        port=settings.DB_PORT,
-        cursor_factory=RealDictCursor
-    )
+    return get_pooled_connection(cursor_factory=RealDictCursor)
 
 
 class OrderType(BaseModel):
@@ -60,6 +57,7 @@ class PaginationInfo(BaseModel):
     limit: int = 20
     total: int = 0
     total_pages: int = 0
+    next_cursor: Optional[str] = None
 
 
 class OrdersListResponse(BaseModel):
@@ -67,6 +65,13 @@ class OrdersListResponse(BaseModel):
     pagination: PaginationInfo
 
 
+# Newest first, undated orders first (as with ORDER BY created_at DESC)
+ORDER_SORT_KEYS = [
+    SortKey("COALESCE(so.created_at, 'infinity')", "sort_created_at", descending=True),
+    SortKey("so.id", "id", descending=True),
+]
+
+
 class OrderCategory(BaseModel):
     id: int
     category_name: str
@@ -154,7 +159,11 @@ def get_orders_list(
     limit: int = Query(20, ge=1, le=100),
     order_type: Optional[str] = None,
     active_only: bool = True,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    page_cursor: Optional[str] = Query(
+        None, alias="cursor", description="next_cursor of the previous page"
+    ),
+    count_mode: str = Query("exact", pattern=COUNT_MODE_PATTERN)
 ):
     """
     Get paginated list of student orders
@@ -183,14 +192,28 @@ def get_orders_list(
         where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
         
         # Get total count
-        cursor.execute(f"""
-            SELECT COUNT(*) as total FROM student_orders {where_sql}
-        """, params)
-        total_count = cursor.fetchone()['total']
+        def count_exact():
+            cursor.execute(f"""
+                SELECT COUNT(*) as total FROM student_orders {where_sql}
+            """, params)
+            return cursor.fetchone()['total']
+
+        count = total_count(
+            count_mode, ("student_orders", order_type, active_only, search), count_exact,
+            lambda: estimate_rows(cursor, f"SELECT id FROM student_orders {where_sql}", params)
+        )
         
-        # Calculate pagination
+        # Calculate pagination; a cursor replaces the offset
         offset = (page - 1) * limit
-        total_pages = (total_count + limit - 1) // limit
+        total_pages = (count + limit - 1) // limit
+        order_sql, _ = order_by_sql(ORDER_SORT_KEYS)
+        offset_sql, offset_params, after_params = "OFFSET %s", [offset], []
+        if page_cursor:
+            after, after_params = after_sql(
+                ORDER_SORT_KEYS, decode_cursor(page_cursor, ORDER_SORT_KEYS)
+            )
+            where_sql = f"{where_sql} AND {after}" if where_sql else f"WHERE {after}"
+            offset_sql, offset_params = "", []
         
         # Get orders with student info
         cursor.execute(f"""
@@ -202,17 +225,19 @@ def get_orders_list(
                 so.status,
                 so.notes,
                 so.created_at,
-                COUNT(soa.id) as student_count
+                COUNT(soa.id) as student_count,
+                COALESCE(so.created_at, 'infinity')::text as sort_created_at
             FROM student_orders so
             LEFT JOIN student_order_assignments soa ON soa.order_id = so.id
             {where_sql}
             GROUP BY so.id, so.order_number, so.order_type, so.order_date, so.status, so.notes, so.created_at
-            ORDER BY so.created_at DESC
-            LIMIT %s OFFSET %s
-        """, params + [limit, offset])
+            ORDER BY {order_sql}
+            LIMIT %s {offset_sql}
+        """, params + after_params + [limit + 1] + offset_params)
+        rows, next_cursor = split_page(cursor.fetchall(), limit, row_values(ORDER_SORT_KEYS))
 
         orders = []
-        for row in cursor.fetchall():
+        for row in rows:
             # Map database fields to frontend expected fields
             order_data = {
                 'id': str(row['id']),  # Convert UUID to string
@@ -232,8 +257,9 @@ def get_orders_list(
             pagination=PaginationInfo(
                 page=page,
                 limit=limit,
-                total=total_count,
-                total_pages=total_pages
+                total=count,
+                total_pages=total_pages,
+                next_cursor=next_cursor
             )
         )
     finally:
@@ -274,11 +300,18 @@ def get_order_categories():
 @router.get("/orders/stats")
 async def get_orders_stats():
     """
-    Get order statistics - STUB
-    Note: Student orders functionality not yet implemented in LMS database
+    Get order statistics by status
     """
-    
-    return {
+    stats = await fetch_one("""
+        SELECT
+            COUNT(*) as total_orders,
+            COUNT(*) FILTER (WHERE status = 'pending') as pending_orders,
+            COUNT(*) FILTER (WHERE status = 'approved') as approved_orders,
+            COUNT(*) FILTER (WHERE status = 'rejected') as rejected_orders
+        FROM student_orders
+    """)
+
+    return stats or {
         "total_orders": 0,
         "pending_orders": 0,
         "approved_orders": 0,
@@ -2,31 +2,76 @@
 Student management API endpoints - Updated for LMS database
 """
 
+import logging
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-import psycopg2
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from psycopg2.extras import RealDictCursor
 from pydantic import BaseModel
 
-from app.core.config import settings
+from app.core.database import fetch_all, fetch_one
+from app.core.db_pool import get_db_connection as get_pooled_connection
+from app.core.etag import is_not_modified, make_etag, not_modified, set_etag, version_sql
+from app.core.pagination import (
+    COUNT_MODE_PATTERN, SortKey, after_sql, decode_cursor, estimate_rows,
+    order_by_sql, row_values, split_page, total_count
+)
 from app.auth import get_current_user, CurrentUser
+from app.services import localization, org_tree, schedule_index
+from app.services.course_schedules import DAY_NAMES, fetch_offering_schedules
+from app.services.schedule_index import ScheduleTemplate
+from app.services.search import search_condition, search_rank
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/students", tags=["students"])
 
+STUDENT_SEARCH_COLUMNS = ["s.student_number", "p.first_name", "p.last_name"]
+
 
 # Database connection function
 def get_db_connection():
     """Create database connection"""
-    return psycopg2.connect(
-        host=settings.DB_HOST,
-        port=settings.DB_PORT,
-        database=settings.DB_NAME,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD,
-        cursor_factory=RealDictCursor
+    return get_pooled_connection(cursor_factory=RealDictCursor)
+
+
+# Row versions of everything the personal student views are built from
+_STUDENT_OFFERINGS = \
+    "(SELECT course_offering_id FROM course_enrollments WHERE student_id = %s)"
+
+STUDENT_VERSION_SQL = "SELECT concat_ws('|', " + ", ".join([
+    version_sql("students s WHERE s.id = %s", "s"),
+    version_sql(
+        "persons p JOIN students s ON p.user_id = s.user_id WHERE s.id = %s", "p"
+    ),
+    version_sql("course_enrollments ce WHERE ce.student_id = %s", "ce"),
+    version_sql("grades g WHERE g.student_id = %s", "g"),
+    version_sql(f"course_offerings co WHERE co.id IN {_STUDENT_OFFERINGS}", "co"),
+    version_sql(
+        f"courses c JOIN course_offerings co ON co.course_id = c.id "
+        f"WHERE co.id IN {_STUDENT_OFFERINGS}", "c"
+    ),
+    version_sql(
+        f"class_schedules cs WHERE cs.course_offering_id IN {_STUDENT_OFFERINGS}", "cs"
+    ),
+    version_sql(
+        f"assessments a WHERE a.course_offering_id IN {_STUDENT_OFFERINGS}", "a"
+    ),
+    version_sql(
+        f"course_instructors ci WHERE ci.course_offering_id IN {_STUDENT_OFFERINGS}", "ci"
+    ),
+    version_sql("calendar_events ev WHERE ev.event_type = 'holiday'", "ev"),
+]) + ") AS version"
+
+
+def _student_version(cur, student_id) -> str:
+    """Cheap version of a student's schedule, courses and grades"""
+    cur.execute(
+        STUDENT_VERSION_SQL,
+        [str(student_id)] * STUDENT_VERSION_SQL.count("%s")
     )
+    return cur.fetchone()['version']
 
 
 # Pydantic models
@@ -67,6 +112,7 @@ class StudentListResponse(BaseModel):
     current_page: int
     per_page: int
     results: List[StudentResponse]
+    next_cursor: Optional[str] = None
 
 
 class StudentStatsResponse(BaseModel):
@@ -85,6 +131,10 @@ def get_students(
     status: Optional[str] = Query(None, description="Filter by status"),
     study_mode: Optional[str] = Query(None, description="Filter by study mode"),
     academic_program_id: Optional[str] = Query(None, description="Filter by program"),
+    organization_id: Optional[str] = Query(None, description="Filter by the program's unit"),
+    include_subunits: bool = Query(False, description="Also match units below organization_id"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count_mode: str = Query("exact", pattern=COUNT_MODE_PATTERN),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """
@@ -97,6 +147,10 @@ def get_students(
     - status: Filter by student status
     - study_mode: Filter by study mode
     - academic_program_id: Filter by academic program UUID
+    - organization_id: Filter by the organization unit of the program
+    - include_subunits: Include programs of units below organization_id
+    - cursor: Continue after the previous page instead of using page
+    - count_mode: exact, cached or estimated total count
     """
     # Check permissions
     if current_user.user_type not in ["ADMIN", "TEACHER", "SYSADMIN"]:
@@ -113,17 +167,10 @@ def get_students(
         where_conditions = []
         params = []
         
-        print(f"DEBUG: search={search}, status={status}, study_mode={study_mode}, program={academic_program_id}")
-        
         if search:
-            where_conditions.append("""
-                (s.student_number ILIKE %s 
-                 OR p.first_name ILIKE %s 
-                 OR p.last_name ILIKE %s
-                 OR CONCAT(p.first_name, ' ', p.last_name) ILIKE %s)
-            """)
-            search_term = f"%{search}%"
-            params.extend([search_term, search_term, search_term, search_term])
+            search_sql, search_params = search_condition(search, STUDENT_SEARCH_COLUMNS)
+            where_conditions.append(search_sql)
+            params.extend(search_params)
         
         if status:
             where_conditions.append("s.status = %s")
@@ -136,30 +183,71 @@ def get_students(
         if academic_program_id:
             where_conditions.append("s.academic_program_id = %s")
             params.append(academic_program_id)
+
+        if organization_id:
+            try:
+                organization_id = str(UUID(organization_id))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid organization ID format")
+            unit_ids = [organization_id]
+            if include_subunits:
+                unit_ids = org_tree.get_tree().subtree_ids(organization_id) or unit_ids
+            where_conditions.append(
+                "s.academic_program_id IN (SELECT id FROM academic_programs "
+                "WHERE organization_unit_id = ANY(%s::uuid[]))"
+            )
+            params.append(unit_ids)
         
         where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
         
-        print(f"DEBUG: where_clause={where_clause}")
-        print(f"DEBUG: params={params}")
+        logger.debug("Student list filter: %s %s", where_clause, params)
         
         # Count total records
-        count_query = f"""
-            SELECT COUNT(DISTINCT s.id)
+        from_clause = f"""
             FROM students s
             LEFT JOIN users u ON s.user_id = u.id
             LEFT JOIN persons p ON u.id = p.user_id
             {where_clause}
         """
-        cur.execute(count_query, params)
-        total_count = cur.fetchone()['count']
-        print(f"DEBUG: total_count={total_count}")
-        total_pages = (total_count + per_page - 1) // per_page
+
+        def count_exact():
+            cur.execute(f"SELECT COUNT(DISTINCT s.id) {from_clause}", params)
+            return cur.fetchone()['count']
+
+        count = total_count(
+            count_mode,
+            ("students", search, status, study_mode, academic_program_id,
+             organization_id, include_subunits),
+            count_exact,
+            lambda: estimate_rows(cur, f"SELECT s.id {from_clause}", params)
+        )
+        total_pages = (count + per_page - 1) // per_page
         
-        # Get paginated results
+        # Get paginated results (best matches first when searching)
         offset = (page - 1) * per_page
+        rank_sql, rank_params = search_rank(search, STUDENT_SEARCH_COLUMNS)
+        sort_keys = [
+            SortKey("COALESCE(s.enrollment_date, 'infinity'::date)", "sort_enrollment_date", True),
+            SortKey("s.student_number", "student_number"),
+            SortKey("s.id", "id"),
+        ]
+        if rank_params:
+            sort_keys.insert(
+                0, SortKey(rank_sql, "search_rank", True, tuple(rank_params))
+            )
+        order_sql, order_params = order_by_sql(sort_keys)
+
+        # A cursor replaces the offset with a condition on the sort keys
+        offset_sql, offset_params, after_params = "OFFSET %s", [offset], []
+        if cursor:
+            after, after_params = after_sql(sort_keys, decode_cursor(cursor, sort_keys))
+            where_clause = f"{where_clause} AND {after}" if where_clause else f"WHERE {after}"
+            offset_sql, offset_params = "", []
         
         query = f"""
             SELECT 
+                {rank_sql} as search_rank,
+                COALESCE(s.enrollment_date, 'infinity'::date)::text as sort_enrollment_date,
                 s.id,
                 s.student_number,
                 s.status,
@@ -181,13 +269,16 @@ def get_students(
             LEFT JOIN persons p ON u.id = p.user_id
             LEFT JOIN academic_programs ap ON s.academic_program_id = ap.id
             {where_clause}
-            ORDER BY s.enrollment_date DESC, s.student_number
-            LIMIT %s OFFSET %s
+            ORDER BY {order_sql}
+            LIMIT %s {offset_sql}
         """
         
-        cur.execute(query, params + [per_page, offset])
-        rows = cur.fetchall()
-        print(f"DEBUG: rows count={len(rows)}")
+        cur.execute(
+            query,
+            rank_params + params + after_params + order_params + [per_page + 1] + offset_params
+        )
+        rows, next_cursor = split_page(cur.fetchall(), per_page, row_values(sort_keys))
+        logger.debug("Student list: %d of %d rows", len(rows), count)
         
         # Build response
         students = []
@@ -224,11 +315,12 @@ def get_students(
             ))
         
         return StudentListResponse(
-            count=total_count,
+            count=count,
             total_pages=total_pages,
             current_page=page,
             per_page=per_page,
-            results=students
+            results=students,
+            next_cursor=next_cursor
         )
         
     finally:
@@ -519,8 +611,84 @@ class StudentScheduleResponse(BaseModel):
     schedule_events: List[ClassScheduleEvent] = []
 
 
+# Color palette for different courses
+SCHEDULE_COLORS = [
+    "#3788d8", "#22c55e", "#f59e0b",
+    "#ec4899", "#8b5cf6", "#14b8a6", "#f97316"
+]
+
+
+def _load_holidays(cur):
+    """Holiday dates, shared by all calendar views"""
+    holidays = schedule_index.get_holidays()
+    if holidays is None:
+        cur.execute(schedule_index.HOLIDAYS_SQL)
+        holidays = schedule_index.store_holidays(cur.fetchall())
+    return holidays
+
+
+def _load_schedule_templates(cur, student_id) -> List[ScheduleTemplate]:
+    """Weekly schedule templates of a student with prepared event fields"""
+    # Use the database function to get clean, non-conflicting schedule
+    cur.execute("""
+        SELECT
+            schedule_id::text,
+            course_code,
+            course_name,
+            day_of_week,
+            start_time,
+            end_time,
+            room_number as room,
+            schedule_type,
+            effective_from,
+            effective_until,
+            SPLIT_PART(instructor_name, ' ', 1) as inst_first_name,
+            SPLIT_PART(instructor_name, ' ', 2) as inst_last_name
+        FROM get_student_schedule(%s)
+    """, [str(student_id)])
+
+    course_colors = {}
+    templates = []
+    for schedule in cur.fetchall():
+        # Assign color per course
+        if schedule['course_code'] not in course_colors:
+            course_colors[schedule['course_code']] = \
+                SCHEDULE_COLORS[len(course_colors) % len(SCHEDULE_COLORS)]
+
+        instructor_name = None
+        if schedule['inst_first_name'] and schedule['inst_last_name']:
+            instructor_name = \
+                f"{schedule['inst_first_name']} " \
+                f"{schedule['inst_last_name']}"
+
+        templates.append(ScheduleTemplate(
+            schedule_id=schedule['schedule_id'],
+            day_of_week=schedule['day_of_week'],
+            start_time=str(schedule['start_time']),
+            end_time=str(schedule['end_time']),
+            effective_from=schedule['effective_from'],
+            effective_until=schedule['effective_until'],
+            event={
+                "title": schedule['course_code'],
+                "course_code": schedule['course_code'],
+                "course_name": schedule['course_name'],
+                "day_of_week": schedule['day_of_week'],
+                "day_name": DAY_NAMES[schedule['day_of_week']],
+                "room": schedule['room'],
+                "schedule_type": schedule['schedule_type'],
+                "instructor_name": instructor_name,
+                "background_color": course_colors[schedule['course_code']],
+            }
+        ))
+    return templates
+
+
 @router.get("/me/courses", response_model=StudentCoursesResponse)
-def get_my_courses(current_user: CurrentUser = Depends(get_current_user)):
+def get_my_courses(
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user)
+):
     """
     Get detailed course information for the authenticated student
     including schedules, grades, and instructors.
@@ -553,6 +721,11 @@ def get_my_courses(current_user: CurrentUser = Depends(get_current_user)):
                 status_code=404,
                 detail="Student profile not found"
             )
+
+        etag = make_etag(request, student['id'], _student_version(cur, student['id']))
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         
         full_name = f"{student['first_name']} {student['last_name']}"
         full_name = full_name.strip()
@@ -567,11 +740,6 @@ def get_my_courses(current_user: CurrentUser = Depends(get_current_user)):
                 ce.id as enrollment_id,
                 c.id as course_id,
                 c.code as course_code,
-                COALESCE(
-                    c.name->>'en',
-                    c.name->>'az',
-                    c.code
-                ) as course_name,
                 c.credit_hours as credits,
                 ce.enrollment_status,
                 ce.grade,
@@ -603,50 +771,17 @@ def get_my_courses(current_user: CurrentUser = Depends(get_current_user)):
         enrolled_courses_data = cur.fetchall()
         enrolled_courses = []
         
+        # Weekly slots of all enrolled offerings in one query
+        offering_schedules = fetch_offering_schedules(
+            cur, [course_data['offering_id'] for course_data in enrolled_courses_data]
+        )
+
         for course_data in enrolled_courses_data:
-            # Get schedules for this course offering
-            cur.execute("""
-                SELECT
-                    cs.day_of_week,
-                    cs.start_time,
-                    cs.end_time,
-                    cs.schedule_type,
-                    r.room_number as room,
-                    p.first_name as inst_first_name,
-                    p.last_name as inst_last_name
-                FROM class_schedules cs
-                LEFT JOIN rooms r ON cs.room_id = r.id
-                LEFT JOIN users u ON cs.instructor_id = u.id
-                LEFT JOIN persons p ON u.id = p.user_id
-                WHERE cs.course_offering_id = %s
-                ORDER BY cs.day_of_week, cs.start_time
-            """, [str(course_data['offering_id'])])
-            
-            schedules_data = cur.fetchall()
-            schedules = []
-            
-            day_names = [
-                "Monday", "Tuesday", "Wednesday",
-                "Thursday", "Friday", "Saturday", "Sunday"
+            schedules = [
+                CourseScheduleInfo(**sched)
+                for sched in offering_schedules.get(str(course_data['offering_id']), [])
             ]
             
-            for sched in schedules_data:
-                instructor_name = None
-                if sched['inst_first_name'] and sched['inst_last_name']:
-                    inst_name = f"{sched['inst_first_name']} "
-                    inst_name += f"{sched['inst_last_name']}"
-                    instructor_name = inst_name.strip()
-                
-                schedules.append(CourseScheduleInfo(
-                    day_of_week=sched['day_of_week'],
-                    day_name=day_names[sched['day_of_week']],
-                    start_time=str(sched['start_time']),
-                    end_time=str(sched['end_time']),
-                    room=sched['room'],
-                    schedule_type=sched['schedule_type'],
-                    instructor_name=instructor_name
-                ))
-            
             instructor_name = None
             if course_data['inst_first_name'] and course_data['inst_last_name']:
                 inst_name = f"{course_data['inst_first_name']} "
@@ -657,7 +792,9 @@ def get_my_courses(current_user: CurrentUser = Depends(get_current_user)):
                 enrollment_id=str(course_data['enrollment_id']),
                 course_id=str(course_data['course_id']),
                 course_code=course_data['course_code'],
-                course_name=course_data['course_name'],
+                course_name=localization.name_of(
+                    "courses", course_data['course_id'], default=course_data['course_code']
+                ),
                 credits=course_data['credits'],
                 enrollment_status=course_data['enrollment_status'],
                 grade=course_data['grade'],
@@ -677,11 +814,6 @@ def get_my_courses(current_user: CurrentUser = Depends(get_current_user)):
                 ce.id as enrollment_id,
                 c.id as course_id,
                 c.code as course_code,
-                COALESCE(
-                    c.name->>'en',
-                    c.name->>'az',
-                    c.code
-                ) as course_name,
                 c.credit_hours as credits,
                 ce.enrollment_status,
                 ce.grade,
@@ -724,7 +856,9 @@ def get_my_courses(current_user: CurrentUser = Depends(get_current_user)):
                 enrollment_id=str(course_data['enrollment_id']),
                 course_id=str(course_data['course_id']),
                 course_code=course_data['course_code'],
-                course_name=course_data['course_name'],
+                course_name=localization.name_of(
+                    "courses", course_data['course_id'], default=course_data['course_code']
+                ),
                 credits=course_data['credits'],
                 enrollment_status=course_data['enrollment_status'],
                 grade=course_data['grade'],
@@ -765,6 +899,8 @@ def get_my_courses(current_user: CurrentUser = Depends(get_current_user)):
 
 @router.get("/me/schedule", response_model=StudentScheduleResponse)
 def get_my_schedule(
+    request: Request,
+    response: Response,
     current_user: CurrentUser = Depends(get_current_user),
     start_date: str = None,
     end_date: str = None
@@ -785,20 +921,34 @@ def get_my_schedule(
         conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Get student info
-        cur.execute("""
-            SELECT 
-                s.id, 
-                s.student_number, 
-                u.username,
-                p.first_name,
-                p.last_name,
-                p.middle_name
-            FROM students s
-            JOIN users u ON s.user_id = u.id
-            LEFT JOIN persons p ON u.id = p.user_id
-            WHERE u.username = %s AND s.status = 'active'
-        """, [current_user.username])
+        # Get student info (by primary key when the token carries it)
+        if current_user.student_id:
+            cur.execute("""
+                SELECT 
+                    s.id, 
+                    s.student_number, 
+                    %s AS username,
+                    p.first_name,
+                    p.last_name,
+                    p.middle_name
+                FROM students s
+                LEFT JOIN persons p ON p.user_id = s.user_id
+                WHERE s.id = %s AND s.status = 'active'
+            """, [current_user.username, current_user.student_id])
+        else:
+            cur.execute("""
+                SELECT 
+                    s.id, 
+                    s.student_number, 
+                    u.username,
+                    p.first_name,
+                    p.last_name,
+                    p.middle_name
+                FROM students s
+                JOIN users u ON s.user_id = u.id
+                LEFT JOIN persons p ON u.id = p.user_id
+                WHERE u.username = %s AND s.status = 'active'
+            """, [current_user.username])
         
         student = cur.fetchone()
         
@@ -807,6 +957,12 @@ def get_my_schedule(
                 status_code=404,
                 detail="Student profile not found"
             )
+
+        version = _student_version(cur, student['id'])
+        etag = make_etag(request, student['id'], version)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         
         # Build full name
         full_name_parts = []
@@ -835,102 +991,18 @@ def get_my_schedule(
             range_start = today - timedelta(days=today.weekday())
             range_end = range_start + timedelta(weeks=4)
         
-        # Use the database function to get clean, non-conflicting schedule
-        cur.execute("""
-            SELECT
-                schedule_id::text,
-                course_code,
-                course_name,
-                day_of_week,
-                start_time,
-                end_time,
-                room_number as room,
-                schedule_type,
-                effective_from,
-                effective_until,
-                SPLIT_PART(instructor_name, ' ', 1) as inst_first_name,
-                SPLIT_PART(instructor_name, ' ', 2) as inst_last_name
-            FROM get_student_schedule(%s)
-        """, [str(student['id'])])
-        
-        schedules_data = cur.fetchall()
+        schedule = schedule_index.get_schedule("student", student['id'], version)
+        if schedule is None:
+            schedule = schedule_index.store_schedule(
+                "student", student['id'],
+                _load_schedule_templates(cur, student['id']),
+                _load_holidays(cur),
+                version
+            )
 
-        print(f"DEBUG: Found {len(schedules_data)} unique schedule templates")
-        print(f"DEBUG: Generating events for range {range_start} to {range_end}")
+        schedule_events = schedule.between(range_start, range_end)
 
-        schedule_events = []
-        day_names = [
-            "Monday", "Tuesday", "Wednesday",
-            "Thursday", "Friday", "Saturday", "Sunday"
-        ]
-        
-        # Color palette for different courses
-        course_colors = {}
-        colors = [
-            "#3788d8", "#22c55e", "#f59e0b",
-            "#ec4899", "#8b5cf6", "#14b8a6", "#f97316"
-        ]
-        color_index = 0
-        
-        # Generate recurring weekly events for each schedule template
-        for schedule in schedules_data:
-            # Assign color per course
-            if schedule['course_code'] not in course_colors:
-                course_colors[schedule['course_code']] = \
-                    colors[color_index % len(colors)]
-                color_index += 1
-            
-            # Build instructor name
-            instructor_name = None
-            if schedule['inst_first_name'] and schedule['inst_last_name']:
-                instructor_name = \
-                    f"{schedule['inst_first_name']} " \
-                    f"{schedule['inst_last_name']}"
-            
-            # Get schedule validity period
-            sched_start = schedule['effective_from']
-            sched_end = schedule['effective_until']
-            
-            # Calculate actual date range intersection
-            actual_start = max(range_start, sched_start) \
-                if sched_start else range_start
-            actual_end = min(range_end, sched_end) \
-                if sched_end else range_end
-            
-            # Find first occurrence of this day of week in range
-            current_date = actual_start
-            day_offset = (schedule['day_of_week'] - current_date.weekday()) % 7
-            first_occurrence = current_date + timedelta(days=day_offset)
-            
-            # Generate weekly occurrences (limited to requested range only)
-            occurrence_date = first_occurrence
-
-            while occurrence_date <= actual_end:
-                # Create start and end datetime strings
-                start_dt = f"{occurrence_date.strftime('%Y-%m-%d')}" \
-                           f"T{schedule['start_time']}"
-                end_dt = f"{occurrence_date.strftime('%Y-%m-%d')}" \
-                         f"T{schedule['end_time']}"
-                
-                schedule_events.append(ClassScheduleEvent(
-                    id=f"{schedule['schedule_id']}_{occurrence_date}",
-                    title=f"{schedule['course_code']}",
-                    course_code=schedule['course_code'],
-                    course_name=schedule['course_name'],
-                    start=start_dt,
-                    end=end_dt,
-                    day_of_week=schedule['day_of_week'],
-                    day_name=day_names[schedule['day_of_week']],
-                    room=schedule['room'],
-                    schedule_type=schedule['schedule_type'],
-                    instructor_name=instructor_name,
-                    background_color=course_colors[schedule['course_code']]
-                ))
-
-                # Move to next week
-                occurrence_date += timedelta(weeks=1)
-
-        print(f"DEBUG: Generated total of {len(schedule_events)} events")
+        logger.debug("Generated %d schedule events", len(schedule_events))
 
         return StudentScheduleResponse(
             student_id=str(student['id']),
@@ -999,7 +1071,11 @@ class StudentGradesResponse(BaseModel):
 
 
 @router.get("/me/grades", response_model=StudentGradesResponse)
-def get_my_grades(current_user: CurrentUser = Depends(get_current_user)):
+def get_my_grades(
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user)
+):
     """
     Get comprehensive grade information for the authenticated student
     
@@ -1036,6 +1112,11 @@ def get_my_grades(current_user: CurrentUser = Depends(get_current_user)):
                 status_code=404,
                 detail="Student profile not found"
             )
+
+        etag = make_etag(request, student['id'], _student_version(cur, student['id']))
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         
         # Build full name
         full_name = f"{student['first_name']} {student['last_name']}"
@@ -1268,28 +1349,17 @@ async def get_my_assignments(
     - assignments table (id, course_id, title, description, due_date, etc.)
     - assignment_submissions table (id, assignment_id, student_id, file, score, etc.)
     """
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Database connection failed: {str(e)}"
-        )
-    
     try:
         # Get authenticated student's data
-        cur.execute("""
+        student = await fetch_one("""
             SELECT
                 s.id, s.student_number, s.gpa,
                 p.first_name, p.last_name, p.middle_name
             FROM students s
             JOIN users u ON s.user_id = u.id
             LEFT JOIN persons p ON u.id = p.user_id
-            WHERE u.username = %s
-        """, [current_user.username])
-        
-        student = cur.fetchone()
+            WHERE u.username = :username
+        """, {"username": current_user.username})
         
         if not student:
             raise HTTPException(
@@ -1306,18 +1376,16 @@ async def get_my_assignments(
         student_id = str(student['id'])
         
         # Get student's enrolled courses for realistic mock data
-        cur.execute("""
+        enrolled_courses = await fetch_all("""
             SELECT DISTINCT
                 c.code as course_code,
                 COALESCE(c.name->>'en', c.name->>'az', c.code) as course_name
             FROM course_enrollments ce
             JOIN course_offerings co ON ce.course_offering_id = co.id
             JOIN courses c ON co.course_id = c.id
-            WHERE ce.student_id = %s
+            WHERE ce.student_id = :student_id
             LIMIT 5
-        """, [student_id])
-        
-        enrolled_courses = cur.fetchall()
+        """, {"student_id": student['id']})
         
         # MOCK DATA - Replace with real database queries when assignments table exists
         from datetime import datetime, timedelta
@@ -1453,11 +1521,6 @@ async def get_my_assignments(
             status_code=500,
             detail=f"Failed to fetch assignments: {str(e)}"
         )
-    finally:
-        if 'cur' in locals():
-            cur.close()
-        if 'conn' in locals():
-            conn.close()
 
 
 from fastapi import UploadFile, File
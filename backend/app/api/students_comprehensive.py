@@ -6,11 +6,15 @@ from fastapi import APIRouter, HTTPException, Query
 import os
 from pydantic import BaseModel
 from typing import Optional
-import psycopg2
 from psycopg2.extras import RealDictCursor
 import logging
 
-from app.core.config import settings
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.database import fetch_all, fetch_one
+from app.core.db_pool import get_db_connection as get_pooled_connection
+from app.services import facets, suggest
+from app.services.search import search_condition
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,13 +44,7 @@ def convert_large_ints_to_strings(data):
 def get_db_connection():
     """Create database connection"""
     try:
-        return psycopg2.connect(
-            host=settings.DB_HOST,
-            database=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            cursor_factory=RealDictCursor
-        )
+        return get_pooled_connection(cursor_factory=RealDictCursor)
     except Exception as e:
         logger.error(f"Database error: {e}")
         raise HTTPException(
@@ -92,11 +90,7 @@ async def get_students_list(
     active_only: bool = Query(True)
 ):
     """Get paginated list of students with filtering"""
-    connection = None
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
         # Calculate offset
         offset = (page - 1) * per_page
         
@@ -109,15 +103,12 @@ async def get_students_list(
             params.append(1)
         
         if search:
-            where_conditions.append("""
-                (LOWER(p.firstname) LIKE LOWER(%s) 
-                 OR LOWER(p.lastname) LIKE LOWER(%s)
-                 OR LOWER(p.patronymic) LIKE LOWER(%s)
-                 OR LOWER(p.pincode) LIKE LOWER(%s)
-                 OR LOWER(s.card_number) LIKE LOWER(%s))
-            """)
-            search_pattern = f"%{search}%"
-            params.extend([search_pattern] * 5)
+            search_sql, search_params = search_condition(search, [
+                "p.firstname", "p.lastname", "p.patronymic",
+                "p.pincode", "s.card_number"
+            ])
+            where_conditions.append(search_sql)
+            params.extend(search_params)
         
         if org_id:
             where_conditions.append("s.org_id = %s")
@@ -217,8 +208,7 @@ async def get_students_list(
         """
         
         params.extend([per_page, offset])
-        cursor.execute(query, params)
-        students = cursor.fetchall()
+        students = await fetch_all(query, params)
         
         # Get total count for pagination
         count_query = f"""
@@ -238,8 +228,14 @@ async def get_students_list(
             {where_clause}
         """
         
-        cursor.execute(count_query, params[:-2])  # Exclude LIMIT and OFFSET params
-        total_count = cursor.fetchone()['count']
+        async def load_count():
+            count_row = await fetch_one(count_query, params[:-2])  # Exclude LIMIT and OFFSET params
+            return count_row['count']
+
+        total_count = await facets.get_async("students", "list_count", {
+            "search": search, "org_id": org_id, "education_type": education_type,
+            "education_level": education_level, "active_only": active_only
+        }, load_count)
         
         return convert_large_ints_to_strings({
             "students": [dict(student) for student in students],
@@ -254,21 +250,14 @@ async def get_students_list(
     except Exception as e:
         logger.error(f"Error fetching students: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch students: {str(e)}")
-    finally:
-        if connection:
-            connection.close()
 
 
 @router.get("/detail/{student_id}")
 async def get_student_detail(student_id: int):
     """Get comprehensive details for a specific student"""
-    connection = None
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
         # Get comprehensive student information
-        cursor.execute("""
+        student = await fetch_one("""
             SELECT 
                 s.id,
                 s.person_id,
@@ -388,14 +377,12 @@ async def get_student_detail(student_id: int):
             LEFT JOIN dictionaries education_lang_dict ON s.education_lang_id = education_lang_dict.id
             WHERE s.id = %s
         """, (student_id,))
-        
-        student = cursor.fetchone()
         if not student:
             raise HTTPException(status_code=404, detail="Student not found")
         
         # Get attendance summary for this student (if attendance table exists)
         try:
-            cursor.execute("""
+            attendance_summary = await fetch_one("""
                 SELECT 
                     COUNT(*) as total_sessions,
                     COUNT(CASE WHEN a.status = 1 THEN 1 END) as present_count,
@@ -407,15 +394,13 @@ async def get_student_detail(student_id: int):
                 FROM attendance a
                 WHERE a.student_id = %s
             """, (student_id,))
-            
-            attendance_summary = cursor.fetchone()
-        except psycopg2.Error:
+        except SQLAlchemyError:
             # Attendance table doesn't exist
             attendance_summary = None
         
         # Get recent grades (if grades table exists)
         try:
-            cursor.execute("""
+            recent_grades = await fetch_all("""
                 SELECT 
                     g.id,
                     g.score,
@@ -429,15 +414,13 @@ async def get_student_detail(student_id: int):
                 ORDER BY g.grade_date DESC
                 LIMIT 10
             """, (student_id,))
-            
-            recent_grades = cursor.fetchall()
-        except psycopg2.Error:
+        except SQLAlchemyError:
             # Grades table doesn't exist
             recent_grades = []
         
         # Get recent orders (if any)
         try:
-            cursor.execute("""
+            recent_orders = await fetch_all("""
                 SELECT 
                     o.id,
                     o.serial,
@@ -451,9 +434,7 @@ async def get_student_detail(student_id: int):
                 ORDER BY o.order_date DESC
                 LIMIT 5
             """, (student_id,))
-            
-            recent_orders = cursor.fetchall()
-        except psycopg2.Error:
+        except SQLAlchemyError:
             # Orders table issues
             recent_orders = []
         
@@ -473,13 +454,10 @@ async def get_student_detail(student_id: int):
             status_code=500,
             detail=f"Failed to fetch student details: {str(e)}"
         )
-    finally:
-        if connection:
-            connection.close()
 
 
 @router.put("/update/{student_id}")
-async def update_student(student_id: str, student_data: StudentUpdateRequest):
+def update_student(student_id: str, student_data: StudentUpdateRequest):
     """Update student information"""
     connection = None
     try:
@@ -587,6 +565,8 @@ async def update_student(student_id: str, student_data: StudentUpdateRequest):
         
         # Commit the transaction
         connection.commit()
+        facets.invalidate("students")
+        suggest.refresh_safely("student", [student_id])
         
         return {
             "message": "Student updated successfully",
@@ -612,235 +592,217 @@ async def update_student(student_id: str, student_data: StudentUpdateRequest):
 @router.get("/stats")
 async def get_students_stats():
     """Get statistics about students"""
-    connection = None
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        # Total students
-        cursor.execute("SELECT COUNT(*) as total FROM students WHERE active = 1")
-        total_students = cursor.fetchone()['total']
-        
-        # By education level
-        cursor.execute("""
-            SELECT 
-                COALESCE(group_edu_dict.name_en, 'Unknown') as education_level,
-                COUNT(DISTINCT s.id) as count
-            FROM students s
-            LEFT JOIN education_group_student egs ON s.id = egs.student_id AND egs.active = 1
-            LEFT JOIN education_group eg ON egs.education_group_id = eg.id
-            LEFT JOIN dictionaries group_edu_dict ON eg.education_level_id = group_edu_dict.id
-            WHERE s.active = 1
-            GROUP BY group_edu_dict.name_en
-            ORDER BY count DESC
-        """)
-        by_education_level = cursor.fetchall()
-        
-        # By specialization
-        cursor.execute("""
-            SELECT 
-                CASE
-                    WHEN org_names.id = 220223053906474743 THEN 'IT'
-                    WHEN org_names.id = 220223110107192121 THEN 'Translation'
-                    WHEN org_names.id = 220223060403889770 THEN 'Economics'
-                    WHEN org_names.id = 220223063509591259 THEN 'Finance'
-                    WHEN org_names.id = 220223065408917441 THEN 'Marketing'
-                    WHEN org_names.id = 2202230719043010785 THEN 'Management'
-                    WHEN org_names.id = 220223074000992414 THEN 'Accounting'
-                    WHEN org_names.id = 220223095607479549 THEN 'Social Work'
-                    WHEN org_names.id = 220223044808654357 THEN 'Business Admin'
-                    WHEN org_names.id = 220223091501629830 THEN 'Accounting & Audit'
-                    WHEN org_names.id = 220223043104107693 THEN 'Int Trade & Logistics'
-                    WHEN org_names.id = 220223050501833647 THEN 'Public Admin'
-                    WHEN org_names.id = 220223093709483260 THEN 'Industrial Management'
-                    WHEN org_names.id = 220223052408185061 THEN 'World Economics'
-                    WHEN org_names.id = 220211034000856306 THEN 'Finance (MA)'
-                    WHEN org_names.id = 230916013204247889 THEN 'Social Work (MA)'
-                    WHEN org_names.id = 220211043501479568 THEN 'Management (MA)'
-                    WHEN org_names.id = 220211044509326042 THEN 'Marketing (MA)'
-                    WHEN org_names.id = 220211042200292305 THEN 'Economics (MA)'
-                    WHEN org_names.id = 220211032207772797 THEN 'World Economics (MA)'
-                    WHEN org_names.id = 220211051502179233 THEN 'Business Admin (MA)'
-                    WHEN org_names.id = 220211035209269181 THEN 'Accounting & Audit (MA)'
-                    WHEN org_names.id = 220211041006847435 THEN 'Public Admin (MA)'
-                    WHEN parent_org.id = 220216125001718917 THEN 'Business & Economics'
-                    WHEN parent_org.id = 220216120802871763 THEN 'Management & Administration'
-                    WHEN parent_org.id = 220209071708305289 THEN 'Business Administration'
-                    ELSE 'Other'
-                END as specialization,
-                COUNT(DISTINCT s.id) as count
-            FROM students s
-            LEFT JOIN organizations org ON s.org_id = org.id
-            LEFT JOIN organizations parent_org ON org.parent_id = parent_org.id
-            LEFT JOIN org_names ON (s.org_id = org_names.id OR parent_org.id = org_names.id)
-            WHERE s.active = 1
-            GROUP BY specialization
-            ORDER BY count DESC
-        """)
-        by_specialization = cursor.fetchall()
-        
-        return convert_large_ints_to_strings({
-            "total_students": total_students,
-            "by_education_level": [dict(row) for row in by_education_level],
-            "by_specialization": [dict(row) for row in by_specialization]
-        })
-        
+        return await facets.get_async("students", "stats", {}, _load_students_stats)
     except Exception as e:
         logger.error(f"Error fetching student stats: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch student statistics: {str(e)}")
-    finally:
-        if connection:
-            connection.close()
+
+
+async def _load_students_stats():
+    """Student totals by education level and specialization"""
+    # Total students
+    total_row = await fetch_one("SELECT COUNT(*) as total FROM students WHERE active = 1")
+    total_students = total_row['total']
+    
+    # By education level
+    by_education_level = await fetch_all("""
+        SELECT 
+            COALESCE(group_edu_dict.name_en, 'Unknown') as education_level,
+            COUNT(DISTINCT s.id) as count
+        FROM students s
+        LEFT JOIN education_group_student egs ON s.id = egs.student_id AND egs.active = 1
+        LEFT JOIN education_group eg ON egs.education_group_id = eg.id
+        LEFT JOIN dictionaries group_edu_dict ON eg.education_level_id = group_edu_dict.id
+        WHERE s.active = 1
+        GROUP BY group_edu_dict.name_en
+        ORDER BY count DESC
+    """)
+    
+    # By specialization
+    by_specialization = await fetch_all("""
+        SELECT 
+            CASE
+                WHEN org_names.id = 220223053906474743 THEN 'IT'
+                WHEN org_names.id = 220223110107192121 THEN 'Translation'
+                WHEN org_names.id = 220223060403889770 THEN 'Economics'
+                WHEN org_names.id = 220223063509591259 THEN 'Finance'
+                WHEN org_names.id = 220223065408917441 THEN 'Marketing'
+                WHEN org_names.id = 2202230719043010785 THEN 'Management'
+                WHEN org_names.id = 220223074000992414 THEN 'Accounting'
+                WHEN org_names.id = 220223095607479549 THEN 'Social Work'
+                WHEN org_names.id = 220223044808654357 THEN 'Business Admin'
+                WHEN org_names.id = 220223091501629830 THEN 'Accounting & Audit'
+                WHEN org_names.id = 220223043104107693 THEN 'Int Trade & Logistics'
+                WHEN org_names.id = 220223050501833647 THEN 'Public Admin'
+                WHEN org_names.id = 220223093709483260 THEN 'Industrial Management'
+                WHEN org_names.id = 220223052408185061 THEN 'World Economics'
+                WHEN org_names.id = 220211034000856306 THEN 'Finance (MA)'
+                WHEN org_names.id = 230916013204247889 THEN 'Social Work (MA)'
+                WHEN org_names.id = 220211043501479568 THEN 'Management (MA)'
+                WHEN org_names.id = 220211044509326042 THEN 'Marketing (MA)'
+                WHEN org_names.id = 220211042200292305 THEN 'Economics (MA)'
+                WHEN org_names.id = 220211032207772797 THEN 'World Economics (MA)'
+                WHEN org_names.id = 220211051502179233 THEN 'Business Admin (MA)'
+                WHEN org_names.id = 220211035209269181 THEN 'Accounting & Audit (MA)'
+                WHEN org_names.id = 220211041006847435 THEN 'Public Admin (MA)'
+                WHEN parent_org.id = 220216125001718917 THEN 'Business & Economics'
+                WHEN parent_org.id = 220216120802871763 THEN 'Management & Administration'
+                WHEN parent_org.id = 220209071708305289 THEN 'Business Administration'
+                ELSE 'Other'
+            END as specialization,
+            COUNT(DISTINCT s.id) as count
+        FROM students s
+        LEFT JOIN organizations org ON s.org_id = org.id
+        LEFT JOIN organizations parent_org ON org.parent_id = parent_org.id
+        LEFT JOIN org_names ON (s.org_id = org_names.id OR parent_org.id = org_names.id)
+        WHERE s.active = 1
+        GROUP BY specialization
+        ORDER BY count DESC
+    """)
+    
+    return convert_large_ints_to_strings({
+        "total_students": total_students,
+        "by_education_level": [dict(row) for row in by_education_level],
+        "by_specialization": [dict(row) for row in by_specialization]
+    })
 
 
 @router.get("/filters")
 async def get_filter_options():
     """Get available filter options for students"""
-    connection = None
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        # Get unique education types
-        cursor.execute("""
-            SELECT DISTINCT 
-                COALESCE(student_edu_type_dict.name_en, 'Unknown') as education_type
-            FROM students s
-            LEFT JOIN dictionaries student_edu_type_dict ON s.education_type_id = student_edu_type_dict.id
-            WHERE s.active = 1 AND student_edu_type_dict.name_en IS NOT NULL
-            ORDER BY education_type
-        """)
-        education_types = [row['education_type'] for row in cursor.fetchall()]
-        
-        # Get unique education levels
-        cursor.execute("""
-            SELECT DISTINCT 
-                COALESCE(group_edu_dict.name_en, 'Unknown') as education_level
-            FROM students s
-            LEFT JOIN education_group_student egs ON s.id = egs.student_id AND egs.active = 1
-            LEFT JOIN education_group eg ON egs.education_group_id = eg.id
-            LEFT JOIN dictionaries group_edu_dict ON eg.education_level_id = group_edu_dict.id
-            WHERE s.active = 1 AND group_edu_dict.name_en IS NOT NULL
-            ORDER BY education_level
-        """)
-        education_levels = [row['education_level'] for row in cursor.fetchall()]
-        
-        # Get unique organizations
-        cursor.execute("""
-            SELECT DISTINCT 
-                s.org_id,
-                COALESCE(org_dict.name_en, org_dict.name_az, 'Unknown') as organization_name
-            FROM students s
-            LEFT JOIN organizations org ON s.org_id = org.id
-            LEFT JOIN dictionaries org_dict ON org.dictionary_name_id = org_dict.id
-            WHERE s.active = 1 AND s.org_id IS NOT NULL
-            ORDER BY organization_name
-            LIMIT 50
-        """)
-        organizations = [{"id": row['org_id'], "name": row['organization_name']} for row in cursor.fetchall()]
-        
-        return convert_large_ints_to_strings({
-            "education_types": education_types,
-            "education_levels": education_levels,
-            "organizations": organizations
-        })
-        
+        return await facets.get_async("students", "filter_options", {}, _load_filter_options)
     except Exception as e:
         logger.error(f"Error fetching filter options: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch filter options: {str(e)}")
-    finally:
-        if connection:
-            connection.close()
+
+
+async def _load_filter_options():
+    """Distinct education types, levels and organizations of active students"""
+    # Get unique education types
+    education_type_rows = await fetch_all("""
+        SELECT DISTINCT 
+            COALESCE(student_edu_type_dict.name_en, 'Unknown') as education_type
+        FROM students s
+        LEFT JOIN dictionaries student_edu_type_dict ON s.education_type_id = student_edu_type_dict.id
+        WHERE s.active = 1 AND student_edu_type_dict.name_en IS NOT NULL
+        ORDER BY education_type
+    """)
+    education_types = [row['education_type'] for row in education_type_rows]
+    
+    # Get unique education levels
+    education_level_rows = await fetch_all("""
+        SELECT DISTINCT 
+            COALESCE(group_edu_dict.name_en, 'Unknown') as education_level
+        FROM students s
+        LEFT JOIN education_group_student egs ON s.id = egs.student_id AND egs.active = 1
+        LEFT JOIN education_group eg ON egs.education_group_id = eg.id
+        LEFT JOIN dictionaries group_edu_dict ON eg.education_level_id = group_edu_dict.id
+        WHERE s.active = 1 AND group_edu_dict.name_en IS NOT NULL
+        ORDER BY education_level
+    """)
+    education_levels = [row['education_level'] for row in education_level_rows]
+    
+    # Get unique organizations
+    organization_rows = await fetch_all("""
+        SELECT DISTINCT 
+            s.org_id,
+            COALESCE(org_dict.name_en, org_dict.name_az, 'Unknown') as organization_name
+        FROM students s
+        LEFT JOIN organizations org ON s.org_id = org.id
+        LEFT JOIN dictionaries org_dict ON org.dictionary_name_id = org_dict.id
+        WHERE s.active = 1 AND s.org_id IS NOT NULL
+        ORDER BY organization_name
+        LIMIT 50
+    """)
+    organizations = [{"id": row['org_id'], "name": row['organization_name']} for row in organization_rows]
+    
+    return convert_large_ints_to_strings({
+        "education_types": education_types,
+        "education_levels": education_levels,
+        "organizations": organizations
+    })
 
 
 @router.get("/form-data")
 async def get_form_data():
     """Get dropdown data for student edit form"""
-    connection = None
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        # Get organizations from org_names table
-        cursor.execute("""
-            SELECT org.id, COALESCE(names.name_en, names.name_az, 'Unknown') as name
-            FROM organizations org 
-            LEFT JOIN org_names names ON org.dictionary_name_id = names.id
-            WHERE org.active = 1 
-            ORDER BY names.name_en
-        """)
-        organizations = cursor.fetchall()
-        
-        # Get genders (type_id = 100000001)
-        cursor.execute("""
-            SELECT id, name_en as name
-            FROM dictionaries 
-            WHERE type_id = 100000001 AND active = 1
-            ORDER BY name_en
-        """)
-        genders = cursor.fetchall()
-        
-        # Get citizenships (type_id = 100000007)
-        cursor.execute("""
-            SELECT id, name_en as name
-            FROM dictionaries 
-            WHERE type_id = 100000007 AND active = 1
-            ORDER BY name_en
-        """)
-        citizenships = cursor.fetchall()
-        
-        # Get nationalities (type_id = 100000006, 100000022, 100000071)
-        cursor.execute("""
-            SELECT id, name_en as name
-            FROM dictionaries 
-            WHERE type_id IN (100000006, 100000022, 100000071) AND active = 1
-            ORDER BY name_en
-        """)
-        nationalities = cursor.fetchall()
-        
-        # Get marital statuses - let me find the correct type_id
-        cursor.execute("""
-            SELECT id, name_en as name
-            FROM dictionaries 
-            WHERE name_en IN ('Single', 'Married') AND active = 1
-            ORDER BY name_en
-        """)
-        marital_statuses = cursor.fetchall()
-        
-        # Get blood types - they are stored as "I qrup", "II qrup", etc.
-        cursor.execute("""
-            SELECT id, name_en as name
-            FROM dictionaries 
-            WHERE name_en LIKE '%qrup' AND active = 1
-            ORDER BY name_en
-        """)
-        blood_types = cursor.fetchall()
-        
-        # Get education types - find the appropriate type_id
-        cursor.execute("""
-            SELECT id, name_en as name
-            FROM dictionaries 
-            WHERE name_en IN ('Intramural', 'Extramural', 'Evening') AND active = 1
-            ORDER BY name_en
-        """)
-        education_types = cursor.fetchall()
-        
-        return convert_large_ints_to_strings({
-            "organizations": organizations,
-            "genders": genders,
-            "citizenships": citizenships,
-            "nationalities": nationalities,
-            "marital_statuses": marital_statuses,
-            "blood_types": blood_types,
-            "education_types": education_types
-        })
-
+        return await facets.get_async("students", "form_data", {}, _load_form_data)
     except Exception as e:
         logger.error(f"Error fetching form data: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch form data: {str(e)}"
         )
-    finally:
-        if connection:
-            connection.close()
\ No newline at end of file
+
+
+async def _load_form_data():
+    """Organizations and dictionary entries offered by the edit form"""
+    # Get organizations from org_names table
+    organizations = await fetch_all("""
+        SELECT org.id, COALESCE(names.name_en, names.name_az, 'Unknown') as name
+        FROM organizations org 
+        LEFT JOIN org_names names ON org.dictionary_name_id = names.id
+        WHERE org.active = 1 
+        ORDER BY names.name_en
+    """)
+    
+    # Get genders (type_id = 100000001)
+    genders = await fetch_all("""
+        SELECT id, name_en as name
+        FROM dictionaries 
+        WHERE type_id = 100000001 AND active = 1
+        ORDER BY name_en
+    """)
+    
+    # Get citizenships (type_id = 100000007)
+    citizenships = await fetch_all("""
+        SELECT id, name_en as name
+        FROM dictionaries 
+        WHERE type_id = 100000007 AND active = 1
+        ORDER BY name_en
+    """)
+    
+    # Get nationalities (type_id = 100000006, 100000022, 100000071)
+    nationalities = await fetch_all("""
+        SELECT id, name_en as name
+        FROM dictionaries 
+        WHERE type_id IN (100000006, 100000022, 100000071) AND active = 1
+        ORDER BY name_en
+    """)
+    
+    # Get marital statuses - let me find the correct type_id
+    marital_statuses = await fetch_all("""
+        SELECT id, name_en as name
+        FROM dictionaries 
+        WHERE name_en IN ('Single', 'Married') AND active = 1
+        ORDER BY name_en
+    """)
+    
+    # Get blood types - they are stored as "I qrup", "II qrup", etc.
+    blood_types = await fetch_all("""
+        SELECT id, name_en as name
+        FROM dictionaries 
+        WHERE name_en LIKE '%qrup' AND active = 1
+        ORDER BY name_en
+    """)
+    
+    # Get education types - find the appropriate type_id
+    education_types = await fetch_all("""
+        SELECT id, name_en as name
+        FROM dictionaries 
+        WHERE name_en IN ('Intramural', 'Extramural', 'Evening') AND active = 1
+        ORDER BY name_en
+    """)
+    
+    return convert_large_ints_to_strings({
+        "organizations": organizations,
+        "genders": genders,
+        "citizenships": citizenships,
+        "nationalities": nationalities,
+        "marital_statuses": marital_statuses,
+        "blood_types": blood_types,
+        "education_types": education_types
+    })
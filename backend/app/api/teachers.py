@@ -2,23 +2,37 @@
 Teachers API router - Updated to use new LMS schema with staff_members table
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import func
 from typing import List, Optional
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import date
-import psycopg2
 from psycopg2.extras import RealDictCursor
 
 from app.core.database import get_db
-from app.core.config import settings
+from app.core.database import fetch_all, fetch_one, fetch_value
+from app.core.db_pool import get_db_connection as get_pooled_connection
+from app.core.etag import is_not_modified, make_etag, not_modified, set_etag, version_sql
+from app.core.pagination import (
+    COUNT_MODE_PATTERN, SortKey, decode_cursor, orm_after_filter, orm_order_by,
+    split_page, total_count
+)
 from app.models.staff_member import StaffMember
 from app.models.person import Person
 from app.models.user import User
 from app.models.organization_unit import OrganizationUnit
 from app.auth import get_current_user, CurrentUser
+from app.services import org_tree, schedule_index
+from app.services.course_schedules import DAY_NAMES, fetch_offering_schedules
+from app.services.localization import localize
+from app.services.search import orm_search_filter, orm_search_rank
+from app.services.schedule_index import ScheduleTemplate
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/teachers", tags=["teachers"])
 
@@ -26,14 +40,7 @@ router = APIRouter(prefix="/teachers", tags=["teachers"])
 # Database connection function
 def get_db_connection():
     """Create database connection"""
-    return psycopg2.connect(
-        host=settings.DB_HOST,
-        port=settings.DB_PORT,
-        database=settings.DB_NAME,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD,
-        cursor_factory=RealDictCursor
-    )
+    return get_pooled_connection(cursor_factory=RealDictCursor)
 
 
 # Pydantic models for responses
@@ -58,14 +65,6 @@ class OrganizationInfo(BaseModel):
         from_attributes = True
 
 
-def get_localized_name(name_dict: Optional[dict], lang: str = 'en') -> Optional[str]:
-    """Get localized name from JSONB field with fallback"""
-    if not name_dict:
-        return None
-    # Try requested language, fallback to en, then az, then any available
-    return name_dict.get(lang) or name_dict.get('en') or name_dict.get('az') or next(iter(name_dict.values()), None)
-
-
 class TeacherListResponse(BaseModel):
     id: UUID
     employee_number: str
@@ -87,6 +86,7 @@ class PaginatedTeachersResponse(BaseModel):
     current_page: int
     per_page: int
     results: List[TeacherListResponse]
+    next_cursor: Optional[str] = None
 
 
 class TeacherStatsResponse(BaseModel):
@@ -101,8 +101,11 @@ def get_teachers(
     per_page: int = Query(25, ge=1, le=100),
     search: Optional[str] = Query(None),
     organization_id: Optional[str] = Query(None),
+    include_subunits: bool = Query(False, description="Also match units below organization_id"),
     active: Optional[bool] = Query(None),
     lang: str = Query('en', regex='^(en|ru|az)$'),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count_mode: str = Query("exact", pattern=COUNT_MODE_PATTERN),
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user)
 ):
@@ -111,6 +114,9 @@ def get_teachers(
 
     Args:
         lang: Language code for localized content (en, ru, az)
+        cursor: Continue after the previous page instead of using page
+        count_mode: exact, cached or estimated total count (estimates
+            are not available for this query and use the cached count)
     """
     # Check permissions - only admins can list teachers
     if not current_user.has_role("ADMIN") and not current_user.has_role("SYSADMIN"):
@@ -127,36 +133,63 @@ def get_teachers(
         )
 
         # Apply search filter
-        if search:
-            search_filter = or_(
-                Person.first_name.ilike(f"%{search}%"),
-                Person.last_name.ilike(f"%{search}%"),
-                Person.middle_name.ilike(f"%{search}%"),
-                StaffMember.employee_number.ilike(f"%{search}%")
-            )
+        search_columns = [
+            Person.first_name, Person.last_name,
+            Person.middle_name, StaffMember.employee_number
+        ]
+        search_filter = orm_search_filter(search, search_columns)
+        if search_filter is not None:
             query = query.filter(search_filter)
 
         # Apply filters
         if organization_id:
             try:
                 org_uuid = UUID(organization_id)
-                query = query.filter(StaffMember.organization_unit_id == org_uuid)
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid organization ID format")
+            if include_subunits:
+                unit_ids = org_tree.get_tree(db).subtree_ids(str(org_uuid)) or [str(org_uuid)]
+                query = query.filter(
+                    StaffMember.organization_unit_id.in_([UUID(unit_id) for unit_id in unit_ids])
+                )
+            else:
+                query = query.filter(StaffMember.organization_unit_id == org_uuid)
 
         if active is not None:
             query = query.filter(StaffMember.is_active == active)
 
         # Count total records
-        total_count = query.count()
+        count = total_count(
+            count_mode, ("teachers", search, organization_id, include_subunits, active),
+            query.count
+        )
 
-        # Apply pagination
-        offset = (page - 1) * per_page
-        staff_members = query.order_by(
-            Person.last_name, Person.first_name
-        ).offset(offset).limit(per_page).all()
+        # Apply pagination (best matches first when searching); a cursor
+        # replaces the offset with a condition on the sort keys
+        sort_keys = [
+            SortKey(func.coalesce(Person.last_name, ''), "sort_last_name"),
+            SortKey(func.coalesce(Person.first_name, ''), "sort_first_name"),
+            SortKey(StaffMember.id, "sort_id"),
+        ]
+        rank = orm_search_rank(search, search_columns)
+        if rank is not None:
+            sort_keys.insert(0, SortKey(rank, "search_rank", descending=True))
+        query = query.add_columns(
+            *[key.expression.label(key.column) for key in sort_keys]
+        ).order_by(*orm_order_by(sort_keys))
+        if cursor:
+            query = query.filter(orm_after_filter(sort_keys, decode_cursor(cursor, sort_keys)))
+        else:
+            query = query.offset((page - 1) * per_page)
+        rows, next_cursor = split_page(
+            query.limit(per_page + 1).all(),
+            per_page,
+            lambda row: [getattr(row, key.column) for key in sort_keys]
+        )
+        staff_members = [row[0] for row in rows]
 
-        # Build response data
+        # Build response data (organizations come from the cached tree)
+        tree = org_tree.get_tree(db)
         results = []
         for staff in staff_members:
             # Get related data
@@ -177,15 +210,13 @@ def get_teachers(
                     )
 
             if staff.organization_unit_id:
-                org_record = db.query(OrganizationUnit).filter(
-                    OrganizationUnit.id == staff.organization_unit_id
-                ).first()
-                if org_record:
+                org_node = tree.get(str(staff.organization_unit_id))
+                if org_node:
                     organization = OrganizationInfo(
-                        id=org_record.id,
-                        name=org_record.name,
-                        name_localized=get_localized_name(org_record.name, lang),
-                        code=org_record.code
+                        id=org_node.id,
+                        name=org_node.name,
+                        name_localized=localize(org_node.name, lang),
+                        code=org_node.code
                     )
 
             teacher_data = TeacherListResponse(
@@ -201,14 +232,15 @@ def get_teachers(
             )
             results.append(teacher_data)
 
-        total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 1
+        total_pages = (count + per_page - 1) // per_page if count > 0 else 1
 
         return PaginatedTeachersResponse(
-            count=total_count,
+            count=count,
             total_pages=total_pages,
             current_page=page,
             per_page=per_page,
-            results=results
+            results=results,
+            next_cursor=next_cursor
         )
 
     except HTTPException:
@@ -294,7 +326,7 @@ def get_teacher_detail(
                 organization = OrganizationInfo(
                     id=org_record.id,
                     name=org_record.name,
-                    name_localized=get_localized_name(org_record.name, lang),
+                    name_localized=localize(org_record.name, lang),
                     code=org_record.code
                 )
 
@@ -331,6 +363,16 @@ class TeacherCourseInfo(BaseModel):
 
 
 # Detailed Course Models
+class CourseScheduleSlot(BaseModel):
+    day_of_week: int
+    day_name: str
+    start_time: str
+    end_time: str
+    room: Optional[str] = None
+    schedule_type: Optional[str] = None
+    instructor_name: Optional[str] = None
+
+
 class DetailedCourseInfo(BaseModel):
     offering_id: str
     course_code: str
@@ -351,6 +393,7 @@ class DetailedCourseInfo(BaseModel):
     enrollment_status: str
     language_of_instruction: str
     is_published: bool
+    schedules: List[CourseScheduleSlot] = []
 
 
 class TeacherCoursesListResponse(BaseModel):
@@ -431,6 +474,10 @@ class AttendanceRequest(BaseModel):
     records: List[dict]  # [{student_id: str, status: str, notes: Optional[str]}]
 
 
+class BulkAttendanceRequest(BaseModel):
+    sessions: List[AttendanceRequest]
+
+
 class AttendanceRecordResponse(BaseModel):
     id: str
     student_id: str
@@ -495,13 +542,7 @@ def get_teacher_dashboard(
         employee_number = current_user.username  # Account username
         
         # Connect to NEW lms database to get real teacher data
-        conn = psycopg2.connect(
-            dbname=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            host=settings.DB_HOST,
-            port=settings.DB_PORT
-        )
+        conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
         # Get teacher/staff information from NEW database
@@ -637,13 +678,7 @@ def get_teacher_courses(
         employee_number = current_user.username
 
         # Connect to NEW lms database
-        conn = psycopg2.connect(
-            dbname=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            host=settings.DB_HOST,
-            port=settings.DB_PORT
-        )
+        conn = get_db_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
         # Get staff member
@@ -699,6 +734,11 @@ def get_teacher_courses(
 
         course_records = cur.fetchall()
 
+        # Weekly slots of all listed offerings in one query
+        offering_schedules = fetch_offering_schedules(
+            cur, [record['offering_id'] for record in course_records]
+        )
+
         # Convert to DetailedCourseInfo objects
         courses = []
         for record in course_records:
@@ -746,7 +786,8 @@ def get_teacher_courses(
                 language_of_instruction=(
                     record.get('language_of_instruction') or "az"
                 ),
-                is_published=bool(record.get('is_published', False))
+                is_published=bool(record.get('is_published', False)),
+                schedules=offering_schedules.get(str(record['offering_id']), [])
             ))
 
         cur.close()
@@ -782,14 +823,7 @@ def get_teacher_students(
             )
         
         # Connect to lms database
-        conn = psycopg2.connect(
-            dbname=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            host=settings.DB_HOST,
-            port=str(settings.DB_PORT),
-            cursor_factory=RealDictCursor
-        )
+        conn = get_db_connection()
         cur = conn.cursor()
         
         # Get teacher's user_id from staff_members
@@ -946,14 +980,7 @@ def get_teacher_schedules(
     try:
         employee_number = current_user.username
 
-        conn = psycopg2.connect(
-            host=settings.DB_HOST,
-            port=settings.DB_PORT,
-            database=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            cursor_factory=RealDictCursor
-        )
+        conn = get_db_connection()
         cur = conn.cursor()
 
         # Get user_id from employee_number
@@ -1049,14 +1076,7 @@ def get_attendance_for_class(
     try:
         employee_number = current_user.username
 
-        conn = psycopg2.connect(
-            host=settings.DB_HOST,
-            port=settings.DB_PORT,
-            database=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            cursor_factory=RealDictCursor
-        )
+        conn = get_db_connection()
         cur = conn.cursor()
 
         # Get user_id from employee_number
@@ -1176,14 +1196,7 @@ def check_attendance_status(
     try:
         employee_number = current_user.username
 
-        conn = psycopg2.connect(
-            host=settings.DB_HOST,
-            port=settings.DB_PORT,
-            database=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            cursor_factory=RealDictCursor
-        )
+        conn = get_db_connection()
         cur = conn.cursor()
 
         # Get user_id from employee_number
@@ -1273,37 +1286,50 @@ def check_attendance_status(
         )
 
 
-@router.post("/me/attendance")
-def submit_attendance(
-    attendance_data: AttendanceRequest,
-    current_user: CurrentUser = Depends(get_current_user)
-):
-    """Submit or update attendance records for a class"""
+def _canonical_uuid(value, what: str) -> str:
+    """Canonical (lower-case, hyphenated) id string; 400 for malformed ids"""
     try:
-        employee_number = current_user.username
+        return str(UUID(str(value)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {what}: {value}")
 
-        conn = psycopg2.connect(
-            host=settings.DB_HOST,
-            port=settings.DB_PORT,
-            database=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            cursor_factory=RealDictCursor
+
+def _save_attendance(current_user: CurrentUser,
+                     sessions: List[AttendanceRequest]) -> int:
+    """
+    Authorize and upsert the attendance of one or more class sessions
+
+    All records are written with a single INSERT ... ON CONFLICT over
+    unnest() arrays. Returns the number of records written.
+    """
+    # Ids are compared with cs.id::text and deduplicated below, so they
+    # must be canonical; malformed ids would only fail at the uuid cast
+    schedule_ids = {}
+    for session in sessions:
+        schedule_ids[session.class_schedule_id] = _canonical_uuid(
+            session.class_schedule_id, "class_schedule_id"
         )
-        cur = conn.cursor()
+    student_ids = {}
+    for session in sessions:
+        for record in session.records:
+            raw = str(record.get('student_id'))
+            if raw not in student_ids:
+                student_ids[raw] = _canonical_uuid(raw, "student_id")
+
+    conn = get_db_connection()
+    cur = conn.cursor()
 
+    try:
         # Get user_id from employee_number
         cur.execute("""
             SELECT sm.user_id
             FROM staff_members sm
             WHERE sm.employee_number = %s
             LIMIT 1
-        """, [employee_number])
+        """, [current_user.username])
 
         staff_record = cur.fetchone()
         if not staff_record:
-            cur.close()
-            conn.close()
             raise HTTPException(
                 status_code=404,
                 detail="Teacher not found"
@@ -1311,28 +1337,33 @@ def submit_attendance(
 
         user_id = staff_record['user_id']
 
-        # Verify teacher owns this schedule
-        verify_query = """
-            SELECT cs.id
+        # Verify teacher owns every schedule
+        requested = set(schedule_ids.values())
+        cur.execute("""
+            SELECT DISTINCT cs.id::text as id
             FROM class_schedules cs
             JOIN course_instructors ci
                 ON cs.course_offering_id = ci.course_offering_id
-            WHERE cs.id = %s AND ci.instructor_id = %s
-        """
-
-        cur.execute(verify_query,
-                   (attendance_data.class_schedule_id, user_id))
-        if not cur.fetchone():
-            cur.close()
-            conn.close()
+            WHERE cs.id = ANY(%s::uuid[]) AND ci.instructor_id = %s
+        """, (list(requested), user_id))
+        owned = {row['id'] for row in cur.fetchall()}
+        if owned != requested:
             raise HTTPException(
                 status_code=403,
                 detail="Not authorized for this class schedule"
             )
 
-        # Insert or update attendance records
-        for record in attendance_data.records:
-            upsert_query = """
+        # One row per (schedule, student, date); the last entry wins
+        rows = {}
+        for session in sessions:
+            for record in session.records:
+                key = (schedule_ids[session.class_schedule_id],
+                       student_ids[str(record.get('student_id'))],
+                       session.attendance_date)
+                rows[key] = (record['status'], record.get('notes'))
+
+        if rows:
+            cur.execute("""
                 INSERT INTO attendance_records (
                     class_schedule_id,
                     student_id,
@@ -1342,7 +1373,10 @@ def submit_attendance(
                     marked_by,
                     marked_at
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+                SELECT v.class_schedule_id, v.student_id, v.attendance_date,
+                       v.status, v.notes, %s, CURRENT_TIMESTAMP
+                FROM unnest(%s::uuid[], %s::uuid[], %s::date[], %s::text[], %s::text[])
+                    AS v(class_schedule_id, student_id, attendance_date, status, notes)
                 ON CONFLICT (class_schedule_id,
                             student_id, attendance_date)
                 DO UPDATE SET
@@ -1351,22 +1385,35 @@ def submit_attendance(
                     marked_by = EXCLUDED.marked_by,
                     marked_at = CURRENT_TIMESTAMP,
                     updated_at = CURRENT_TIMESTAMP
-                RETURNING id
-            """
-
-            cur.execute(upsert_query, (
-                attendance_data.class_schedule_id,
-                record['student_id'],
-                attendance_data.attendance_date,
-                record['status'],
-                record.get('notes'),
-                user_id
+            """, (
+                user_id,
+                [key[0] for key in rows],
+                [key[1] for key in rows],
+                [key[2] for key in rows],
+                [status for status, _ in rows.values()],
+                [notes for _, notes in rows.values()]
             ))
 
         conn.commit()
+        return len(rows)
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
         cur.close()
         conn.close()
 
+
+@router.post("/me/attendance")
+def submit_attendance(
+    attendance_data: AttendanceRequest,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Submit or update attendance records for a class"""
+    try:
+        _save_attendance(current_user, [attendance_data])
+
         return {
             "success": True,
             "message": (f"Attendance saved for "
@@ -1383,6 +1430,40 @@ def submit_attendance(
         )
 
 
+@router.post("/me/attendance/bulk")
+def submit_attendance_bulk(
+    attendance_data: BulkAttendanceRequest,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Submit or update attendance for several class sessions at once
+
+    For catching up on a week of roll calls; all sessions are saved in
+    one transaction or not at all.
+    """
+    if not attendance_data.sessions:
+        raise HTTPException(status_code=400, detail="No sessions provided")
+
+    try:
+        records_updated = _save_attendance(current_user, attendance_data.sessions)
+
+        return {
+            "success": True,
+            "message": (f"Attendance saved for "
+                       f"{len(attendance_data.sessions)} sessions"),
+            "sessions_updated": len(attendance_data.sessions),
+            "records_updated": records_updated
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error submitting attendance: {str(e)}"
+        )
+
+
 # Grades endpoints
 @router.get("/me/assessments")
 def get_teacher_assessments(
@@ -1624,7 +1705,19 @@ def submit_grades(
 ):
     """
     Submit or update grades for an assessment
+
+    The whole batch is validated against attendance with one query and
+    written with a single upsert, so grading a large section stays a
+    handful of statements in one transaction.
     """
+    # Ids are looked up in the ar.student_id::text statuses and deduplicated
+    # below, so they must be canonical; malformed ids would only fail at the
+    # uuid cast
+    student_ids = {}
+    for grade in request.grades:
+        if grade.student_id not in student_ids:
+            student_ids[grade.student_id] = _canonical_uuid(grade.student_id, "student_id")
+
     try:
         conn = get_db_connection()
         cur = conn.cursor()
@@ -1654,22 +1747,30 @@ def submit_grades(
                 detail="Access denied to this course"
             )
 
-        # VALIDATION: Check if attendance has been submitted for this date
+        # VALIDATION: attendance must be submitted for this date; the same
+        # query returns every student's status for the batch check below
         cur.execute("""
-            SELECT COUNT(*) as attendance_count
+            SELECT ar.student_id::text as student_id, ar.status
             FROM attendance_records ar
             JOIN class_schedules cs ON ar.class_schedule_id = cs.id
             WHERE cs.course_offering_id = %s
                 AND ar.attendance_date = %s
         """, [request.course_offering_id, request.assessment_date])
 
-        attendance_check = cur.fetchone()
-        if not attendance_check or attendance_check['attendance_count'] == 0:
+        attendance_records = cur.fetchall()
+        if not attendance_records:
             raise HTTPException(
                 status_code=400,
                 detail="Attendance must be submitted before entering grades for this date"
             )
 
+        # Students absent or late in any session of that date
+        missed_status = {
+            record['student_id']: record['status']
+            for record in attendance_records
+            if record['status'] in ['absent', 'late']
+        }
+
         # Create or get assessment
         assessment_id = request.assessment_id
 
@@ -1697,76 +1798,51 @@ def submit_grades(
 
             assessment_id = cur.fetchone()['id']
 
-        # Insert or update grades
-        grades_saved = 0
+        # Skip grading students who were absent or late; the last entry
+        # wins when a student appears twice
+        rows = {}
         skipped_students = []
-        
         for grade in request.grades:
-            if grade.grade_value is not None:
-                # Check student's attendance status for this date
-                cur.execute("""
-                    SELECT ar.status
-                    FROM attendance_records ar
-                    JOIN class_schedules cs ON ar.class_schedule_id = cs.id
-                    WHERE cs.course_offering_id = %s
-                        AND ar.attendance_date = %s
-                        AND ar.student_id = %s
-                """, [request.course_offering_id, request.assessment_date, grade.student_id])
-
-                attendance_record = cur.fetchone()
-                
-                # Skip grading if student was absent or late
-                if attendance_record and attendance_record['status'] in ['absent', 'late']:
-                    skipped_students.append({
-                        'student_id': grade.student_id,
-                        'reason': f"Student was {attendance_record['status']}"
-                    })
-                    continue
-                
-                # Check if grade exists
-                cur.execute("""
-                    SELECT id FROM grades
-                    WHERE assessment_id = %s AND student_id = %s
-                """, [assessment_id, grade.student_id])
-
-                existing_grade = cur.fetchone()
-
-                if existing_grade:
-                    # Update existing grade
-                    cur.execute("""
-                        UPDATE grades
-                        SET marks_obtained = %s,
-                            feedback = %s,
-                            graded_by = %s,
-                            graded_at = CURRENT_TIMESTAMP,
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE id = %s
-                    """, [
-                        grade.grade_value,
-                        grade.notes,
-                        teacher_id,
-                        existing_grade['id']
-                    ])
-                else:
-                    # Insert new grade
-                    cur.execute("""
-                        INSERT INTO grades (
-                            assessment_id,
-                            student_id,
-                            marks_obtained,
-                            feedback,
-                            graded_by
-                        )
-                        VALUES (%s, %s, %s, %s, %s)
-                    """, [
-                        assessment_id,
-                        grade.student_id,
-                        grade.grade_value,
-                        grade.notes,
-                        teacher_id
-                    ])
-
-                grades_saved += 1
+            if grade.grade_value is None:
+                continue
+            student_id = student_ids[grade.student_id]
+            status = missed_status.get(student_id)
+            if status:
+                skipped_students.append({
+                    'student_id': student_id,
+                    'reason': f"Student was {status}"
+                })
+                continue
+            rows[student_id] = (grade.grade_value, grade.notes)
+
+        # Insert or update all grades in one statement
+        if rows:
+            cur.execute("""
+                INSERT INTO grades (
+                    assessment_id,
+                    student_id,
+                    marks_obtained,
+                    feedback,
+                    graded_by
+                )
+                SELECT %s, v.student_id, v.marks_obtained, v.feedback, %s
+                FROM unnest(%s::uuid[], %s::numeric[], %s::text[])
+                    AS v(student_id, marks_obtained, feedback)
+                ON CONFLICT (assessment_id, student_id) DO UPDATE SET
+                    marks_obtained = EXCLUDED.marks_obtained,
+                    feedback = EXCLUDED.feedback,
+                    graded_by = EXCLUDED.graded_by,
+                    graded_at = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP
+            """, [
+                assessment_id,
+                teacher_id,
+                list(rows),
+                [marks for marks, _ in rows.values()],
+                [notes for _, notes in rows.values()]
+            ])
+
+        grades_saved = len(rows)
 
         conn.commit()
         cur.close()
@@ -1838,6 +1914,113 @@ class TeacherScheduleResponse(BaseModel):
     schedule_events: List[TeacherScheduleEvent] = []
 
 
+SCHEDULE_COLORS = ['#3788d8', '#22c55e', '#f59e0b', '#ec4899', '#8b5cf6', '#14b8a6', '#f97316']
+
+# Row versions of everything the teacher calendar is built from
+_TEACHER_OFFERINGS = \
+    "(SELECT course_offering_id FROM course_instructors WHERE instructor_id = %s)"
+
+TEACHER_VERSION_SQL = "SELECT concat_ws('|', " + ", ".join([
+    version_sql("persons p WHERE p.user_id = %s", "p"),
+    version_sql("course_instructors ci WHERE ci.instructor_id = %s", "ci"),
+    version_sql(f"course_offerings co WHERE co.id IN {_TEACHER_OFFERINGS}", "co"),
+    version_sql(
+        f"courses c JOIN course_offerings co ON co.course_id = c.id "
+        f"WHERE co.id IN {_TEACHER_OFFERINGS}", "c"
+    ),
+    version_sql(
+        f"class_schedules cs WHERE cs.course_offering_id IN {_TEACHER_OFFERINGS}", "cs"
+    ),
+    version_sql("calendar_events ev WHERE ev.event_type = 'holiday'", "ev"),
+]) + ") AS version"
+
+
+async def _teacher_version(instructor_id) -> str:
+    """Cheap version of a teacher's calendar"""
+    return await fetch_value(
+        TEACHER_VERSION_SQL,
+        [instructor_id] * TEACHER_VERSION_SQL.count("%s")
+    )
+
+
+async def _load_holidays():
+    """Holiday dates, shared by all calendar views"""
+    holidays = schedule_index.get_holidays()
+    if holidays is None:
+        holidays = schedule_index.store_holidays(
+            await fetch_all(schedule_index.HOLIDAYS_SQL)
+        )
+    return holidays
+
+
+async def _load_teacher_schedule_templates(instructor_id) -> List[ScheduleTemplate]:
+    """Weekly schedule templates of a teacher with prepared event fields"""
+    # Group by time slot to avoid duplicates: when a teacher teaches
+    # multiple sections at the same time, combine them into one event
+    schedules_data = await fetch_all("""
+        SELECT
+            MIN(cs.id::text) as schedule_id,
+            cs.day_of_week,
+            cs.start_time,
+            cs.end_time,
+            cs.room_id::text as room_id,
+            cs.schedule_type,
+            MIN(cs.effective_from) as effective_from,
+            MAX(cs.effective_until) as effective_until,
+            c.code as course_code,
+            c.name as course_name,
+            STRING_AGG(DISTINCT co.section_code, ', ' ORDER BY co.section_code) as section_code,
+            SUM(co.max_enrollment) as max_enrollment,
+            SUM(co.current_enrollment) as enrolled_count,
+            COUNT(DISTINCT co.id) as section_count
+        FROM course_instructors ci
+        JOIN course_offerings co ON ci.course_offering_id = co.id
+        JOIN courses c ON co.course_id = c.id
+        JOIN class_schedules cs ON cs.course_offering_id = co.id
+        WHERE ci.instructor_id = %s
+        GROUP BY cs.day_of_week, cs.start_time, cs.end_time, cs.room_id, cs.schedule_type, c.code, c.name
+        ORDER BY cs.day_of_week, cs.start_time
+    """, [instructor_id])
+
+    course_colors = {}
+    templates = []
+    for schedule in schedules_data:
+        # Assign color per course
+        if schedule['course_code'] not in course_colors:
+            course_colors[schedule['course_code']] = \
+                SCHEDULE_COLORS[len(course_colors) % len(SCHEDULE_COLORS)]
+
+        # Extract course name from JSONB
+        course_name = schedule['course_name']
+        if isinstance(course_name, dict):
+            course_name = course_name.get('en', course_name.get('az', course_name.get('ru', 'N/A')))
+        else:
+            course_name = course_name or 'N/A'
+
+        templates.append(ScheduleTemplate(
+            schedule_id=schedule['schedule_id'],
+            day_of_week=schedule['day_of_week'],
+            start_time=str(schedule['start_time']),
+            end_time=str(schedule['end_time']),
+            effective_from=schedule['effective_from'],
+            effective_until=schedule['effective_until'],
+            event={
+                "title": schedule['course_code'],
+                "course_code": schedule['course_code'],
+                "course_name": course_name,
+                "section_code": schedule['section_code'],
+                "day_of_week": schedule['day_of_week'],
+                "day_name": DAY_NAMES[schedule['day_of_week']],
+                "room_id": schedule['room_id'],
+                "schedule_type": schedule['schedule_type'],
+                "enrolled_count": schedule['enrolled_count'] or 0,
+                "max_enrollment": schedule['max_enrollment'] or 0,
+                "background_color": course_colors[schedule['course_code']],
+            }
+        ))
+    return templates
+
+
 @router.get("/me/schedule", response_model=List[ScheduleClass])
 async def get_my_schedule(
     day: Optional[int] = Query(None, ge=0, le=6, description="Day of week (0=Monday, 6=Sunday)"),
@@ -1849,17 +2032,12 @@ async def get_my_schedule(
     - **day**: Optional day of week (0=Monday, 6=Sunday). If not provided, returns today's schedule
     - Returns list of classes with time, course, room, and enrollment information
     """
-    conn = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
         # Get instructor_id from current user
-        cur.execute("""
+        teacher_user = await fetch_one("""
             SELECT id FROM users WHERE username = %s
         """, [current_user.username])
         
-        teacher_user = cur.fetchone()
         if not teacher_user:
             raise HTTPException(status_code=404, detail="Teacher not found")
         
@@ -1873,7 +2051,7 @@ async def get_my_schedule(
             day_of_week = datetime.now().weekday()  # 0=Monday
         
         # Get schedule for the specified day
-        cur.execute("""
+        schedules = await fetch_all("""
             SELECT 
                 cs.id::text as schedule_id,
                 cs.day_of_week,
@@ -1895,8 +2073,6 @@ async def get_my_schedule(
             ORDER BY cs.start_time
         """, (instructor_id, day_of_week))
         
-        schedules = cur.fetchall()
-        
         # Convert to response format
         days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         result = []
@@ -1924,14 +2100,9 @@ async def get_my_schedule(
                 max_enrollment=sch['max_enrollment'] or 0
             ))
         
-        cur.close()
-        conn.close()
-        
         return result
 
     except Exception as e:
-        if conn:
-            conn.close()
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching schedule: {str(e)}"
@@ -1940,6 +2111,8 @@ async def get_my_schedule(
 
 @router.get("/me/schedule/calendar", response_model=TeacherScheduleResponse)
 async def get_my_schedule_calendar(
+    request: Request,
+    response: Response,
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     current_user: CurrentUser = Depends(get_current_user)
@@ -1951,15 +2124,11 @@ async def get_my_schedule_calendar(
     - **end_date**: Optional end date (YYYY-MM-DD). If not provided, uses 4 weeks ahead
     - Returns calendar events formatted for FullCalendar with recurring weekly events
     """
-    conn = None
     try:
         from datetime import datetime, timedelta
 
-        conn = get_db_connection()
-        cur = conn.cursor()
-
         # Get instructor info
-        cur.execute("""
+        teacher_user = await fetch_one("""
             SELECT
                 u.id,
                 u.username,
@@ -1971,12 +2140,17 @@ async def get_my_schedule_calendar(
             WHERE u.username = %s
         """, [current_user.username])
 
-        teacher_user = cur.fetchone()
         if not teacher_user:
             raise HTTPException(status_code=404, detail="Teacher not found")
 
         instructor_id = teacher_user['id']
 
+        version = await _teacher_version(instructor_id)
+        etag = make_etag(request, instructor_id, version)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
         # Build full name
         full_name_parts = []
         if teacher_user.get('first_name'):
@@ -2003,121 +2177,18 @@ async def get_my_schedule_calendar(
             range_start = today - timedelta(days=today.weekday())
             range_end = range_start + timedelta(weeks=4)
 
-        # Get schedule templates - group by time slot to avoid duplicates
-        # When teacher teaches multiple sections at same time, combine them into one event
-        cur.execute("""
-            SELECT
-                MIN(cs.id::text) as schedule_id,
-                cs.day_of_week,
-                cs.start_time,
-                cs.end_time,
-                cs.room_id::text as room_id,
-                cs.schedule_type,
-                MIN(cs.effective_from) as effective_from,
-                MAX(cs.effective_until) as effective_until,
-                c.code as course_code,
-                c.name as course_name,
-                STRING_AGG(DISTINCT co.section_code, ', ' ORDER BY co.section_code) as section_code,
-                SUM(co.max_enrollment) as max_enrollment,
-                SUM(co.current_enrollment) as enrolled_count,
-                COUNT(DISTINCT co.id) as section_count
-            FROM course_instructors ci
-            JOIN course_offerings co ON ci.course_offering_id = co.id
-            JOIN courses c ON co.course_id = c.id
-            JOIN class_schedules cs ON cs.course_offering_id = co.id
-            WHERE ci.instructor_id = %s
-            GROUP BY cs.day_of_week, cs.start_time, cs.end_time, cs.room_id, cs.schedule_type, c.code, c.name
-            ORDER BY cs.day_of_week, cs.start_time
-        """, [instructor_id])
-
-        schedules_data = cur.fetchall()
-
-        print(f"DEBUG: Found {len(schedules_data)} unique time slots (grouped sections) for teacher")
-        print(f"DEBUG: Generating events for range {range_start} to {range_end}")
-
-        schedule_events = []
-        day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-
-        # Color palette for different courses
-        course_colors = {}
-        colors = ['#3788d8', '#22c55e', '#f59e0b', '#ec4899', '#8b5cf6', '#14b8a6', '#f97316']
-        color_index = 0
-
-        # Generate recurring weekly events for each schedule template
-        for schedule in schedules_data:
-            # Assign color per course
-            if schedule['course_code'] not in course_colors:
-                course_colors[schedule['course_code']] = colors[color_index % len(colors)]
-                color_index += 1
-
-            # Extract course name from JSONB
-            course_name = schedule['course_name']
-            if isinstance(course_name, dict):
-                course_name = course_name.get('en', course_name.get('az', course_name.get('ru', 'N/A')))
-            else:
-                course_name = course_name or 'N/A'
+        schedule = schedule_index.get_schedule("teacher", instructor_id, version)
+        if schedule is None:
+            schedule = schedule_index.store_schedule(
+                "teacher", instructor_id,
+                await _load_teacher_schedule_templates(instructor_id),
+                await _load_holidays(),
+                version
+            )
 
-            # Get section info
-            section_count = schedule.get('section_count', 1)
-            section_display = schedule['section_code']
-            
-            # Log if multiple sections are grouped
-            if section_count > 1:
-                print(f"DEBUG: Grouping {section_count} sections at {schedule['start_time']}: {section_display}")
-
-            # Get schedule validity period
-            sched_start = schedule.get('effective_from')
-            sched_end = schedule.get('effective_until')
-
-            print(f"DEBUG: Schedule {schedule['course_code']} - effective_from: {sched_start}, effective_until: {sched_end}")
-
-            # IMPORTANT: Ignore effective dates for now since all schedules are expired
-            # Use the requested range instead
-            actual_start = range_start
-            actual_end = range_end
-
-            # Find first occurrence of this day of week in range
-            current_date = actual_start
-            day_offset = (schedule['day_of_week'] - current_date.weekday()) % 7
-            first_occurrence = current_date + timedelta(days=day_offset)
-
-            # Generate weekly occurrences (limited to requested range only)
-            occurrence_date = first_occurrence
-            occurrence_count = 0
-
-            while occurrence_date <= actual_end:
-                # Create start and end datetime strings
-                start_dt = f"{occurrence_date.strftime('%Y-%m-%d')}T{schedule['start_time']}"
-                end_dt = f"{occurrence_date.strftime('%Y-%m-%d')}T{schedule['end_time']}"
-
-                if occurrence_count < 2:  # Debug: Log first 2 occurrences
-                    print(f"DEBUG: {schedule['course_code']} occurrence #{occurrence_count}: {start_dt} to {end_dt}")
-
-                schedule_events.append(TeacherScheduleEvent(
-                    id=f"{schedule['schedule_id']}_{occurrence_date}",
-                    title=f"{schedule['course_code']}",
-                    course_code=schedule['course_code'],
-                    course_name=course_name,
-                    section_code=schedule['section_code'],
-                    start=start_dt,
-                    end=end_dt,
-                    day_of_week=schedule['day_of_week'],
-                    day_name=day_names[schedule['day_of_week']],
-                    room_id=schedule['room_id'],
-                    schedule_type=schedule['schedule_type'],
-                    enrolled_count=schedule['enrolled_count'] or 0,
-                    max_enrollment=schedule['max_enrollment'] or 0,
-                    background_color=course_colors[schedule['course_code']]
-                ))
-
-                # Move to next week
-                occurrence_date += timedelta(weeks=1)
-                occurrence_count += 1
-
-        print(f"DEBUG: Generated total of {len(schedule_events)} events for teacher")
+        schedule_events = schedule.between(range_start, range_end)
 
-        cur.close()
-        conn.close()
+        logger.debug("Generated %d schedule events for teacher", len(schedule_events))
 
         return TeacherScheduleResponse(
             teacher_id=str(instructor_id),
@@ -2129,8 +2200,6 @@ async def get_my_schedule_calendar(
     except HTTPException:
         raise
     except Exception as e:
-        if conn:
-            conn.close()
         print(f"Error in get_my_schedule_calendar: {e}")
         import traceback
         traceback.print_exc()
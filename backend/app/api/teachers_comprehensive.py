@@ -16,6 +16,7 @@ from app.models.user import User
 from app.models.account import Account
 from app.models.organization import Organization
 from app.models.dictionary import Dictionary
+from app.services import facets
 
 # Create router for teachers comprehensive endpoints
 router = APIRouter(prefix="/teachers", tags=["teachers"])
@@ -104,7 +105,7 @@ class PaginatedTeachersResponse(BaseModel):
 
 
 @router.get("/", response_model=PaginatedTeachersResponse)
-async def get_teachers(
+def get_teachers(
     page: int = Query(1, ge=1),
     per_page: int = Query(25, ge=1, le=100),
     search: Optional[str] = Query(None),
@@ -153,8 +154,11 @@ async def get_teachers(
             active_value = 1 if active else 0
             query = query.filter(User.active == active_value)
 
-        # Count total records
-        total_count = query.count()
+        # Count total records (reused across pages and visits)
+        total_count = facets.get("staff", "list_count", {
+            "search": search, "organization_id": organization_id,
+            "position_id": position_id, "teaching": teaching, "active": active
+        }, query.count)
 
         # Apply pagination
         offset = (page - 1) * per_page
@@ -223,7 +227,7 @@ async def get_teachers(
 
 
 @router.get("/stats", response_model=TeacherStatsResponse)
-async def get_teacher_stats(db: Session = Depends(get_db)):
+def get_teacher_stats(db: Session = Depends(get_db)):
     """
     Get teacher statistics
     """
@@ -245,70 +249,76 @@ async def get_teacher_stats(db: Session = Depends(get_db)):
 
 
 @router.get("/filter-options", response_model=FilterOptionsResponse)
-async def get_filter_options(db: Session = Depends(get_db)):
+def get_filter_options(db: Session = Depends(get_db)):
     """
     Get available filter options for teachers
     """
     try:
-        # Get organizations that have teachers
-        org_ids = db.query(distinct(Teacher.organization_id)).filter(Teacher.organization_id.isnot(None)).all()
-        org_ids = [org_id[0] for org_id in org_ids]
-        organizations = db.query(Organization).filter(Organization.id.in_(org_ids)).all()
-
-        # Get positions from dictionaries that are used by teachers
-        pos_ids = db.query(distinct(Teacher.position_id)).filter(Teacher.position_id.isnot(None)).all()
-        pos_ids = [pos_id[0] for pos_id in pos_ids]
-        positions = db.query(Dictionary).filter(Dictionary.id.in_(pos_ids)).all()
-
-        # Get staff types from dictionaries that are used by teachers
-        staff_ids = db.query(distinct(Teacher.staff_type_id)).filter(Teacher.staff_type_id.isnot(None)).all()
-        staff_ids = [staff_id[0] for staff_id in staff_ids]
-        staff_types = db.query(Dictionary).filter(Dictionary.id.in_(staff_ids)).all()
-
-        # Get contract types from dictionaries that are used by teachers
-        contract_ids = db.query(distinct(Teacher.contract_type_id)).filter(Teacher.contract_type_id.isnot(None)).all()
-        contract_ids = [contract_id[0] for contract_id in contract_ids]
-        contract_types = db.query(Dictionary).filter(Dictionary.id.in_(contract_ids)).all()
-
-        return FilterOptionsResponse(
-            organizations=[
-                OrganizationInfo(
-                    id=org.id,
-                    name=getattr(org, 'name', str(org.id))
-                ) for org in organizations
-            ],
-            positions=[
-                DictionaryInfo(
-                    id=pos.id,
-                    name_en=pos.name_en,
-                    name_az=pos.name_az,
-                    code=pos.code
-                ) for pos in positions
-            ],
-            staff_types=[
-                DictionaryInfo(
-                    id=st.id,
-                    name_en=st.name_en,
-                    name_az=st.name_az,
-                    code=st.code
-                ) for st in staff_types
-            ],
-            contract_types=[
-                DictionaryInfo(
-                    id=ct.id,
-                    name_en=ct.name_en,
-                    name_az=ct.name_az,
-                    code=ct.code
-                ) for ct in contract_types
-            ]
+        return facets.get(
+            "staff", "filter_options", {}, lambda: _load_filter_options(db)
         )
-
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve filter options: {str(e)}")
 
 
+def _load_filter_options(db: Session) -> FilterOptionsResponse:
+    """Organizations and dictionary entries used by teachers"""
+    # Get organizations that have teachers
+    org_ids = db.query(distinct(Teacher.organization_id)).filter(Teacher.organization_id.isnot(None)).all()
+    org_ids = [org_id[0] for org_id in org_ids]
+    organizations = db.query(Organization).filter(Organization.id.in_(org_ids)).all()
+
+    # Get positions from dictionaries that are used by teachers
+    pos_ids = db.query(distinct(Teacher.position_id)).filter(Teacher.position_id.isnot(None)).all()
+    pos_ids = [pos_id[0] for pos_id in pos_ids]
+    positions = db.query(Dictionary).filter(Dictionary.id.in_(pos_ids)).all()
+
+    # Get staff types from dictionaries that are used by teachers
+    staff_ids = db.query(distinct(Teacher.staff_type_id)).filter(Teacher.staff_type_id.isnot(None)).all()
+    staff_ids = [staff_id[0] for staff_id in staff_ids]
+    staff_types = db.query(Dictionary).filter(Dictionary.id.in_(staff_ids)).all()
+
+    # Get contract types from dictionaries that are used by teachers
+    contract_ids = db.query(distinct(Teacher.contract_type_id)).filter(Teacher.contract_type_id.isnot(None)).all()
+    contract_ids = [contract_id[0] for contract_id in contract_ids]
+    contract_types = db.query(Dictionary).filter(Dictionary.id.in_(contract_ids)).all()
+
+    return FilterOptionsResponse(
+        organizations=[
+            OrganizationInfo(
+                id=org.id,
+                name=getattr(org, 'name', str(org.id))
+            ) for org in organizations
+        ],
+        positions=[
+            DictionaryInfo(
+                id=pos.id,
+                name_en=pos.name_en,
+                name_az=pos.name_az,
+                code=pos.code
+            ) for pos in positions
+        ],
+        staff_types=[
+            DictionaryInfo(
+                id=st.id,
+                name_en=st.name_en,
+                name_az=st.name_az,
+                code=st.code
+            ) for st in staff_types
+        ],
+        contract_types=[
+            DictionaryInfo(
+                id=ct.id,
+                name_en=ct.name_en,
+                name_az=ct.name_az,
+                code=ct.code
+            ) for ct in contract_types
+        ]
+    )
+
+
 @router.get("/{teacher_id}", response_model=TeacherListResponse)
-async def get_teacher_detail(teacher_id: int, db: Session = Depends(get_db)):
+def get_teacher_detail(teacher_id: int, db: Session = Depends(get_db)):
     """
     Get detailed information for a specific teacher
     """
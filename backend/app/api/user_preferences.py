@@ -6,10 +6,9 @@ import os
 from typing import Dict, Any
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-import psycopg2
 from psycopg2.extras import RealDictCursor
 
-from app.core.config import settings
+from app.core.db_pool import get_db_connection as get_pooled_connection
 from app.auth import get_current_user, CurrentUser
 
 router = APIRouter(prefix="/user-preferences", tags=["user-preferences"])
@@ -17,13 +16,7 @@ router = APIRouter(prefix="/user-preferences", tags=["user-preferences"])
 
 def get_db_connection():
     """Get PostgreSQL database connection"""
-    return psycopg2.connect(
-        host=settings.DB_HOST,
-        database=settings.DB_NAME,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD,
-        cursor_factory=RealDictCursor
-    )
+    return get_pooled_connection(cursor_factory=RealDictCursor)
 
 
 class UserPreferences(BaseModel):
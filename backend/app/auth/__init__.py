@@ -11,6 +11,7 @@ from .dependencies import (
     require_admin,
     require_teacher_or_admin
 )
+from .user_cache import invalidate_user
 
 __all__ = [
     "create_access_token",
@@ -22,5 +23,6 @@ __all__ = [
     "require_roles",
     "CurrentUser",
     "require_admin",
-    "require_teacher_or_admin"
+    "require_teacher_or_admin",
+    "invalidate_user"
 ]
\ No newline at end of file
@@ -9,11 +9,12 @@ from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.models import User, Person
 from .jwt_handler import verify_token
+from .user_cache import UserIdentity, get_identity, get_token_state
 
 # Security scheme
 security = HTTPBearer(auto_error=False)
@@ -22,38 +23,77 @@ security = HTTPBearer(auto_error=False)
 class CurrentUser:
     """
     Current authenticated user information
+
+    Identity fields (id, username, role, profile ids, name) come from the
+    cached ``UserIdentity`` or from the token claims. The ``user`` and ``person`` ORM rows are only
+    loaded when an endpoint actually accesses them.
     """
     def __init__(
         self,
-        user: User,
+        user: Optional[User] = None,
         person: Optional[Person] = None,
-        user_type: str = "UNKNOWN"
+        user_type: str = "UNKNOWN",
+        identity: Optional[UserIdentity] = None,
+        db: Optional[Session] = None
     ):
-        self.user = user
-        self.person = person
-        self._user_type = user_type
+        if identity is None:
+            if user is None:
+                raise ValueError("CurrentUser requires a user or an identity")
+            identity = UserIdentity(
+                user_id=str(user.id),
+                username=user.username or "",
+                email=user.email or "",
+                user_type=user_type,
+                is_active=bool(user.is_active),
+                is_locked=bool(user.is_locked),
+                person_id=str(person.id) if person else None,
+                first_name=person.first_name if person else None,
+                last_name=person.last_name if person else None,
+            )
+        self.identity = identity
+        self._user = user
+        self._person = person
+        self._db = db
         
+    @property
+    def user(self) -> User:
+        if self._user is None:
+            self._user = self._db.get(User, self.id)
+        return self._user
+
+    @property
+    def person(self) -> Optional[Person]:
+        if self._person is None and self.identity.person_id:
+            self._person = self._db.get(Person, UUID(self.identity.person_id))
+        return self._person
+
     @property
     def id(self) -> UUID:
-        return self.user.id
+        return UUID(self.identity.user_id)
         
     @property 
     def user_type(self) -> str:
-        return self._user_type
+        return self.identity.user_type
         
     @property
     def username(self) -> str:
-        return self.user.username or ""
+        return self.identity.username
         
     @property
     def email(self) -> str:
-        return self.user.email or ""
+        return self.identity.email
+
+    @property
+    def student_id(self) -> Optional[str]:
+        return self.identity.student_id
+
+    @property
+    def staff_id(self) -> Optional[str]:
+        return self.identity.staff_id
         
     @property
     def full_name(self) -> str:
-        if self.person:
-            return f"{self.person.first_name} {self.person.last_name}".strip()
-        return self.username
+        return self.identity.full_name
         
     def has_role(self, required_role: str) -> bool:
         """Check if user has a specific role"""
@@ -71,6 +111,10 @@ def get_current_user(
     """
     Get the current authenticated user from JWT token
     
+    Tokens that carry identity claims and a token version are trusted after
+    a cached version/revocation check. Older tokens without claims resolve
+    the identity through the per-subject identity cache.
+
     Args:
         credentials: HTTP Bearer credentials
         db: Database session
@@ -104,55 +148,20 @@ def get_current_user(
         except (ValueError, AttributeError):
             raise credentials_exception
             
-        # Get user from database
-        user = db.get(User, user_id)
-        if user is None:
-            raise credentials_exception
-            
-        # Get person information if available
-        person = None
-        stmt = select(Person).where(Person.user_id == user_id)
-        result = db.execute(stmt)
-        person = result.scalar_one_or_none()
-            
-        # Determine user type
-        user_type = "UNKNOWN"
-        
-        # Check metadata first
-        if user.user_metadata and isinstance(user.user_metadata, dict):
-            metadata_role = user.user_metadata.get('role')
-            if metadata_role in ['SYSADMIN', 'ADMIN', 'TEACHER', 'STUDENT']:
-                user_type = metadata_role
-        
-        if user_type == "UNKNOWN":
-            # Check Student
-            from app.models import Student
-            student_check = db.execute(
-                select(Student.id).where(Student.user_id == user_id).limit(1)
-            ).scalar_one_or_none()
-            
-            if student_check:
-                user_type = "STUDENT"
-            else:
-                # Check Staff
-                from app.models.staff_member import StaffMember
-                staff_record = db.execute(
-                    select(StaffMember.administrative_role)
-                    .where(StaffMember.user_id == user_id)
-                    .limit(1)
-                ).fetchone()
-                
-                if staff_record:
-                    admin_role = staff_record.administrative_role
-                    if admin_role and admin_role in [
-                        'rector', 'vice_rector', 'dean', 'vice_dean',
-                        'head_of_department'
-                    ]:
-                        user_type = "ADMIN"
-                    else:
-                        user_type = "TEACHER"
-
-        return CurrentUser(user=user, person=person, user_type=user_type)
+        if settings.AUTH_TRUST_TOKEN_CLAIMS and "ver" in payload:
+            state = get_token_state(db, user_id)
+            if state is None:
+                raise credentials_exception
+            token_version, usable = state
+            if not usable or payload.get("ver") != token_version:
+                raise credentials_exception
+            identity = UserIdentity.from_claims(payload)
+        else:
+            identity = get_identity(db, user_id)
+            if identity is None:
+                raise credentials_exception
+
+        return CurrentUser(identity=identity, db=db)
         
     except Exception:
         raise credentials_exception
@@ -0,0 +1,190 @@
+"""
+Bounded executor for bcrypt password hashing
+
+bcrypt is deliberately CPU-expensive. Running it inline on request threads
+lets a login storm (e.g. the start of a registration period) saturate the
+worker and starve every other endpoint. Hashing work is instead run on a
+small dedicated thread pool (bcrypt releases the GIL) with admission
+control: when more than ``AUTH_HASH_WORKERS + AUTH_HASH_MAX_QUEUE`` requests
+are in flight, or a request waited longer than ``AUTH_HASH_QUEUE_TIMEOUT``
+for a worker, ``PasswordHashingBusy`` is raised so the caller can answer
+429 with a Retry-After estimate.
+"""
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from .password import hash_password, verify_password
+
+_TIMED_OUT = object()
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool cannot admit more work"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing capacity exhausted")
+        self.retry_after = retry_after
+
+
+class PasswordHashPool:
+    """
+    Size-limited executor for password hashing with queue-depth limits
+
+    Args:
+        workers: Number of hashing threads
+        max_queue: Requests allowed to wait for a thread before rejecting
+        queue_timeout: Seconds a request may wait for a thread
+            (``<= 0`` waits indefinitely)
+    """
+
+    def __init__(self, workers: int, max_queue: int, queue_timeout: float):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+        # Metrics
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._hash_total = 0.0
+        self._hash_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Threads do not survive fork, so each worker process gets its own
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="password-hash"
+                    )
+                    self._executor_pid = pid
+        return self._executor
+
+    def retry_after(self) -> int:
+        """Estimate in seconds until the current backlog is drained"""
+        with self._lock:
+            average = self._hash_total / self._completed if self._completed else 0.25
+            backlog = self._in_flight
+        return max(1, math.ceil(backlog / self.workers * average))
+
+    def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run ``func(*args)`` on the hashing pool and wait for the result
+
+        The caller waits at most ``queue_timeout`` for a thread to pick
+        the task up (plus the hash itself once it has started).
+
+        Raises:
+            PasswordHashingBusy: If the queue is full or the queue wait
+                exceeded ``queue_timeout``
+        """
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                rejected = True
+            else:
+                self._in_flight += 1
+                self._submitted += 1
+                rejected = False
+        if rejected:
+            raise PasswordHashingBusy(self.retry_after())
+
+        enqueued_at = time.monotonic()
+
+        def task():
+            started_at = time.monotonic()
+            waited = started_at - enqueued_at
+            if self.queue_timeout > 0 and waited > self.queue_timeout:
+                with self._lock:
+                    self._timed_out += 1
+                return _TIMED_OUT
+            result = func(*args)
+            elapsed = time.monotonic() - started_at
+            with self._lock:
+                self._completed += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+                self._hash_total += elapsed
+                self._hash_max = max(self._hash_max, elapsed)
+            return result
+
+        timeout = self.queue_timeout if self.queue_timeout > 0 else None
+        try:
+            future = self._get_executor().submit(task)
+            try:
+                result = future.result(timeout=timeout)
+            except FutureTimeout:
+                # Still queued: give up. Already hashing: the remaining wait
+                # is bounded by one hash, so let it finish
+                if future.cancel():
+                    with self._lock:
+                        self._timed_out += 1
+                    raise PasswordHashingBusy(self.retry_after())
+                result = future.result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        if result is _TIMED_OUT:
+            raise PasswordHashingBusy(self.retry_after())
+        return result
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against a bcrypt hash on the pool"""
+        return self.run(verify_password, plain_password, hashed_password)
+
+    def hash(self, password: str) -> str:
+        """Hash a password with bcrypt on the pool"""
+        return self.run(hash_password, password)
+
+    def shutdown(self) -> None:
+        """Stop the hashing threads of this process"""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            self._executor_pid = None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue and timing metrics for monitoring"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.workers),
+                "submitted": self._submitted,
+                "completed": completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "queue_wait_avg_ms": round(self._wait_total / completed * 1000, 2) if completed else 0.0,
+                "queue_wait_max_ms": round(self._wait_max * 1000, 2),
+                "hash_time_avg_ms": round(self._hash_total / completed * 1000, 2) if completed else 0.0,
+                "hash_time_max_ms": round(self._hash_max * 1000, 2),
+            }
+
+
+password_pool = PasswordHashPool(
+    workers=settings.AUTH_HASH_WORKERS,
+    max_queue=settings.AUTH_HASH_MAX_QUEUE,
+    queue_timeout=settings.AUTH_HASH_QUEUE_TIMEOUT,
+)
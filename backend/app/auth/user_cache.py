@@ -0,0 +1,338 @@
+"""
+Cache of resolved user identities keyed by token subject
+
+Resolving an authenticated user costs a users, persons, students and
+staff_members lookup. The result only changes when one of those rows
+changes, so it is cached per user id in an in-process LRU with a TTL and,
+when ``AUTH_CACHE_REDIS`` is enabled, shared between workers through Redis.
+ORM updates to the involved models invalidate the entry automatically.
+
+Access tokens carry the same identity as signed claims together with a
+token version (``users.metadata->>'token_version'``). Bumping the version
+revokes every token issued before, so requests with such tokens only need
+a cached version check instead of resolving the identity.
+"""
+
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache, get_redis, reset_redis
+from app.core.config import settings
+from app.models import Person, Student, User
+from app.models.staff_member import StaffMember
+
+logger = logging.getLogger(__name__)
+
+ADMIN_ROLES = [
+    'rector', 'vice_rector', 'dean', 'vice_dean', 'head_of_department'
+]
+
+_REDIS_KEY_PREFIX = "auth:identity:"
+
+
+@dataclass
+class UserIdentity:
+    """Snapshot of the data needed to authorize a request"""
+    user_id: str
+    username: str
+    email: str
+    user_type: str
+    is_active: bool = True
+    is_locked: bool = False
+    person_id: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    student_id: Optional[str] = None
+    staff_id: Optional[str] = None
+    token_version: int = 0
+
+    @property
+    def full_name(self) -> str:
+        if self.person_id:
+            return f"{self.first_name or ''} {self.last_name or ''}".strip()
+        return self.username
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UserIdentity":
+        return cls(**data)
+
+    def to_claims(self) -> Dict[str, Any]:
+        """JWT claims describing this identity"""
+        return {
+            "sub": self.user_id,
+            "username": self.username,
+            "email": self.email,
+            "user_type": self.user_type,
+            "person_id": self.person_id,
+            "name": self.full_name if self.person_id else None,
+            "student_id": self.student_id,
+            "staff_id": self.staff_id,
+            "ver": self.token_version,
+        }
+
+    @classmethod
+    def from_claims(cls, payload: Dict[str, Any]) -> "UserIdentity":
+        """Rebuild an identity from verified JWT claims"""
+        return cls(
+            user_id=payload["sub"],
+            username=payload.get("username") or "",
+            email=payload.get("email") or "",
+            user_type=payload.get("user_type") or "UNKNOWN",
+            person_id=payload.get("person_id"),
+            first_name=payload.get("name"),
+            student_id=payload.get("student_id"),
+            staff_id=payload.get("staff_id"),
+            token_version=int(payload.get("ver") or 0),
+        )
+
+
+def get_token_version(user: User) -> int:
+    """Current token version of a user (0 until tokens are first revoked)"""
+    if user.user_metadata and isinstance(user.user_metadata, dict):
+        try:
+            return int(user.user_metadata.get('token_version') or 0)
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+def determine_user_type(
+    user: User,
+    student_id: Optional[Any],
+    staff_admin_role: Optional[str],
+    is_staff: bool
+) -> str:
+    """
+    Derive the role of a user
+
+    The role in ``user_metadata`` wins (SYSADMIN and special roles), then
+    students, then staff members, who are ADMIN when they hold an
+    administrative role and TEACHER otherwise.
+    """
+    if user.user_metadata and isinstance(user.user_metadata, dict):
+        metadata_role = user.user_metadata.get('role')
+        if metadata_role in ['SYSADMIN', 'ADMIN', 'TEACHER', 'STUDENT']:
+            return metadata_role
+
+    if student_id:
+        return "STUDENT"
+    if is_staff:
+        if staff_admin_role and staff_admin_role in ADMIN_ROLES:
+            return "ADMIN"
+        return "TEACHER"
+    return "UNKNOWN"
+
+
+def resolve_identity(db: Session, user_id: UUID) -> Optional[UserIdentity]:
+    """Load the identity of a user from the database"""
+    user = db.get(User, user_id)
+    if user is None:
+        return None
+
+    person = db.execute(
+        select(Person).where(Person.user_id == user_id)
+    ).scalar_one_or_none()
+
+    student_id = db.execute(
+        select(Student.id).where(Student.user_id == user_id).limit(1)
+    ).scalar_one_or_none()
+
+    staff_record = db.execute(
+        select(StaffMember.id, StaffMember.administrative_role)
+        .where(StaffMember.user_id == user_id)
+        .limit(1)
+    ).fetchone()
+
+    user_type = determine_user_type(
+        user,
+        student_id,
+        staff_record.administrative_role if staff_record else None,
+        staff_record is not None
+    )
+
+    return UserIdentity(
+        user_id=str(user.id),
+        username=user.username or "",
+        email=user.email or "",
+        user_type=user_type,
+        is_active=bool(user.is_active),
+        is_locked=bool(user.is_locked),
+        person_id=str(person.id) if person else None,
+        first_name=person.first_name if person else None,
+        last_name=person.last_name if person else None,
+        student_id=str(student_id) if student_id else None,
+        staff_id=str(staff_record.id) if staff_record else None,
+        token_version=get_token_version(user),
+    )
+
+
+class IdentityCache:
+    """Two-level (in-process LRU, optional Redis) cache of UserIdentity"""
+
+    def __init__(self, max_size: int, ttl: float, use_redis: bool = False):
+        self.local = TTLCache(max_size=max_size, ttl=ttl)
+        self.ttl = ttl
+        self.use_redis = use_redis
+
+    def _redis(self):
+        return get_redis() if self.use_redis else None
+
+    def get(self, user_id: str) -> Optional[UserIdentity]:
+        identity = self.local.get(user_id)
+        if identity is not None:
+            return identity
+
+        client = self._redis()
+        if client is None:
+            return None
+        try:
+            raw = client.get(_REDIS_KEY_PREFIX + user_id)
+        except Exception as e:
+            logger.warning(f"Redis identity lookup failed: {e}")
+            reset_redis()
+            return None
+        if raw is None:
+            return None
+        identity = UserIdentity.from_dict(json.loads(raw))
+        self.local.set(user_id, identity)
+        return identity
+
+    def set(self, identity: UserIdentity) -> None:
+        self.local.set(identity.user_id, identity)
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.setex(
+                _REDIS_KEY_PREFIX + identity.user_id,
+                max(int(self.ttl), 1),
+                json.dumps(identity.to_dict())
+            )
+        except Exception as e:
+            logger.warning(f"Redis identity store failed: {e}")
+            reset_redis()
+
+    def invalidate(self, user_id: Any) -> None:
+        key = str(user_id)
+        self.local.delete(key)
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.delete(_REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            logger.warning(f"Redis identity invalidation failed: {e}")
+            reset_redis()
+
+    def clear(self) -> None:
+        self.local.clear()
+
+
+identity_cache = IdentityCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL,
+    use_redis=settings.AUTH_CACHE_REDIS,
+)
+
+
+def get_identity(db: Session, user_id: UUID) -> Optional[UserIdentity]:
+    """Return the cached identity of a user, resolving it on a miss"""
+    if not settings.AUTH_CACHE_ENABLED:
+        return resolve_identity(db, user_id)
+
+    key = str(user_id)
+    identity = identity_cache.get(key)
+    if identity is None:
+        identity = resolve_identity(db, user_id)
+        if identity is not None:
+            identity_cache.set(identity)
+    return identity
+
+
+# user id -> (token version, account usable)
+_token_states = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL,
+)
+
+
+def get_token_state(db: Session, user_id: UUID) -> Optional[Tuple[int, bool]]:
+    """
+    Return the current token version of a user and whether the account
+    may authenticate (active and not locked)
+
+    Served from the identity cache when possible, otherwise from a single
+    primary-key lookup on ``users`` that is cached for ``AUTH_CACHE_TTL``.
+    """
+    key = str(user_id)
+    identity = identity_cache.get(key) if settings.AUTH_CACHE_ENABLED else None
+    if identity is not None:
+        return identity.token_version, identity.is_active and not identity.is_locked
+
+    state = _token_states.get(key) if settings.AUTH_CACHE_ENABLED else None
+    if state is not None:
+        return state
+
+    row = db.execute(
+        select(User.user_metadata, User.is_active, User.is_locked)
+        .where(User.id == user_id)
+    ).fetchone()
+    if row is None:
+        return None
+
+    metadata = row.user_metadata if isinstance(row.user_metadata, dict) else {}
+    try:
+        version = int(metadata.get('token_version') or 0)
+    except (TypeError, ValueError):
+        version = 0
+    state = (version, bool(row.is_active) and not row.is_locked)
+    if settings.AUTH_CACHE_ENABLED:
+        _token_states.set(key, state)
+    return state
+
+
+def revoke_tokens(db: Session, user: User) -> int:
+    """
+    Invalidate every access token issued to a user so far
+
+    Returns:
+        The new token version
+    """
+    metadata = dict(user.user_metadata or {})
+    version = get_token_version(user) + 1
+    metadata['token_version'] = version
+    user.user_metadata = metadata
+    db.commit()
+    return version
+
+
+def invalidate_user(user_id: Any) -> None:
+    """Drop the cached identity of a user (call after raw-SQL updates)"""
+    if user_id is not None:
+        identity_cache.invalidate(user_id)
+        _token_states.delete(str(user_id))
+
+
+# Invalidate on ORM writes to any row the identity is built from
+def _invalidate_by_id(mapper, connection, target):
+    invalidate_user(target.id)
+
+
+def _invalidate_by_user_id(mapper, connection, target):
+    invalidate_user(target.user_id)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(User, _event, _invalidate_by_id)
+    event.listen(Person, _event, _invalidate_by_user_id)
+    event.listen(Student, _event, _invalidate_by_user_id)
+    event.listen(StaffMember, _event, _invalidate_by_user_id)
@@ -0,0 +1,143 @@
+"""
+In-process caching utilities with optional Redis backing
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after ``ttl`` seconds
+
+    Args:
+        max_size: Maximum number of entries before the least recently
+            used one is evicted
+        ttl: Seconds an entry stays valid (``<= 0`` disables expiry)
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value or ``default`` if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry if full"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl > 0 else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any],
+                   ttl: Optional[float] = None) -> Any:
+        """Return the cached value, calling ``loader`` to fill a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value, ttl=ttl)
+        return value
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+_redis_client = None
+_redis_checked_at = 0.0
+_redis_lock = threading.Lock()
+_REDIS_RETRY_INTERVAL = 30.0
+
+
+def get_redis():
+    """
+    Get a shared Redis client for ``REDIS_URL``
+
+    Returns None when Redis is not installed or not reachable; callers
+    must treat Redis as an optional second-level cache. A failed connection
+    is retried at most every 30 seconds.
+    """
+    global _redis_client, _redis_checked_at
+    if _redis_client is not None:
+        return _redis_client
+
+    now = time.monotonic()
+    if _redis_checked_at and now - _redis_checked_at < _REDIS_RETRY_INTERVAL:
+        return None
+
+    with _redis_lock:
+        if _redis_client is not None:
+            return _redis_client
+        _redis_checked_at = now
+        try:
+            import redis
+
+            client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5,
+            )
+            client.ping()
+            _redis_client = client
+        except Exception as e:
+            logger.warning(f"Redis unavailable, using in-process cache only: {e}")
+            _redis_client = None
+    return _redis_client
+
+
+def reset_redis() -> None:
+    """Drop the shared Redis client after a connection error"""
+    global _redis_client, _redis_checked_at
+    with _redis_lock:
+        _redis_client = None
+        _redis_checked_at = time.monotonic()
@@ -31,6 +31,19 @@ class Settings(BaseSettings):
     DB_USER: str = "postgres"
     DB_PASSWORD: str = "1111"
     DB_NAME: str = "lms"
+    DB_CONNECT_TIMEOUT: int = 10
+
+    # Connection pool (sized per worker process)
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_MAX_LIFETIME: int = 1800
+    DB_POOL_HEALTH_CHECK_INTERVAL: int = 30
+    # SQLAlchemy engine pools, separate from the psycopg2 pool above: the
+    # sync engine serves the ORM endpoints, the async engine (asyncpg) the
+    # async ones. Per worker: DB_POOL_MAX_SIZE + both engine pool sizes
+    DB_SYNC_ENGINE_POOL_SIZE: int = 5
+    DB_ASYNC_ENGINE_POOL_SIZE: int = 5
     
     @property
     def database_url(self) -> str:
@@ -47,6 +60,54 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "your-jwt-secret-key-here-in-production-use-a-real-secret"
     JWT_ALGORITHM: str = "HS256"
     ALGORITHM: str = "HS256"
+
+    # Authenticated identity cache (per token subject)
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_TTL: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    AUTH_CACHE_REDIS: bool = False
+    # Trust identity claims in versioned tokens instead of resolving the user
+    AUTH_TRUST_TOKEN_CLAIMS: bool = True
+
+    # bcrypt executor (threads, waiting requests, max queue wait in seconds)
+    AUTH_HASH_WORKERS: int = 4
+    AUTH_HASH_MAX_QUEUE: int = 64
+    AUTH_HASH_QUEUE_TIMEOUT: float = 5.0
+
+    # Dashboard statistics (read cache TTL, full refresh interval in seconds;
+    # the refresh also rebuilds the attendance rollup)
+    DASHBOARD_STATS_CACHE_TTL: int = 30
+    DASHBOARD_STATS_REFRESH_INTERVAL: int = 300
+
+    # Schedule occurrence index (seconds, cached students/teachers)
+    SCHEDULE_CACHE_TTL: int = 300
+    SCHEDULE_CACHE_MAX_SIZE: int = 5000
+
+    # Type-ahead prefix index rebuild interval (seconds, 0 = build once)
+    SUGGEST_REFRESH_INTERVAL: int = 600
+
+    # Reuse of exact list totals for count_mode=cached (seconds)
+    PAGINATION_COUNT_CACHE_TTL: int = 60
+
+    # List totals and filter facets (seconds, entries; dropped on writes)
+    FACET_CACHE_TTL: int = 60
+    FACET_CACHE_MAX_SIZE: int = 1024
+
+    # Cached organization tree rebuild age (seconds; writes also drop it)
+    ORG_TREE_TTL: int = 300
+
+    # Reference data (dropdown lists): reload age in seconds, and whether
+    # to LISTEN for change notifications from the source tables
+    REFERENCE_DATA_TTL: int = 3600
+    REFERENCE_DATA_LISTEN: bool = True
+
+    # Request profiling: statement counts / DB time per request, exposed
+    # as Server-Timing headers and GET /metrics; statements slower than
+    # SLOW_QUERY_MS go to the slow-query log
+    PROFILING_ENABLED: bool = True
+    PROFILING_SERVER_TIMING: bool = True
+    SLOW_QUERY_MS: int = 500
+
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
@@ -1,15 +1,27 @@
-from sqlalchemy import create_engine
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence, Union
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 
+from app.core import profiling
 from app.core.config import settings
 
-# For now, we'll use sync database operations since asyncpg doesn't work with Python 3.13
-# We can add async support later when asyncpg is compatible
-
-# Sync engine for all operations
+# Sync engine for ORM endpoints, Alembic and scripts. Raw SQL endpoints use
+# the psycopg2 pool (app.core.db_pool), so each pool is sized on its own
 sync_engine = create_engine(
     settings.database_url,
-    echo=settings.DEBUG
+    echo=settings.DEBUG,
+    pool_size=settings.DB_SYNC_ENGINE_POOL_SIZE,
+    max_overflow=0,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_MAX_LIFETIME,
+    pool_pre_ping=True
 )
 
 # Sync session maker
@@ -19,6 +31,32 @@ SessionLocal = sessionmaker(
     bind=sync_engine
 )
 
+# Async engine (asyncpg) for ``async def`` endpoints so queries in flight
+# do not block the event loop. Connections are opened lazily, so importing
+# this module in a forked worker does not share sockets with the parent.
+async_engine = create_async_engine(
+    settings.async_database_url,
+    echo=settings.DEBUG,
+    pool_size=settings.DB_ASYNC_ENGINE_POOL_SIZE,
+    max_overflow=0,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_MAX_LIFETIME,
+    pool_pre_ping=True
+)
+
+# Statement counts and timings for the request profiler
+if settings.PROFILING_ENABLED:
+    profiling.instrument_engine(sync_engine)
+    profiling.instrument_engine(async_engine.sync_engine)
+
+# Async session maker
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
 # Dependency to get database session
 def get_db():
     """Get database session for sync operations."""
@@ -28,7 +66,74 @@ def get_db():
     finally:
         db.close()
 
-# For async operations when needed (will implement later)
-async def get_async_session():
-    """Placeholder for async session - not implemented yet."""
-    raise NotImplementedError("Async sessions not available with current setup")
\ No newline at end of file
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get database session for async operations."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+# Async raw-SQL helpers. ``params`` is either a dict for SQLAlchemy named
+# parameters (``WHERE id = :id``) or a sequence for psycopg2-style ``%s``
+# placeholders, so queries can move over from RealDictCursor code unchanged.
+# Rows are returned as plain dictionaries, like RealDictCursor rows.
+
+Params = Optional[Union[Dict[str, Any], Sequence[Any]]]
+
+
+def to_dollar_params(query: str) -> str:
+    """Rewrite psycopg2 ``%s`` placeholders to asyncpg ``$n`` ones."""
+    parts = []
+    index = 0
+    position = 0
+    while True:
+        found = query.find("%", position)
+        if found == -1:
+            parts.append(query[position:])
+            break
+        parts.append(query[position:found])
+        marker = query[found + 1:found + 2]
+        if marker == "s":
+            index += 1
+            parts.append(f"${index}")
+        elif marker == "%":
+            parts.append("%")
+        else:
+            raise ValueError(f"Unsupported placeholder %{marker} in query")
+        position = found + 2
+    return "".join(parts)
+
+
+async def _execute(conn: AsyncConnection, query: str, params: Params):
+    if params is None or isinstance(params, dict):
+        return await conn.execute(text(query), params or {})
+    return await conn.exec_driver_sql(to_dollar_params(query), tuple(params))
+
+
+async def fetch_all(query: str, params: Params = None) -> List[Dict[str, Any]]:
+    """Run a query and return all rows as dictionaries."""
+    async with async_engine.connect() as conn:
+        result = await _execute(conn, query, params)
+        return [dict(row) for row in result.mappings()]
+
+
+async def fetch_one(query: str, params: Params = None) -> Optional[Dict[str, Any]]:
+    """Run a query and return the first row as a dictionary (or None)."""
+    async with async_engine.connect() as conn:
+        result = await _execute(conn, query, params)
+        row = result.mappings().first()
+        return dict(row) if row is not None else None
+
+
+async def fetch_value(query: str, params: Params = None) -> Any:
+    """Run a query and return the first column of the first row."""
+    async with async_engine.connect() as conn:
+        result = await _execute(conn, query, params)
+        return result.scalar()
+
+
+async def execute(query: str, params: Params = None) -> int:
+    """Run a statement in its own transaction and return the row count."""
+    async with async_engine.begin() as conn:
+        result = await _execute(conn, query, params)
+        return result.rowcount
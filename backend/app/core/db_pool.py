@@ -0,0 +1,416 @@
+"""
+Process-wide PostgreSQL connection pool for the raw-SQL API modules
+
+The routers under ``app/api`` talk to PostgreSQL through psycopg2 directly.
+Instead of opening a new TCP + auth handshake per request they check a
+connection out of this pool; calling ``conn.close()`` hands it back.
+
+The pool is sized per worker process (``DB_POOL_MAX_SIZE``), so it opens
+at most ``workers * DB_POOL_MAX_SIZE`` server connections; the SQLAlchemy
+engines add their own ``DB_SYNC_ENGINE_POOL_SIZE`` and
+``DB_ASYNC_ENGINE_POOL_SIZE`` per worker. Connections are recycled after
+``DB_POOL_MAX_LIFETIME`` seconds and pinged before reuse when they sat
+idle for longer than ``DB_POOL_HEALTH_CHECK_INTERVAL``.
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generator, Optional
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.extras import RealDictCursor
+from psycopg2.pool import PoolError
+
+from app.core import profiling
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(PoolError):
+    """Raised when no connection becomes available within the pool timeout"""
+
+
+class PooledConnectionMixin:
+    """
+    Makes ``close()`` return the connection to its pool instead of
+    closing the socket. Closing twice is a no-op, so the common
+    ``finally: conn.close()`` plus ``except: conn.close()`` pattern is safe.
+    """
+
+    _pool: Optional["ConnectionPool"] = None
+    _checked_out: bool = False
+
+    def close(self):
+        pool = self._pool
+        if pool is not None and self._checked_out:
+            pool.putconn(self)
+        elif pool is None:
+            super().close()
+
+    def close_physical(self):
+        """Close the underlying server connection"""
+        super().close()
+
+
+class PooledConnection(PooledConnectionMixin, psycopg2.extensions.connection):
+    """
+    psycopg2 connection that is returned to the pool on close()
+
+    Its cursors record their statements in the request profile
+    (``app.core.profiling``) unless ``PROFILING_ENABLED`` is off.
+    """
+
+    def cursor(self, *args, **kwargs):
+        if settings.PROFILING_ENABLED:
+            cursor_factory = (kwargs.get("cursor_factory") or self.cursor_factory
+                              or psycopg2.extensions.cursor)
+            kwargs["cursor_factory"] = profiling.profiled_cursor_class(cursor_factory)
+        return super().cursor(*args, **kwargs)
+
+
+def _default_connect() -> PooledConnection:
+    return psycopg2.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        dbname=settings.DB_NAME,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        connect_timeout=settings.DB_CONNECT_TIMEOUT,
+        application_name=settings.PROJECT_NAME[:63],
+        connection_factory=PooledConnection,
+    )
+
+
+class ConnectionPool:
+    """
+    Thread-safe LIFO connection pool with health checks and lifetime recycling
+
+    Args:
+        min_size: Connections opened by ``open()`` and kept warm
+        max_size: Upper bound of open connections (idle + checked out)
+        timeout: Seconds ``getconn()`` waits for a free connection
+        max_lifetime: Seconds after which a connection is recycled
+        health_check_interval: Idle seconds after which a connection is
+            pinged before being handed out
+        connect: Factory returning a new ``PooledConnectionMixin`` connection
+    """
+
+    def __init__(
+        self,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        max_lifetime: float = 1800.0,
+        health_check_interval: float = 30.0,
+        connect: Callable[[], Any] = _default_connect,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Invalid pool size configuration")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self._connect = connect
+
+        self._lock = threading.Condition()
+        self._idle: deque = deque()
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+        # Counters exposed through stats()
+        self._checkouts = 0
+        self._connections_created = 0
+        self._connections_discarded = 0
+        self._connections_leaked = 0
+        self._health_check_failures = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    # ------------------------------------------------------------------
+    # Connection lifecycle
+    # ------------------------------------------------------------------
+
+    def _new_connection(self):
+        conn = self._connect()
+        conn._pool = self
+        conn._checked_out = False
+        conn._created_at = time.monotonic()
+        conn._last_used = conn._created_at
+        # Frees the slot even if a caller forgets to close() the connection
+        conn._finalizer = weakref.finalize(conn, self._release_slot)
+        conn._finalizer.atexit = False
+        with self._lock:
+            self._connections_created += 1
+        return conn
+
+    def _release_slot(self, leaked: bool = True):
+        with self._lock:
+            self._size -= 1
+            if leaked:
+                self._connections_leaked += 1
+            self._lock.notify()
+
+    def _discard(self, conn):
+        conn._pool = None
+        conn._checked_out = False
+        try:
+            if not conn.closed:
+                conn.close_physical()
+        except Exception:
+            pass
+        with self._lock:
+            self._connections_discarded += 1
+        conn._finalizer.detach()
+        self._release_slot(leaked=False)
+
+    def _is_expired(self, conn, now: float) -> bool:
+        return (
+            self.max_lifetime > 0
+            and now - conn._created_at >= self.max_lifetime
+        )
+
+    def _is_healthy(self, conn, now: float) -> bool:
+        if conn.closed:
+            return False
+        if now - conn._last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            with self._lock:
+                self._health_check_failures += 1
+            return False
+
+    def open(self) -> None:
+        """Pre-open ``min_size`` connections (failures are logged, not raised)"""
+        opened = []
+        try:
+            for _ in range(self.min_size):
+                opened.append(self.getconn())
+        except Exception as e:
+            logger.warning(f"Could not warm up database pool: {e}")
+        for conn in opened:
+            self.putconn(conn)
+
+    def getconn(self, cursor_factory: Any = RealDictCursor):
+        """
+        Check a connection out of the pool
+
+        Args:
+            cursor_factory: Default cursor factory for ``conn.cursor()``
+
+        Returns:
+            A connection whose ``close()`` returns it to the pool
+
+        Raises:
+            PoolTimeout: If no connection frees up within ``timeout``
+            psycopg2.Error: If a new connection cannot be established
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        while True:
+            conn = None
+            create = False
+            with self._lock:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"No database connection available within "
+                            f"{self.timeout:.1f}s (pool size {self.max_size})"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._lock.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                if self._idle:
+                    conn = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+
+            if create:
+                try:
+                    conn = self._new_connection()
+                except Exception:
+                    self._release_slot(leaked=False)
+                    raise
+            else:
+                now = time.monotonic()
+                if self._is_expired(conn, now) or not self._is_healthy(conn, now):
+                    self._discard(conn)
+                    continue
+
+            conn.cursor_factory = cursor_factory
+            conn._checked_out = True
+            waited = time.monotonic() - started
+            with self._lock:
+                self._checkouts += 1
+                self._wait_time_total += waited
+                self._wait_time_max = max(self._wait_time_max, waited)
+            return conn
+
+    def putconn(self, conn) -> None:
+        """Return a connection to the pool, resetting its session state"""
+        if not conn._checked_out:
+            return
+        conn._checked_out = False
+
+        if self._closed or conn.closed:
+            self._discard(conn)
+            return
+
+        try:
+            if (conn.info.transaction_status
+                    != psycopg2.extensions.TRANSACTION_STATUS_IDLE):
+                conn.rollback()
+            if conn.autocommit:
+                conn.autocommit = False
+        except Exception:
+            self._discard(conn)
+            return
+
+        now = time.monotonic()
+        if self._is_expired(conn, now):
+            self._discard(conn)
+            return
+
+        conn._last_used = now
+        with self._lock:
+            self._idle.append(conn)
+            self._lock.notify()
+
+    def close(self) -> None:
+        """Close all idle connections and refuse further checkouts"""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._lock.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage counters"""
+        with self._lock:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "connections_created": self._connections_created,
+                "connections_discarded": self._connections_discarded,
+                "connections_leaked": self._connections_leaked,
+                "health_check_failures": self._health_check_failures,
+                "timeouts": self._timeouts,
+                "wait_time_avg_ms": round(
+                    self._wait_time_total / self._checkouts * 1000, 3
+                ) if self._checkouts else 0.0,
+                "wait_time_max_ms": round(self._wait_time_max * 1000, 3),
+            }
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Get the connection pool of the current worker process
+
+    A new pool is created after ``fork()`` so uvicorn/gunicorn workers never
+    share sockets inherited from the parent.
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = ConnectionPool(
+                    min_size=settings.DB_POOL_MIN_SIZE,
+                    max_size=settings.DB_POOL_MAX_SIZE,
+                    timeout=settings.DB_POOL_TIMEOUT,
+                    max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+                    health_check_interval=settings.DB_POOL_HEALTH_CHECK_INTERVAL,
+                )
+                _pool_pid = pid
+    return _pool
+
+
+def close_pool() -> None:
+    """Close the pool of the current process (used on shutdown)"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.close()
+        _pool = None
+        _pool_pid = None
+
+
+def pool_stats() -> Optional[Dict[str, Any]]:
+    """Pool metrics, or None if no connection was requested yet"""
+    if _pool is None or _pool_pid != os.getpid():
+        return None
+    return _pool.stats()
+
+
+def get_db_connection(cursor_factory: Any = RealDictCursor):
+    """
+    Check out a pooled psycopg2 connection
+
+    Call ``conn.close()`` when done to return it to the pool.
+
+    Args:
+        cursor_factory: Default cursor class for ``conn.cursor()``;
+            pass ``None`` for plain tuple cursors
+    """
+    return get_pool().getconn(cursor_factory=cursor_factory)
+
+
+@contextmanager
+def db_cursor(cursor_factory: Any = RealDictCursor) -> Generator:
+    """
+    Context manager yielding a cursor on a pooled connection
+
+    Commits when the block succeeds and rolls back on error.
+    """
+    conn = get_db_connection(cursor_factory=cursor_factory)
+    cur = conn.cursor()
+    try:
+        yield cur
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+def get_db_cursor() -> Generator:
+    """FastAPI dependency yielding a RealDictCursor on a pooled connection"""
+    with db_cursor(cursor_factory=RealDictCursor) as cur:
+        yield cur
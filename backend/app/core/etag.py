@@ -0,0 +1,76 @@
+"""
+Conditional GET support (ETag / If-None-Match)
+
+Personal endpoints polled by the portals compute a cheap version string
+first - typically one query over the row versions of the tables the
+response is built from - and answer ``304 Not Modified`` when the client
+already holds that version, skipping the heavy queries and serialization.
+
+Row versions use PostgreSQL's ``xmin`` system column, which changes on
+every insert or update of a row, plus a row count to notice deletes. This
+works for every table whether or not it has an ``updated_at`` column.
+"""
+
+import hashlib
+from datetime import date
+from typing import Any
+
+from fastapi import Request, Response
+
+# ETags are per user; shared caches must not store them
+CACHE_CONTROL = "private, no-cache"
+
+
+def version_sql(from_clause: str, alias: str) -> str:
+    """
+    Scalar subquery returning ``"<count>.<max xmin>"`` for a row set
+
+    Args:
+        from_clause: Everything after ``FROM`` (joins and ``WHERE``)
+        alias: Alias of the table whose row versions are tracked
+    """
+    return (
+        f"(SELECT COUNT(*) || '.' || COALESCE(MAX({alias}.xmin::text::bigint), 0) "
+        f"FROM {from_clause})"
+    )
+
+
+def make_etag(request: Request, *parts: Any) -> str:
+    """
+    Strong ETag for a personal response
+
+    The path, the query string and the current date (relative default
+    ranges such as "this week" move daily) are always part of the tag.
+    """
+    digest = hashlib.sha1()
+    for part in (request.url.path, str(request.query_params),
+                 date.today().isoformat(), *parts):
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already covers ``etag``"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current ETag"""
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
@@ -0,0 +1,196 @@
+"""
+Keyset (cursor) pagination and cheaper total counts for list endpoints
+
+``LIMIT/OFFSET`` makes deep pages linearly slower, because PostgreSQL
+still produces and discards every skipped row, and the separate
+``COUNT(*)`` runs again for every page. List endpoints therefore accept:
+
+- ``cursor``: the opaque ``next_cursor`` of the previous page. The query
+  then continues *after* the last row seen (``WHERE sort key > last
+  value``), which costs the same on every page. Omitting it keeps the
+  ``page``/``offset`` behaviour, so existing clients are unaffected.
+- ``count_mode``: ``exact`` (default) runs the count query, ``cached``
+  reuses an exact count for ``PAGINATION_COUNT_CACHE_TTL`` seconds and
+  ``estimated`` takes the planner's row estimate (falling back to the
+  cached count where no estimate is available).
+
+The sort of a keyset-paginated query is a list of :class:`SortKey`, whose
+last key must be unique (usually the primary key) and whose expressions
+must not be NULL (wrap nullable columns in ``COALESCE``).
+"""
+
+import base64
+import json
+from collections import defaultdict
+from typing import Any, Callable, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+COUNT_MODES = ("exact", "cached", "estimated")
+COUNT_MODE_PATTERN = "^(exact|cached|estimated)$"
+
+_count_cache = TTLCache(max_size=2048, ttl=settings.PAGINATION_COUNT_CACHE_TTL)
+# Bumped by invalidate_counts(); part of every count cache key
+_count_generations = defaultdict(int)
+
+
+class SortKey(NamedTuple):
+    """
+    One ORDER BY key
+
+    Attributes:
+        expression: SQL text, or a SQLAlchemy column element for ORM queries
+        column: Result column holding the key's value (for the next cursor)
+        descending: Sort direction
+        params: ``%s`` parameters used by ``expression``
+    """
+    expression: Any
+    column: str
+    descending: bool = False
+    params: Tuple[Any, ...] = ()
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key values of the last row on a page"""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> List[Any]:
+    """Sort key values of a cursor; 400 if it does not fit ``keys``"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def order_by_sql(keys: Sequence[SortKey]) -> Tuple[str, List[Any]]:
+    """``ORDER BY`` list (without the keyword) and its parameters"""
+    parts = []
+    params: List[Any] = []
+    for key in keys:
+        parts.append(f"{key.expression} {'DESC' if key.descending else 'ASC'}")
+        params.extend(key.params)
+    return ", ".join(parts), params
+
+
+def after_sql(keys: Sequence[SortKey], values: Sequence[Any]) -> Tuple[str, List[Any]]:
+    """
+    Condition selecting the rows sorted after ``values``
+
+    Keys may mix directions, so the condition is expanded as
+    ``k1 > v1 OR (k1 = v1 AND k2 > v2) OR ...`` rather than a row
+    comparison.
+    """
+    alternatives = []
+    params: List[Any] = []
+    for position, key in enumerate(keys):
+        terms = []
+        for equal_key, value in zip(keys[:position], values):
+            terms.append(f"{equal_key.expression} = %s")
+            params.extend(equal_key.params)
+            params.append(value)
+        terms.append(f"{key.expression} {'<' if key.descending else '>'} %s")
+        params.extend(key.params)
+        params.append(values[position])
+        alternatives.append("(" + " AND ".join(terms) + ")")
+    return "(" + " OR ".join(alternatives) + ")", params
+
+
+def named_params(sql: str, params: Sequence[Any], prefix: str = "after") -> Tuple[str, dict]:
+    """Rewrite ``%s`` placeholders to ``:name`` ones for SQLAlchemy ``text()``"""
+    parts = sql.split("%s")
+    named = {}
+    rewritten = parts[0]
+    for position, (value, part) in enumerate(zip(params, parts[1:])):
+        named[f"{prefix}_{position}"] = value
+        rewritten += f":{prefix}_{position}{part}"
+    return rewritten, named
+
+
+def orm_order_by(keys: Sequence[SortKey]) -> list:
+    """SQLAlchemy equivalent of :func:`order_by_sql`"""
+    return [key.expression.desc() if key.descending else key.expression.asc()
+            for key in keys]
+
+
+def orm_after_filter(keys: Sequence[SortKey], values: Sequence[Any]):
+    """SQLAlchemy equivalent of :func:`after_sql`"""
+    alternatives = []
+    for position, key in enumerate(keys):
+        terms = [equal_key.expression == value
+                 for equal_key, value in zip(keys[:position], values)]
+        value = values[position]
+        terms.append(key.expression < value if key.descending else key.expression > value)
+        alternatives.append(and_(*terms))
+    return or_(*alternatives)
+
+
+def split_page(rows: Sequence[Any], limit: int,
+               values_of: Callable[[Any], Sequence[Any]]) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim a ``LIMIT limit + 1`` result to one page and build its next cursor
+
+    Args:
+        rows: Fetched rows, at most ``limit + 1``
+        limit: Page size
+        values_of: Sort key values of a row
+
+    Returns:
+        (page rows, next cursor or None on the last page)
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    return page, encode_cursor(values_of(page[-1]))
+
+
+def row_values(keys: Sequence[SortKey]) -> Callable[[Any], List[Any]]:
+    """``values_of`` for dictionary rows selecting each key's ``column``"""
+    return lambda row: [row[key.column] for key in keys]
+
+
+def estimate_rows(cur, query: str, params: Sequence[Any] = ()) -> int:
+    """The planner's row estimate for ``query`` (no rows are read)"""
+    cur.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+    row = cur.fetchone()
+    plan = row["QUERY PLAN"] if isinstance(row, dict) else row[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def invalidate_counts(*lists: str) -> None:
+    """Forget the cached totals of the named lists (after writes)"""
+    for name in lists:
+        _count_generations[name] += 1
+
+
+def total_count(mode: str, cache_key: Tuple[Hashable, ...], exact: Callable[[], int],
+                estimate: Optional[Callable[[], int]] = None) -> int:
+    """
+    Total row count in the requested ``count_mode``
+
+    Args:
+        mode: One of ``COUNT_MODES``
+        cache_key: List name (as used by :func:`invalidate_counts`)
+            followed by the endpoint's filters
+        exact: Runs the exact count
+        estimate: Returns a planner estimate (optional)
+    """
+    if mode == "estimated" and estimate is not None:
+        return estimate()
+    cache_key = (_count_generations[cache_key[0]], *cache_key)
+    if mode in ("cached", "estimated"):
+        return _count_cache.get_or_set(cache_key, exact)
+    count = exact()
+    _count_cache.set(cache_key, count)
+    return count
@@ -0,0 +1,369 @@
+"""
+Request-level query profiling, metrics and slow-query log
+
+Every HTTP request gets a :class:`RequestProfile` (held in a context
+variable, so it follows the request into the threadpool) into which the
+database instrumentation records each statement:
+
+- psycopg2 cursors of pooled connections (``app.core.db_pool``) are
+  wrapped by :func:`profiled_cursor_class`
+- SQLAlchemy engines report through :func:`instrument_engine`
+
+:class:`ProfilingMiddleware` then
+
+- adds a ``Server-Timing`` header (``db``, ``serialize`` and ``app``
+  durations, with the statement and row counts as descriptions),
+- aggregates per-route totals that ``GET /metrics`` exposes in the
+  Prometheus text format.
+
+Statements slower than ``SLOW_QUERY_MS`` are written to a structlog
+logger with a normalized SQL *fingerprint* (literals and parameters
+replaced by ``?``), so repeated slow queries group together.
+:func:`configure_logging` (called at application startup) makes structlog
+emit them as one JSON object per line.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+
+from app.core.config import settings
+
+slow_query_log = structlog.get_logger("app.slow_query")
+
+
+def configure_logging() -> None:
+    """Render structlog events as JSON lines, filtered at ``LOG_LEVEL``"""
+    level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(),
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        logger_factory=structlog.PrintLoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
+
+# Upper bounds (seconds) of the request duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class RequestProfile:
+    """Database and serialization work done for one request"""
+    method: str = ""
+    path: str = ""
+    statements: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    serialize_time: float = 0.0
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+# ---------------------------------------------------------------------------
+# SQL fingerprints
+# ---------------------------------------------------------------------------
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDERS = re.compile(r"%\([^)]+\)s|%s|\$\d+|(?<!:):[A-Za-z_]\w*")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(sql: Any) -> str:
+    """
+    Normalized form of a statement
+
+    Comments are dropped, literals and placeholders become ``?``, lists
+    of them collapse to ``(?+)`` and whitespace is collapsed, so every
+    execution of the same query shares one fingerprint.
+    """
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    sql = _COMMENTS.sub(" ", str(sql))
+    sql = _STRINGS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _LISTS.sub("(?+)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def fingerprint_id(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+# Statements executed outside any request (startup, background tasks)
+_background = {"statements": 0, "db_time": 0.0, "rows": 0}
+# (method, route) -> aggregated totals
+_routes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+
+def record_statement(sql: Any, duration: float, rows: int) -> None:
+    """Account one executed statement to the current request"""
+    rows = max(rows or 0, 0)
+    profile = _current.get()
+    if profile is not None:
+        profile.statements += 1
+        profile.db_time += duration
+        profile.rows += rows
+    else:
+        with _lock:
+            _background["statements"] += 1
+            _background["db_time"] += duration
+            _background["rows"] += rows
+
+    if duration * 1000 >= settings.SLOW_QUERY_MS:
+        normalized = fingerprint(sql)
+        slow_query_log.warning(
+            "slow_query",
+            fingerprint=fingerprint_id(normalized),
+            sql=normalized,
+            duration_ms=round(duration * 1000, 1),
+            rows=rows,
+            method=profile.method if profile else None,
+            path=profile.path if profile else None,
+        )
+
+
+def _record_request(method: str, route: str, status: int, duration: float,
+                    profile: RequestProfile) -> None:
+    with _lock:
+        totals = _routes.get((method, route))
+        if totals is None:
+            totals = _routes[(method, route)] = {
+                "requests": 0, "errors": 0, "duration": 0.0,
+                "buckets": [0] * len(DURATION_BUCKETS),
+                "statements": 0, "db_time": 0.0, "rows": 0, "serialize_time": 0.0,
+            }
+        totals["requests"] += 1
+        totals["errors"] += status >= 500
+        totals["duration"] += duration
+        for position, bound in enumerate(DURATION_BUCKETS):
+            if duration <= bound:
+                totals["buckets"][position] += 1
+        totals["statements"] += profile.statements
+        totals["db_time"] += profile.db_time
+        totals["rows"] += profile.rows
+        totals["serialize_time"] += profile.serialize_time
+
+
+# ---------------------------------------------------------------------------
+# Instrumentation
+# ---------------------------------------------------------------------------
+
+class ProfiledCursorMixin:
+    """Times ``execute``/``executemany`` of a psycopg2 cursor class"""
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            record_statement(query, time.perf_counter() - started, self.rowcount)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            record_statement(query, time.perf_counter() - started, self.rowcount)
+
+
+_cursor_classes: Dict[type, type] = {}
+
+
+def profiled_cursor_class(cursor_class: type) -> type:
+    """Subclass of ``cursor_class`` recording its statements (cached)"""
+    if issubclass(cursor_class, ProfiledCursorMixin):
+        return cursor_class
+    profiled = _cursor_classes.get(cursor_class)
+    if profiled is None:
+        profiled = type(f"Profiled{cursor_class.__name__}",
+                        (ProfiledCursorMixin, cursor_class), {})
+        _cursor_classes[cursor_class] = profiled
+    return profiled
+
+
+def instrument_engine(engine) -> None:
+    """Record the statements of a (sync) SQLAlchemy engine"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["profiling_started"].pop()
+        record_statement(statement, time.perf_counter() - started,
+                         getattr(cursor, "rowcount", 0))
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("profiling_started"):
+            conn.info["profiling_started"].pop()
+
+
+class ProfiledJSONResponse(JSONResponse):
+    """Default response class timing JSON rendering as ``serialize``"""
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            profile = _current.get()
+            if profile is not None:
+                profile.serialize_time += time.perf_counter() - started
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+def server_timing(profile: RequestProfile, elapsed: float) -> str:
+    return (
+        f'db;dur={profile.db_time * 1000:.1f};'
+        f'desc="{profile.statements} queries, {profile.rows} rows", '
+        f'serialize;dur={profile.serialize_time * 1000:.1f}, '
+        f'app;dur={elapsed * 1000:.1f}'
+    )
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling every HTTP request (see module docstring)"""
+
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(method=scope["method"], path=scope["path"])
+        token = _current.set(profile)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    header = server_timing(profile, time.perf_counter() - started)
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", header.encode("latin-1")),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            _record_request(
+                scope["method"], getattr(route, "path", None) or "unmatched",
+                status, time.perf_counter() - started, profile
+            )
+
+
+# ---------------------------------------------------------------------------
+# Prometheus exposition
+# ---------------------------------------------------------------------------
+
+def _label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(
+        f'{name}="{_label_value(value)}"' for name, value in labels.items()
+    ) + "}"
+
+
+def metrics_text(extra_gauges: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """
+    All metrics in the Prometheus text exposition format
+
+    Args:
+        extra_gauges: ``{metric name: {"help": ..., "values": {label: value}}}``
+            appended as gauges labelled ``key`` (e.g. pool statistics)
+    """
+    with _lock:
+        routes = {key: {**totals, "buckets": list(totals["buckets"])}
+                  for key, totals in _routes.items()}
+        background = dict(_background)
+
+    lines: List[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    family("http_request_duration_seconds", "histogram", "Request duration by route")
+    for (method, route), totals in sorted(routes.items()):
+        for bound, count in zip(DURATION_BUCKETS, totals["buckets"]):
+            labels = _labels(method=method, route=route, le=bound)
+            lines.append(f"http_request_duration_seconds_bucket{labels} {count}")
+        labels = _labels(method=method, route=route, le="+Inf")
+        lines.append(f"http_request_duration_seconds_bucket{labels} {totals['requests']}")
+        labels = _labels(method=method, route=route)
+        lines.append(f"http_request_duration_seconds_sum{labels} {totals['duration']:.6f}")
+        lines.append(f"http_request_duration_seconds_count{labels} {totals['requests']}")
+
+    counters = (
+        ("http_request_errors_total", "errors", "Responses with a 5xx status"),
+        ("db_statements_total", "statements", "SQL statements executed"),
+        ("db_time_seconds_total", "db_time", "Time spent executing SQL"),
+        ("db_rows_total", "rows", "Rows returned or affected by SQL"),
+        ("serialize_time_seconds_total", "serialize_time", "Time spent rendering JSON"),
+    )
+    for name, field, help_text in counters:
+        family(name, "counter", help_text)
+        for (method, route), totals in sorted(routes.items()):
+            lines.append(f"{name}{_labels(method=method, route=route)} {totals[field]}")
+        if field in background:
+            lines.append(f"{name}{_labels(method='', route='background')} {background[field]}")
+
+    for name, gauge in (extra_gauges or {}).items():
+        family(name, "gauge", gauge["help"])
+        for key, value in gauge["values"].items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"{name}{_labels(key=key)} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Forget all aggregated metrics (tests)"""
+    with _lock:
+        _routes.clear()
+        _background.update(statements=0, db_time=0.0, rows=0)
@@ -3,10 +3,15 @@ import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 
+from app.core import profiling
 from app.core.config import settings
-from app.core.database import sync_engine
+from app.core.database import sync_engine, async_engine
+from app.core.db_pool import get_pool, close_pool, pool_stats
+from app.auth.password_pool import password_pool
+from app.services import dashboard_stats, reference_data, search, suggest
 from app.api import api_router
 
 
@@ -19,6 +24,21 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     print("Starting Education Management System API...")
     print(f"Environment: {settings.ENVIRONMENT}")
     print(f"Database: {settings.database_url}")
+
+    # Warm up this worker's connection pool (failures are only logged)
+    get_pool().open()
+
+    # pg_trgm probe for search ranking (failures are only logged)
+    search_probe = asyncio.create_task(asyncio.to_thread(search.detect_safely))
+
+    # Type-ahead index: built in the background, then rebuilt periodically
+    suggest_maintainer = asyncio.create_task(suggest.maintain())
+
+    # Reference data change notifications (TTL expiry is the fallback)
+    reference_data_listener = asyncio.create_task(reference_data.maintain())
+
+    # Dashboard summary tables and their reconciliation task
+    stats_refresher = await dashboard_stats.start_refresher()
     
     try:
         yield
@@ -28,6 +48,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     
     # Shutdown
     print("Shutting down Education Management System API...")
+    search_probe.cancel()
+    suggest_maintainer.cancel()
+    reference_data_listener.cancel()
+    if stats_refresher is not None:
+        stats_refresher.cancel()
+    close_pool()
+    password_pool.shutdown()
+    await async_engine.dispose()
     # Note: sync_engine disposal is handled automatically
 
 
@@ -35,6 +63,8 @@ def create_application() -> FastAPI:
     """
     Create and configure FastAPI application
     """
+    profiling.configure_logging()
+
     app = FastAPI(
         title=settings.PROJECT_NAME,
         description="A comprehensive education management system API",
@@ -43,6 +73,7 @@ def create_application() -> FastAPI:
         docs_url=f"{settings.API_PREFIX}/docs",
         redoc_url=f"{settings.API_PREFIX}/redoc",
         lifespan=lifespan,
+        default_response_class=profiling.ProfiledJSONResponse,
     )
 
     # Set all CORS enabled origins
@@ -74,6 +105,13 @@ def create_application() -> FastAPI:
     # Security middleware
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
 
+    # Per-request query profile (outermost, so it times the whole stack)
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(
+            profiling.ProfilingMiddleware,
+            server_timing=settings.PROFILING_SERVER_TIMING
+        )
+
     # Include API router
     app.include_router(api_router, prefix=settings.API_PREFIX)
 
@@ -85,8 +123,27 @@ def create_application() -> FastAPI:
             "service": settings.PROJECT_NAME,
             "version": settings.VERSION,
             "environment": settings.ENVIRONMENT,
+            "database_pool": pool_stats(),
+            "password_hashing": password_pool.stats(),
         }
 
+    # Prometheus scrape endpoint
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(
+            profiling.metrics_text({
+                "db_pool": {
+                    "help": "psycopg2 connection pool statistics",
+                    "values": pool_stats() or {},
+                },
+                "password_hashing_pool": {
+                    "help": "Password hashing worker pool statistics",
+                    "values": password_pool.stats(),
+                },
+            }),
+            media_type="text/plain; version=0.0.4"
+        )
+
     return app
 
 
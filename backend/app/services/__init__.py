@@ -0,0 +1 @@
+"""Shared domain services (precomputed statistics, caches and indexes)"""
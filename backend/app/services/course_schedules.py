@@ -0,0 +1,69 @@
+"""
+Batched weekly schedule lookup for course offerings
+
+Course listings show each offering's weekly slots. Loading them per
+offering inside the listing loop costs one round trip per course; this
+helper fetches the slots of all listed offerings with a single
+``= ANY(%s)`` query and groups them in memory.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List
+
+DAY_NAMES = [
+    "Monday", "Tuesday", "Wednesday",
+    "Thursday", "Friday", "Saturday", "Sunday"
+]
+
+
+def fetch_offering_schedules(cur, offering_ids: Iterable[Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Weekly schedule slots of several course offerings
+
+    Args:
+        cur: psycopg2 cursor returning dictionaries (RealDictCursor)
+        offering_ids: Course offering ids
+
+    Returns:
+        Offering id (as string) -> slots ordered by day and start time.
+        Offerings without slots are absent.
+    """
+    ids = list({str(offering_id) for offering_id in offering_ids})
+    if not ids:
+        return {}
+
+    cur.execute("""
+        SELECT
+            cs.course_offering_id::text as offering_id,
+            cs.day_of_week,
+            cs.start_time,
+            cs.end_time,
+            cs.schedule_type,
+            r.room_number as room,
+            p.first_name as inst_first_name,
+            p.last_name as inst_last_name
+        FROM class_schedules cs
+        LEFT JOIN rooms r ON cs.room_id = r.id
+        LEFT JOIN users u ON cs.instructor_id = u.id
+        LEFT JOIN persons p ON u.id = p.user_id
+        WHERE cs.course_offering_id = ANY(%s::uuid[])
+        ORDER BY cs.course_offering_id, cs.day_of_week, cs.start_time
+    """, [ids])
+
+    schedules = defaultdict(list)
+    for sched in cur.fetchall():
+        instructor_name = None
+        if sched['inst_first_name'] and sched['inst_last_name']:
+            instructor_name = \
+                f"{sched['inst_first_name']} {sched['inst_last_name']}".strip()
+
+        schedules[sched['offering_id']].append({
+            "day_of_week": sched['day_of_week'],
+            "day_name": DAY_NAMES[sched['day_of_week']],
+            "start_time": str(sched['start_time']),
+            "end_time": str(sched['end_time']),
+            "room": sched['room'],
+            "schedule_type": sched['schedule_type'],
+            "instructor_name": instructor_name,
+        })
+    return dict(schedules)
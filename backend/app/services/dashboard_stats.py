@@ -0,0 +1,252 @@
+"""
+Precomputed dashboard statistics
+
+The admin dashboard used to count students, staff, courses, enrollments,
+requests and organization units (and scan 30 days of attendance) on every
+page load. The counters now live in the ``dashboard_counters`` summary
+table, maintained incrementally by statement-level triggers (one update
+per statement, so bulk loads do not serialize on the counter rows) and
+reconciled by a periodic full refresh that also corrects any drift.
+Attendance is aggregated into the ``attendance_daily_counts`` rollup by
+that refresh only, so roll calls never contend on a shared row.
+
+The tables and triggers are created by an Alembic migration
+(``alembic upgrade head``). Reads are served from an in-process TTL
+cache, so a dashboard request costs at most one small indexed read. When
+the summary tables are not installed the values are computed live.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from psycopg2 import errors
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db_pool import db_cursor
+
+logger = logging.getLogger(__name__)
+
+# table -> [(counter name, row predicate)]; the triggers created by the
+# summary tables migration maintain the same counters, keep them in sync
+COUNTERS: Dict[str, List[Tuple[str, str]]] = {
+    "students": [
+        ("students_active", "status = 'active'"),
+    ],
+    "staff_members": [
+        ("staff_active", "is_active = true"),
+    ],
+    "courses": [
+        ("courses_active", "is_active = true"),
+    ],
+    "course_enrollments": [
+        ("enrollments_total", "true"),
+        ("enrollments_active", "enrollment_status = 'active'"),
+        ("enrollments_completed", "enrollment_status = 'completed'"),
+    ],
+    "transcript_requests": [
+        ("transcript_requests_pending", "status = 'pending'"),
+    ],
+    "organization_units": [
+        ("organization_units_active", "is_active = true"),
+        ("faculties_active", "is_active = true AND type = 'faculty'"),
+        ("departments_active", "is_active = true AND type = 'department'"),
+    ],
+}
+
+# Counters that cannot be maintained per statement; refreshed periodically
+PERIODIC_COUNTERS = {
+    "staff_utilized": """
+        SELECT COUNT(DISTINCT sm.id)
+        FROM staff_members sm
+        JOIN course_instructors ci ON ci.instructor_id = sm.user_id
+        WHERE sm.is_active = true
+    """,
+}
+
+ATTENDANCE_WINDOW_DAYS = 30
+
+_LOCK_KEY = 0x64617368  # pg advisory lock serializing refreshes
+
+_cache = TTLCache(max_size=64, ttl=settings.DASHBOARD_STATS_CACHE_TTL)
+
+
+# ---------------------------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------------------------
+
+def _existing_tables(cur, tables) -> List[str]:
+    cur.execute(
+        "SELECT t FROM unnest(%s::text[]) AS t WHERE to_regclass(t) IS NOT NULL",
+        (list(tables),)
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def _live_counters(cur) -> Dict[str, int]:
+    """Compute every counter with one aggregate query per table"""
+    values: Dict[str, int] = {}
+    for table in _existing_tables(cur, COUNTERS):
+        counters = COUNTERS[table]
+        aggregates = ", ".join(
+            f"COUNT(*) FILTER (WHERE {predicate})"
+            for _, predicate in counters
+        )
+        cur.execute(f"SELECT {aggregates} FROM {table}")
+        row = cur.fetchone()
+        for (name, _), value in zip(counters, row):
+            values[name] = value or 0
+    if len(_existing_tables(cur, ["staff_members", "course_instructors"])) == 2:
+        for name, query in PERIODIC_COUNTERS.items():
+            cur.execute(query)
+            values[name] = cur.fetchone()[0] or 0
+    return values
+
+
+def refresh() -> bool:
+    """
+    Recompute all counters and the recent attendance rollup
+
+    Only one worker refreshes at a time; others return False immediately.
+    """
+    with db_cursor(cursor_factory=None) as cur:
+        cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (_LOCK_KEY,))
+        if not cur.fetchone()[0]:
+            return False
+
+        values = _live_counters(cur)
+        cur.execute("""
+            INSERT INTO dashboard_counters (name, value, updated_at)
+            SELECT name, value, now()
+            FROM unnest(%s::text[], %s::bigint[]) AS v(name, value)
+            ON CONFLICT (name) DO UPDATE SET
+                value = EXCLUDED.value,
+                updated_at = EXCLUDED.updated_at
+        """, (list(values), list(values.values())))
+
+        if _existing_tables(cur, ["attendance_records"]):
+            cur.execute("""
+                DELETE FROM attendance_daily_counts
+                WHERE attendance_date >= CURRENT_DATE - %s
+            """, (ATTENDANCE_WINDOW_DAYS + 1,))
+            cur.execute("""
+                INSERT INTO attendance_daily_counts (attendance_date, present, total)
+                SELECT attendance_date,
+                       COUNT(*) FILTER (WHERE status = 'present'),
+                       COUNT(*)
+                FROM attendance_records
+                WHERE attendance_date >= CURRENT_DATE - %s
+                GROUP BY attendance_date
+            """, (ATTENDANCE_WINDOW_DAYS + 1,))
+    invalidate()
+    return True
+
+
+async def refresh_periodically(interval: float) -> None:
+    """Background task reconciling the counters every ``interval`` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(refresh)
+        except Exception as e:
+            logger.warning(f"Dashboard statistics refresh failed: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def invalidate() -> None:
+    """Drop cached statistics (e.g. after bulk imports)"""
+    _cache.clear()
+
+
+def _load_counters() -> Dict[str, int]:
+    with db_cursor(cursor_factory=None) as cur:
+        try:
+            cur.execute("SELECT name, value FROM dashboard_counters")
+            values = {name: value for name, value in cur.fetchall()}
+        except errors.UndefinedTable:
+            values = {}
+        if values:
+            return values
+    # Summary table missing or empty: compute live
+    with db_cursor(cursor_factory=None) as cur:
+        return _live_counters(cur)
+
+
+def get_counters() -> Dict[str, int]:
+    """All dashboard counters (cached)"""
+    return _cache.get_or_set("counters", _load_counters)
+
+
+def _load_attendance_rate() -> float:
+    with db_cursor(cursor_factory=None) as cur:
+        try:
+            cur.execute("""
+                SELECT SUM(present), SUM(total)
+                FROM attendance_daily_counts
+                WHERE attendance_date >= CURRENT_DATE - %s
+            """, (ATTENDANCE_WINDOW_DAYS,))
+            present, total = cur.fetchone()
+        except errors.UndefinedTable:
+            present = total = None
+    if present is None:
+        with db_cursor(cursor_factory=None) as cur:
+            cur.execute("""
+                SELECT COUNT(*) FILTER (WHERE status = 'present'), COUNT(*)
+                FROM attendance_records
+                WHERE attendance_date >= CURRENT_DATE - %s
+            """, (ATTENDANCE_WINDOW_DAYS,))
+            present, total = cur.fetchone()
+    return _percentage(present, total)
+
+
+def get_attendance_rate() -> float:
+    """Attendance rate over the last 30 days (cached)"""
+    return _cache.get_or_set("attendance_rate", _load_attendance_rate)
+
+
+def _percentage(part: Optional[int], whole: Optional[int]) -> float:
+    if not part or not whole:
+        return 0
+    return round(float(part) / float(whole) * 100, 1)
+
+
+def get_quick_stats() -> Dict[str, Any]:
+    """Percentages shown in the dashboard progress bars"""
+    counters = get_counters()
+    return {
+        "attendance_rate": get_attendance_rate(),
+        "completion_rate": _percentage(
+            counters.get("enrollments_completed"),
+            counters.get("enrollments_total")
+        ),
+        "utilization_rate": _percentage(
+            counters.get("staff_utilized"),
+            counters.get("staff_active")
+        ),
+    }
+
+
+def get_cached(key: Any, loader) -> Any:
+    """Cache any other dashboard fragment for the statistics TTL"""
+    return _cache.get_or_set(key, loader)
+
+
+async def start_refresher() -> Optional[asyncio.Task]:
+    """Fill the summary tables and start the periodic refresh task"""
+    try:
+        await asyncio.to_thread(refresh)
+    except errors.UndefinedTable:
+        logger.warning("Dashboard summary tables missing (run alembic upgrade head), "
+                       "using live counts")
+        return None
+    except Exception as e:
+        logger.warning(f"Dashboard statistics refresh failed, using live counts: {e}")
+        return None
+    interval = settings.DASHBOARD_STATS_REFRESH_INTERVAL
+    if interval <= 0:
+        return None
+    return asyncio.create_task(refresh_periodically(interval))
@@ -0,0 +1,143 @@
+"""
+Cached list totals and filter facets
+
+List screens ask for the same totals (``COUNT(DISTINCT s.id)`` over the
+students / persons join) and the same filter option lists on every page
+and every visit. They are cached here per *scope* and normalized filter
+set for ``FACET_CACHE_TTL`` seconds:
+
+- ``students``: anything computed from students and their persons
+- ``staff``: anything computed from staff members / teachers
+
+Writes to a scope drop all of its entries: ORM writes through the
+listeners below once their transaction commits, raw SQL writes by
+calling :func:`invalidate` after their commit. Entries
+are never deleted one by one - invalidating bumps the scope's generation,
+which is part of every key, and stale entries age out of the LRU.
+"""
+
+import logging
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core import pagination
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.person import Person
+from app.models.staff_member import StaffMember
+from app.models.student import Student
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ("students", "staff")
+
+# List count keys of app.core.pagination dropped along with each scope
+_COUNT_SCOPES = {
+    "students": ("students",),
+    "staff": ("teachers",),
+}
+
+_cache = TTLCache(max_size=settings.FACET_CACHE_MAX_SIZE, ttl=settings.FACET_CACHE_TTL)
+_generations: Dict[str, int] = {scope: 0 for scope in SCOPES}
+_lock = Lock()
+_MISSING = object()
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(_normalize(item) for item in value))
+    return value
+
+
+def cache_key(scope: str, name: str, filters: Dict[str, Any]) -> Tuple[Hashable, ...]:
+    """
+    Key of one cached value
+
+    Filters are normalized (case, whitespace, order) and unset ones
+    (None or empty) are dropped, so equivalent requests share an entry.
+    """
+    normalized = tuple(sorted(
+        (field, _normalize(value)) for field, value in filters.items()
+        if value is not None and value != ""
+    ))
+    return (scope, _generations[scope], name, normalized)
+
+
+def get(scope: str, name: str, filters: Dict[str, Any], loader: Callable[[], Any]) -> Any:
+    """Cached value, computed by ``loader`` on a miss"""
+    return _cache.get_or_set(cache_key(scope, name, filters), loader)
+
+
+async def get_async(scope: str, name: str, filters: Dict[str, Any],
+                    loader: Callable[[], Awaitable[Any]]) -> Any:
+    """:func:`get` for async loaders"""
+    key = cache_key(scope, name, filters)
+    value = _cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = await loader()
+        _cache.set(key, value)
+    return value
+
+
+def invalidate(*scopes: str) -> None:
+    """Drop every cached total and facet of the given scopes"""
+    with _lock:
+        for scope in scopes:
+            _generations[scope] += 1
+    pagination.invalidate_counts(
+        *[name for scope in scopes for name in _COUNT_SCOPES[scope]]
+    )
+
+
+def stats() -> Dict[str, Any]:
+    return {**_cache.stats(), "generations": dict(_generations)}
+
+
+# ORM writes mark their scopes at flush and invalidate once the transaction
+# commits, so a concurrent request cannot cache pre-commit data under the
+# new generation; raw SQL writers call invalidate() after their commit
+_PENDING = "facet_scopes"
+
+
+def _mark(target, *scopes: str) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING, set()).update(scopes)
+
+
+def _mark_students(mapper, connection, target):
+    _mark(target, "students")
+
+
+def _mark_staff(mapper, connection, target):
+    _mark(target, "staff")
+
+
+def _mark_people(mapper, connection, target):
+    _mark(target, *SCOPES)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Student, _event, _mark_students)
+    event.listen(StaffMember, _event, _mark_staff)
+    event.listen(Person, _event, _mark_people)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    scopes = session.info.pop(_PENDING, None)
+    if scopes:
+        invalidate(*sorted(scopes))
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_rolled_back(session, transaction):
+    # Runs after after_commit; only a rolled back outermost transaction
+    # still has pending scopes
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
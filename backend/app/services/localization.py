@@ -0,0 +1,93 @@
+"""
+Localized names
+
+Names of courses, programs and organization units are stored as
+multilingual JSONB (``{"az": ..., "en": ..., "ru": ...}``). Resolving
+them per row - ``COALESCE(c.name->>%s, c.name->>'en', ...)`` in SQL or
+a dictionary lookup per object in Python - decodes the same JSON on
+every row of every request.
+
+Instead, each table's names are kept as a *catalog*: the raw ``id, name``
+rows are a reference set (see :mod:`app.services.reference_data`, which
+reloads them when the table changes), and for every language they are
+projected once into a plain ``id -> name`` dictionary. Queries then
+select only the id and look the name up here.
+
+:func:`localize` is the one fallback rule used everywhere: the requested
+language, then English, then Azerbaijani, then any translation.
+"""
+
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from app.services import reference_data
+
+LANGUAGES = ("az", "en", "ru")
+LANGUAGE_PATTERN = "^(en|ru|az)$"
+
+FALLBACK_LANGUAGES = ("en", "az")
+
+# Catalog name -> table with ``id`` and JSONB ``name`` columns
+CATALOGS = {
+    "courses": "courses",
+    "programs": "academic_programs",
+    "organizations": "organization_units",
+}
+
+_projections: Dict[Tuple[str, str], Tuple[str, Dict[str, str]]] = {}
+_lock = Lock()
+
+
+def localize(value: Optional[dict], lang: str = "en") -> Optional[str]:
+    """Name in ``lang`` from a multilingual value, with fallback"""
+    if not value:
+        return None
+    for code in (lang, *FALLBACK_LANGUAGES):
+        if value.get(code):
+            return value[code]
+    return next((name for name in value.values() if name), None)
+
+
+def _set_name(catalog: str) -> str:
+    return f"names.{catalog}"
+
+
+def _register(catalog: str, table: str) -> None:
+    @reference_data.register(_set_name(catalog), tables=(table,), listed=False)
+    def load(cur):
+        cur.execute(f"SELECT id::text AS id, name FROM {table}")
+        return cur.fetchall()
+
+
+for _catalog, _table in CATALOGS.items():
+    _register(_catalog, _table)
+
+
+def names(catalog: str, lang: str = "en") -> Dict[str, str]:
+    """
+    ``id -> name`` in ``lang`` for every row of a catalog
+
+    The projection is rebuilt only when the version of the underlying
+    reference set changes. It is shared between callers: do not modify it.
+    """
+    set_name = _set_name(catalog)
+    cached = _projections.get((catalog, lang))
+    if cached is not None and cached[0] == reference_data.version(set_name):
+        return cached[1]
+    with _lock:
+        version, rows = reference_data.get_versioned(set_name)
+        projection = {}
+        for row in rows:
+            name = localize(row["name"], lang)
+            if name:
+                projection[row["id"]] = name
+        _projections[(catalog, lang)] = (version, projection)
+        return projection
+
+
+def name_of(catalog: str, row_id: Any, lang: str = "en",
+            default: Optional[str] = None) -> Optional[str]:
+    """Localized name of one row, ``default`` if unknown or unnamed"""
+    if row_id is None:
+        return default
+    return names(catalog, lang).get(str(row_id), default)
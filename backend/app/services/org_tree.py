@@ -0,0 +1,188 @@
+"""
+Cached organization tree
+
+The organization hierarchy changes a few times a year but is read on
+every organization screen and by filters such as "teachers of this
+faculty". Instead of loading every ``organization_units`` row and
+rebuilding the parent/child mapping per request (or walking it with
+recursive SQL), the tree is built once into:
+
+- ``children``: adjacency lists, ordered by code
+- ``order`` / ``enter`` / ``leave``: a depth-first (Euler tour) numbering;
+  the subtree of a unit is the slice ``order[enter:leave]`` and
+  "is X inside Y" is two integer comparisons
+- ``paths``: the root-to-unit path of every unit
+
+Every build gets a new ``version``. ORM writes to ``OrganizationUnit``
+drop the tree; it is also rebuilt after ``ORG_TREE_TTL`` seconds so that
+changes made by other processes show up.
+"""
+
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.organization_unit import OrganizationUnit
+
+
+@dataclass(frozen=True)
+class OrgNode:
+    """The fields of an organization unit the tree serves"""
+    id: str
+    parent_id: Optional[str]
+    code: str
+    name: Dict[str, Any]
+    type: str
+    is_active: bool
+
+
+class OrgTree:
+    """Immutable organization tree; see the module docstring"""
+
+    def __init__(self, nodes: Iterable[OrgNode], version: int = 0):
+        self.version = version
+        self.nodes: Dict[str, OrgNode] = {node.id: node for node in nodes}
+        self.children: Dict[str, List[str]] = {node_id: [] for node_id in self.nodes}
+        self.roots: List[str] = []
+
+        by_code = sorted(self.nodes.values(), key=lambda node: (node.code or "", node.id))
+        for node in by_code:
+            if node.parent_id in self.nodes and node.parent_id != node.id:
+                self.children[node.parent_id].append(node.id)
+            else:
+                self.roots.append(node.id)
+
+        self.order: List[str] = []
+        self.enter: Dict[str, int] = {}
+        self.leave: Dict[str, int] = {}
+        self.paths: Dict[str, Tuple[str, ...]] = {}
+        for root in self.roots:
+            self._number(root)
+        # Units on a parent cycle are unreachable from any root; each
+        # cycle is cut at its lowest code
+        for node in by_code:
+            if node.id not in self.enter:
+                self.roots.append(node.id)
+                self._number(node.id)
+
+    def _number(self, root: str) -> None:
+        """Iterative depth-first numbering of one root's subtree"""
+        self.paths[root] = (root,)
+        stack = [(root, iter(self.children[root]))]
+        self.enter[root] = len(self.order)
+        self.order.append(root)
+        while stack:
+            node_id, pending = stack[-1]
+            child = next(pending, None)
+            if child is None:
+                stack.pop()
+                self.leave[node_id] = len(self.order)
+            elif child not in self.enter:
+                self.paths[child] = self.paths[node_id] + (child,)
+                self.enter[child] = len(self.order)
+                self.order.append(child)
+                stack.append((child, iter(self.children[child])))
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get(self, node_id: str) -> Optional[OrgNode]:
+        return self.nodes.get(node_id)
+
+    def children_of(self, node_id: str, active_only: bool = False) -> List[OrgNode]:
+        """Direct children, ordered by code"""
+        children = [self.nodes[child] for child in self.children.get(node_id, ())]
+        if active_only:
+            children = [child for child in children if child.is_active]
+        return children
+
+    def subtree_ids(self, node_id: str, include_self: bool = True,
+                    active_only: bool = False) -> List[str]:
+        """Ids of a unit and everything below it, in depth-first order"""
+        if node_id not in self.enter:
+            return []
+        start = self.enter[node_id] + (0 if include_self else 1)
+        ids = self.order[start:self.leave[node_id]]
+        if active_only:
+            ids = [unit_id for unit_id in ids if self.nodes[unit_id].is_active]
+        return ids
+
+    def is_within(self, node_id: str, ancestor_id: str) -> bool:
+        """Whether ``node_id`` is ``ancestor_id`` or below it"""
+        if node_id not in self.enter or ancestor_id not in self.enter:
+            return False
+        return self.enter[ancestor_id] <= self.enter[node_id] < self.leave[ancestor_id]
+
+    def path(self, node_id: str) -> List[OrgNode]:
+        """Units from the root down to ``node_id`` (empty if unknown)"""
+        return [self.nodes[unit_id] for unit_id in self.paths.get(node_id, ())]
+
+
+def node_from_unit(unit: OrganizationUnit) -> OrgNode:
+    return OrgNode(
+        id=str(unit.id),
+        parent_id=str(unit.parent_id) if unit.parent_id else None,
+        code=unit.code,
+        name=unit.name or {"en": f"Organization {unit.code}"},
+        type=unit.type,
+        is_active=unit.is_active if unit.is_active is not None else True,
+    )
+
+
+_tree: Optional[OrgTree] = None
+_loaded_at = 0.0
+_version = 0
+_lock = Lock()
+
+
+def _load(db: Session) -> OrgTree:
+    global _version
+    _version += 1
+    return OrgTree((node_from_unit(unit) for unit in db.query(OrganizationUnit).all()),
+                   version=_version)
+
+
+def get_tree(db: Optional[Session] = None) -> OrgTree:
+    """
+    The current tree, (re)built when dropped or older than ``ORG_TREE_TTL``
+
+    Args:
+        db: Session to load with; a short-lived one is opened if omitted
+    """
+    global _tree, _loaded_at
+    tree = _tree
+    if tree is not None and time.monotonic() - _loaded_at < settings.ORG_TREE_TTL:
+        return tree
+    with _lock:
+        if _tree is not None and time.monotonic() - _loaded_at < settings.ORG_TREE_TTL:
+            return _tree
+        if db is not None:
+            tree = _load(db)
+        else:
+            with SessionLocal() as session:
+                tree = _load(session)
+        _tree, _loaded_at = tree, time.monotonic()
+        return tree
+
+
+def invalidate() -> None:
+    """Drop the tree (call after raw-SQL writes to organization_units)"""
+    global _tree
+    _tree = None
+
+
+def _invalidate_on_write(mapper, connection, target):
+    invalidate()
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(OrganizationUnit, _event, _invalidate_on_write)
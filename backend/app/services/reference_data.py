@@ -0,0 +1,233 @@
+"""
+Process-wide reference data
+
+Dropdown data - organizations, languages, semesters, grade scales, event
+types - changes a few times a year but used to be queried on every form
+render. Each such list is registered here as a *reference set*: a loader
+plus the tables it reads. Sets are loaded on first use and then served
+from memory.
+
+Every loaded set carries a version (a hash of its content, so all
+workers agree on it), and :func:`bundle` combines several sets into one
+response for the frontends to fetch at startup. Callers receive copies
+of the cached rows, so modifying a result never changes the cache.
+
+Freshness:
+
+- Statement-level triggers on the source tables (created by an Alembic
+  migration) ``pg_notify('reference_data', <table>)``; :func:`listen`
+  receives those notifications on a dedicated connection and drops the
+  affected sets in every worker.
+- Independently, sets are reloaded after ``REFERENCE_DATA_TTL`` seconds,
+  which covers writes made while no listener was running.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import select
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import psycopg2
+
+from app.core.config import settings
+from app.core.db_pool import db_cursor
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "reference_data"
+
+@dataclass(frozen=True)
+class ReferenceSet:
+    """A registered list: its loader and the tables it is built from"""
+    name: str
+    tables: Tuple[str, ...]
+    load: Callable[[Any], List[Dict[str, Any]]]
+    listed: bool = True
+
+
+@dataclass(frozen=True)
+class _Loaded:
+    value: List[Dict[str, Any]]
+    version: str
+    loaded_at: float
+
+
+_sets: Dict[str, ReferenceSet] = {}
+_loaded: Dict[str, _Loaded] = {}
+_lock = threading.Lock()
+
+
+def register(name: str, tables: Iterable[str] = (), listed: bool = True) -> Callable:
+    """
+    Decorator registering ``loader(cursor) -> rows`` as a reference set
+
+    Args:
+        name: Set name, also its key in :func:`bundle`
+        tables: Tables the loader reads; writes to them reload the set
+        listed: Whether the set is served by :func:`bundle` / ``/lookups``
+            (internal sets such as name catalogs are not)
+    """
+    def decorator(loader: Callable[[Any], List[Dict[str, Any]]]):
+        _sets[name] = ReferenceSet(name, tuple(tables), loader, listed)
+        return loader
+    return decorator
+
+
+def names() -> List[str]:
+    """Names of the listed sets"""
+    return sorted(name for name, reference_set in _sets.items() if reference_set.listed)
+
+
+def _version(value: Any) -> str:
+    raw = json.dumps(value, default=str, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def _fresh(name: str) -> Optional[_Loaded]:
+    loaded = _loaded.get(name)
+    if loaded and time.monotonic() - loaded.loaded_at < settings.REFERENCE_DATA_TTL:
+        return loaded
+    return None
+
+
+def _get_loaded(name: str) -> _Loaded:
+    if name not in _sets:
+        raise KeyError(f"Unknown reference set: {name}")
+    loaded = _fresh(name)
+    if loaded:
+        return loaded
+    with _lock:
+        loaded = _fresh(name)
+        if loaded:
+            return loaded
+        with db_cursor() as cur:
+            value = [dict(row) for row in _sets[name].load(cur)]
+        loaded = _Loaded(value, _version(value), time.monotonic())
+        _loaded[name] = loaded
+        return loaded
+
+
+def get(name: str) -> List[Dict[str, Any]]:
+    """Rows of a reference set (a copy), loaded on first use"""
+    return copy.deepcopy(_get_loaded(name).value)
+
+
+def get_versioned(name: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """Version and rows (a copy) of a reference set, from the same load"""
+    loaded = _get_loaded(name)
+    return loaded.version, copy.deepcopy(loaded.value)
+
+
+async def get_async(name: str) -> List[Dict[str, Any]]:
+    """:func:`get` for async endpoints (loads off the event loop)"""
+    loaded = _fresh(name)
+    if loaded:
+        return copy.deepcopy(loaded.value)
+    return await asyncio.to_thread(get, name)
+
+
+def version(name: str) -> str:
+    return _get_loaded(name).version
+
+
+def bundle(requested: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Several sets in one response
+
+    Returns:
+        ``{"version": ..., "versions": {set: version}, "lookups": {set: rows}}``;
+        ``version`` changes whenever any included set changes
+    """
+    selected = sorted(set(requested)) if requested else names()
+    loaded = {name: _get_loaded(name) for name in selected}
+    versions = {name: item.version for name, item in loaded.items()}
+    return {
+        "version": _version(versions),
+        "versions": versions,
+        "lookups": {name: copy.deepcopy(item.value) for name, item in loaded.items()},
+    }
+
+
+def invalidate(*set_names: str) -> None:
+    """Reload the given sets (all when none are given) on next use"""
+    for name in set_names or list(_loaded):
+        _loaded.pop(name, None)
+
+
+def invalidate_tables(*tables: str) -> None:
+    """Reload every set built from any of ``tables``"""
+    changed = set(tables)
+    invalidate(*[
+        reference_set.name for reference_set in _sets.values()
+        if changed.intersection(reference_set.tables)
+    ])
+
+
+# ---------------------------------------------------------------------------
+# Change notifications
+# ---------------------------------------------------------------------------
+
+def _source_tables() -> List[str]:
+    """Tables that need the notify trigger (see the Alembic migrations)"""
+    return sorted({table for reference_set in _sets.values() for table in reference_set.tables})
+
+
+def _listen_connection():
+    """Dedicated (unpooled) connection in autocommit, listening on CHANNEL"""
+    conn = psycopg2.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        dbname=settings.DB_NAME,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        connect_timeout=settings.DB_CONNECT_TIMEOUT,
+        application_name=f"{settings.PROJECT_NAME[:50]} listener",
+    )
+    conn.autocommit = True
+    conn.cursor().execute(f"LISTEN {CHANNEL}")
+    return conn
+
+
+def listen(stop: threading.Event, poll_interval: float = 5.0) -> None:
+    """
+    Blocking loop applying change notifications until ``stop`` is set
+
+    The connection is re-established after errors; since notifications
+    sent while disconnected are lost, all sets are dropped on reconnect.
+    """
+    while not stop.is_set():
+        conn = None
+        try:
+            conn = _listen_connection()
+            invalidate()
+            while not stop.is_set():
+                if select.select([conn], [], [], poll_interval) == ([], [], []):
+                    continue
+                conn.poll()
+                tables = {notify.payload for notify in conn.notifies}
+                conn.notifies.clear()
+                if tables:
+                    invalidate_tables(*tables)
+        except Exception as e:
+            logger.warning(f"Reference data listener interrupted: {e}")
+            stop.wait(poll_interval)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+async def maintain() -> None:
+    """Background task: listen for changes (the triggers come from a migration)"""
+    if not settings.REFERENCE_DATA_LISTEN:
+        return
+    stop = threading.Event()
+    try:
+        await asyncio.to_thread(listen, stop)
+    finally:
+        stop.set()
@@ -0,0 +1,194 @@
+"""
+Schedule occurrence index
+
+Calendar views used to load every schedule template of a student or
+teacher and expand the weekly recurrences in a loop on each request. The
+index keeps, per (student|teacher, owner id), the owner's templates with
+their static event fields prepared once, and materializes occurrences per
+ISO week on first use. A calendar request becomes a lookup of the weeks
+covering the requested range.
+
+Occurrences respect each template's ``effective_from``/``effective_until``
+and skip holidays taken from ``calendar_events``. Entries expire after
+``SCHEDULE_CACHE_TTL`` seconds; writes to schedules or calendar events
+should call :func:`invalidate`. Callers that compute a version of the
+owner's rows (the ETag version) store it with the entry, and a lookup
+with a different version misses, so a cached body never outlives the
+version it is served under.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Holidays (inclusive date ranges) from the academic calendar
+HOLIDAYS_SQL = """
+    SELECT start_datetime, end_datetime
+    FROM calendar_events
+    WHERE event_type = 'holiday'
+"""
+
+# Weeks memoized per owner; wider ranges are expanded without storing
+MAX_WEEKS_PER_OWNER = 104
+
+_HOLIDAYS_KEY = ("holidays",)
+
+
+@dataclass(frozen=True)
+class ScheduleTemplate:
+    """One weekly recurring class slot with its prepared event fields"""
+    schedule_id: str
+    day_of_week: int
+    start_time: str
+    end_time: str
+    effective_from: Optional[date] = None
+    effective_until: Optional[date] = None
+    event: Dict[str, Any] = field(default_factory=dict, compare=False)
+
+    def occurs_on(self, day: date) -> bool:
+        if self.effective_from and day < self.effective_from:
+            return False
+        if self.effective_until and day > self.effective_until:
+            return False
+        return True
+
+
+def week_start(day: date) -> date:
+    """Monday of the week containing ``day``"""
+    return day - timedelta(days=day.weekday())
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def holidays_from_rows(rows: Iterable[Any]) -> FrozenSet[date]:
+    """Expand (start, end) holiday rows into the set of covered dates"""
+    days = set()
+    for row in rows:
+        start, end = (row['start_datetime'], row['end_datetime']) \
+            if isinstance(row, dict) else row
+        start = _as_date(start)
+        end = _as_date(end) or start
+        if start is None:
+            continue
+        day = start
+        while day <= end:
+            days.add(day)
+            day += timedelta(days=1)
+    return frozenset(days)
+
+
+class OwnerSchedule:
+    """Templates of one student or teacher plus their materialized weeks"""
+
+    def __init__(self, templates: List[ScheduleTemplate],
+                 holidays: FrozenSet[date], version: Optional[str] = None):
+        self.version = version
+        self.templates = sorted(
+            templates, key=lambda t: (t.day_of_week, t.start_time)
+        )
+        self.holidays = holidays
+        self._weeks: Dict[date, List[Dict[str, Any]]] = {}
+        self._lock = Lock()
+
+    def _expand_week(self, monday: date) -> List[Dict[str, Any]]:
+        events = []
+        for template in self.templates:
+            day = monday + timedelta(days=template.day_of_week)
+            if day in self.holidays or not template.occurs_on(day):
+                continue
+            iso_day = day.isoformat()
+            events.append({
+                **template.event,
+                "id": f"{template.schedule_id}_{iso_day}",
+                "start": f"{iso_day}T{template.start_time}",
+                "end": f"{iso_day}T{template.end_time}",
+            })
+        return events
+
+    def week(self, monday: date) -> List[Dict[str, Any]]:
+        """Occurrences of the week starting on ``monday``"""
+        events = self._weeks.get(monday)
+        if events is None:
+            events = self._expand_week(monday)
+            with self._lock:
+                if len(self._weeks) < MAX_WEEKS_PER_OWNER:
+                    self._weeks[monday] = events
+        return events
+
+    def between(self, range_start: date, range_end: date) -> List[Dict[str, Any]]:
+        """Occurrences from ``range_start`` to ``range_end`` inclusive"""
+        start_iso = range_start.isoformat()
+        end_iso = range_end.isoformat()
+        events = []
+        monday = week_start(range_start)
+        while monday <= range_end:
+            week_events = self.week(monday)
+            if monday < range_start or monday + timedelta(days=6) > range_end:
+                # Partial week: keep occurrences inside the range only
+                week_events = [
+                    e for e in week_events
+                    if start_iso <= e["start"][:10] <= end_iso
+                ]
+            events.extend(week_events)
+            monday += timedelta(weeks=1)
+        return events
+
+
+_cache = TTLCache(
+    max_size=settings.SCHEDULE_CACHE_MAX_SIZE,
+    ttl=settings.SCHEDULE_CACHE_TTL
+)
+
+
+def get_schedule(kind: str, owner_id: str,
+                 version: Optional[str] = None) -> Optional[OwnerSchedule]:
+    """
+    Cached schedule of a ``"student"`` or ``"teacher"``, if present
+
+    With ``version``, an entry stored under another version is dropped
+    together with the shared holidays (the version covers both), so the
+    caller reloads them.
+    """
+    key = (kind, str(owner_id))
+    schedule = _cache.get(key)
+    if schedule is not None and version is not None and schedule.version != version:
+        _cache.delete(key)
+        _cache.delete(_HOLIDAYS_KEY)
+        return None
+    return schedule
+
+
+def store_schedule(kind: str, owner_id: str,
+                   templates: List[ScheduleTemplate],
+                   holidays: FrozenSet[date],
+                   version: Optional[str] = None) -> OwnerSchedule:
+    """Index freshly loaded templates, built from rows at ``version``"""
+    schedule = OwnerSchedule(templates, holidays, version)
+    _cache.set((kind, str(owner_id)), schedule)
+    return schedule
+
+
+def get_holidays() -> Optional[FrozenSet[date]]:
+    return _cache.get(_HOLIDAYS_KEY)
+
+
+def store_holidays(rows: Iterable[Any]) -> FrozenSet[date]:
+    holidays = holidays_from_rows(rows)
+    _cache.set(_HOLIDAYS_KEY, holidays)
+    return holidays
+
+
+def invalidate(kind: Optional[str] = None, owner_id: Optional[str] = None) -> None:
+    """Drop one owner's schedule, or everything when called without arguments"""
+    if kind is not None and owner_id is not None:
+        _cache.delete((kind, str(owner_id)))
+    else:
+        _cache.clear()
@@ -0,0 +1,148 @@
+"""
+Shared name / number search
+
+Student and teacher lookups used to OR together ``ILIKE '%term%'`` over
+several columns, which always scans the persons/students join. All of
+them now build their filter here:
+
+- The term is split into words; every word has to match one of the
+  searched columns (so "ali mammad" finds first name + last name).
+- Columns are compared as ``lower(col) LIKE '%word%'``, which the
+  ``pg_trgm`` GIN indexes answer directly. The extension and indexes are
+  created by an Alembic migration; the app only checks at startup
+  (:func:`detect`) whether the extension is there.
+- With the extension available, results can be ordered by relevance:
+  exact and prefix matches first, then trigram similarity.
+
+Both raw SQL (``%s`` placeholders) and SQLAlchemy ORM queries are
+supported; without ``pg_trgm`` (e.g. SQLite in tests) the same filters
+still work, just without an index.
+"""
+
+import logging
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_
+
+from app.core.db_pool import db_cursor
+
+logger = logging.getLogger(__name__)
+
+MAX_WORDS = 5
+
+_trigram_available = False
+
+
+def trigram_available() -> bool:
+    """Whether pg_trgm was found at startup (enables relevance ranking)"""
+    return _trigram_available
+
+
+def detect() -> bool:
+    """Check whether pg_trgm is installed (no DDL; see the migrations)"""
+    global _trigram_available
+    with db_cursor(cursor_factory=None) as cur:
+        cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        _trigram_available = cur.fetchone() is not None
+    if not _trigram_available:
+        logger.warning("pg_trgm not installed (run alembic upgrade head), "
+                       "searching without relevance ranking")
+    return _trigram_available
+
+
+def detect_safely() -> None:
+    """Startup hook: probe pg_trgm, logging instead of failing"""
+    try:
+        detect()
+    except Exception as e:
+        logger.warning(f"Could not check for pg_trgm, searching without ranking: {e}")
+
+
+def split_words(term: Optional[str]) -> List[str]:
+    """Lower-cased search words (at most ``MAX_WORDS``)"""
+    if not term:
+        return []
+    return term.lower().split()[:MAX_WORDS]
+
+
+def _like_pattern(word: str) -> str:
+    escaped = re.sub(r"([\\%_])", r"\\\1", word)
+    return f"%{escaped}%"
+
+
+def search_condition(term: Optional[str], columns: Sequence[str],
+                     id_column: Optional[str] = None) -> Tuple[str, List[Any]]:
+    """
+    SQL condition matching ``term`` against ``columns``
+
+    Args:
+        term: User input; empty input matches everything
+        columns: Column expressions, e.g. ``["p.first_name", "s.student_number"]``
+        id_column: Integer key also matched exactly when a word is numeric
+
+    Returns:
+        (condition, params) for psycopg2 ``%s`` placeholders; the
+        condition is ``"TRUE"`` when there is nothing to search
+    """
+    words = split_words(term)
+    if not words:
+        return "TRUE", []
+
+    conditions = []
+    params: List[Any] = []
+    for word in words:
+        alternatives = [f"lower({column}) LIKE %s" for column in columns]
+        params.extend([_like_pattern(word)] * len(columns))
+        if id_column and word.isdigit():
+            alternatives.append(f"{id_column} = %s")
+            params.append(int(word))
+        conditions.append("(" + " OR ".join(alternatives) + ")")
+    return "(" + " AND ".join(conditions) + ")", params
+
+
+def search_rank(term: Optional[str], columns: Sequence[str]) -> Tuple[str, List[Any]]:
+    """
+    SQL relevance expression for ``ORDER BY ... DESC``
+
+    Exact matches rank above prefix matches, which rank above the best
+    trigram similarity. Returns ``("0", [])`` when ranking is unavailable.
+    """
+    phrase = " ".join(split_words(term))
+    if not phrase or not _trigram_available:
+        return "0", []
+
+    parts = []
+    params: List[Any] = []
+    for column in columns:
+        parts.append(
+            f"(CASE WHEN lower({column}) = %s THEN 2 "
+            f"WHEN lower({column}) LIKE %s THEN 1 ELSE 0 END "
+            f"+ similarity(lower({column}), %s))"
+        )
+        params.extend([phrase, _like_pattern(phrase)[1:], phrase])
+    return "GREATEST(" + ", ".join(parts) + ")", params
+
+
+def orm_search_filter(term: Optional[str], columns: Sequence[Any]):
+    """SQLAlchemy equivalent of :func:`search_condition` (None if no term)"""
+    words = split_words(term)
+    if not words:
+        return None
+    return and_(*[
+        or_(*[
+            func.lower(column).like(_like_pattern(word), escape="\\")
+            for column in columns
+        ])
+        for word in words
+    ])
+
+
+def orm_search_rank(term: Optional[str], columns: Sequence[Any]):
+    """SQLAlchemy relevance expression, or None when ranking is unavailable"""
+    phrase = " ".join(split_words(term))
+    if not phrase or not _trigram_available:
+        return None
+    return func.greatest(*[
+        func.similarity(func.lower(column), phrase) for column in columns
+    ])
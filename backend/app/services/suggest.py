@@ -0,0 +1,284 @@
+"""
+In-memory prefix index for type-ahead suggestions
+
+Pickers for students and teachers used to query the database on every
+keystroke. The index keeps every active student and teacher in memory as
+a sorted array of normalized name / number tokens, so a suggestion is a
+binary search plus a short scan.
+
+Tokens are folded so that Azerbaijani, Russian and plain Latin spellings
+meet: "Çingiz", "Cingiz", "Chingiz" and "Чингиз" all reach the same entry.
+
+The index is built at startup, rebuilt every ``SUGGEST_REFRESH_INTERVAL``
+seconds and updated per entry by :func:`refresh` after edits.
+"""
+
+import asyncio
+import logging
+import unicodedata
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from psycopg2 import errors
+
+from app.core.config import settings
+from app.core.db_pool import db_cursor
+
+logger = logging.getLogger(__name__)
+
+# Folding shared by indexed text and queries
+_SIMPLE_FOLD = str.maketrans({
+    "ə": "e", "ı": "i", "ö": "o", "ü": "u", "ş": "s", "ç": "c", "ğ": "g",
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "j", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "x", "ц": "ts", "ч": "c", "ш": "s", "щ": "s", "ъ": "",
+    "ы": "i", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+})
+
+# Extra spellings indexed next to the folded one (romanized digraphs)
+_DIGRAPH_FOLD = str.maketrans({
+    "ş": "sh", "ç": "ch", "ə": "a", "x": "kh", "ж": "zh", "ч": "ch",
+    "ш": "sh", "щ": "shch", "х": "kh", "ğ": "gh",
+})
+
+# Keys scanned per lookup before ranking (bounds the cost of 1-letter queries)
+MAX_CANDIDATES = 2000
+
+KINDS = ("student", "teacher")
+
+# (query, id column) per kind: the current schema first, then the legacy
+# one. {ids} becomes an optional id filter.
+_SOURCES: Dict[str, List[Tuple[str, str]]] = {
+    "student": [
+        ("""
+        SELECT s.id::text, concat_ws(' ', p.first_name, p.last_name), s.student_number
+        FROM students s
+        JOIN persons p ON p.user_id = s.user_id
+        WHERE s.status = 'active' {ids}
+        """, "s.id"),
+        ("""
+        SELECT s.id::text, concat_ws(' ', p.firstname, p.lastname), s.card_number
+        FROM students s
+        JOIN persons p ON s.person_id = p.id
+        WHERE s.active = 1 {ids}
+        """, "s.id"),
+    ],
+    "teacher": [
+        ("""
+        SELECT sm.id::text, concat_ws(' ', p.first_name, p.last_name), sm.employee_number
+        FROM staff_members sm
+        JOIN persons p ON p.user_id = sm.user_id
+        WHERE sm.is_active = true {ids}
+        """, "sm.id"),
+        ("""
+        SELECT t.id::text, concat_ws(' ', p.firstname, p.lastname), NULL
+        FROM teachers t
+        JOIN persons p ON t.person_id = p.id
+        WHERE t.active = 1 {ids}
+        """, "t.id"),
+    ],
+}
+
+
+def fold(text: str) -> str:
+    """Lower-case, transliterate and strip accents"""
+    text = text.lower().translate(_SIMPLE_FOLD)
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if c.isalnum() or c.isspace())
+
+
+def index_tokens(text: str) -> Set[str]:
+    """All spellings under which ``text`` is findable"""
+    lowered = text.lower()
+    tokens = set(fold(lowered).split())
+    tokens.update(fold(lowered.translate(_DIGRAPH_FOLD)).split())
+    return tokens
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    kind: str
+    id: str
+    name: str
+    number: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "id": self.id,
+                "name": self.name, "number": self.number}
+
+
+class PrefixIndex:
+    """Sorted (token, kind, id) keys over a dictionary of entries"""
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str, str]] = []
+        self._entries: Dict[Tuple[str, str], Suggestion] = {}
+        self._tokens: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _entry_tokens(entry: Suggestion) -> Tuple[str, ...]:
+        tokens = index_tokens(entry.name)
+        if entry.number:
+            tokens.update(fold(entry.number).split())
+        return tuple(sorted(tokens))
+
+    @classmethod
+    def build(cls, entries: Iterable[Suggestion]) -> "PrefixIndex":
+        index = cls()
+        keys = []
+        for entry in entries:
+            ref = (entry.kind, entry.id)
+            tokens = cls._entry_tokens(entry)
+            index._entries[ref] = entry
+            index._tokens[ref] = tokens
+            keys.extend((token, entry.kind, entry.id) for token in tokens)
+        keys.sort()
+        index._keys = keys
+        return index
+
+    def upsert(self, entry: Suggestion) -> None:
+        with self._lock:
+            self._remove(entry.kind, entry.id)
+            ref = (entry.kind, entry.id)
+            tokens = self._entry_tokens(entry)
+            self._entries[ref] = entry
+            self._tokens[ref] = tokens
+            for token in tokens:
+                insort(self._keys, (token, entry.kind, entry.id))
+
+    def remove(self, kind: str, entry_id: str) -> None:
+        with self._lock:
+            self._remove(kind, entry_id)
+
+    def _remove(self, kind: str, entry_id: str) -> None:
+        ref = (kind, entry_id)
+        for token in self._tokens.pop(ref, ()):
+            key = (token, kind, entry_id)
+            position = bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+        self._entries.pop(ref, None)
+
+    def suggest(self, query: str, kinds: Iterable[str] = KINDS,
+                limit: int = 10) -> List[Suggestion]:
+        """
+        Entries having a token that starts with each query word
+
+        Ranked by: first name word matched, then shorter names, then name.
+        """
+        words = fold(query).split()
+        if not words:
+            return []
+        kinds = set(kinds)
+        # Scan the keys of the most selective word, check the others per entry
+        longest = max(words, key=len)
+        candidates: Dict[Tuple[str, str], bool] = {}
+
+        with self._lock:
+            keys = self._keys
+            position = bisect_left(keys, (longest,))
+            scanned = 0
+            while position < len(keys) and scanned < MAX_CANDIDATES:
+                token, kind, entry_id = keys[position]
+                if not token.startswith(longest):
+                    break
+                position += 1
+                scanned += 1
+                if kind not in kinds:
+                    continue
+                ref = (kind, entry_id)
+                tokens = self._tokens[ref]
+                if all(any(t.startswith(w) for t in tokens) for w in words):
+                    entry = self._entries[ref]
+                    leading = fold(entry.name).split()[:1]
+                    candidates[ref] = bool(leading) and leading[0].startswith(words[0])
+            entries = self._entries
+
+        ranked = sorted(
+            candidates,
+            key=lambda ref: (not candidates[ref], len(entries[ref].name),
+                             entries[ref].name)
+        )
+        return [entries[ref] for ref in ranked[:limit]]
+
+
+_index = PrefixIndex()
+
+
+def _load(kind: str, ids: Optional[List[str]] = None) -> List[Suggestion]:
+    """Rows of one kind from whichever schema is present"""
+    last_error = None
+    for query, id_column in _SOURCES[kind]:
+        sql = query.format(ids=f"AND {id_column}::text = ANY(%s)" if ids is not None else "")
+        try:
+            with db_cursor(cursor_factory=None) as cur:
+                cur.execute(sql, (ids,) if ids is not None else None)
+                return [
+                    Suggestion(kind, row[0], (row[1] or "").strip(), row[2])
+                    for row in cur.fetchall()
+                    if (row[1] or "").strip()
+                ]
+        except (errors.UndefinedTable, errors.UndefinedColumn) as e:
+            last_error = e
+    raise last_error
+
+
+def rebuild() -> int:
+    """Reload every entry and swap the index in; returns its size"""
+    global _index
+    entries = []
+    for kind in KINDS:
+        try:
+            entries.extend(_load(kind))
+        except (errors.UndefinedTable, errors.UndefinedColumn) as e:
+            logger.warning(f"Suggestions for {kind}s unavailable: {e}")
+    _index = PrefixIndex.build(entries)
+    return len(_index)
+
+
+def refresh(kind: str, ids: Iterable[str]) -> None:
+    """Reload specific entries after they were created, edited or removed"""
+    ids = [str(entry_id) for entry_id in ids]
+    found = {entry.id: entry for entry in _load(kind, ids)}
+    for entry_id in ids:
+        if entry_id in found:
+            _index.upsert(found[entry_id])
+        else:
+            _index.remove(kind, entry_id)
+
+
+def refresh_safely(kind: str, ids: Iterable[str]) -> None:
+    """:func:`refresh` for request handlers: failures are only logged"""
+    try:
+        refresh(kind, ids)
+    except Exception as e:
+        logger.warning(f"Suggestion refresh failed: {e}")
+
+
+def suggest(query: str, kinds: Iterable[str] = KINDS, limit: int = 10) -> List[Suggestion]:
+    return _index.suggest(query, kinds, limit)
+
+
+def size() -> int:
+    return len(_index)
+
+
+async def maintain() -> None:
+    """Background task: build at startup, then rebuild periodically"""
+    interval = settings.SUGGEST_REFRESH_INTERVAL
+    while True:
+        try:
+            count = await asyncio.to_thread(rebuild)
+            logger.info(f"Suggestion index built with {count} entries")
+        except Exception as e:
+            logger.warning(f"Suggestion index build failed: {e}")
+        if interval <= 0:
+            return
+        await asyncio.sleep(interval)
@@ -0,0 +1,10 @@
+"""
+Benchmark suite for the hot API paths
+
+- :mod:`benchmarks.seed` fills a local PostgreSQL with a synthetic
+  dataset shaped like production
+- :mod:`benchmarks.run` drives the API against it and reports latency
+  percentiles and throughput, optionally compared with a baseline file
+
+See ``benchmarks/README.md``.
+"""
@@ -0,0 +1,89 @@
+"""
+Shape and identifiers of the synthetic benchmark dataset
+
+Every seeded row gets a deterministic UUID, ``md5('bench:<kind>:<n>')``,
+computed the same way in SQL (by the seeder) and in Python (by the load
+driver), so the driver can address sections, schedules and assessments
+without querying the database.
+"""
+
+import hashlib
+import uuid
+from dataclasses import dataclass, fields, replace
+from datetime import date, timedelta
+from typing import Any
+
+PASSWORD = "bench-password"
+
+TERM_START = date(2025, 9, 15)
+TERM_END = date(2026, 1, 31)
+# Date of the seeded roll call in the large sections; grades can only be
+# submitted for dates with attendance
+ATTENDANCE_DATE = TERM_START + timedelta(days=7)
+
+ADMIN_USERNAME = "bench_admin"
+
+
+def bench_uuid(kind: str, *parts: Any) -> str:
+    """UUID of a seeded row; SQL: ``md5('bench:<kind>:' || ...)::uuid``"""
+    key = ":".join(["bench", kind, *(str(part) for part in parts)])
+    return str(uuid.UUID(hashlib.md5(key.encode("utf-8")).hexdigest()))
+
+
+def student_username(n: int) -> str:
+    return f"bench_s{n:06d}"
+
+
+def teacher_username(n: int) -> str:
+    """Teachers log in with their employee number"""
+    return f"bench_t{n:04d}"
+
+
+# Per-row counts, kept when the dataset is scaled
+_RATIOS = ("schedules_per_offering", "enrollments_per_student", "assessments_per_offering")
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    Sizes of the synthetic dataset
+
+    The defaults match production: ~20k students, ~3M grades, 5k class
+    schedules and a few 1,400-student lecture sections. Offerings
+    ``1..big_sections`` are the large sections, all taught by teacher 1.
+    """
+    students: int = 20_000
+    teachers: int = 400
+    courses: int = 1_000
+    big_sections: int = 5
+    big_section_size: int = 1_400
+    schedules_per_offering: int = 5
+    enrollments_per_student: int = 8
+    assessments_per_offering: int = 20
+
+    def scaled(self, factor: float) -> "Dataset":
+        """Dataset with every count multiplied by ``factor`` (at least 1)"""
+        if factor == 1:
+            return self
+        return replace(self, **{
+            field.name: max(1, round(getattr(self, field.name) * factor))
+            for field in fields(self)
+            if field.name not in _RATIOS
+        })
+
+    @property
+    def regular_offerings(self) -> int:
+        return self.courses - self.big_sections
+
+    @property
+    def schedules(self) -> int:
+        return self.courses * self.schedules_per_offering
+
+    @property
+    def enrollments(self) -> int:
+        regular = self.students * min(self.enrollments_per_student, self.regular_offerings)
+        return regular + self.big_sections * min(self.big_section_size, self.students)
+
+    @property
+    def grades(self) -> int:
+        return self.enrollments * self.assessments_per_offering
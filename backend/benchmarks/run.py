@@ -0,0 +1,256 @@
+"""
+Drive the hot API paths and report latency percentiles and throughput
+
+Usage (from ``backend/``, with the API running against a seeded database)::
+
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+Each scenario runs on its own: ``--warmup`` unmeasured requests, then
+``--requests`` measured ones from ``--concurrency`` concurrent clients.
+Users are sampled with a fixed ``--seed``, so repeated runs issue the
+same requests. With ``--baseline`` the run is compared with an earlier
+result and the exit status is 1 if any scenario regressed.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.dataset import (
+    ADMIN_USERNAME, ATTENDANCE_DATE, PASSWORD, Dataset, bench_uuid,
+    student_username, teacher_username
+)
+from benchmarks.stats import compare, format_table, summarize
+
+_DB_TIMING = re.compile(r"\bdb;dur=([\d.]+)")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    One benchmarked request
+
+    Attributes:
+        role: Token pool the request is sent with (None: anonymous)
+        body: Builds the JSON body from the dataset and a random source
+    """
+    name: str
+    method: str
+    path: str
+    role: Optional[str] = None
+    body: Optional[Callable[[Dataset, random.Random], Any]] = None
+
+
+def _big_section_students(dataset: Dataset) -> List[str]:
+    """Student ids of large section 1 (as enrolled by the seeder)"""
+    size = min(dataset.big_section_size, dataset.students)
+    return [bench_uuid("student", i % dataset.students + 1) for i in range(size)]
+
+
+def _login_body(dataset: Dataset, rng: random.Random) -> dict:
+    return {"username": student_username(rng.randint(1, dataset.students)),
+            "password": PASSWORD}
+
+
+def _attendance_body(dataset: Dataset, rng: random.Random) -> dict:
+    records = [{"student_id": student_id, "status": "present"}
+               for student_id in _big_section_students(dataset)]
+    return {"sessions": [
+        {
+            "class_schedule_id": bench_uuid("schedule", 1, k),
+            "attendance_date": ATTENDANCE_DATE.isoformat(),
+            "records": records,
+        }
+        for k in range(1, dataset.schedules_per_offering + 1)
+    ]}
+
+
+def _grades_body(dataset: Dataset, rng: random.Random) -> dict:
+    return {
+        "course_offering_id": bench_uuid("offering", 1),
+        "assessment_id": bench_uuid("assessment", 1, 1),
+        "assessment_title": "Quiz 1",
+        "assessment_type": "quiz",
+        "total_marks": 100,
+        "assessment_date": ATTENDANCE_DATE.isoformat(),
+        "grades": [{"student_id": student_id, "grade_value": rng.randint(40, 100)}
+                   for student_id in _big_section_students(dataset)],
+    }
+
+
+SCENARIOS = [
+    Scenario("login", "POST", "/auth/login", body=_login_body),
+    Scenario("student_schedule", "GET", "/students/me/schedule", role="student"),
+    Scenario("student_grades", "GET", "/students/me/grades", role="student"),
+    Scenario("teacher_students", "GET", "/teachers/me/students", role="section_teacher"),
+    Scenario("dashboard_stats", "GET", "/dashboard/stats", role="admin"),
+    Scenario("bulk_attendance", "POST", "/teachers/me/attendance/bulk",
+             role="section_teacher", body=_attendance_body),
+    Scenario("grade_submission", "POST", "/teachers/me/grades",
+             role="section_teacher", body=_grades_body),
+]
+
+
+async def _login(client: httpx.AsyncClient, username: str) -> str:
+    response = await client.post("/auth/login",
+                                 json={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def login_pools(client: httpx.AsyncClient, dataset: Dataset, users: int,
+                      rng: random.Random) -> Dict[str, List[str]]:
+    """Tokens per role; students are a fixed random sample"""
+    students = rng.sample(range(1, dataset.students + 1), min(users, dataset.students))
+    semaphore = asyncio.Semaphore(8)
+
+    async def login(username: str) -> str:
+        async with semaphore:
+            return await _login(client, username)
+
+    student_tokens = await asyncio.gather(*[login(student_username(n)) for n in students])
+    return {
+        "student": list(student_tokens),
+        "section_teacher": [await _login(client, teacher_username(1))],
+        "admin": [await _login(client, ADMIN_USERNAME)],
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, dataset: Dataset,
+                       tokens: Dict[str, List[str]], requests: int, concurrency: int,
+                       warmup: int, seed: int) -> Dict[str, Any]:
+    def prepare(index: int):
+        """Headers and body of request ``index``, the same on every run"""
+        rng = random.Random(f"{seed}:{scenario.name}:{index}")
+        headers = {}
+        if scenario.role:
+            headers["Authorization"] = f"Bearer {rng.choice(tokens[scenario.role])}"
+        return headers, scenario.body(dataset, rng) if scenario.body else None
+
+    latencies: List[float] = []
+    db_times: List[float] = []
+    errors = 0
+    position = count()
+
+    async def worker(measured: bool, limit: int, offset: int) -> None:
+        nonlocal errors
+        while True:
+            index = next(position)
+            if index >= limit:
+                return
+            headers, body = prepare(offset + index)
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, scenario.path,
+                                                 headers=headers, json=body)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                response, failed = None, True
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if not measured:
+                continue
+            latencies.append(elapsed_ms)
+            errors += failed
+            timing = response.headers.get("server-timing", "") if response else ""
+            match = _DB_TIMING.search(timing)
+            if match:
+                db_times.append(float(match.group(1)))
+
+    workers = min(concurrency, max(warmup, 1))
+    await asyncio.gather(*[worker(False, warmup, 0) for _ in range(workers)])
+
+    position = count()
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(True, requests, warmup) for _ in range(concurrency)])
+    return summarize(latencies, errors, time.perf_counter() - started, db_times)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    dataset = Dataset().scaled(args.scale)
+    selected = [s for s in SCENARIOS if not args.scenarios or s.name in args.scenarios]
+    limits = httpx.Limits(max_connections=args.concurrency + 8)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout,
+                                 limits=limits) as client:
+        tokens = await login_pools(client, dataset, args.users, random.Random(args.seed))
+        results = {}
+        for scenario in selected:
+            print(f"Running {scenario.name}...", file=sys.stderr)
+            results[scenario.name] = await run_scenario(
+                client, scenario, dataset, tokens, args.requests,
+                args.concurrency, args.warmup, args.seed
+            )
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "base_url": args.base_url,
+            "scale": args.scale,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--scenarios", type=lambda value: value.split(","),
+                        help="Comma-separated scenario names (default: all of "
+                             + ", ".join(s.name for s in SCENARIOS) + ")")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--users", type=int, default=200,
+                        help="Students logged in for the student scenarios")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Scale the database was seeded with")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Compare with an earlier result file")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed relative regression (default 0.15)")
+    parser.add_argument("--save-baseline", help="Write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["scenarios"]
+    print(format_table(result["scenarios"], baseline))
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+                f.write("\n")
+
+    if baseline is not None:
+        regressions = compare(result["scenarios"], baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""
+Seed the benchmark dataset into the configured PostgreSQL database
+
+Usage (from ``backend/``, against a local database with the LMS schema)::
+
+    python -m benchmarks.seed              # production-sized dataset
+    python -m benchmarks.seed --scale 0.1  # 10% of every count
+    python -m benchmarks.seed --reset      # remove the benchmark rows only
+
+All rows are generated set-based with ``generate_series`` and carry
+deterministic ids (see :mod:`benchmarks.dataset`), so seeding is
+idempotent and never touches non-benchmark data. Users are named
+``bench_*`` and courses are coded ``BENCH-*``; ``--reset`` deletes
+exactly those.
+"""
+
+import argparse
+import sys
+import time
+
+from app.auth.password import hash_password
+from app.core.db_pool import get_db_connection
+
+from benchmarks.dataset import (
+    ADMIN_USERNAME, ATTENDANCE_DATE, PASSWORD, TERM_END, TERM_START, Dataset
+)
+
+# Offerings per grades batch (keeps each transaction to a few 100k rows)
+GRADE_BATCH = 50
+
+_USERS = """
+    INSERT INTO users (id, username, email, password_hash, is_active, metadata)
+    SELECT md5('bench:user:s:' || n)::uuid, 'bench_s' || lpad(n::text, 6, '0'),
+           'bench_s' || n || '@bench.local', %(password_hash)s, true, '{}'::jsonb
+    FROM generate_series(1, %(students)s) AS n
+    UNION ALL
+    SELECT md5('bench:user:t:' || n)::uuid, 'bench_t' || lpad(n::text, 4, '0'),
+           'bench_t' || n || '@bench.local', %(password_hash)s, true, '{}'::jsonb
+    FROM generate_series(1, %(teachers)s) AS n
+    UNION ALL
+    SELECT md5('bench:user:admin')::uuid, %(admin)s, 'bench_admin@bench.local',
+           %(password_hash)s, true, '{"role": "ADMIN"}'::jsonb
+    ON CONFLICT (id) DO NOTHING
+"""
+
+_PERSONS = """
+    INSERT INTO persons (id, user_id, first_name, last_name)
+    SELECT md5('bench:person:' || u.id)::uuid, u.id,
+           'Bench' || substr(u.username, 7), 'User' || substr(u.username, 7)
+    FROM users u
+    WHERE u.username LIKE 'bench\\_%%'
+    ON CONFLICT (id) DO NOTHING
+"""
+
+_STUDENTS = """
+    INSERT INTO students (id, user_id, student_number, status, enrollment_date)
+    SELECT md5('bench:student:' || n)::uuid, md5('bench:user:s:' || n)::uuid,
+           'BS' || lpad(n::text, 6, '0'), 'active', %(term_start)s
+    FROM generate_series(1, %(students)s) AS n
+    ON CONFLICT (id) DO NOTHING
+"""
+
+_STAFF = """
+    INSERT INTO staff_members (id, user_id, employee_number, position_title,
+                               hire_date, is_active)
+    SELECT md5('bench:staff:' || n)::uuid, md5('bench:user:t:' || n)::uuid,
+           'bench_t' || lpad(n::text, 4, '0'),
+           '{"en": "Lecturer", "az": "Müəllim", "ru": "Преподаватель"}'::jsonb,
+           %(term_start)s, true
+    FROM generate_series(1, %(teachers)s) AS n
+    ON CONFLICT (id) DO NOTHING
+"""
+
+_TERM = """
+    INSERT INTO academic_terms (id, term_name, term_code, academic_year, term_type,
+                                term_number, start_date, end_date, is_active)
+    VALUES (md5('bench:term')::uuid, 'Benchmark term', 'BENCH', '2025-2026', 'fall',
+            1, %(term_start)s, %(term_end)s, true)
+    ON CONFLICT (id) DO NOTHING
+"""
+
+_COURSES = """
+    INSERT INTO courses (id, code, name, credit_hours, lecture_hours,
+                         tutorial_hours, lab_hours, is_active)
+    SELECT md5('bench:course:' || n)::uuid, 'BENCH-' || lpad(n::text, 4, '0'),
+           jsonb_build_object('az', 'Fənn ' || n, 'en', 'Course ' || n, 'ru', 'Курс ' || n),
+           5, 30, 15, 0, true
+    FROM generate_series(1, %(courses)s) AS n
+    ON CONFLICT (id) DO NOTHING
+"""
+
+# Offering n belongs to course n; offerings 1..big_sections are the large
+# lecture sections, all taught by teacher 1
+_OFFERINGS = """
+    INSERT INTO course_offerings (id, course_id, academic_term_id, section_code,
+                                  max_enrollment, current_enrollment, delivery_mode,
+                                  is_published, enrollment_status)
+    SELECT md5('bench:offering:' || n)::uuid, md5('bench:course:' || n)::uuid,
+           md5('bench:term')::uuid, 'A',
+           CASE WHEN n <= %(big_sections)s THEN %(big_section_size)s ELSE 60 END,
+           0, 'in_person', true, 'open'
+    FROM generate_series(1, %(courses)s) AS n
+    ON CONFLICT (id) DO NOTHING
+"""
+
+_INSTRUCTORS = """
+    INSERT INTO course_instructors (id, course_offering_id, instructor_id, role,
+                                    assigned_date)
+    SELECT md5('bench:instructor:' || n)::uuid, md5('bench:offering:' || n)::uuid,
+           md5('bench:user:t:' || CASE WHEN n <= %(big_sections)s THEN 1
+                                       ELSE (n - 1) %% %(teachers)s + 1 END)::uuid,
+           'primary', %(term_start)s
+    FROM generate_series(1, %(courses)s) AS n
+    ON CONFLICT (id) DO NOTHING
+"""
+
+_SCHEDULES = """
+    INSERT INTO class_schedules (id, course_offering_id, day_of_week, start_time,
+                                 end_time, schedule_type, instructor_id,
+                                 is_recurring, effective_from, effective_until)
+    SELECT md5('bench:schedule:' || n || ':' || k)::uuid,
+           md5('bench:offering:' || n)::uuid,
+           (k - 1) %% 5 + 1,
+           time '08:30' + ((n + k) %% 6) * interval '90 minutes',
+           time '09:50' + ((n + k) %% 6) * interval '90 minutes',
+           'lecture',
+           md5('bench:user:t:' || CASE WHEN n <= %(big_sections)s THEN 1
+                                       ELSE (n - 1) %% %(teachers)s + 1 END)::uuid,
+           true, %(term_start)s, %(term_end)s
+    FROM generate_series(1, %(courses)s) AS n,
+         generate_series(1, %(schedules_per_offering)s) AS k
+    ON CONFLICT (id) DO NOTHING
+"""
+
+# Large sections take consecutive blocks of students; every student also
+# takes enrollments_per_student regular offerings spread by a stride
+_ENROLLMENTS = """
+    INSERT INTO course_enrollments (id, course_offering_id, student_id,
+                                    enrollment_date, enrollment_status)
+    SELECT md5('bench:enrollment:' || o || ':' || s)::uuid,
+           md5('bench:offering:' || o)::uuid, md5('bench:student:' || s)::uuid,
+           %(term_start)s, 'enrolled'
+    FROM (
+        SELECT o, ((o - 1) * %(big_section_size)s + i - 1) %% %(students)s + 1 AS s
+        FROM generate_series(1, %(big_sections)s) AS o,
+             generate_series(1, LEAST(%(big_section_size)s, %(students)s)) AS i
+        UNION
+        SELECT %(big_sections)s + 1 + (s * 7 + k * 131) %% %(regular_offerings)s, s
+        FROM generate_series(1, %(students)s) AS s,
+             generate_series(0, LEAST(%(enrollments_per_student)s,
+                                      %(regular_offerings)s) - 1) AS k
+    ) AS e
+    ON CONFLICT DO NOTHING
+"""
+
+_ENROLLMENT_COUNTS = """
+    UPDATE course_offerings co
+    SET current_enrollment = counts.total
+    FROM (
+        SELECT course_offering_id, COUNT(*) AS total
+        FROM course_enrollments
+        WHERE course_offering_id IN (
+            SELECT md5('bench:offering:' || n)::uuid
+            FROM generate_series(1, %(courses)s) AS n
+        )
+        GROUP BY course_offering_id
+    ) AS counts
+    WHERE co.id = counts.course_offering_id
+"""
+
+_ASSESSMENTS = """
+    INSERT INTO assessments (id, course_offering_id, title, assessment_type,
+                             total_marks, due_date, created_by)
+    SELECT md5('bench:assessment:' || n || ':' || k)::uuid,
+           md5('bench:offering:' || n)::uuid,
+           jsonb_build_object('en', 'Quiz ' || k), 'quiz', 100,
+           %(term_start)s::date + k * 5,
+           md5('bench:user:t:' || CASE WHEN n <= %(big_sections)s THEN 1
+                                       ELSE (n - 1) %% %(teachers)s + 1 END)::uuid
+    FROM generate_series(1, %(courses)s) AS n,
+         generate_series(1, %(assessments_per_offering)s) AS k
+    ON CONFLICT (id) DO NOTHING
+"""
+
+_GRADES = """
+    INSERT INTO grades (assessment_id, student_id, marks_obtained, graded_by)
+    SELECT a.id, ce.student_id,
+           40 + abs(hashtext(a.id::text || ce.student_id::text)) %% 61,
+           a.created_by
+    FROM generate_series(%(first)s, %(last)s) AS n
+    JOIN course_enrollments ce ON ce.course_offering_id = md5('bench:offering:' || n)::uuid
+    JOIN assessments a ON a.course_offering_id = ce.course_offering_id
+    ON CONFLICT (assessment_id, student_id) DO NOTHING
+"""
+
+# One roll call per large section, required before grades can be submitted
+_ATTENDANCE = """
+    INSERT INTO attendance_records (class_schedule_id, student_id, attendance_date,
+                                    status, marked_by, marked_at)
+    SELECT md5('bench:schedule:' || ce_o.n || ':1')::uuid, ce.student_id,
+           %(attendance_date)s, 'present', md5('bench:user:t:1')::uuid, now()
+    FROM generate_series(1, %(big_sections)s) AS ce_o(n)
+    JOIN course_enrollments ce
+        ON ce.course_offering_id = md5('bench:offering:' || ce_o.n)::uuid
+    ON CONFLICT (class_schedule_id, student_id, attendance_date) DO NOTHING
+"""
+
+_BENCH_OFFERINGS = """
+    SELECT co.id FROM course_offerings co
+    JOIN courses c ON c.id = co.course_id
+    WHERE c.code LIKE 'BENCH-%%'
+"""
+
+_RESET = [
+    f"DELETE FROM attendance_records WHERE class_schedule_id IN "
+    f"(SELECT id FROM class_schedules WHERE course_offering_id IN ({_BENCH_OFFERINGS}))",
+    f"DELETE FROM grades WHERE assessment_id IN "
+    f"(SELECT id FROM assessments WHERE course_offering_id IN ({_BENCH_OFFERINGS}))",
+    f"DELETE FROM assessments WHERE course_offering_id IN ({_BENCH_OFFERINGS})",
+    f"DELETE FROM course_enrollments WHERE course_offering_id IN ({_BENCH_OFFERINGS})",
+    f"DELETE FROM class_schedules WHERE course_offering_id IN ({_BENCH_OFFERINGS})",
+    f"DELETE FROM course_instructors WHERE course_offering_id IN ({_BENCH_OFFERINGS})",
+    f"DELETE FROM course_offerings WHERE id IN ({_BENCH_OFFERINGS})",
+    "DELETE FROM courses WHERE code LIKE 'BENCH-%%'",
+    "DELETE FROM academic_terms WHERE id = md5('bench:term')::uuid",
+    "DELETE FROM students WHERE user_id IN "
+    "(SELECT id FROM users WHERE username LIKE 'bench\\_%%')",
+    "DELETE FROM staff_members WHERE user_id IN "
+    "(SELECT id FROM users WHERE username LIKE 'bench\\_%%')",
+    "DELETE FROM persons WHERE user_id IN "
+    "(SELECT id FROM users WHERE username LIKE 'bench\\_%%')",
+    "DELETE FROM users WHERE username LIKE 'bench\\_%%'",
+]
+
+_ANALYZE = (
+    "users", "persons", "students", "staff_members", "courses", "course_offerings",
+    "course_instructors", "class_schedules", "course_enrollments", "assessments",
+    "grades", "attendance_records",
+)
+
+
+def _step(conn, label: str, sql: str, params: dict) -> None:
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.rowcount
+    conn.commit()
+    print(f"  {label:<22} {rows:>10,} rows  {time.perf_counter() - started:7.1f}s")
+
+
+def seed(dataset: Dataset) -> None:
+    params = {
+        "password_hash": hash_password(PASSWORD),
+        "admin": ADMIN_USERNAME,
+        "term_start": TERM_START,
+        "term_end": TERM_END,
+        "attendance_date": ATTENDANCE_DATE,
+        "students": dataset.students,
+        "teachers": dataset.teachers,
+        "courses": dataset.courses,
+        "big_sections": dataset.big_sections,
+        "big_section_size": dataset.big_section_size,
+        "regular_offerings": dataset.regular_offerings,
+        "schedules_per_offering": dataset.schedules_per_offering,
+        "enrollments_per_student": dataset.enrollments_per_student,
+        "assessments_per_offering": dataset.assessments_per_offering,
+    }
+    print(f"Seeding {dataset} (~{dataset.grades:,} grades)")
+
+    conn = get_db_connection(cursor_factory=None)
+    try:
+        _step(conn, "users", _USERS, params)
+        _step(conn, "persons", _PERSONS, params)
+        _step(conn, "students", _STUDENTS, params)
+        _step(conn, "staff members", _STAFF, params)
+        _step(conn, "academic term", _TERM, params)
+        _step(conn, "courses", _COURSES, params)
+        _step(conn, "course offerings", _OFFERINGS, params)
+        _step(conn, "course instructors", _INSTRUCTORS, params)
+        _step(conn, "class schedules", _SCHEDULES, params)
+        _step(conn, "enrollments", _ENROLLMENTS, params)
+        _step(conn, "enrollment counts", _ENROLLMENT_COUNTS, params)
+        _step(conn, "assessments", _ASSESSMENTS, params)
+        for first in range(1, dataset.courses + 1, GRADE_BATCH):
+            last = min(first + GRADE_BATCH - 1, dataset.courses)
+            _step(conn, f"grades {first}-{last}", _GRADES,
+                  {**params, "first": first, "last": last})
+        _step(conn, "attendance", _ATTENDANCE, params)
+
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            for table in _ANALYZE:
+                cur.execute(f"ANALYZE {table}")
+    finally:
+        conn.close()
+
+
+def reset() -> None:
+    print("Removing benchmark rows")
+    conn = get_db_connection(cursor_factory=None)
+    try:
+        for sql in _RESET:
+            table = sql.split()[2]
+            _step(conn, table, sql, {})
+    finally:
+        conn.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply every row count (default: production size)")
+    parser.add_argument("--reset", action="store_true",
+                        help="Delete the benchmark rows instead of seeding")
+    args = parser.parse_args(argv)
+
+    if args.reset:
+        reset()
+    else:
+        seed(Dataset().scaled(args.scale))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
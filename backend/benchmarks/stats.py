@@ -0,0 +1,102 @@
+"""
+Latency summaries and baseline comparison
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """``p``-th percentile with linear interpolation (numpy's default)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * p / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies_ms: Sequence[float], errors: int, elapsed: float,
+              db_ms: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+    """
+    Summary of one scenario
+
+    Args:
+        latencies_ms: Latency of every measured request (errors included)
+        errors: Requests that failed or returned an unexpected status
+        elapsed: Wall-clock seconds of the measured phase
+        db_ms: ``db`` durations from the Server-Timing headers, if any
+    """
+    count = len(latencies_ms)
+    summary = {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(latencies_ms) / count, 2) if count else 0.0,
+        "max_ms": round(max(latencies_ms), 2) if count else 0.0,
+    }
+    for p in PERCENTILES:
+        summary[f"p{p}_ms"] = round(percentile(latencies_ms, p), 2)
+    if db_ms:
+        summary["db_p50_ms"] = round(percentile(db_ms, 50), 2)
+    return summary
+
+
+def compare(current: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float = 0.15) -> List[str]:
+    """
+    Regressions of ``current`` against ``baseline`` (scenario -> summary)
+
+    A scenario regresses when its p50, p95 or p99 latency grows by more
+    than ``tolerance``, its throughput drops by more than ``tolerance`` or
+    its error rate rises by more than one percentage point. Scenarios
+    missing from either side are not compared.
+    """
+    regressions = []
+    for name in sorted(set(current) & set(baseline)):
+        now, before = current[name], baseline[name]
+        for p in PERCENTILES:
+            key = f"p{p}_ms"
+            if before.get(key) and now[key] > before[key] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {now[key]:.1f} vs {before[key]:.1f} "
+                    f"(+{(now[key] / before[key] - 1) * 100:.0f}%)"
+                )
+        rps_before = before.get("throughput_rps")
+        if rps_before and now["throughput_rps"] < rps_before * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {now['throughput_rps']:.1f} vs {rps_before:.1f} rps"
+            )
+        if now["error_rate"] > before.get("error_rate", 0.0) + 0.01:
+            regressions.append(
+                f"{name}: error rate {now['error_rate']:.2%} "
+                f"vs {before.get('error_rate', 0.0):.2%}"
+            )
+    return regressions
+
+
+def format_table(results: Dict[str, Dict[str, Any]],
+                 baseline: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """Plain-text report, with p95 change against the baseline if given"""
+    header = (f"{'scenario':<20} {'req':>6} {'err':>5} {'rps':>8} "
+              f"{'p50':>8} {'p95':>8} {'p99':>8} {'db p50':>8}")
+    if baseline:
+        header += f" {'p95 vs base':>12}"
+    lines = [header, "-" * len(header)]
+    for name, s in results.items():
+        line = (f"{name:<20} {s['requests']:>6} {s['errors']:>5} "
+                f"{s['throughput_rps']:>8.1f} {s['p50_ms']:>8.1f} "
+                f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} "
+                f"{s.get('db_p50_ms', float('nan')):>8.1f}")
+        if baseline:
+            before = baseline.get(name, {}).get("p95_ms")
+            change = f"{(s['p95_ms'] / before - 1) * 100:+.0f}%" if before else "n/a"
+            line += f" {change:>12}"
+        lines.append(line)
+    return "\n".join(lines)
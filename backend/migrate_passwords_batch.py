@@ -1,87 +1,245 @@
 #!/usr/bin/env python3
 """
-Fast batch migration script to hash all plain text passwords.
+Parallel, resumable batch migration of plain text passwords to bcrypt.
 
-This version commits in batches for better performance.
+Candidate users are streamed in primary-key order (keyset pagination), each
+batch is hashed across a process pool and written back with a single
+``UPDATE ... FROM (VALUES ...)`` statement. After every committed batch the
+last processed id is stored in a checkpoint file, so an interrupted run
+continues where it stopped.
+
+Run with: python migrate_passwords_batch.py [--workers N] [--batch-size N]
 """
 
+import argparse
+import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.core.database import SessionLocal
-from app.models import User
-from app.auth import hash_password
-from sqlalchemy import select
+from psycopg2.extras import execute_values
 
-def migrate_passwords_batch():
-    """Migrate passwords in batches"""
+from app.core.db_pool import get_db_connection
+from app.auth.password import hash_password
 
-    db = SessionLocal()
+DEFAULT_CHECKPOINT = Path(__file__).parent / ".password_migration_checkpoint.json"
 
-    try:
-        print("=" * 60)
-        print("BATCH PASSWORD MIGRATION")
-        print("=" * 60)
+# Bcrypt hashes always start with $2a$ / $2b$
+CANDIDATE_FILTER = "LEFT(password_hash, 2) <> '$2'"
 
-        # Find users with plain text passwords
-        stmt = select(User).where(~User.password_hash.startswith('$2'))
-        result = db.execute(stmt)
-        users_to_migrate = result.scalars().all()
 
-        total = len(users_to_migrate)
+def hash_plain_password(plain: str) -> Optional[str]:
+    """Hash one legacy password (runs in a worker process)"""
+    try:
+        # Truncate if needed (bcrypt 72-byte limit)
+        if len(plain.encode('utf-8')) > 72:
+            plain = plain.encode('utf-8')[:72].decode('utf-8', errors='ignore')
+        return hash_password(plain)
+    except Exception:
+        return None
+
+
+def load_checkpoint(path: Path) -> dict:
+    if path.exists():
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    return {"last_id": None, "migrated": 0, "errors": 0}
+
+
+def save_checkpoint(path: Path, checkpoint: dict) -> None:
+    """Write the checkpoint atomically"""
+    checkpoint["updated_at"] = datetime.now().isoformat()
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def fetch_batch(cur, last_id: Optional[str], batch_size: int):
+    """Next batch of candidate users after ``last_id`` in id order"""
+    if last_id is None:
+        cur.execute(f"""
+            SELECT id::text, password_hash FROM users
+            WHERE {CANDIDATE_FILTER}
+            ORDER BY id
+            LIMIT %s
+        """, (batch_size,))
+    else:
+        cur.execute(f"""
+            SELECT id::text, password_hash FROM users
+            WHERE {CANDIDATE_FILTER} AND id > %s::uuid
+            ORDER BY id
+            LIMIT %s
+        """, (last_id, batch_size))
+    return cur.fetchall()
+
+
+def count_remaining(cur, last_id: Optional[str]) -> int:
+    if last_id is None:
+        cur.execute(f"SELECT COUNT(*) FROM users WHERE {CANDIDATE_FILTER}")
+    else:
+        cur.execute(
+            f"SELECT COUNT(*) FROM users WHERE {CANDIDATE_FILTER} AND id > %s::uuid",
+            (last_id,)
+        )
+    return cur.fetchone()[0]
+
+
+def write_batch(cur, rows) -> int:
+    """Store hashed passwords; rows changed meanwhile are left untouched"""
+    execute_values(cur, """
+        UPDATE users AS u
+        SET password_hash = v.password_hash,
+            password_changed_at = CURRENT_TIMESTAMP
+        FROM (VALUES %s) AS v(id, old_password, password_hash)
+        WHERE u.id = v.id::uuid
+          AND u.password_hash = v.old_password
+          AND LEFT(u.password_hash, 2) <> '$2'
+    """, rows, page_size=len(rows))
+    return cur.rowcount
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def migrate_passwords_batch(batch_size: int, workers: int,
+                            checkpoint_path: Path, restart: bool,
+                            assume_yes: bool):
+    """Migrate passwords in parallel batches"""
+
+    print("=" * 60)
+    print("BATCH PASSWORD MIGRATION")
+    print("=" * 60)
+
+    if restart and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint["last_id"]:
+        print(f"↩️  Resuming after id {checkpoint['last_id']} "
+              f"({checkpoint['migrated']} already migrated)")
+
+    conn = get_db_connection(cursor_factory=None)
+    try:
+        cur = conn.cursor()
+        total = count_remaining(cur, checkpoint["last_id"])
+        conn.commit()
         print(f"🔓 Users to migrate: {total}")
 
         if total == 0:
             print("✅ All passwords already hashed")
             return
 
-        response = input(f"\n⚠️  Migrate {total} passwords? (yes/no): ")
-        if response.lower() != 'yes':
-            print("❌ Cancelled")
-            return
+        if not assume_yes:
+            response = input(f"\n⚠️  Migrate {total} passwords? (yes/no): ")
+            if response.lower() != 'yes':
+                print("❌ Cancelled")
+                return
 
-        print(f"\n🔄 Migrating {total} passwords in batches...")
+        print(f"\n🔄 Migrating {total} passwords with {workers} workers "
+              f"in batches of {batch_size}...")
 
-        batch_size = 100
+        processed = 0
         migrated = 0
         errors = 0
-
-        for i in range(0, total, batch_size):
-            batch = users_to_migrate[i:i + batch_size]
-
-            for user in batch:
-                try:
-                    plain = user.password_hash
-                    # Truncate if needed (bcrypt 72-byte limit)
-                    if len(plain.encode('utf-8')) > 72:
-                        plain = plain.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-
-                    user.password_hash = hash_password(plain)
-                    migrated += 1
-                except Exception as e:
-                    errors += 1
-                    print(f"  ✗ Error: {user.username}: {e}")
-
-            # Commit batch
-            db.commit()
-            print(f"  ✓ Processed {min(i + batch_size, total)}/{total} users")
-
+        started_at = time.monotonic()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while True:
+                batch = fetch_batch(cur, checkpoint["last_id"], batch_size)
+                if not batch:
+                    break
+                batch_started = time.monotonic()
+
+                ids = [row[0] for row in batch]
+                plains = [row[1] for row in batch]
+                chunksize = max(1, len(plains) // (workers * 4))
+                hashes = list(pool.map(hash_plain_password, plains,
+                                       chunksize=chunksize))
+
+                rows = []
+                for user_id, plain, hashed in zip(ids, plains, hashes):
+                    if hashed is None:
+                        errors += 1
+                        print(f"  ✗ Error hashing password of user {user_id}")
+                    else:
+                        rows.append((user_id, plain, hashed))
+
+                updated = write_batch(cur, rows) if rows else 0
+                conn.commit()
+
+                migrated += updated
+                processed += len(batch)
+                checkpoint["last_id"] = ids[-1]
+                checkpoint["migrated"] += updated
+                checkpoint["errors"] += len(batch) - len(rows)
+                save_checkpoint(checkpoint_path, checkpoint)
+
+                elapsed = time.monotonic() - started_at
+                rate = processed / elapsed if elapsed else 0.0
+                batch_rate = len(batch) / max(time.monotonic() - batch_started, 1e-6)
+                eta = (total - processed) / rate if rate else 0.0
+                print(f"  ✓ {processed}/{total} users | "
+                      f"{batch_rate:.0f}/s batch, {rate:.0f}/s overall | "
+                      f"ETA {format_duration(eta)}")
+
+        elapsed = time.monotonic() - started_at
         print(f"\n✅ Migration complete!")
         print(f"   Migrated: {migrated}")
         print(f"   Errors: {errors}")
+        print(f"   Skipped (changed during run): {processed - migrated - errors}")
+        print(f"   Time: {format_duration(elapsed)} "
+              f"({processed / elapsed if elapsed else 0:.0f} users/s)")
+
+        # A finished run needs no checkpoint
+        if checkpoint_path.exists():
+            checkpoint_path.unlink()
 
+    except KeyboardInterrupt:
+        conn.rollback()
+        print(f"\n⏸️  Interrupted; rerun to resume from {checkpoint_path}")
     except Exception as e:
-        db.rollback()
+        conn.rollback()
         print(f"❌ Failed: {e}")
         import traceback
         traceback.print_exc()
 
     finally:
-        db.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Hash plain text passwords in parallel, resumable batches'
+    )
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='Users fetched, hashed and written per batch')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Hashing processes (default: CPU count)')
+    parser.add_argument('--checkpoint', type=Path, default=DEFAULT_CHECKPOINT,
+                        help='Checkpoint file used to resume')
+    parser.add_argument('--restart', action='store_true',
+                        help='Ignore an existing checkpoint')
+    parser.add_argument('--yes', action='store_true',
+                        help='Do not ask for confirmation')
+    args = parser.parse_args()
+
+    migrate_passwords_batch(
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+        assume_yes=args.yes
+    )
 
 
 if __name__ == "__main__":
-    migrate_passwords_batch()
+    main()
@@ -22,18 +22,28 @@ Usage:
     python migrate_database.py --phase 4  # Courses and offerings
     python migrate_database.py --phase 5  # Enrollments and grades
     python migrate_database.py --validate  # Run validation queries
+    python migrate_database.py --phase 5 --grade-workers 4  # Parallel grades
+    python migrate_database.py --restart  # Ignore the saved run state
+
+Completed steps and id mappings are stored in migration_state.sqlite;
+rerunning after a failure resumes at the first unfinished step.
 """
 
 import psycopg2
-from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.extras import RealDictCursor
 from psycopg2.extensions import register_adapter, AsIs
 import uuid
 import json
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, List, Tuple, Any
 import argparse
+import io
+import itertools
+import sqlite3
 import sys
+import time
 import base64
 
 # Register UUID adapter for psycopg2
@@ -84,10 +94,406 @@ NEW_DB_CONFIG = {
     'password': '1111'
 }
 
+# ============================================================================
+# DETERMINISTIC IDS AND RUN STATE
+# ============================================================================
+# New UUIDs are derived from legacy ids (uuid5), so every run produces the
+# same ids and re-running a phase only hits ON CONFLICT. Id mappings and
+# completed steps are kept in a SQLite file, so an interrupted run resumes
+# without rebuilding mappings from both databases.
+
+MIGRATION_NAMESPACE = uuid.UUID('8a4e2f61-7c1d-5b93-a0e6-3d9f1c2b7e54')
+DEFAULT_STATE_FILE = 'migration_state.sqlite'
+
+
+def legacy_uuid(entity: str, *legacy_key) -> uuid.UUID:
+    """Deterministic UUID for a legacy row of ``entity``"""
+    name = f"{entity}:" + ":".join(str(part) for part in legacy_key)
+    return uuid.uuid5(MIGRATION_NAMESPACE, name)
+
+
+class MigrationState:
+    """Persistent id mappings and step checkpoints (SQLite)"""
+    
+    def __init__(self, path: str = DEFAULT_STATE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS mappings (
+                entity TEXT NOT NULL,
+                legacy_key TEXT NOT NULL,
+                new_id TEXT NOT NULL,
+                PRIMARY KEY (entity, legacy_key)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                step TEXT PRIMARY KEY,
+                completed_at TEXT NOT NULL,
+                details TEXT
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        self.conn.commit()
+    
+    def reset(self) -> None:
+        """Forget all mappings and checkpoints"""
+        self.conn.executescript("""
+            DELETE FROM mappings;
+            DELETE FROM checkpoints;
+            DELETE FROM meta;
+        """)
+        self.conn.commit()
+    
+    def save_mappings(self, mappings: Dict[str, Dict]) -> None:
+        """Upsert every id mapping (keys may be ints, strings or tuples)"""
+        with self.conn:
+            for entity, mapping in mappings.items():
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO mappings VALUES (?, ?, ?)",
+                    (
+                        (entity, json.dumps(key), str(value))
+                        for key, value in mapping.items()
+                        if value is not None
+                    )
+                )
+    
+    def load_mappings(self) -> Dict[str, Dict]:
+        mappings: Dict[str, Dict] = {}
+        for entity, legacy_key, new_id in self.conn.execute(
+            "SELECT entity, legacy_key, new_id FROM mappings"
+        ):
+            key = json.loads(legacy_key)
+            if isinstance(key, list):
+                key = tuple(key)
+            mappings.setdefault(entity, {})[key] = new_id
+        return mappings
+    
+    def is_done(self, step: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM checkpoints WHERE step = ?", (step,)
+        ).fetchone()
+        return row is not None
+    
+    def completed(self, prefix: str) -> Dict[str, Any]:
+        """Details of the completed steps whose name starts with ``prefix``"""
+        rows = self.conn.execute(
+            "SELECT step, details FROM checkpoints WHERE step LIKE ?",
+            (prefix + '%',)
+        )
+        return {
+            step: json.loads(details) if details else None
+            for step, details in rows
+        }
+    
+    def mark_done(self, step: str, details: Any = None) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+                (step, datetime.now().isoformat(),
+                 json.dumps(details) if details is not None else None)
+            )
+    
+    def get_meta(self, key: str) -> Any:
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def set_meta(self, key: str, value: Any) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                (key, json.dumps(value))
+            )
+    
+    def close(self) -> None:
+        self.conn.close()
+
+
+# ============================================================================
+# BULK LOADER
+# ============================================================================
+# Rows are streamed with COPY FROM STDIN (CSV) into a temporary staging table
+# typed like the target and merged with a single INSERT ... SELECT, so the
+# per-row cost is the COPY parser rather than Python-side SQL building.
+
+BULK_CHUNK_SIZE = 50000
+COPY_NULL = '\\N'
+
+
+def _copy_value(value):
+    """Prepare a Python value for a CSV COPY row"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _copy_field(value) -> str:
+    """
+    Encode one CSV COPY field
+    
+    None is written as an unquoted ``\\N`` (the COPY ``NULL`` marker) and
+    every other value is quoted, so empty strings and a literal ``\\N``
+    stay strings instead of turning into NULL.
+    """
+    if value is None:
+        return COPY_NULL
+    return '"' + str(_copy_value(value)).replace('"', '""') + '"'
+
+
+def _copy_buffer(rows) -> io.StringIO:
+    """CSV COPY input for ``rows``"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_copy_field(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_rows(cur, table: str, columns, rows) -> None:
+    """Stream rows into ``table`` with COPY FROM STDIN (CSV)"""
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        _copy_buffer(rows)
+    )
+
+
+def bulk_load(cur, table: str, columns, rows, on_conflict: str = "",
+              conflict_columns=None, chunk_size: int = BULK_CHUNK_SIZE) -> int:
+    """
+    Load rows into ``table`` through a COPY-filled staging table
+    
+    Args:
+        cur: Cursor on the target database (the caller commits)
+        table: Target table
+        columns: Target columns, in the order of the row tuples
+        rows: Iterable of row tuples
+        on_conflict: ``ON CONFLICT ...`` clause for the merge
+        conflict_columns: Conflict key; duplicates of the key within a chunk
+            are collapsed so ``DO UPDATE`` does not touch a row twice
+        chunk_size: Rows staged and merged per round trip
+    
+    Returns:
+        Number of rows inserted or updated
+    """
+    stage = f"{table}_stage"
+    column_list = ', '.join(columns)
+    # Same column types as the target, without its constraints or defaults
+    cur.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {stage} AS "
+        f"SELECT {column_list} FROM {table} WITH NO DATA"
+    )
+    cur.execute(f"TRUNCATE {stage}")
+    select = f"SELECT {column_list} FROM {stage}"
+    if conflict_columns:
+        key = ', '.join(conflict_columns)
+        select = f"SELECT DISTINCT ON ({key}) {column_list} FROM {stage} ORDER BY {key}"
+    merge = f"INSERT INTO {table} ({column_list}) {select} {on_conflict}"
+    
+    affected = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        _copy_rows(cur, stage, columns, chunk)
+        cur.execute(merge)
+        affected += cur.rowcount
+        cur.execute(f"TRUNCATE {stage}")
+    return affected
+
+
+# ============================================================================
+# GRADE MIGRATION WORKERS
+# ============================================================================
+# journal_details is split into id ranges that are migrated independently,
+# either in-process or across a process pool. Each range is streamed through
+# a server-side cursor (keyset bounds on jd.id instead of OFFSET) and loaded
+# with bulk_load.
+
+GRADE_COLUMNS = (
+    'id', 'assessment_id', 'student_id', 'submission_id', 'graded_by',
+    'marks_obtained', 'percentage', 'letter_grade', 'feedback',
+    'rubric_scores', 'is_final', 'graded_at', 'approved_by', 'approved_at',
+    'grade_history', 'created_at', 'updated_at'
+)
+
+_grade_worker = {}
+
+
+def _init_grade_worker(assessments: Dict, students: Dict) -> None:
+    """Process initializer: open connections and keep the id mappings"""
+    _grade_worker['assessments'] = assessments
+    _grade_worker['students'] = students
+    _grade_worker['old_conn'] = psycopg2.connect(**OLD_DB_CONFIG)
+    _grade_worker['new_conn'] = psycopg2.connect(**NEW_DB_CONFIG)
+
+
+def _close_grade_worker() -> None:
+    for key in ('old_conn', 'new_conn'):
+        conn = _grade_worker.pop(key, None)
+        if conn is not None:
+            conn.close()
+
+
+def _build_grade_row(grade, assessments: Dict, students: Dict):
+    """Build a grades row, or return the reason it has to be skipped"""
+    assessment_uuid = assessments.get(
+        (grade['course_id'], grade['course_eva_id'])
+    )
+    if not assessment_uuid:
+        return 'no_assessment'
+
+    student_uuid = students.get(grade['student_id'])
+    if not student_uuid:
+        return 'no_student'
+
+    # Extract grade value
+    # Simplified - in production lookup in dictionaries
+    marks = 0.0
+    if grade['point_id_1']:
+        # Simple extraction - can be improved
+        marks = float(grade['point_id_1'] % 100)
+
+    percentage = marks
+
+    # Calculate letter grade
+    if percentage >= 90:
+        letter_grade = 'A'
+    elif percentage >= 80:
+        letter_grade = 'B'
+    elif percentage >= 70:
+        letter_grade = 'C'
+    elif percentage >= 60:
+        letter_grade = 'D'
+    else:
+        letter_grade = 'F'
+
+    return (
+        str(legacy_uuid('grades', grade['id'])),
+        assessment_uuid,
+        student_uuid,
+        None,  # submission_id
+        None,  # graded_by
+        marks,
+        percentage,
+        letter_grade,
+        None,  # feedback
+        None,  # rubric_scores
+        True,  # is_final
+        grade['update_date'],  # graded_at
+        None,  # approved_by
+        None,  # approved_at
+        None,  # grade_history
+        grade['create_date'] or datetime.now(),
+        datetime.now()
+    )
+
+
+def _migrate_grade_range(id_range: Tuple[int, int], batch_size: int) -> Dict[str, int]:
+    """
+    Migrate journal_details with ``low < id <= high``
+
+    Returns:
+        Counters for the range (processed, migrated, skipped_no_assessment,
+        skipped_no_student)
+    """
+    low, high = id_range
+    old_conn = _grade_worker['old_conn']
+    new_conn = _grade_worker['new_conn']
+    assessments = _grade_worker['assessments']
+    students = _grade_worker['students']
+    result = {
+        'processed': 0,
+        'migrated': 0,
+        'skipped_no_assessment': 0,
+        'skipped_no_student': 0,
+    }
+
+    # Named (server-side) cursor: rows are streamed, not materialized
+    with old_conn.cursor(
+        name=f"grades_{low}_{high}",
+        cursor_factory=RealDictCursor
+    ) as cur:
+        cur.itersize = batch_size
+        cur.execute("""
+            SELECT
+                jd.id, jd.journal_id, jd.point_id_1,
+                jd.status_1,
+                jd.create_date, jd.update_date,
+                j.course_id, j.student_id, j.course_eva_id
+            FROM journal_details jd
+            JOIN journal j ON jd.journal_id = j.id
+            WHERE jd.active = 1 AND jd.id > %s AND jd.id <= %s
+            ORDER BY jd.id
+        """, (low, high))
+
+        while True:
+            batch_grades = cur.fetchmany(batch_size)
+            if not batch_grades:
+                break
+
+            grade_values = []
+            for grade in batch_grades:
+                row = _build_grade_row(grade, assessments, students)
+                if row == 'no_assessment':
+                    result['skipped_no_assessment'] += 1
+                elif row == 'no_student':
+                    result['skipped_no_student'] += 1
+                else:
+                    grade_values.append(row)
+
+            if grade_values:
+                with new_conn.cursor() as new_cur:
+                    result['migrated'] += bulk_load(
+                        new_cur, 'grades', GRADE_COLUMNS, grade_values,
+                        on_conflict="ON CONFLICT DO NOTHING"
+                    )
+                new_conn.commit()
+
+            result['processed'] += len(batch_grades)
+
+    old_conn.commit()
+    return result
+
+
+def _split_id_range(min_id: int, max_id: int, parts: int) -> List[Tuple[int, int]]:
+    """Split ``[min_id, max_id]`` into ``(low, high]`` ranges"""
+    span = max_id - min_id + 1
+    parts = max(1, min(parts, span))
+    step = -(-span // parts)
+    ranges = []
+    low = min_id - 1
+    while low < max_id:
+        high = min(low + step, max_id)
+        ranges.append((low, high))
+        low = high
+    return ranges
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
 class DatabaseMigration:
     """Handles complete database migration from old to new schema"""
     
-    def __init__(self):
+    def __init__(self, grade_workers: int = 1, grade_batch_size: int = 10000,
+                 state_file: str = DEFAULT_STATE_FILE, restart: bool = False):
+        self.grade_workers = max(1, grade_workers)
+        self.grade_batch_size = grade_batch_size
+        self.state = MigrationState(state_file)
+        if restart:
+            self.state.reset()
         self.old_conn = None
         self.new_conn = None
         self.id_mappings = {}
@@ -124,7 +530,16 @@ class DatabaseMigration:
             raise
     
     def load_existing_mappings(self):
-        """Load existing ID mappings from migrated data in new database"""
+        """Load existing ID mappings (state file first, else both databases)"""
+        stored = self.state.load_mappings()
+        if stored:
+            self.id_mappings.update(stored)
+            logger.info(
+                f"Loaded {sum(len(m) for m in stored.values()):,} id mappings "
+                f"from {self.state.path}"
+            )
+            return
+        
         try:
             with self.new_conn.cursor(cursor_factory=RealDictCursor) as cur:
                 # Load user mappings
@@ -285,6 +700,7 @@ class DatabaseMigration:
         if self.new_conn:
             self.new_conn.close()
             logger.info("Closed new database connection")
+        self.state.close()
     
     def generate_uuid_mapping(self, table_name: str, id_column: str = 'id') -> Dict[int, uuid.UUID]:
         """
@@ -303,7 +719,7 @@ class DatabaseMigration:
             cur.execute(f"SELECT DISTINCT {id_column} FROM {table_name} WHERE {id_column} IS NOT NULL")
             old_ids = [row[0] for row in cur.fetchall()]
         
-        mapping = {old_id: uuid.uuid4() for old_id in old_ids}
+        mapping = {old_id: legacy_uuid(table_name, old_id) for old_id in old_ids}
         self.id_mappings[table_name] = mapping
         
         logger.info(f"✓ Generated {len(mapping)} UUID mappings for {table_name}")
@@ -363,11 +779,12 @@ class DatabaseMigration:
             logger.info(f"Found {len(old_users)} users to migrate")
             
             # Insert users into new database
-            insert_query = """
-                INSERT INTO users (
-                    id, username, email, password_hash, is_active,
-                    last_login_at, password_changed_at, created_at, updated_at, metadata
-                ) VALUES %s
+            columns = (
+                'id', 'username', 'email', 'password_hash', 'is_active',
+                'last_login_at', 'password_changed_at', 'created_at',
+                'updated_at', 'metadata'
+            )
+            on_conflict = """
                 ON CONFLICT (username) DO NOTHING
             """
             
@@ -418,7 +835,9 @@ class DatabaseMigration:
                 ))
             
             with self.new_conn.cursor() as cur:
-                execute_values(cur, insert_query, values)
+                bulk_load(
+                    cur, 'users', columns, values, on_conflict
+                )
                 self.new_conn.commit()
                 self.stats['users']['migrated'] = len(values)
             
@@ -471,12 +890,12 @@ class DatabaseMigration:
             self.stats['persons']['total'] = len(old_persons)
             logger.info(f"Found {len(old_persons)} persons to migrate")
             
-            insert_query = """
-                INSERT INTO persons (
-                    id, user_id, first_name, last_name, middle_name,
-                    date_of_birth, gender, national_id,
-                    created_at, updated_at
-                ) VALUES %s
+            columns = (
+                'id', 'user_id', 'first_name', 'last_name', 'middle_name',
+                'date_of_birth', 'gender', 'national_id', 'created_at',
+                'updated_at'
+            )
+            on_conflict = """
                 ON CONFLICT (user_id) DO NOTHING
             """
             
@@ -510,7 +929,7 @@ class DatabaseMigration:
                             birthdate = None
                 
                 values.append((
-                    uuid.uuid4(),
+                    legacy_uuid('persons', person['id']),
                     user_mapping[person['user_id']],
                     person.get('firstname', 'Unknown'),
                     person.get('lastname', 'Unknown'),
@@ -523,7 +942,9 @@ class DatabaseMigration:
                 ))
             
             with self.new_conn.cursor() as cur:
-                execute_values(cur, insert_query, values)
+                bulk_load(
+                    cur, 'persons', columns, values, on_conflict
+                )
                 self.new_conn.commit()
                 self.stats['persons']['migrated'] = len(values)
             
@@ -568,12 +989,13 @@ class DatabaseMigration:
             # Get user mapping
             user_mapping = self.id_mappings.get('users', {})
             
-            insert_query = """
-                INSERT INTO students (
-                    id, user_id, student_number, enrollment_date, status,
-                    study_mode, funding_type, gpa, total_credits_earned,
-                    created_at, updated_at, metadata
-                ) VALUES %s
+            columns = (
+                'id', 'user_id', 'student_number', 'enrollment_date',
+                'status', 'study_mode', 'funding_type', 'gpa',
+                'total_credits_earned', 'created_at', 'updated_at',
+                'metadata'
+            )
+            on_conflict = """
                 ON CONFLICT (student_number) DO UPDATE SET
                     user_id = EXCLUDED.user_id,
                     metadata = EXCLUDED.metadata
@@ -651,7 +1073,10 @@ class DatabaseMigration:
                 ))
             
             with self.new_conn.cursor() as cur:
-                execute_values(cur, insert_query, values)
+                bulk_load(
+                    cur, 'students', columns, values, on_conflict,
+                    conflict_columns=('student_number',)
+                )
                 self.new_conn.commit()
                 self.stats['students']['migrated'] = len(values)
             
@@ -690,12 +1115,12 @@ class DatabaseMigration:
             # Get user mapping
             user_mapping = self.id_mappings.get('users', {})
             
-            insert_query = """
-                INSERT INTO staff_members (
-                    id, user_id, employee_number, position_title,
-                    employment_type, hire_date, is_active,
-                    created_at, updated_at
-                ) VALUES %s
+            columns = (
+                'id', 'user_id', 'employee_number', 'position_title',
+                'employment_type', 'hire_date', 'is_active', 'created_at',
+                'updated_at'
+            )
+            on_conflict = """
                 ON CONFLICT (user_id) DO UPDATE SET
                     employee_number = EXCLUDED.employee_number,
                     position_title = EXCLUDED.position_title
@@ -755,7 +1180,10 @@ class DatabaseMigration:
                 ))
             
             with self.new_conn.cursor() as cur:
-                execute_values(cur, insert_query, values)
+                bulk_load(
+                    cur, 'staff_members', columns, values, on_conflict,
+                    conflict_columns=('user_id',)
+                )
                 self.new_conn.commit()
                 self.stats['staff']['migrated'] = len(values)
             
@@ -820,11 +1248,11 @@ class DatabaseMigration:
                 else:
                     return 'program'
             
-            insert_query = """
-                INSERT INTO organization_units (
-                    id, parent_id, type, code, name, is_active,
-                    created_at, updated_at
-                ) VALUES %s
+            columns = (
+                'id', 'parent_id', 'type', 'code', 'name', 'is_active',
+                'created_at', 'updated_at'
+            )
+            on_conflict = """
                 ON CONFLICT (code) DO UPDATE SET
                     parent_id = EXCLUDED.parent_id,
                     name = EXCLUDED.name,
@@ -869,14 +1297,11 @@ class DatabaseMigration:
             ))
             
             with self.new_conn.cursor() as cur:
-                # Insert in batches to handle large datasets
-                batch_size = 100
-                total_inserted = 0
-                
-                for i in range(0, len(sorted_values), batch_size):
-                    batch = sorted_values[i:i+batch_size]
-                    execute_values(cur, insert_query, batch)
-                    total_inserted += len(batch)
+                bulk_load(
+                    cur, 'organization_units', columns, sorted_values,
+                    on_conflict, conflict_columns=('code',)
+                )
+                total_inserted = len(sorted_values)
                 
                 logger.info(f"✓ Inserted {total_inserted} organizations")
                 
@@ -898,11 +1323,11 @@ class DatabaseMigration:
         logger.info("\nCREATING ACADEMIC TERMS...")
         
         try:
-            insert_query = """
-                INSERT INTO academic_terms (
-                    id, academic_year, term_type, term_number,
-                    start_date, end_date, is_current
-                ) VALUES %s
+            columns = (
+                'id', 'academic_year', 'term_type', 'term_number',
+                'start_date', 'end_date', 'is_current'
+            )
+            on_conflict = """
                 ON CONFLICT DO NOTHING
             """
             
@@ -910,7 +1335,7 @@ class DatabaseMigration:
             for year in range(2020, 2026):
                 # Fall semester
                 values.append((
-                    uuid.uuid4(),
+                    legacy_uuid('academic_terms', year, 'fall'),
                     f"{year}-{year+1}",
                     'fall',
                     1,
@@ -921,7 +1346,7 @@ class DatabaseMigration:
                 
                 # Spring semester
                 values.append((
-                    uuid.uuid4(),
+                    legacy_uuid('academic_terms', year, 'spring'),
                     f"{year}-{year+1}",
                     'spring',
                     2,
@@ -931,7 +1356,9 @@ class DatabaseMigration:
                 ))
             
             with self.new_conn.cursor() as cur:
-                execute_values(cur, insert_query, values)
+                bulk_load(
+                    cur, 'academic_terms', columns, values, on_conflict
+                )
                 self.new_conn.commit()
             
             logger.info(f"✓ Created {len(values)} academic terms")
@@ -1030,7 +1457,7 @@ class DatabaseMigration:
                     if course['id'] in self.id_mappings['courses']:
                         course_uuid = self.id_mappings['courses'][course['id']]
                     else:
-                        course_uuid = uuid.uuid4()
+                        course_uuid = legacy_uuid('courses', course['id'])
                         self.id_mappings['courses'][course['id']] = course_uuid
                     
                     # Multilingual name
@@ -1055,18 +1482,21 @@ class DatabaseMigration:
                     ))
             
             # Insert into new database
-            insert_query = """
-                INSERT INTO courses (
-                    id, code, name, credit_hours, organization_unit_id,
-                    is_active, created_at, updated_at
-                ) VALUES %s
+            columns = (
+                'id', 'code', 'name', 'credit_hours', 'organization_unit_id',
+                'is_active', 'created_at', 'updated_at'
+            )
+            on_conflict = """
                 ON CONFLICT (code) DO UPDATE SET
                     name = EXCLUDED.name,
                     updated_at = EXCLUDED.updated_at
             """
             
             with self.new_conn.cursor() as cur:
-                execute_values(cur, insert_query, course_values)
+                bulk_load(
+                    cur, 'courses', columns, course_values, on_conflict,
+                    conflict_columns=('code',)
+                )
                 self.new_conn.commit()
             
             self.stats['courses']['migrated'] = len(course_values)
@@ -1142,7 +1572,7 @@ class DatabaseMigration:
                         continue  # Skip - already exists
                     
                     # Generate new UUID for new offering
-                    offering_uuid = uuid.uuid4()
+                    offering_uuid = legacy_uuid('course_offerings', offering['id'])
                     self.id_mappings['course_offerings'][offering['id']] = offering_uuid
                     
                     # Map to master course via subject_id
@@ -1204,13 +1634,13 @@ class DatabaseMigration:
                 return
             
             # Insert into new database
-            insert_query = """
-                INSERT INTO course_offerings (
-                    id, course_id, academic_term_id, section_code,
-                    language_of_instruction, max_enrollment, current_enrollment,
-                    delivery_mode, is_published, enrollment_status,
-                    created_at, updated_at
-                ) VALUES %s
+            columns = (
+                'id', 'course_id', 'academic_term_id', 'section_code',
+                'language_of_instruction', 'max_enrollment',
+                'current_enrollment', 'delivery_mode', 'is_published',
+                'enrollment_status', 'created_at', 'updated_at'
+            )
+            on_conflict = """
                 ON CONFLICT (course_id, academic_term_id, section_code) DO UPDATE SET
                     max_enrollment = EXCLUDED.max_enrollment,
                     current_enrollment = EXCLUDED.current_enrollment,
@@ -1218,7 +1648,10 @@ class DatabaseMigration:
             """
             
             with self.new_conn.cursor() as cur:
-                execute_values(cur, insert_query, offering_values)
+                bulk_load(
+                    cur, 'course_offerings', columns, offering_values, on_conflict,
+                    conflict_columns=('course_id', 'academic_term_id', 'section_code')
+                )
                 self.new_conn.commit()
             
             self.stats['course_offerings']['migrated'] = len(offering_values)
@@ -1308,7 +1741,7 @@ class DatabaseMigration:
                 skipped_duplicate = 0
                 
                 for instructor in old_instructors:
-                    instructor_uuid = uuid.uuid4()
+                    instructor_uuid = legacy_uuid('course_instructors', instructor['id'])
                     
                     # Map to course offering
                     offering_uuid = self.id_mappings.get('course_offerings', {}).get(instructor['course_id'])
@@ -1355,15 +1788,16 @@ class DatabaseMigration:
                 return
             
             # Insert into new database
-            insert_query = """
-                INSERT INTO course_instructors (
-                    id, course_offering_id, instructor_id, role,
-                    assigned_date
-                ) VALUES %s
-            """
+            columns = (
+                'id', 'course_offering_id', 'instructor_id', 'role',
+                'assigned_date'
+            )
+            on_conflict = ""
             
             with self.new_conn.cursor() as cur:
-                execute_values(cur, insert_query, instructor_values)
+                bulk_load(
+                    cur, 'course_instructors', columns, instructor_values, on_conflict
+                )
                 self.new_conn.commit()
             
             self.stats['course_instructors']['migrated'] = len(instructor_values)
@@ -1405,7 +1839,7 @@ class DatabaseMigration:
                 logger.info(f"Found {len(course_students)} direct course enrollments")
                 
                 for enrollment in course_students:
-                    enrollment_uuid = str(uuid.uuid4())
+                    enrollment_uuid = str(legacy_uuid('course_enrollments', enrollment['id']))
                     
                     # Map to course offering
                     offering_uuid = self.id_mappings.get('course_offerings', {}).get(enrollment['course_id'])
@@ -1452,27 +1886,29 @@ class DatabaseMigration:
                 self.stats['enrollments']['total'] = len(course_students)
                 self.stats['enrollments']['migrated'] = len(enrollment_values)
             
-            # Insert into new database in batches
-            insert_query = """
-                INSERT INTO course_enrollments (
-                    id, course_offering_id, student_id, enrollment_status,
-                    enrollment_date, status_changed_date, grade, grade_points,
-                    attendance_percentage, is_retake, notes, created_at, updated_at
-                ) VALUES %s
-                ON CONFLICT (course_offering_id, student_id) 
+            # Insert into new database
+            columns = (
+                'id', 'course_offering_id', 'student_id',
+                'enrollment_status', 'enrollment_date',
+                'status_changed_date', 'grade', 'grade_points',
+                'attendance_percentage', 'is_retake', 'notes', 'created_at',
+                'updated_at'
+            )
+            on_conflict = """
+                ON CONFLICT (course_offering_id, student_id)
                 WHERE enrollment_status = 'enrolled'
                 DO UPDATE SET
                     enrollment_date = EXCLUDED.enrollment_date,
                     enrollment_status = EXCLUDED.enrollment_status
             """
             
-            batch_size = 5000
-            for i in range(0, len(enrollment_values), batch_size):
-                batch = enrollment_values[i:i+batch_size]
-                with self.new_conn.cursor() as cur:
-                    execute_values(cur, insert_query, batch)
-                    self.new_conn.commit()
-                logger.info(f"  Inserted batch {i//batch_size + 1}/{(len(enrollment_values)-1)//batch_size + 1}")
+            with self.new_conn.cursor() as cur:
+                bulk_load(
+                    cur, 'course_enrollments', columns, enrollment_values,
+                    on_conflict,
+                    conflict_columns=('course_offering_id', 'student_id')
+                )
+                self.new_conn.commit()
             
             logger.info(f"✓ Migrated {len(enrollment_values)} enrollments")
             if skipped_no_offering > 0:
@@ -1517,7 +1953,11 @@ class DatabaseMigration:
                 skipped_no_offering = 0
                 
                 for assessment in assessment_groups:
-                    assessment_uuid = str(uuid.uuid4())
+                    assessment_uuid = str(legacy_uuid(
+                        'assessments',
+                        assessment['course_id'],
+                        assessment['course_eva_id']
+                    ))
                     
                     # Map to course offering
                     offering_uuid = self.id_mappings.get(
@@ -1584,29 +2024,24 @@ class DatabaseMigration:
                 self.stats['assessments']['total'] = len(assessment_groups)
                 self.stats['assessments']['migrated'] = len(assessment_values)
             
-            # Insert into new database in batches
-            insert_query = """
-                INSERT INTO assessments (
-                    id, course_offering_id, title, description,
-                    assessment_type, weight_percentage,
-                    total_marks, passing_marks, due_date, duration_minutes,
-                    instructions, submission_type, allows_late_submission,
-                    late_penalty_per_day, max_attempts, is_group_work,
-                    rubric, created_by, created_at, updated_at
-                ) VALUES %s
+            # Insert into new database
+            columns = (
+                'id', 'course_offering_id', 'title', 'description',
+                'assessment_type', 'weight_percentage', 'total_marks',
+                'passing_marks', 'due_date', 'duration_minutes',
+                'instructions', 'submission_type', 'allows_late_submission',
+                'late_penalty_per_day', 'max_attempts', 'is_group_work',
+                'rubric', 'created_by', 'created_at', 'updated_at'
+            )
+            on_conflict = """
                 ON CONFLICT (id) DO NOTHING
             """
             
-            batch_size = 5000
-            for i in range(0, len(assessment_values), batch_size):
-                batch = assessment_values[i:i+batch_size]
-                with self.new_conn.cursor() as cur:
-                    execute_values(cur, insert_query, batch)
-                    self.new_conn.commit()
-                logger.info(
-                    f"  Inserted batch {i//batch_size + 1}/"
-                    f"{(len(assessment_values)-1)//batch_size + 1}"
+            with self.new_conn.cursor() as cur:
+                bulk_load(
+                    cur, 'assessments', columns, assessment_values, on_conflict
                 )
+                self.new_conn.commit()
             
             logger.info(f"✓ Migrated {len(assessment_values)} assessments")
             if skipped_no_offering > 0:
@@ -1628,136 +2063,112 @@ class DatabaseMigration:
         logger.info("=" * 60)
         
         try:
-            # Count total records
+            # Count total records and the id span to split
             with self.old_conn.cursor() as cur:
-                cur.execute("SELECT COUNT(*) FROM journal_details WHERE active = 1")
-                total_grades = cur.fetchone()[0]
+                cur.execute("""
+                    SELECT COUNT(*), MIN(id), MAX(id)
+                    FROM journal_details WHERE active = 1
+                """)
+                total_grades, min_id, max_id = cur.fetchone()
                 self.stats['grades']['total'] = total_grades
                 logger.info(f"Found {total_grades:,} grades to migrate")
             
-            # Process in batches
-            batch_size = 10000
-            offset = 0
+            if not total_grades:
+                return
+            
+            # Small ranges keep workers balanced and progress fine-grained.
+            # The range plan is saved so a resumed run reuses it even with
+            # a different worker count.
+            id_ranges = self.state.get_meta('grade_ranges')
+            if id_ranges is None:
+                parts = max(
+                    self.grade_workers * 8,
+                    -(-total_grades // (self.grade_batch_size * 10))
+                )
+                id_ranges = _split_id_range(min_id, max_id, parts)
+                self.state.set_meta('grade_ranges', id_ranges)
+            id_ranges = [tuple(id_range) for id_range in id_ranges]
+            assessments = self.id_mappings.get('assessments', {})
+            students = self.id_mappings.get('students', {})
+            
+            processed = 0
             migrated_count = 0
             skipped_no_assessment = 0
             skipped_no_student = 0
-            
-            while offset < total_grades:
-                with self.old_conn.cursor(
-                    cursor_factory=RealDictCursor
-                ) as cur:
-                    cur.execute("""
-                        SELECT
-                            jd.id, jd.journal_id, jd.point_id_1,
-                            jd.status_1,
-                            jd.create_date, jd.update_date,
-                            j.course_id, j.student_id, j.course_eva_id
-                        FROM journal_details jd
-                        JOIN journal j ON jd.journal_id = j.id
-                        WHERE jd.active = 1
-                        ORDER BY jd.id
-                        LIMIT %s OFFSET %s
-                    """, (batch_size, offset))
-                    
-                    batch_grades = cur.fetchall()
-                    
-                    if not batch_grades:
-                        break
-                    
-                    grade_values = []
-                    for grade in batch_grades:
-                        grade_uuid = str(uuid.uuid4())
-                        
-                        # Map to assessment
-                        assessment_key = (
-                            grade['course_id'],
-                            grade['course_eva_id']
-                        )
-                        assessment_uuid = self.id_mappings.get(
-                            'assessments', {}
-                        ).get(assessment_key)
-                        
-                        # Map to student
-                        student_uuid = self.id_mappings.get(
-                            'students', {}
-                        ).get(grade['student_id'])
-                        
-                        if not assessment_uuid:
-                            skipped_no_assessment += 1
-                            continue
-                        
-                        if not student_uuid:
-                            skipped_no_student += 1
-                            continue
-                        
-                        # Extract grade value
-                        # Simplified - in production lookup in dictionaries
-                        marks = 0.0
-                        if grade['point_id_1']:
-                            # Simple extraction - can be improved
-                            marks = float(grade['point_id_1'] % 100)
-                        
-                        percentage = marks
-                        
-                        # Calculate letter grade
-                        if percentage >= 90:
-                            letter_grade = 'A'
-                        elif percentage >= 80:
-                            letter_grade = 'B'
-                        elif percentage >= 70:
-                            letter_grade = 'C'
-                        elif percentage >= 60:
-                            letter_grade = 'D'
-                        else:
-                            letter_grade = 'F'
-                        
-                        grade_values.append((
-                            grade_uuid,
-                            assessment_uuid,
-                            student_uuid,
-                            None,  # submission_id
-                            None,  # graded_by
-                            marks,
-                            percentage,
-                            letter_grade,
-                            None,  # feedback
-                            None,  # rubric_scores
-                            True,  # is_final
-                            grade['update_date'],  # graded_at
-                            None,  # approved_by
-                            None,  # approved_at
-                            None,  # grade_history
-                            grade['create_date'] or datetime.now(),
-                            datetime.now()
-                        ))
-                    
-                    # Insert batch
-                    if grade_values:
-                        insert_query = """
-                            INSERT INTO grades (
-                                id, assessment_id, student_id, submission_id,
-                                graded_by, marks_obtained, percentage,
-                                letter_grade, feedback, rubric_scores,
-                                is_final, graded_at, approved_by, approved_at,
-                                grade_history, created_at, updated_at
-                            ) VALUES %s
-                            ON CONFLICT (id) DO NOTHING
-                        """
-                        
-                        with self.new_conn.cursor() as new_cur:
-                            execute_values(new_cur, insert_query, grade_values)
-                            self.new_conn.commit()
-                        
-                        migrated_count += len(grade_values)
-                        self.stats['grades']['migrated'] = migrated_count
+            resumed = 0
+            
+            def record(id_range, result, checkpoint=True):
+                nonlocal processed, migrated_count
+                nonlocal skipped_no_assessment, skipped_no_student
+                if checkpoint:
+                    self.state.mark_done(
+                        f"grades:{id_range[0]}-{id_range[1]}", result
+                    )
+                processed += result['processed']
+                migrated_count += result['migrated']
+                skipped_no_assessment += result['skipped_no_assessment']
+                skipped_no_student += result['skipped_no_student']
+                self.stats['grades']['migrated'] = migrated_count
+                if not checkpoint:
+                    return
                 
-                offset += batch_size
-                progress = (offset / total_grades) * 100
+                elapsed = time.monotonic() - started_at
+                rate = (processed - resumed) / elapsed if elapsed else 0
+                eta = (total_grades - processed) / rate if rate else 0
+                progress = (processed / total_grades) * 100
                 logger.info(
                     f"  Progress: {migrated_count:,}/{total_grades:,} "
-                    f"({progress:.1f}%)"
+                    f"({progress:.1f}%) | {rate:,.0f} rows/s | "
+                    f"ETA {_format_eta(eta)}"
                 )
             
+            # Ranges finished by an interrupted run are not migrated again
+            done = self.state.completed('grades:')
+            pending = []
+            for id_range in id_ranges:
+                result = done.get(f"grades:{id_range[0]}-{id_range[1]}")
+                if result is None:
+                    pending.append(id_range)
+                else:
+                    record(id_range, result, checkpoint=False)
+            resumed = processed
+            if resumed:
+                logger.info(
+                    f"Resuming: {len(id_ranges) - len(pending)} of "
+                    f"{len(id_ranges)} ranges ({resumed:,} rows) already done"
+                )
+            started_at = time.monotonic()
+            
+            logger.info(
+                f"Processing {len(pending)} id ranges with "
+                f"{self.grade_workers} worker(s)"
+            )
+            if self.grade_workers == 1:
+                _init_grade_worker(assessments, students)
+                try:
+                    for id_range in pending:
+                        record(id_range, _migrate_grade_range(
+                            id_range, self.grade_batch_size
+                        ))
+                finally:
+                    _close_grade_worker()
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=self.grade_workers,
+                    initializer=_init_grade_worker,
+                    initargs=(assessments, students)
+                ) as pool:
+                    futures = {
+                        pool.submit(
+                            _migrate_grade_range,
+                            id_range,
+                            self.grade_batch_size
+                        ): id_range
+                        for id_range in pending
+                    }
+                    for future in as_completed(futures):
+                        record(futures[future], future.result())
+            
             logger.info(f"✓ Migrated {migrated_count:,} grades")
             if skipped_no_assessment > 0:
                 logger.info(
@@ -1880,27 +2291,34 @@ class DatabaseMigration:
         try:
             self.connect_databases()
             
-            if phase == 'all' or phase == '1':
-                self.migrate_users()
-                self.migrate_persons()
-            
-            if phase == 'all' or phase == '2':
-                self.migrate_students()
-                self.migrate_staff()
-            
-            if phase == 'all' or phase == '3':
-                self.migrate_organizations()
-                self.migrate_academic_terms()
-            
-            if phase == 'all' or phase == '4':
-                self.migrate_courses()
-                self.migrate_course_offerings()
-                self.migrate_course_instructors()
-            
-            if phase == 'all' or phase == '5':
-                self.migrate_enrollments()
-                self.migrate_assessments()
-                self.migrate_grades()
+            steps = [
+                ('1', 'users', self.migrate_users),
+                ('1', 'persons', self.migrate_persons),
+                ('2', 'students', self.migrate_students),
+                ('2', 'staff', self.migrate_staff),
+                ('3', 'organizations', self.migrate_organizations),
+                ('3', 'academic_terms', self.migrate_academic_terms),
+                ('4', 'courses', self.migrate_courses),
+                ('4', 'course_offerings', self.migrate_course_offerings),
+                ('4', 'course_instructors', self.migrate_course_instructors),
+                ('5', 'enrollments', self.migrate_enrollments),
+                ('5', 'assessments', self.migrate_assessments),
+                ('5', 'grades', self.migrate_grades),
+            ]
+            
+            for step_phase, step, migrate in steps:
+                if phase != 'all' and phase != step_phase:
+                    continue
+                if self.state.is_done(step):
+                    logger.info(
+                        f"↷ Skipping {step} (completed in a previous run)"
+                    )
+                    continue
+                migrate()
+                # Persist mappings before the checkpoint so a resumed run
+                # always has the ids the completed steps produced
+                self.state.save_mappings(self.id_mappings)
+                self.state.mark_done(step, self.stats.get(step))
             
             # Print statistics
             self.print_statistics()
@@ -1923,10 +2341,23 @@ def main():
                        help='Migration phase to run')
     parser.add_argument('--validate', action='store_true',
                        help='Run validation only')
+    parser.add_argument('--grade-workers', type=int, default=1,
+                       help='Worker processes for the grade migration')
+    parser.add_argument('--grade-batch-size', type=int, default=10000,
+                       help='Rows fetched and loaded per grade batch')
+    parser.add_argument('--state-file', default=DEFAULT_STATE_FILE,
+                       help='SQLite file with id mappings and checkpoints')
+    parser.add_argument('--restart', action='store_true',
+                       help='Discard saved mappings and checkpoints')
     
     args = parser.parse_args()
     
-    migration = DatabaseMigration()
+    migration = DatabaseMigration(
+        grade_workers=args.grade_workers,
+        grade_batch_size=args.grade_batch_size,
+        state_file=args.state_file,
+        restart=args.restart
+    )
     
     try:
         if args.validate:
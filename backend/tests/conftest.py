@@ -127,6 +127,74 @@ def client(setup_test_db):
     app.dependency_overrides.clear()
 
 
+class FakeCursor:
+    """
+    psycopg2 cursor stand-in that records statements
+
+    Each query answers with the ``results`` entry whose SQL fragment it
+    contains, otherwise with ``rows``. INSERT/UPDATE/DELETE statements
+    consume ``rowcounts`` in order.
+    """
+
+    def __init__(self, rows=(), results=None, rowcounts=()):
+        self.rows = list(rows)
+        self.results = dict(results or {})
+        self.rowcounts = list(rowcounts)
+        self.executed = []
+        self.rowcount = -1
+        self._result = []
+
+    def execute(self, query, params=None):
+        self.executed.append((" ".join(query.split()), params))
+        self._result = next(
+            (rows for fragment, rows in self.results.items() if fragment in query),
+            self.rows
+        )
+        if query.lstrip().startswith(("INSERT", "UPDATE", "DELETE")) and self.rowcounts:
+            self.rowcount = self.rowcounts.pop(0)
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return list(self._result)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """psycopg2 connection stand-in handing out one FakeCursor"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = False
+        self.rolled_back = False
+        self.closed = False
+
+    def cursor(self, cursor_factory=None):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_connection(monkeypatch):
+    """Point a module's get_db_connection at a FakeConnection"""
+    def connect(module, cursor):
+        conn = FakeConnection(cursor)
+        monkeypatch.setattr(module, "get_db_connection", lambda: conn)
+        return conn
+    return connect
+
+
 # Test entity creation helpers
 def create_test_person(session, **kwargs):
     """Create a test person"""
@@ -0,0 +1,31 @@
+"""
+Tests for the async raw-SQL helpers
+"""
+
+import pytest
+
+from app.core.database import to_dollar_params
+
+
+class TestDollarParams:
+    """Test psycopg2 placeholder conversion for asyncpg"""
+
+    def test_placeholders_are_numbered(self):
+        query = "SELECT * FROM users WHERE username = %s AND is_active = %s"
+        assert to_dollar_params(query) == (
+            "SELECT * FROM users WHERE username = $1 AND is_active = $2"
+        )
+
+    def test_escaped_percent_is_unescaped(self):
+        query = "SELECT * FROM dictionaries WHERE name_en LIKE '%%qrup' AND id = %s"
+        assert to_dollar_params(query) == (
+            "SELECT * FROM dictionaries WHERE name_en LIKE '%qrup' AND id = $1"
+        )
+
+    def test_casts_are_left_alone(self):
+        query = "SELECT id::text FROM students WHERE id = %s"
+        assert to_dollar_params(query) == "SELECT id::text FROM students WHERE id = $1"
+
+    def test_unsupported_placeholder(self):
+        with pytest.raises(ValueError):
+            to_dollar_params("SELECT * FROM users WHERE username = %(name)s")
@@ -0,0 +1,77 @@
+"""
+Tests for saving teacher attendance (single and bulk sessions)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import teachers
+from app.api.teachers import AttendanceRequest
+from tests.conftest import FakeCursor
+
+SCHEDULE_ID = "6f1c2a9e-3b4d-4e5f-8a7b-9c0d1e2f3a4b"
+STUDENT_ID = "0a1b2c3d-4e5f-4a6b-8c7d-8e9f0a1b2c3d"
+
+
+@pytest.fixture
+def connection(fake_connection):
+    def connect(owned=(SCHEDULE_ID,)):
+        return fake_connection(teachers, FakeCursor(results={
+            "FROM staff_members": [{"user_id": "teacher-user"}],
+            "FROM class_schedules": [{"id": schedule_id} for schedule_id in owned],
+        }))
+    return connect
+
+
+def session(schedule_id=SCHEDULE_ID, student_id=STUDENT_ID):
+    return AttendanceRequest(
+        class_schedule_id=schedule_id,
+        attendance_date="2025-03-10",
+        records=[{"student_id": student_id, "status": "present"}],
+    )
+
+
+TEACHER = SimpleNamespace(username="T0001")
+
+
+class TestSaveAttendance:
+    """Test id normalization and authorization"""
+
+    def test_non_canonical_ids_are_normalized(self, connection):
+        conn = connection()
+
+        written = teachers._save_attendance(TEACHER, [
+            session(SCHEDULE_ID.upper(), STUDENT_ID.upper()),
+            session("{" + SCHEDULE_ID + "}", STUDENT_ID.replace("-", "")),
+        ])
+
+        # Both sessions are the same row once normalized
+        assert written == 1
+        assert conn.committed
+        _, params = conn.cursor().executed[-1]
+        assert params[1] == [SCHEDULE_ID]
+        assert params[2] == [STUDENT_ID]
+
+    @pytest.mark.parametrize("schedule_id, student_id", [
+        ("not-a-uuid", STUDENT_ID),
+        (SCHEDULE_ID, "42"),
+        (SCHEDULE_ID, None),
+    ])
+    def test_malformed_ids_are_rejected(self, connection, schedule_id, student_id):
+        conn = connection()
+
+        with pytest.raises(HTTPException) as error:
+            teachers._save_attendance(TEACHER, [session(schedule_id, student_id)])
+
+        assert error.value.status_code == 400
+        assert conn.cursor().executed == []
+
+    def test_foreign_schedule_is_forbidden(self, connection):
+        connection(owned=())
+
+        with pytest.raises(HTTPException) as error:
+            teachers._save_attendance(TEACHER, [session()])
+
+        assert error.value.status_code == 403
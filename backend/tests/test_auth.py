@@ -247,3 +247,59 @@ class TestJWTTokens:
         
         with pytest.raises(HTTPException):
             verify_token(token)
+
+
+class TestTokenClaims:
+    """Test identity claims and token revocation"""
+
+    def _claims_token(self, db_session, user):
+        from app.auth.jwt_handler import create_access_token
+        from app.auth.user_cache import resolve_identity
+        identity = resolve_identity(db_session, user.id)
+        return create_access_token(identity.to_claims())
+
+    def test_login_token_carries_identity_claims(self, client, db_session):
+        """Test that login embeds role, profile id and version claims"""
+        from tests.conftest import create_test_user
+        from app.auth.jwt_handler import verify_token
+        user = create_test_user(db_session, user_type="student")
+
+        response = client.post("/api/v1/auth/login", json={
+            "username": user.username,
+            "password": "testpass123"
+        })
+        payload = verify_token(response.json()["access_token"])
+
+        assert payload["user_type"] == "STUDENT"
+        assert payload["student_id"] is not None
+        assert payload["staff_id"] is None
+        assert payload["ver"] == 0
+
+    def test_claims_token_authenticates(self, client, db_session):
+        """Test that a versioned token is accepted on the claims path"""
+        from tests.conftest import create_test_user
+        user = create_test_user(db_session, user_type="teacher")
+        token = self._claims_token(db_session, user)
+
+        response = client.get(
+            "/api/v1/auth/me",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["user_type"] == "TEACHER"
+
+    def test_revoked_token_is_rejected(self, client, db_session):
+        """Test that bumping the token version rejects older tokens"""
+        from tests.conftest import create_test_user
+        from app.auth.user_cache import revoke_tokens
+        user = create_test_user(db_session, user_type="student")
+        token = self._claims_token(db_session, user)
+
+        assert revoke_tokens(db_session, user) == 1
+
+        response = client.get(
+            "/api/v1/auth/me",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,112 @@
+"""
+Tests for the benchmark harness (statistics, dataset identifiers and seeder SQL)
+"""
+
+import hashlib
+import random
+import re
+
+from benchmarks import run, seed
+from benchmarks.dataset import Dataset, bench_uuid
+from benchmarks.stats import compare, percentile, summarize
+
+INSERT_COLUMNS = re.compile(r"INSERT INTO (\w+) \(([^)]*)\)")
+
+# Mapped to the legacy table layout (no student_number / enrollment_date)
+LEGACY_MODELS = {"students"}
+
+
+def summary(p50=10.0, p95=20.0, p99=30.0, rps=100.0, error_rate=0.0):
+    return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+            "throughput_rps": rps, "error_rate": error_rate}
+
+
+class TestStats:
+    """Test percentiles, summaries and baseline comparison"""
+
+    def test_percentile_interpolates(self):
+        values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+
+        assert percentile(values, 50) == 5.5
+        assert percentile(values, 0) == 1
+        assert percentile(values, 100) == 10
+        assert round(percentile(values, 95), 2) == 9.55
+        assert percentile([], 95) == 0.0
+
+    def test_summarize(self):
+        result = summarize([10.0, 20.0, 30.0, 40.0], errors=1, elapsed=2.0, db_ms=[1.0, 3.0])
+
+        assert result["requests"] == 4
+        assert result["error_rate"] == 0.25
+        assert result["throughput_rps"] == 2.0
+        assert result["p50_ms"] == 25.0
+        assert result["db_p50_ms"] == 2.0
+
+    def test_compare_flags_regressions_only(self):
+        baseline = {"a": summary(), "b": summary(), "gone": summary()}
+        current = {
+            "a": summary(p95=22.0),  # within 15%
+            "b": summary(p99=40.0, rps=80.0, error_rate=0.05),
+            "new": summary(p50=1000.0),
+        }
+
+        regressions = compare(current, baseline, tolerance=0.15)
+
+        assert len(regressions) == 3
+        assert all(line.startswith("b:") for line in regressions)
+
+
+class TestDataset:
+    """Test dataset shape and deterministic ids"""
+
+    def test_ids_match_the_seeder(self):
+        # SQL: md5('bench:offering:' || 1)::uuid
+        expected = hashlib.md5(b"bench:offering:1").hexdigest()
+
+        assert bench_uuid("offering", 1).replace("-", "") == expected
+        assert bench_uuid("assessment", 1, 1) == bench_uuid("assessment", "1", "1")
+        assert bench_uuid("student", 1) != bench_uuid("student", 2)
+
+    def test_default_shape(self):
+        dataset = Dataset()
+
+        assert dataset.schedules == 5_000
+        assert 3_000_000 <= dataset.grades <= 3_500_000
+        assert dataset.scaled(0.1).enrollments_per_student == dataset.enrollments_per_student
+
+    def test_write_bodies_cover_a_large_section(self):
+        dataset = Dataset()
+        rng = random.Random(1)
+
+        attendance = run._attendance_body(dataset, rng)
+        grades = run._grades_body(dataset, rng)
+
+        assert len(attendance["sessions"]) == dataset.schedules_per_offering
+        assert len(attendance["sessions"][0]["records"]) == 1_400
+        assert len(grades["grades"]) == 1_400
+        assert grades["grades"][0]["student_id"] == bench_uuid("student", 1)
+
+
+class TestSeeder:
+    """Test the seeder's SQL against the mapped tables"""
+
+    def test_insert_columns_exist(self):
+        from app.models.base import Base
+        import app.models  # noqa: F401 - registers the mapped tables
+
+        checked = set()
+        for name in dir(seed):
+            sql = getattr(seed, name)
+            if not (name.startswith("_") and isinstance(sql, str)):
+                continue
+            for table, columns in INSERT_COLUMNS.findall(sql):
+                mapped = Base.metadata.tables.get(table)
+                if mapped is None or table in LEGACY_MODELS:
+                    continue
+                names = {column.strip() for column in columns.split(",")}
+                assert names <= set(mapped.columns.keys()), (
+                    f"{name}: {sorted(names - set(mapped.columns.keys()))} not in {table}"
+                )
+                checked.add(table)
+
+        assert {"users", "persons", "staff_members"} <= checked
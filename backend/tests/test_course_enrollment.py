@@ -0,0 +1,75 @@
+"""
+Tests for set-based course enrollment (class schedule course_student)
+"""
+
+from app.api import class_schedule
+from tests.conftest import FakeCursor
+
+
+class TestApplyCourseEnrollment:
+    """Test the add / reactivate / remove statements and their counts"""
+
+    def test_counts(self):
+        # remove, reactivate, insert
+        cursor = FakeCursor(rowcounts=[2, 1, 3])
+
+        changes = class_schedule._apply_course_enrollment(
+            cursor, 7, [5, 4, 4, 6, 8], [1, 2, 4]
+        )
+
+        assert changes == {"added": 3, "reactivated": 1, "removed": 2}
+        lock, remove, reactivate, insert = cursor.executed
+        assert "pg_advisory_xact_lock" in lock[0]
+        # Students both added and removed stay enrolled
+        assert remove[1] == (7, [1, 2])
+        assert "active = 0" in remove[0] and "active <> 0" in remove[0]
+        assert reactivate[1] == (7, [4, 5, 6, 8])
+        assert "active = 1" in reactivate[0] and "active <> 1" in reactivate[0]
+        assert "nextval('course_student_id_seq')" in insert[0]
+        assert "NOT EXISTS" in insert[0]
+        assert insert[1] == (7, [4, 5, 6, 8], 7)
+
+    def test_no_ddl_in_the_request(self):
+        cursor = FakeCursor(rowcounts=[0, 1])
+
+        class_schedule._apply_course_enrollment(cursor, 7, [5], [])
+
+        assert not any("CREATE" in sql or "setval" in sql for sql, _ in cursor.executed)
+
+    def test_remove_only(self):
+        cursor = FakeCursor(rowcounts=[1])
+
+        changes = class_schedule._apply_course_enrollment(cursor, 7, [], [3])
+
+        assert changes == {"added": 0, "reactivated": 0, "removed": 1}
+        assert len(cursor.executed) == 2
+
+
+class TestEnrollEducationGroup:
+    """Test POST /courses/{course_id}/education-groups/{group_id}/enroll"""
+
+    URL = "/api/v1/courses/7/education-groups/3/enroll"
+
+    def test_enrolls_group_students(self, client, fake_connection):
+        cursor = FakeCursor(rowcounts=[2, 1], rows=[(10,), (11,), (12,)])
+        conn = fake_connection(class_schedule, cursor)
+
+        response = client.post(self.URL)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["group_students"] == 3
+        assert data["added"] == 1
+        assert data["reactivated"] == 2
+        assert data["removed"] == 0
+        assert data["message"] == "Enrolled 3 students from education group 3"
+        assert cursor.executed[0][1] == (3,)
+        assert conn.committed
+
+    def test_empty_group(self, client, fake_connection):
+        conn = fake_connection(class_schedule, FakeCursor(rows=[]))
+
+        response = client.post(self.URL)
+
+        assert response.status_code == 404
+        assert conn.rolled_back and not conn.committed
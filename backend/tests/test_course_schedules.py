@@ -0,0 +1,43 @@
+"""
+Tests for the batched course schedule lookup
+"""
+
+from datetime import time
+
+from app.services.course_schedules import fetch_offering_schedules
+from tests.conftest import FakeCursor
+
+
+class TestFetchOfferingSchedules:
+    """Test single-query fetching and grouping"""
+
+    def test_groups_slots_by_offering(self):
+        cur = FakeCursor([
+            {"offering_id": "o1", "day_of_week": 0, "start_time": time(9, 0),
+             "end_time": time(10, 30), "schedule_type": "lecture", "room": "101",
+             "inst_first_name": "Ali", "inst_last_name": "Aliyev"},
+            {"offering_id": "o1", "day_of_week": 2, "start_time": time(9, 0),
+             "end_time": time(10, 30), "schedule_type": "lab", "room": None,
+             "inst_first_name": None, "inst_last_name": None},
+            {"offering_id": "o2", "day_of_week": 4, "start_time": time(13, 0),
+             "end_time": time(14, 0), "schedule_type": "lecture", "room": "202",
+             "inst_first_name": "Leyla", "inst_last_name": "Mammadova"},
+        ])
+
+        schedules = fetch_offering_schedules(cur, ["o1", "o2", "o1", "o3"])
+
+        assert len(cur.executed) == 1
+        assert "= ANY(%s::uuid[])" in cur.executed[0][0]
+        assert sorted(cur.executed[0][1][0]) == ["o1", "o2", "o3"]
+        assert [s["day_name"] for s in schedules["o1"]] == ["Monday", "Wednesday"]
+        assert schedules["o1"][0]["start_time"] == "09:00:00"
+        assert schedules["o1"][0]["instructor_name"] == "Ali Aliyev"
+        assert schedules["o1"][1]["instructor_name"] is None
+        assert schedules["o2"][0]["room"] == "202"
+        assert "o3" not in schedules
+
+    def test_no_offerings_skips_query(self):
+        cur = FakeCursor([])
+
+        assert fetch_offering_schedules(cur, []) == {}
+        assert cur.executed == []
@@ -0,0 +1,81 @@
+"""
+Tests for the precomputed dashboard statistics
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from app.services import dashboard_stats
+
+MIGRATION = (Path(__file__).resolve().parents[1] / "alembic" / "versions"
+             / "3c1f8a2d9b47_dashboard_summary_tables.py")
+
+
+@pytest.fixture(scope="module")
+def migration():
+    spec = importlib.util.spec_from_file_location("dashboard_summary_tables", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestTriggerSql:
+    """Test the maintenance SQL of the summary tables migration"""
+
+    def test_counter_trigger_covers_every_counter(self, migration):
+        sql = migration.counter_trigger_sql("course_enrollments")
+
+        for name, _ in dashboard_stats.COUNTERS["course_enrollments"]:
+            assert f"'{name}'" in sql
+        assert "FOR EACH STATEMENT" in sql
+        assert "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows" in sql
+        assert "d.value + v.delta" in sql
+        assert "d.value - v.delta" in sql
+
+    def test_counters_match_the_service(self, migration):
+        assert migration.COUNTERS == dashboard_stats.COUNTERS
+
+    def test_attendance_has_no_trigger(self, migration):
+        # Aggregated by the periodic refresh instead
+        assert "attendance_records" not in migration.COUNTERS
+        assert not hasattr(dashboard_stats, "install")
+
+
+class TestReads:
+    """Test cached reads and derived percentages"""
+
+    def setup_method(self):
+        dashboard_stats.invalidate()
+
+    def teardown_method(self):
+        dashboard_stats.invalidate()
+
+    def test_counters_are_cached(self, monkeypatch):
+        calls = []
+
+        def load():
+            calls.append(1)
+            return {"students_active": 7}
+
+        monkeypatch.setattr(dashboard_stats, "_load_counters", load)
+
+        assert dashboard_stats.get_counters() == {"students_active": 7}
+        assert dashboard_stats.get_counters() == {"students_active": 7}
+        assert len(calls) == 1
+
+    def test_quick_stats(self, monkeypatch):
+        monkeypatch.setattr(dashboard_stats, "_load_counters", lambda: {
+            "enrollments_completed": 1,
+            "enrollments_total": 3,
+            "staff_utilized": 0,
+            "staff_active": 5,
+        })
+        monkeypatch.setattr(dashboard_stats, "_load_attendance_rate", lambda: 87.5)
+
+        assert dashboard_stats.get_quick_stats() == {
+            "attendance_rate": 87.5,
+            "completion_rate": 33.3,
+            "utilization_rate": 0,
+        }
@@ -0,0 +1,153 @@
+"""
+Tests for the pooled psycopg2 connection provider
+"""
+
+import gc
+import time
+
+import pytest
+import psycopg2.extensions
+
+from app.core.db_pool import ConnectionPool, PooledConnectionMixin, PoolTimeout
+
+
+class _FakeInfo:
+    def __init__(self):
+        self.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.conn.broken:
+            raise psycopg2.OperationalError("server closed the connection")
+        self.conn.pings += 1
+
+
+class _FakeBaseConnection:
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = False
+        self.cursor_factory = None
+        self.info = _FakeInfo()
+        self.rollbacks = 0
+        self.pings = 0
+        self.broken = False
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeConnection(PooledConnectionMixin, _FakeBaseConnection):
+    pass
+
+
+def make_pool(**kwargs):
+    options = {"min_size": 0, "max_size": 2, "timeout": 0.05}
+    options.update(kwargs)
+    return ConnectionPool(connect=FakeConnection, **options)
+
+
+class TestConnectionPool:
+    """Test pool checkout, return and recycling"""
+
+    def test_close_returns_connection_to_pool(self):
+        pool = make_pool()
+        conn = pool.getconn()
+        conn.close()
+
+        assert not conn.closed
+        assert pool.stats()["idle"] == 1
+        assert pool.getconn() is conn
+
+    def test_double_close_is_noop(self):
+        pool = make_pool()
+        conn = pool.getconn()
+        conn.close()
+        conn.close()
+
+        assert pool.stats()["idle"] == 1
+
+    def test_open_transaction_is_rolled_back_on_return(self):
+        pool = make_pool()
+        conn = pool.getconn()
+        conn.autocommit = True
+        conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        conn.close()
+
+        assert conn.rollbacks == 1
+        assert conn.autocommit is False
+
+    def test_cursor_factory_is_applied(self):
+        pool = make_pool()
+        conn = pool.getconn(cursor_factory=dict)
+        assert conn.cursor_factory is dict
+        conn.close()
+
+        assert pool.getconn(cursor_factory=None).cursor_factory is None
+
+    def test_timeout_when_exhausted(self):
+        pool = make_pool(max_size=1)
+        held = pool.getconn()
+
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+        assert pool.stats()["timeouts"] == 1
+        held.close()
+
+    def test_expired_connection_is_recycled(self):
+        pool = make_pool(max_lifetime=0.01)
+        conn = pool.getconn()
+        time.sleep(0.02)
+        conn.close()
+
+        assert conn.closed
+        assert pool.stats()["size"] == 0
+        assert pool.getconn() is not conn
+
+    def test_broken_idle_connection_fails_health_check(self):
+        pool = make_pool(health_check_interval=0)
+        conn = pool.getconn()
+        conn.close()
+        conn.broken = True
+
+        fresh = pool.getconn()
+        assert fresh is not conn
+        assert pool.stats()["health_check_failures"] == 1
+
+    def test_leaked_connection_frees_its_slot(self):
+        pool = make_pool(max_size=1)
+        pool.getconn()
+        gc.collect()
+
+        conn = pool.getconn()
+        assert conn is not None
+        assert pool.stats()["connections_leaked"] == 1
+
+    def test_stats(self):
+        pool = make_pool()
+        first = pool.getconn()
+        second = pool.getconn()
+        first.close()
+
+        stats = pool.stats()
+        assert stats["size"] == 2
+        assert stats["in_use"] == 1
+        assert stats["idle"] == 1
+        assert stats["checkouts"] == 2
+        second.close()
@@ -0,0 +1,63 @@
+"""
+Tests for conditional GET helpers
+"""
+
+from starlette.requests import Request
+
+from app.core.etag import (
+    is_not_modified, make_etag, not_modified, version_sql
+)
+
+
+def make_request(path="/api/v1/students/me/grades", query=b"", headers=None):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query,
+        "headers": [
+            (name.lower().encode(), value.encode())
+            for name, value in (headers or {}).items()
+        ],
+    })
+
+
+class TestEtag:
+    """Test tag computation and If-None-Match matching"""
+
+    def test_tag_depends_on_version_and_query(self):
+        request = make_request()
+
+        etag = make_etag(request, "student-1", "3.100|1.7")
+        assert etag == make_etag(request, "student-1", "3.100|1.7")
+        assert etag != make_etag(request, "student-1", "3.101|1.7")
+        assert etag != make_etag(request, "student-2", "3.100|1.7")
+        assert etag != make_etag(
+            make_request(query=b"start_date=2025-01-06"), "student-1", "3.100|1.7"
+        )
+
+    def test_if_none_match(self):
+        etag = '"abc"'
+
+        assert not is_not_modified(make_request(), etag)
+        assert is_not_modified(make_request(headers={"If-None-Match": '"abc"'}), etag)
+        assert is_not_modified(
+            make_request(headers={"If-None-Match": '"x", W/"abc"'}), etag
+        )
+        assert is_not_modified(make_request(headers={"If-None-Match": "*"}), etag)
+        assert not is_not_modified(
+            make_request(headers={"If-None-Match": '"other"'}), etag
+        )
+
+    def test_not_modified_response(self):
+        response = not_modified('"abc"')
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == '"abc"'
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+    def test_version_sql(self):
+        sql = version_sql("grades g WHERE g.student_id = %s", "g")
+
+        assert "MAX(g.xmin::text::bigint)" in sql
+        assert sql.endswith("FROM grades g WHERE g.student_id = %s)")
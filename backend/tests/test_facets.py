@@ -0,0 +1,94 @@
+"""
+Tests for the cached totals and facets
+"""
+
+import asyncio
+import uuid
+
+from app.core import pagination
+from app.models.person import Person
+from app.services import facets
+from tests.conftest import TestingSessionLocal
+
+
+class TestFacetCache:
+    """Test keys, loading and invalidation"""
+
+    def test_equivalent_filters_share_an_entry(self):
+        first = facets.cache_key("students", "list_count", {
+            "search": "  Ali   MAMMAD ", "org_id": None, "education_type": ""
+        })
+        second = facets.cache_key("students", "list_count", {"search": "ali mammad"})
+
+        assert first == second
+        assert facets.cache_key("students", "list_count", {"search": "ali"}) != first
+
+    def test_loader_runs_once_until_invalidated(self):
+        calls = []
+
+        def load():
+            calls.append(1)
+            return len(calls)
+
+        assert facets.get("staff", "test_count", {"active": True}, load) == 1
+        assert facets.get("staff", "test_count", {"active": True}, load) == 1
+
+        facets.invalidate("students")
+        assert facets.get("staff", "test_count", {"active": True}, load) == 1
+
+        facets.invalidate("staff")
+        assert facets.get("staff", "test_count", {"active": True}, load) == 2
+
+    def test_async_loader(self):
+        calls = []
+
+        async def load():
+            calls.append(1)
+            return {"total": 5}
+
+        async def run():
+            return [await facets.get_async("students", "test_stats", {}, load)
+                    for _ in range(2)]
+
+        assert asyncio.run(run()) == [{"total": 5}, {"total": 5}]
+        assert len(calls) == 1
+
+    def test_invalidation_drops_cached_list_totals(self):
+        counts = iter([10, 11])
+
+        assert pagination.total_count("cached", ("students", "x"), lambda: next(counts)) == 10
+        assert pagination.total_count("cached", ("students", "x"), lambda: next(counts)) == 10
+
+        facets.invalidate("students")
+        assert pagination.total_count("cached", ("students", "x"), lambda: next(counts)) == 11
+
+
+class TestOrmInvalidation:
+    """Test that ORM writes invalidate on commit only"""
+
+    def _person(self):
+        return Person(id=uuid.uuid4(), first_name="Test", last_name="User")
+
+    def test_invalidates_after_commit(self, db_session):
+        before = facets.stats()["generations"]
+
+        db_session.add(self._person())
+        db_session.flush()
+        assert facets.stats()["generations"] == before
+
+        db_session.commit()
+        after = facets.stats()["generations"]
+        assert after == {scope: before[scope] + 1 for scope in facets.SCOPES}
+
+    def test_rollback_does_not_invalidate(self, setup_test_db):
+        before = facets.stats()["generations"]
+        session = TestingSessionLocal()
+        try:
+            session.add(self._person())
+            session.flush()
+            session.rollback()
+        finally:
+            session.close()
+
+        assert facets.stats()["generations"] == before
+        assert facets._PENDING not in session.info
@@ -0,0 +1,125 @@
+"""
+Tests for submitting assessment grades
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import teachers
+from app.api.teachers import GradeSubmitRequest
+from tests.conftest import FakeCursor
+
+OFFERING_ID = "5e2d1c0b-9a8f-4e7d-8c6b-5a4f3e2d1c0b"
+ASSESSMENT_ID = "1f2e3d4c-5b6a-4978-8695-a4b3c2d1e0f9"
+PRESENT = "0a1b2c3d-4e5f-4a6b-8c7d-8e9f0a1b2c3d"
+ABSENT = "9f8e7d6c-5b4a-4392-8170-6f5e4d3c2b1a"
+LATE = "3c4d5e6f-7a8b-4c9d-8e0f-1a2b3c4d5e6f"
+
+TEACHER = SimpleNamespace(username="T0001")
+
+
+@pytest.fixture
+def connection(fake_connection):
+    def connect(attendance=None):
+        if attendance is None:
+            attendance = [
+                {"student_id": PRESENT, "status": "present"},
+                {"student_id": ABSENT, "status": "absent"},
+                {"student_id": LATE, "status": "late"},
+            ]
+        return fake_connection(teachers, FakeCursor(results={
+            "FROM users": [{"id": "teacher-user"}],
+            "FROM course_instructors": [{"id": 1}],
+            "FROM attendance_records": attendance,
+        }))
+    return connect
+
+
+def submission(*grades):
+    return GradeSubmitRequest(
+        course_offering_id=OFFERING_ID,
+        assessment_id=ASSESSMENT_ID,
+        assessment_title="Quiz 1",
+        assessment_type="quiz",
+        total_marks=10,
+        assessment_date="2025-03-10",
+        grades=[
+            {"student_id": student_id, "grade_value": value}
+            for student_id, value in grades
+        ],
+    )
+
+
+def grade_upserts(conn):
+    return [
+        params for sql, params in conn.cursor().executed
+        if sql.startswith("INSERT INTO grades")
+    ]
+
+
+class TestSubmitGrades:
+    """Test attendance checks, id normalization and the batched upsert"""
+
+    def test_absent_and_late_students_are_skipped(self, connection):
+        conn = connection()
+
+        result = teachers.submit_grades(
+            submission((PRESENT, 8), (ABSENT.upper(), 5), ("{" + LATE + "}", 6)),
+            TEACHER
+        )
+
+        assert result["grades_saved"] == 1
+        assert result["skipped_students"] == [
+            {"student_id": ABSENT, "reason": "Student was absent"},
+            {"student_id": LATE, "reason": "Student was late"},
+        ]
+        [params] = grade_upserts(conn)
+        assert params[2:] == [[PRESENT], [8], [None]]
+        assert conn.committed
+
+    def test_duplicate_entries_are_deduplicated(self, connection):
+        conn = connection()
+
+        result = teachers.submit_grades(
+            submission((PRESENT, 7), (PRESENT.upper(), 9)),
+            TEACHER
+        )
+
+        # The last entry wins
+        assert result["grades_saved"] == 1
+        [params] = grade_upserts(conn)
+        assert params == [ASSESSMENT_ID, "teacher-user", [PRESENT], [9], [None]]
+
+    def test_single_upsert_for_the_batch(self, connection):
+        conn = connection(attendance=[{"student_id": PRESENT, "status": "present"}])
+        students = [PRESENT, ABSENT, LATE]
+
+        teachers.submit_grades(
+            submission(*[(student_id, 10) for student_id in students]),
+            TEACHER
+        )
+
+        [params] = grade_upserts(conn)
+        assert params[2] == students
+        assert len(conn.cursor().executed) == 4
+
+    def test_attendance_must_be_submitted(self, connection):
+        conn = connection(attendance=[])
+
+        with pytest.raises(HTTPException) as error:
+            teachers.submit_grades(submission((PRESENT, 8)), TEACHER)
+
+        assert error.value.status_code == 400
+        assert "Attendance must be submitted" in error.value.detail
+        assert grade_upserts(conn) == []
+
+    def test_malformed_ids_are_rejected(self, connection):
+        conn = connection()
+
+        with pytest.raises(HTTPException) as error:
+            teachers.submit_grades(submission(("42", 8)), TEACHER)
+
+        assert error.value.status_code == 400
+        assert conn.cursor().executed == []
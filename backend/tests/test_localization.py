@@ -0,0 +1,59 @@
+"""
+Tests for localized name catalogs
+"""
+
+from contextlib import contextmanager
+
+from app.services import localization, reference_data
+from tests.conftest import FakeCursor
+
+
+class TestLocalize:
+    """Test the language fallback rule"""
+
+    def test_requested_language_first(self):
+        assert localization.localize({"az": "Riyaziyyat", "en": "Math"}, "az") == "Riyaziyyat"
+
+    def test_falls_back_to_english_then_azerbaijani(self):
+        assert localization.localize({"az": "Fizika", "en": "Physics"}, "ru") == "Physics"
+        assert localization.localize({"az": "Fizika", "ru": ""}, "ru") == "Fizika"
+        assert localization.localize({"de": "Physik"}, "ru") == "Physik"
+
+    def test_empty_value(self):
+        assert localization.localize(None) is None
+        assert localization.localize({}) is None
+
+
+class TestCatalogs:
+    """Test per-language projections of the reference sets"""
+
+    def test_projection_per_language(self, monkeypatch):
+        cursor = FakeCursor([
+            {"id": "1", "name": {"az": "Riyaziyyat", "en": "Math", "ru": "Математика"}},
+            {"id": "2", "name": {"az": "Fizika"}},
+            {"id": "3", "name": None},
+        ])
+
+        @contextmanager
+        def db_cursor():
+            yield cursor
+
+        monkeypatch.setattr(reference_data, "db_cursor", db_cursor)
+        monkeypatch.setattr(reference_data, "_loaded", {})
+        monkeypatch.setattr(localization, "_projections", {})
+
+        assert localization.names("courses", "ru") == {"1": "Математика", "2": "Fizika"}
+        assert localization.names("courses", "en") is localization.names("courses", "en")
+        assert localization.name_of("courses", 2, "en") == "Fizika"
+        assert localization.name_of("courses", "3", "en", default="C3") == "C3"
+        assert localization.name_of("courses", None, default="?") == "?"
+        assert len(cursor.executed) == 1
+
+        reference_data.invalidate_tables("courses")
+        cursor.rows = [{"id": "1", "name": {"en": "Mathematics"}}]
+
+        assert localization.names("courses", "en") == {"1": "Mathematics"}
+
+    def test_catalogs_are_not_listed(self):
+        assert "names.courses" not in reference_data.names()
+        assert "courses" in reference_data._source_tables()
@@ -0,0 +1,108 @@
+"""
+Tests for the COPY encoding of the database migration bulk loader
+"""
+
+import importlib.util
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+MIGRATION_SCRIPT = Path(__file__).resolve().parents[1] / "migration" / "migrate_database.py"
+
+
+@pytest.fixture(scope="module")
+def migration(tmp_path_factory):
+    # The script opens its log file in the working directory on import
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(tmp_path_factory.mktemp("migration"))
+        spec = importlib.util.spec_from_file_location("migrate_database", MIGRATION_SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+class TestCopyBuffer:
+    """Test the CSV written for COPY FROM STDIN"""
+
+    def test_grade_row_nulls(self, migration):
+        grade_id = uuid.UUID("00000000-0000-0000-0000-000000000001")
+        row = dict.fromkeys(migration.GRADE_COLUMNS)
+        row.update(id=grade_id, assessment_id=grade_id, student_id=grade_id,
+                   marks_obtained=87.5, letter_grade="B+", feedback='Said "ok"',
+                   rubric_scores={}, is_final=True,
+                   graded_at=datetime(2025, 1, 2, 3, 4, 5), grade_history=[])
+
+        line = migration._copy_buffer([tuple(row.values())]).getvalue()
+
+        fields = line.rstrip("\n").split(",")
+        columns = dict(zip(migration.GRADE_COLUMNS, fields))
+        for nullable in ("submission_id", "graded_by", "approved_by", "approved_at",
+                         "percentage", "created_at", "updated_at"):
+            assert columns[nullable] == r"\N"
+        assert columns["marks_obtained"] == '"87.5"'
+        assert columns["feedback"] == '"Said ""ok"""'
+        assert columns["rubric_scores"] == '"{}"'
+        assert columns["is_final"] == '"True"'
+        assert columns["graded_at"] == '"2025-01-02 03:04:05"'
+
+    def test_copy_declares_null_marker(self, migration):
+        class Cursor:
+            def copy_expert(self, sql, buffer):
+                self.sql, self.data = sql, buffer.read()
+
+        cur = Cursor()
+        migration._copy_rows(cur, "grades_stage", ("id", "graded_by"), [(1, None)])
+
+        assert cur.sql == ("COPY grades_stage (id, graded_by) FROM STDIN "
+                           r"WITH (FORMAT csv, NULL '\N')")
+        assert cur.data == '"1",\\N\n'
+
+
+class _RecordingCursor:
+    """Cursor that records the statements and COPY input of bulk_load"""
+
+    def __init__(self):
+        self.statements = []
+        self.copied = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+        if sql.startswith("INSERT"):
+            self.rowcount = len(self.copied[-1].splitlines())
+
+    def copy_expert(self, sql, buffer):
+        self.copied.append(buffer.read())
+
+
+class TestBulkLoad:
+    """Test NULL handling of every phase loaded through bulk_load"""
+
+    def test_null_uuid_and_text_columns(self, migration):
+        person_id = uuid.UUID("00000000-0000-0000-0000-000000000002")
+        cur = _RecordingCursor()
+
+        affected = migration.bulk_load(
+            cur, "persons", ("id", "user_id", "middle_name", "last_name"),
+            [(person_id, None, None, ""), (person_id, None, r"\N", "Aliyev")],
+            on_conflict="ON CONFLICT (id) DO NOTHING"
+        )
+
+        assert affected == 2
+        first, second = cur.copied[0].splitlines()
+        # NULL uuid and NULL text are unquoted markers
+        assert first == f'"{person_id}",\\N,\\N,""'
+        # A literal backslash-N string stays quoted, i.e. not NULL
+        assert second == f'"{person_id}",\\N,"\\N","Aliyev"'
+
+    def test_rows_are_chunked(self, migration):
+        cur = _RecordingCursor()
+
+        affected = migration.bulk_load(cur, "users", ("id", "email"),
+                                       [(n, None) for n in range(5)], chunk_size=2)
+
+        assert affected == 5
+        assert [len(data.splitlines()) for data in cur.copied] == [2, 2, 1]
+        assert all(line.endswith(r",\N") for data in cur.copied for line in data.splitlines())
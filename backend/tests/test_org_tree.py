@@ -0,0 +1,89 @@
+"""
+Tests for the cached organization tree
+"""
+
+import uuid
+
+from app.models.organization_unit import OrganizationUnit
+from app.services import org_tree
+from app.services.org_tree import OrgNode, OrgTree
+
+
+def node(node_id, parent_id=None, code=None, is_active=True):
+    return OrgNode(node_id, parent_id, code or node_id, {"en": node_id}, "unit", is_active)
+
+
+def make_tree():
+    # uni
+    # ├── a (faculty)
+    # │   ├── a1
+    # │   └── a2 (inactive)
+    # │       └── a2x
+    # └── b
+    return OrgTree([
+        node("a2x", "a2"), node("b", "uni"), node("a", "uni"),
+        node("uni"), node("a2", "a", is_active=False), node("a1", "a"),
+    ])
+
+
+class TestOrgTree:
+    """Test lookups on an in-memory tree"""
+
+    def test_children_are_ordered_by_code(self):
+        tree = make_tree()
+
+        assert tree.roots == ["uni"]
+        assert [c.id for c in tree.children_of("uni")] == ["a", "b"]
+        assert [c.id for c in tree.children_of("a", active_only=True)] == ["a1"]
+        assert tree.children_of("missing") == []
+
+    def test_subtree_and_containment(self):
+        tree = make_tree()
+
+        assert tree.subtree_ids("a") == ["a", "a1", "a2", "a2x"]
+        assert tree.subtree_ids("a", include_self=False, active_only=True) == ["a1", "a2x"]
+        assert tree.subtree_ids("uni") == tree.order
+        assert tree.is_within("a2x", "a")
+        assert tree.is_within("a", "a")
+        assert not tree.is_within("b", "a")
+        assert tree.subtree_ids("missing") == []
+
+    def test_path(self):
+        tree = make_tree()
+
+        assert [n.id for n in tree.path("a2x")] == ["uni", "a", "a2", "a2x"]
+        assert tree.path("missing") == []
+
+    def test_orphans_and_cycles_become_roots(self):
+        tree = OrgTree([node("x", "gone"), node("c1", "c2"), node("c2", "c1")])
+
+        assert sorted(tree.roots) == ["c1", "x"]
+        assert sorted(tree.order) == ["c1", "c2", "x"]
+        assert tree.subtree_ids("c1") == ["c1", "c2"]
+
+
+class TestCachedTree:
+    """Test loading through the ORM and invalidation on writes"""
+
+    def test_reload_after_write(self, db_session):
+        org_tree.invalidate()
+        root = OrganizationUnit(
+            id=uuid.uuid4(), type="university", code="TREE-ROOT", name={"en": "Root"}
+        )
+        db_session.add(root)
+        db_session.commit()
+
+        tree = org_tree.get_tree(db_session)
+        assert str(root.id) in tree
+        assert org_tree.get_tree(db_session) is tree
+
+        child = OrganizationUnit(
+            id=uuid.uuid4(), parent_id=root.id, type="faculty",
+            code="TREE-CHILD", name={"en": "Child"}
+        )
+        db_session.add(child)
+        db_session.commit()
+
+        refreshed = org_tree.get_tree(db_session)
+        assert refreshed.version > tree.version
+        assert refreshed.subtree_ids(str(root.id)) == [str(root.id), str(child.id)]
@@ -0,0 +1,117 @@
+"""
+Tests for the bounded password hashing pool
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.auth.password import hash_password
+from app.auth.password_pool import PasswordHashingBusy, PasswordHashPool
+
+
+class TestPasswordHashPool:
+    """Test admission control and metrics"""
+
+    def test_verify_and_hash(self):
+        pool = PasswordHashPool(workers=1, max_queue=1, queue_timeout=5)
+        hashed = pool.hash("secret")
+
+        assert pool.verify("secret", hashed)
+        assert not pool.verify("wrong", hashed)
+        stats = pool.stats()
+        assert stats["completed"] == 3
+        assert stats["hash_time_avg_ms"] > 0
+        pool.shutdown()
+
+    def test_rejects_when_queue_is_full(self):
+        pool = PasswordHashPool(workers=1, max_queue=0, queue_timeout=5)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+            return True
+
+        worker = threading.Thread(target=pool.run, args=(blocking,))
+        worker.start()
+        started.wait(5)
+
+        with pytest.raises(PasswordHashingBusy) as exc_info:
+            pool.run(lambda: True)
+        assert exc_info.value.retry_after >= 1
+        assert pool.stats()["rejected"] == 1
+
+        release.set()
+        worker.join(5)
+        assert pool.run(lambda: "ok") == "ok"
+        pool.shutdown()
+
+    def test_queue_timeout(self):
+        pool = PasswordHashPool(workers=1, max_queue=1, queue_timeout=0.01)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        worker = threading.Thread(target=pool.run, args=(blocking,))
+        worker.start()
+        started.wait(5)
+        threading.Timer(0.05, release.set).start()
+
+        with pytest.raises(PasswordHashingBusy):
+            pool.run(lambda: True)
+        assert pool.stats()["timed_out"] == 1
+        worker.join(5)
+        pool.shutdown()
+
+    def test_queue_timeout_bounds_caller_wait(self):
+        pool = PasswordHashPool(workers=1, max_queue=1, queue_timeout=0.05)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        worker = threading.Thread(target=pool.run, args=(blocking,))
+        worker.start()
+        started.wait(5)
+
+        began = time.monotonic()
+        with pytest.raises(PasswordHashingBusy):
+            pool.run(lambda: True)
+        # Rejected after the queue timeout, not when the worker frees up
+        assert time.monotonic() - began < 1
+        assert pool.stats()["timed_out"] == 1
+        assert pool.stats()["in_flight"] == 1
+
+        release.set()
+        worker.join(5)
+        assert pool.stats()["in_flight"] == 0
+        pool.shutdown()
+
+
+class TestLoginBackpressure:
+    """Test that login answers 429 when hashing is saturated"""
+
+    def test_login_returns_retry_after(self, client, db_session, monkeypatch):
+        from tests.conftest import create_test_user
+        from app.auth.password_pool import password_pool
+        user = create_test_user(db_session, password_hash=hash_password("testpass123"))
+
+        def busy(*args):
+            raise PasswordHashingBusy(3)
+
+        monkeypatch.setattr(password_pool, "run", busy)
+        response = client.post("/api/v1/auth/login", json={
+            "username": user.username,
+            "password": "testpass123"
+        })
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "3"
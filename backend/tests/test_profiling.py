@@ -0,0 +1,128 @@
+"""
+Tests for the request profiler
+"""
+
+import json
+
+import pytest
+import structlog
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import profiling
+
+
+class _BaseCursor:
+    rowcount = -1
+
+    def execute(self, query, vars=None):
+        self.rowcount = 3
+
+
+def make_app():
+    app = FastAPI(default_response_class=profiling.ProfiledJSONResponse)
+    app.add_middleware(profiling.ProfilingMiddleware)
+    cursor_class = profiling.profiled_cursor_class(_BaseCursor)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        cursor = cursor_class()
+        cursor.execute("SELECT * FROM items WHERE id = %s", (item_id,))
+        cursor.execute("SELECT 1")
+        return {"id": item_id}
+
+    return app
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    profiling.reset()
+    yield
+    profiling.reset()
+
+
+class TestFingerprint:
+    """Test SQL normalization"""
+
+    def test_literals_and_placeholders(self):
+        sql = """
+            SELECT * FROM students  -- list
+            WHERE name = 'O''Brien' AND id IN (%s, %s, %s) AND age > 18
+              AND code = :code AND n = $1
+        """
+
+        assert profiling.fingerprint(sql) == (
+            "SELECT * FROM students WHERE name = ? AND id IN (?+) "
+            "AND age > ? AND code = ? AND n = ?"
+        )
+
+    def test_same_query_same_id(self):
+        first = profiling.fingerprint("SELECT * FROM t WHERE id = 1")
+        second = profiling.fingerprint(b"SELECT *  FROM t WHERE id = 42")
+
+        assert profiling.fingerprint_id(first) == profiling.fingerprint_id(second)
+
+    def test_casts_are_kept(self):
+        assert profiling.fingerprint("SELECT id::text FROM t") == "SELECT id::text FROM t"
+
+
+class TestProfiler:
+    """Test request profiles, headers and metrics"""
+
+    def test_server_timing_and_metrics(self):
+        client = TestClient(make_app())
+
+        response = client.get("/items/7")
+
+        assert response.json() == {"id": 7}
+        timing = response.headers["server-timing"]
+        assert 'desc="2 queries, 6 rows"' in timing
+        assert "serialize;dur=" in timing and "app;dur=" in timing
+
+        client.get("/items/8")
+        text = profiling.metrics_text({"db_pool": {"help": "pool", "values": {"size": 2}}})
+
+        assert 'db_statements_total{method="GET",route="/items/{item_id}"} 4' in text
+        assert 'db_rows_total{method="GET",route="/items/{item_id}"} 12' in text
+        assert ('http_request_duration_seconds_count'
+                '{method="GET",route="/items/{item_id}"} 2') in text
+        assert 'db_pool{key="size"} 2' in text
+
+    def test_statements_outside_requests(self):
+        profiling.profiled_cursor_class(_BaseCursor)().execute("SELECT 1")
+
+        assert profiling.current_profile() is None
+        assert 'db_statements_total{method="",route="background"} 1' in profiling.metrics_text()
+
+    def test_slow_query_log(self, monkeypatch):
+        logged = []
+        monkeypatch.setattr(profiling.settings, "SLOW_QUERY_MS", 0)
+        monkeypatch.setattr(profiling.slow_query_log, "warning",
+                            lambda event, **fields: logged.append((event, fields)))
+
+        profiling.record_statement("SELECT * FROM t WHERE id = 5", 0.25, 1)
+
+        event, fields = logged[0]
+        assert event == "slow_query"
+        assert fields["sql"] == "SELECT * FROM t WHERE id = ?"
+        assert fields["duration_ms"] == 250.0
+
+    def test_logging_renders_json(self, capsys):
+        try:
+            profiling.configure_logging()
+            structlog.get_logger("test").warning("slow_query", duration_ms=250.0)
+        finally:
+            structlog.reset_defaults()
+            profiling.configure_logging()
+
+        entry = json.loads(capsys.readouterr().out)
+        assert entry["event"] == "slow_query"
+        assert entry["level"] == "warning"
+        assert entry["duration_ms"] == 250.0
+        assert "timestamp" in entry
+
+    def test_profiled_class_is_cached(self):
+        cursor_class = profiling.profiled_cursor_class(_BaseCursor)
+
+        assert profiling.profiled_cursor_class(_BaseCursor) is cursor_class
+        assert profiling.profiled_cursor_class(cursor_class) is cursor_class
@@ -0,0 +1,128 @@
+"""
+Tests for the process-wide reference data cache
+"""
+
+import importlib.util
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from app.services import reference_data
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Empty registry whose loaders get a dummy cursor"""
+    monkeypatch.setattr(reference_data, "_sets", {})
+    monkeypatch.setattr(reference_data, "_loaded", {})
+
+    @contextmanager
+    def cursor():
+        yield None
+
+    monkeypatch.setattr(reference_data, "db_cursor", cursor)
+    return reference_data
+
+
+class TestReferenceData:
+    """Test loading, versioning and invalidation"""
+
+    def test_loads_once(self, registry):
+        calls = []
+
+        @registry.register("levels", tables=("levels",))
+        def load(cur):
+            calls.append(1)
+            return [{"id": 1, "name": "Bachelor"}]
+
+        assert registry.get("levels") == [{"id": 1, "name": "Bachelor"}]
+        assert len(calls) == 1
+
+    def test_callers_get_copies(self, registry):
+        @registry.register("levels")
+        def load(cur):
+            return [{"id": 1, "name": {"en": "Bachelor"}}]
+
+        rows = registry.get("levels")
+        rows[0]["name"]["en"] = "changed"
+        rows.append({"id": 2})
+
+        assert registry.get("levels") == [{"id": 1, "name": {"en": "Bachelor"}}]
+        assert registry.bundle(["levels"])["lookups"]["levels"] is not registry.get("levels")
+
+    def test_unknown_set(self, registry):
+        with pytest.raises(KeyError):
+            registry.get("missing")
+
+    def test_table_invalidation_reloads_dependent_sets(self, registry):
+        rows = {"levels": ["a"], "types": ["x"]}
+
+        @registry.register("levels", tables=("levels", "dictionaries"))
+        def load_levels(cur):
+            return [{"id": value} for value in rows["levels"]]
+
+        @registry.register("types", tables=("types",))
+        def load_types(cur):
+            return [{"id": value} for value in rows["types"]]
+
+        before = registry.bundle()
+        rows["levels"] = ["a", "b"]
+        rows["types"] = ["y"]
+        registry.invalidate_tables("dictionaries")
+        after = registry.bundle()
+
+        assert after["lookups"]["levels"] == [{"id": "a"}, {"id": "b"}]
+        assert after["lookups"]["types"] == [{"id": "x"}]
+        assert after["versions"]["levels"] != before["versions"]["levels"]
+        assert after["versions"]["types"] == before["versions"]["types"]
+        assert after["version"] != before["version"]
+
+    def test_version_depends_only_on_content(self, registry):
+        @registry.register("levels")
+        def load(cur):
+            return [{"id": 1}]
+
+        version = registry.version("levels")
+        registry.invalidate()
+
+        assert registry.version("levels") == version
+
+    def test_expires_after_ttl(self, registry, monkeypatch):
+        calls = []
+
+        @registry.register("levels")
+        def load(cur):
+            calls.append(1)
+            return []
+
+        registry.get("levels")
+        monkeypatch.setattr(reference_data.settings, "REFERENCE_DATA_TTL", 0)
+        registry.get("levels")
+
+        assert len(calls) == 2
+
+    def test_bundle_subset(self, registry):
+        for name in ("a", "b", "c"):
+            registry.register(name)(lambda cur, name=name: [{"id": name}])
+
+        bundle = registry.bundle(["c", "a"])
+
+        assert list(bundle["lookups"]) == ["a", "c"]
+        assert registry._source_tables() == []
+
+
+class TestNotifyMigration:
+    """Test that the notify triggers cover every source table"""
+
+    def test_migration_covers_registered_tables(self):
+        import app.main  # noqa: F401 - registers every reference set
+
+        path = next((Path(__file__).resolve().parents[1] / "alembic" / "versions")
+                    .glob("*_reference_data_notify_triggers.py"))
+        spec = importlib.util.spec_from_file_location("reference_data_notify", path)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+
+        assert set(reference_data._source_tables()) <= set(migration.SOURCE_TABLES)
+        assert migration.CHANNEL == reference_data.CHANNEL
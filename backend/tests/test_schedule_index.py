@@ -0,0 +1,85 @@
+"""
+Tests for the schedule occurrence index
+"""
+
+from datetime import date, datetime
+
+from app.services import schedule_index
+from app.services.schedule_index import (
+    OwnerSchedule, ScheduleTemplate, holidays_from_rows
+)
+
+
+def make_template(day_of_week, **kwargs):
+    return ScheduleTemplate(
+        schedule_id=f"s{day_of_week}",
+        day_of_week=day_of_week,
+        start_time="09:00:00",
+        end_time="10:30:00",
+        event={"course_code": "CS101"},
+        **kwargs
+    )
+
+
+class TestOwnerSchedule:
+    """Test weekly materialization"""
+
+    def test_weekly_occurrences_in_range(self):
+        schedule = OwnerSchedule([make_template(0), make_template(2)], frozenset())
+
+        # Wednesday 2025-03-05 to Monday 2025-03-17
+        events = schedule.between(date(2025, 3, 5), date(2025, 3, 17))
+
+        assert [e["id"] for e in events] == [
+            "s2_2025-03-05", "s0_2025-03-10", "s2_2025-03-12", "s0_2025-03-17"
+        ]
+        assert events[0]["start"] == "2025-03-05T09:00:00"
+        assert events[0]["end"] == "2025-03-05T10:30:00"
+        assert events[0]["course_code"] == "CS101"
+
+    def test_effective_dates_and_holidays(self):
+        template = make_template(
+            0,
+            effective_from=date(2025, 3, 10),
+            effective_until=date(2025, 3, 31)
+        )
+        holidays = holidays_from_rows([
+            (datetime(2025, 3, 17, 0, 0), datetime(2025, 3, 18, 23, 59))
+        ])
+        schedule = OwnerSchedule([template], holidays)
+
+        events = schedule.between(date(2025, 3, 1), date(2025, 4, 30))
+
+        assert [e["start"][:10] for e in events] == [
+            "2025-03-10", "2025-03-24", "2025-03-31"
+        ]
+
+    def test_weeks_are_memoized(self):
+        schedule = OwnerSchedule([make_template(0)], frozenset())
+
+        first = schedule.week(date(2025, 3, 3))
+        assert schedule.week(date(2025, 3, 3)) is first
+
+
+class TestIndexCache:
+    """Test owner lookups and invalidation"""
+
+    def teardown_method(self):
+        schedule_index.invalidate()
+
+    def test_store_and_invalidate(self):
+        schedule_index.store_schedule("student", "42", [make_template(1)], frozenset())
+        assert schedule_index.get_schedule("student", 42) is not None
+
+        schedule_index.invalidate("student", 42)
+        assert schedule_index.get_schedule("student", "42") is None
+
+    def test_version_change_misses(self):
+        schedule_index.store_schedule("teacher", "7", [make_template(1)], frozenset(), "1.10")
+        schedule_index.store_holidays([])
+
+        assert schedule_index.get_schedule("teacher", "7", "1.10") is not None
+        # Rows changed since the entry was built: reload it and the holidays
+        assert schedule_index.get_schedule("teacher", "7", "2.11") is None
+        assert schedule_index.get_schedule("teacher", "7") is None
+        assert schedule_index.get_holidays() is None
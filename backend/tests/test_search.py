@@ -0,0 +1,109 @@
+"""
+Tests for the shared search helpers
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy import Column, MetaData, String, Table, select
+
+from app.services import search
+from app.services.search import (
+    orm_search_filter, search_condition, search_rank, split_words
+)
+
+
+class TestSearchCondition:
+    """Test SQL generation for raw queries"""
+
+    def test_every_word_must_match_a_column(self):
+        sql, params = search_condition("Ali  MAMMAD", ["p.first_name", "p.last_name"])
+
+        assert sql == (
+            "((lower(p.first_name) LIKE %s OR lower(p.last_name) LIKE %s) AND "
+            "(lower(p.first_name) LIKE %s OR lower(p.last_name) LIKE %s))"
+        )
+        assert params == ["%ali%", "%ali%", "%mammad%", "%mammad%"]
+
+    def test_wildcards_are_escaped(self):
+        _, params = search_condition("50%_off", ["c.code"])
+
+        assert params == ["%50\\%\\_off%"]
+
+    def test_numeric_word_matches_id(self):
+        sql, params = search_condition("42", ["p.firstname"], id_column="s.id")
+
+        assert "s.id = %s" in sql
+        assert params == ["%42%", 42]
+
+    def test_empty_term(self):
+        assert search_condition("  ", ["p.first_name"]) == ("TRUE", [])
+        assert split_words(None) == []
+
+    def test_rank_needs_trigram(self, monkeypatch):
+        monkeypatch.setattr(search, "_trigram_available", False)
+        assert search_rank("ali", ["p.first_name"]) == ("0", [])
+
+        monkeypatch.setattr(search, "_trigram_available", True)
+        sql, params = search_rank("Ali", ["p.first_name"])
+        assert "similarity(lower(p.first_name), %s)" in sql
+        assert params == ["ali", "ali%", "ali"]
+
+
+class TestDetect:
+    """Test the startup probe (read-only; DDL lives in the migrations)"""
+
+    def _cursor(self, monkeypatch, installed):
+        statements = []
+
+        class Cursor:
+            def execute(self, sql, params=None):
+                statements.append(sql)
+
+            def fetchone(self):
+                return (1,) if installed else None
+
+        @contextmanager
+        def db_cursor(cursor_factory=None):
+            yield Cursor()
+
+        monkeypatch.setattr(search, "db_cursor", db_cursor)
+        return statements
+
+    def test_detects_extension(self, monkeypatch):
+        statements = self._cursor(monkeypatch, installed=True)
+        monkeypatch.setattr(search, "_trigram_available", False)
+
+        assert search.detect() is True
+        assert search.trigram_available()
+        assert all(sql.lstrip().startswith("SELECT") for sql in statements)
+
+    def test_missing_extension(self, monkeypatch):
+        self._cursor(monkeypatch, installed=False)
+        monkeypatch.setattr(search, "_trigram_available", True)
+
+        assert search.detect() is False
+        assert not search.trigram_available()
+
+
+class TestOrmSearchFilter:
+    """Test the SQLAlchemy variant"""
+
+    def test_filter_on_sqlite(self, db_session):
+        people = Table(
+            "search_people", MetaData(),
+            Column("first_name", String), Column("last_name", String)
+        )
+        people.create(db_session.connection())
+        db_session.execute(people.insert(), [
+            {"first_name": "Ali", "last_name": "Mammadov"},
+            {"first_name": "Leyla", "last_name": "Aliyeva"},
+            {"first_name": "Rashad", "last_name": "Huseynov"},
+        ])
+
+        condition = orm_search_filter("ali", [people.c.first_name, people.c.last_name])
+        names = db_session.execute(
+            select(people.c.first_name).where(condition).order_by(people.c.first_name)
+        ).scalars().all()
+
+        assert names == ["Ali", "Leyla"]
+        assert orm_search_filter("", [people.c.first_name]) is None
@@ -0,0 +1,70 @@
+"""
+Tests for the type-ahead prefix index
+"""
+
+from app.services.suggest import PrefixIndex, Suggestion, fold, index_tokens
+
+
+def make_index():
+    return PrefixIndex.build([
+        Suggestion("student", "1", "Çingiz Məmmədov", "S2024001"),
+        Suggestion("student", "2", "Leyla Əliyeva", "S2024002"),
+        Suggestion("teacher", "3", "Ali Aliyev", "E100"),
+        Suggestion("teacher", "4", "Alina Qasımova", None),
+    ])
+
+
+class TestFolding:
+    """Test spelling normalization"""
+
+    def test_fold(self):
+        assert fold("Çingiz MƏMMƏDOV") == "cingiz memmedov"
+        assert fold("Чингиз") == "cingiz"
+        assert fold("Qasımova-Ağa") == "qasimovaaga"
+
+    def test_romanized_digraphs_are_indexed(self):
+        assert index_tokens("Çingiz Məmmədov") == {
+            "cingiz", "chingiz", "memmedov", "mammadov"
+        }
+
+
+class TestPrefixIndex:
+    """Test lookup, ranking and incremental updates"""
+
+    def test_any_spelling_finds_the_entry(self):
+        index = make_index()
+
+        for query in ["Çin", "cingiz", "Chingiz", "Чингиз", "mammad", "memm"]:
+            assert [e.id for e in index.suggest(query)] == ["1"], query
+
+    def test_every_word_must_match(self):
+        index = make_index()
+
+        assert [e.id for e in index.suggest("cin mam")] == ["1"]
+        assert index.suggest("cin leyla") == []
+
+    def test_numbers_match_by_prefix(self):
+        index = make_index()
+
+        assert {e.id for e in index.suggest("s2024")} == {"1", "2"}
+
+    def test_ranking_and_filters(self):
+        index = make_index()
+
+        # First-word matches first, shorter names before longer ones
+        assert [e.id for e in index.suggest("ali")] == ["3", "4", "2"]
+        assert [e.id for e in index.suggest("ali", kinds=["student"])] == ["2"]
+        assert len(index.suggest("ali", limit=1)) == 1
+        assert index.suggest("   ") == []
+
+    def test_upsert_and_remove(self):
+        index = make_index()
+
+        index.upsert(Suggestion("student", "2", "Leyla Hüseynova", "S2024002"))
+        assert [e.id for e in index.suggest("huseyn")] == ["2"]
+        assert [e.id for e in index.suggest("ali")] == ["3", "4"]
+
+        index.remove("teacher", "3")
+        assert [e.id for e in index.suggest("ali")] == ["4"]
+        assert len(index) == 3
+        assert len(index._keys) == sum(len(t) for t in index._tokens.values())
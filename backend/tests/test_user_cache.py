@@ -0,0 +1,66 @@
+"""
+Tests for the TTL cache and the authenticated identity cache
+"""
+
+import time
+
+from app.auth.user_cache import get_identity, identity_cache
+from app.core.cache import TTLCache
+from tests.conftest import create_test_user
+
+
+class TestTTLCache:
+    """Test expiry and LRU eviction"""
+
+    def test_entry_expires(self):
+        cache = TTLCache(max_size=10, ttl=0.01)
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+        time.sleep(0.02)
+        assert cache.get("key") is None
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_get_or_set_calls_loader_once(self):
+        cache = TTLCache()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return "loaded"
+
+        assert cache.get_or_set("key", loader) == "loaded"
+        assert cache.get_or_set("key", loader) == "loaded"
+        assert len(calls) == 1
+
+
+class TestIdentityCache:
+    """Test identity resolution and invalidation"""
+
+    def test_identity_is_cached(self, db_session):
+        user = create_test_user(db_session, user_type="student")
+        identity = get_identity(db_session, user.id)
+
+        assert identity.user_type == "STUDENT"
+        assert identity.student_id is not None
+        assert identity_cache.get(str(user.id)) is identity
+
+    def test_user_update_invalidates_identity(self, db_session):
+        user = create_test_user(db_session, user_type="teacher")
+        assert get_identity(db_session, user.id).is_active
+
+        user.is_active = False
+        db_session.commit()
+
+        assert identity_cache.get(str(user.id)) is None
+        assert not get_identity(db_session, user.id).is_active